@@ -1,6 +1,6 @@
 import React from 'react';
 import { Users, Plus, Calendar, DollarSign, TrendingUp, ArrowRight, Trash2, AlertTriangle, Gift, CheckCircle, AlertCircle, Sparkles, Loader } from 'lucide-react';
-import { calcularFechasRondas, calcularRondaActual, calcularProximoCumpleanos, calcularEstadoTanda } from '../utils/tandaCalculos';
+import { fechasRondasDeTanda, calcularRondaActual, calcularProximoCumpleanos, calcularEstadoTanda } from '../utils/tandaCalculos';
 import { apiFetch } from '../utils/apiFetch';
 
 export default function InicioView({ tandas, setActiveView, onSeleccionarTanda, onCrearNueva, onEliminarTanda, loading = false }) {
@@ -364,7 +364,7 @@ export default function InicioView({ tandas, setActiveView, onSeleccionarTanda,
                                 );
                               })()}
                               {tanda.fechaInicio && (() => {
-                                const fechasRondas = calcularFechasRondas(tanda.fechaInicio, tanda.totalRondas, tanda.frecuencia);
+                                const fechasRondas = fechasRondasDeTanda(tanda);
                                 if (fechasRondas.length === 0) return null;
                                 const fechaFin = new Date(fechasRondas[fechasRondas.length - 1].fechaInicio);
                                 return (
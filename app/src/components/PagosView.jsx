@@ -9,6 +9,7 @@ const LEVEL_STYLES = {
 };
 import { calcularRondaActual, calcularEstadoPorParticipante, calcularFechaRonda, DIAS_VENTANA_CUMPLE } from '../utils/tandaCalculos';
 import { apiFetch } from '../utils/apiFetch';
+import { obtenerMatrizPagos } from '../utils/matrizPagos';
 
 export default function PagosView({ tandaData, setTandaData, loadAdminData }) {
   const [matrizPagos, setMatrizPagos] = useState(null);
@@ -98,39 +99,10 @@ export default function PagosView({ tandaData, setTandaData, loadAdminData }) {
 
     setLoading(true);
     try {
-      const data = await apiFetch(`${pagosUrl}/matriz`);
+      const data = await obtenerMatrizPagos(pagosUrl, Number(tandaData.totalRondas), tandaData.montoPorRonda);
 
       if (data.success) {
-        const matrizApi = data.data?.matriz || [];
-        const pagosArray = [];
-        
-        matrizApi.forEach(participante => {
-          const participanteId = participante.participanteId;
-          const pagos = participante.pagos || {};
-          
-          Object.keys(pagos).forEach(ronda => {
-            const pagoData = pagos[ronda];
-            const tieneInfoRelevante = pagoData && (
-              pagoData.pagado || pagoData.notas || pagoData.exentoPago ||
-              pagoData.monto || pagoData.fechaPago || pagoData.metodoPago
-            );
-            
-            if (tieneInfoRelevante) {
-              pagosArray.push({
-                participanteId,
-                ronda: parseInt(ronda),
-                pagado: pagoData.pagado || false,
-                fechaPago: pagoData.fechaPago,
-                metodoPago: pagoData.metodoPago || 'Transferencia',
-                notas: pagoData.notas || '',
-                monto: pagoData.monto || tandaData.montoPorRonda,
-                exentoPago: pagoData.exentoPago || false
-              });
-            }
-          });
-        });
-        
-        setMatrizPagos(pagosArray);
+        setMatrizPagos(data.pagos);
       }
     } catch (error) {
       console.error('Error cargando matriz:', error);
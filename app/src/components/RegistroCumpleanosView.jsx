@@ -1,7 +1,8 @@
 import React, { useState, useEffect } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
 import { Gift, Calendar, Phone, User, Mail, Cake, PartyPopper, Sparkles, Heart, AlertCircle, CheckCircle, ArrowRight, Info, HelpCircle, X } from 'lucide-react';
-import { API_BASE_URL } from '../utils/apiFetch';
+import { cargarDatosRegistro } from '../utils/registroSnapshot';
+import { enviarRegistro } from '../utils/registroSolicitud';
 import { PAISES, formatPhoneForStorage } from '../utils/phoneUtils';
 
 export default function RegistroCumpleanosView() {
@@ -48,12 +49,11 @@ export default function RegistroCumpleanosView() {
     setError(null);
 
     try {
-      const response = await fetch(`${API_BASE_URL}/registro/${tokenRegistro}`);
-      const data = await response.json();
+      const { ok, data } = await cargarDatosRegistro(tokenRegistro);
 
       //console.log('Respuesta recibida:', data);
 
-      if (!response.ok) {
+      if (!ok) {
         throw new Error(data.error?.message || 'Error al cargar informacion');
       }
 
@@ -103,20 +103,14 @@ export default function RegistroCumpleanosView() {
         throw new Error('La fecha de cumpleanos es requerida');
       }
 
-      const response = await fetch(`${API_BASE_URL}/registro/${token}`, {
-        method: 'POST',
-        headers: {
-          'Content-Type': 'application/json'
-        },
-        body: JSON.stringify({
-          nombre: formData.nombre,
-          telefono: formatPhoneForStorage(lada, formData.telefono),
-          email: formData.email || undefined,
-          fechaCumpleaños: formData.fechaCumpleaños
-        })
+      const response = await enviarRegistro(token, {
+        nombre: formData.nombre,
+        telefono: formatPhoneForStorage(lada, formData.telefono),
+        email: formData.email || undefined,
+        fechaCumpleaños: formData.fechaCumpleaños
       });
 
-      const data = await response.json();
+      const data = response.data;
 
       if (!response.ok) {
         throw new Error(data.error?.message || 'Error al registrarse');
@@ -1,8 +1,9 @@
 import React, { useState, useEffect } from 'react';
 import { Users, CheckCircle, Calendar, DollarSign, AlertCircle, Loader, Shield } from 'lucide-react';
-import { calcularFechasRondas } from '../utils/tandaCalculos';
+import { fechasRondasDeTanda } from '../utils/tandaCalculos';
 import { useParams, useNavigate } from 'react-router-dom';
-import { API_BASE_URL } from '../utils/apiFetch';
+import { cargarDatosRegistro } from '../utils/registroSnapshot';
+import { enviarRegistro } from '../utils/registroSolicitud';
 import { PAISES, formatPhoneForStorage } from '../utils/phoneUtils';
 
 export default function RegistroPublicoView() {
@@ -64,27 +65,17 @@ export default function RegistroPublicoView() {
         throw new Error('Token de registro no válido');
       }
 
-      const url = `${API_BASE_URL}/registro/${token}`;
-      console.log('🌐 URL completa:', url);
-      
-      const response = await fetch(url, {
-        method: 'GET',
-        headers: {
-          'Content-Type': 'application/json',
-        }
-      });
+      const { ok, status, data } = await cargarDatosRegistro(token);
 
-      console.log('📥 Status de respuesta:', response.status);
+      console.log('📥 Status de respuesta:', status);
 
-      if (!response.ok) {
-        if (response.status === 404) {
+      if (!ok) {
+        if (status === 404) {
           throw new Error('Link de registro no válido o expirado');
         }
-        const errorData = await response.json();
-        throw new Error(errorData.error?.message || `Error al cargar datos: ${response.status}`);
+        throw new Error(data.error?.message || `Error al cargar datos: ${status}`);
       }
 
-      const data = await response.json();
       //console.log('✅ Datos recibidos:', data);
 
       if (data.success && data.data) {
@@ -305,24 +296,15 @@ export default function RegistroPublicoView() {
     setError(null);
 
     try {
-      const url = `${API_BASE_URL}/registro/${token}`;
-      console.log('🌐 URL de registro:', url);
-      
-      const response = await fetch(url, {
-        method: 'POST',
-        headers: {
-          'Content-Type': 'application/json'
-        },
-        body: JSON.stringify({
-          nombre: formData.nombre.trim(),
-          telefono: formatPhoneForStorage(lada, formData.telefono),
-          email: formData.email.trim() || undefined,
-          numeros: numerosSeleccionados
-        })
+      const response = await enviarRegistro(token, {
+        nombre: formData.nombre.trim(),
+        telefono: formatPhoneForStorage(lada, formData.telefono),
+        email: formData.email.trim() || undefined,
+        numeros: numerosSeleccionados
       });
 
       console.log('📥 Respuesta status:', response.status);
-      const data = await response.json();
+      const data = response.data;
       console.log('📥 Respuesta data:', data);
       
       if (!response.ok) {
@@ -441,11 +423,7 @@ export default function RegistroPublicoView() {
   const obtenerFechasRonda = (numeroRonda) => {
     if (!tandaData.fechaInicio) return null;
     
-    const fechasRondas = calcularFechasRondas(
-      tandaData.fechaInicio,
-      tandaData.totalRondas,
-      tandaData.frecuencia
-    );
+    const fechasRondas = fechasRondasDeTanda(tandaData);
     
     const ronda = fechasRondas.find(r => r.numero === numeroRonda);
     
@@ -590,11 +568,7 @@ export default function RegistroPublicoView() {
             })()}
 
             {(() => {
-              const fechasRondas = calcularFechasRondas(
-                tandaData.fechaInicio,
-                tandaData.totalRondas,
-                tandaData.frecuencia
-              );
+              const fechasRondas = fechasRondasDeTanda(tandaData);
               
               if (fechasRondas.length === 0) return null;
               
@@ -0,0 +1,77 @@
+// ===========================================
+// utils/matrizPagos.js
+// Carga la matriz de pagos en formato compacto
+// (GET /tandas/{tandaId}/pagos/matriz?format=compact)
+// y la expande a la lista de celdas con pago que usa
+// PagosView: { participanteId, ronda, pagado, ... }.
+//
+// pagados/exentos son bitmaps con bit (ronda - desde);
+// se leen con aritmética porque los operadores de bits
+// de JS sólo llegan a 32 bits.
+// ===========================================
+
+import { apiFetch } from './apiFetch';
+
+// Igual que MATRIZ_VENTANA_MAX en lambda_pagos
+const VENTANA_MAX = 52;
+
+const bitActivo = (mascara, i) => Math.floor(mascara / 2 ** i) % 2 === 1;
+
+export function expandirMatrizCompacta(data, montoPorRonda) {
+  const { desde, hasta, campos = [], predeterminados = {}, participantes = [] } = data;
+  const pagos = [];
+
+  participantes.forEach(participante => {
+    const detalles = new Map((participante.detalles || []).map(fila => [fila[0], fila]));
+
+    for (let i = 0; i <= hasta - desde; i++) {
+      const ronda = desde + i;
+      const pagado = bitActivo(participante.pagados, i);
+      const exentoPago = bitActivo(participante.exentos, i);
+      const fila = detalles.get(ronda);
+
+      if (!pagado && !exentoPago && !fila) continue;
+
+      // null en la fila = valor predeterminado de la matriz;
+      // '' = sin valor (cae en los mismos defaults que la matriz detallada)
+      const celda = {};
+      campos.slice(1).forEach((campo, j) => {
+        celda[campo] = fila?.[j + 1] ?? predeterminados[campo] ?? null;
+      });
+
+      pagos.push({
+        participanteId: participante.participanteId,
+        ronda,
+        pagado,
+        fechaPago: celda.fechaPago,
+        metodoPago: celda.metodoPago || 'Transferencia',
+        notas: celda.notas || '',
+        monto: celda.monto || montoPorRonda,
+        exentoPago
+      });
+    }
+  });
+
+  return pagos;
+}
+
+/**
+ * Devuelve { success, pagos } o la respuesta de error del API.
+ * Las tandas de más de VENTANA_MAX rondas se piden por ventanas.
+ */
+export async function obtenerMatrizPagos(pagosUrl, totalRondas, montoPorRonda) {
+  if (!totalRondas || totalRondas <= VENTANA_MAX) {
+    const data = await apiFetch(`${pagosUrl}/matriz?format=compact`);
+    if (!data.success) return data;
+    return { success: true, pagos: expandirMatrizCompacta(data.data, montoPorRonda) };
+  }
+
+  const pagos = [];
+  for (let desde = 1; desde <= totalRondas; desde += VENTANA_MAX) {
+    const hasta = Math.min(totalRondas, desde + VENTANA_MAX - 1);
+    const data = await apiFetch(`${pagosUrl}/matriz?format=compact&desde=${desde}&hasta=${hasta}`);
+    if (!data.success) return data;
+    pagos.push(...expandirMatrizCompacta(data.data, montoPorRonda));
+  }
+  return { success: true, pagos };
+}
@@ -0,0 +1,57 @@
+// ===========================================
+// utils/registroSnapshot.js
+// Carga los datos públicos de un link de registro.
+// Primero intenta el snapshot estático que publica el
+// backend en el bucket del sitio (registro/{token}.json);
+// si no existe cae al endpoint GET /registro/{token}.
+// ===========================================
+
+import { API_BASE_URL } from './apiFetch';
+
+const BASE_URL_ESTATIC_WEB = 'https://app-tandasmx.s3.us-east-1.amazonaws.com';
+
+function expiracionEnMs(expiracion) {
+  if (typeof expiracion === 'number') return expiracion * 1000;
+  if (typeof expiracion === 'string') return new Date(expiracion).getTime();
+  return null;
+}
+
+/**
+ * Devuelve { ok, status, data } con el mismo formato que el endpoint:
+ * data = { success, data } o { success: false, error: { message } }
+ */
+export async function cargarDatosRegistro(token) {
+  try {
+    const snapshot = await fetch(`${BASE_URL_ESTATIC_WEB}/registro/${token}.json`, {
+      cache: 'no-cache'
+    });
+
+    if (snapshot.ok) {
+      const data = await snapshot.json();
+      const expiraEn = expiracionEnMs(data.data?.expiracion);
+
+      // El snapshot se purga periódicamente; entre purgas se valida aquí
+      if (expiraEn !== null && expiraEn <= Date.now()) {
+        return {
+          ok: false,
+          status: 403,
+          data: { success: false, error: { message: 'Link de registro expirado' } }
+        };
+      }
+
+      return { ok: true, status: 200, data };
+    }
+  } catch (error) {
+    console.warn('⚠️ Snapshot de registro no disponible, usando API:', error);
+  }
+
+  // Sin snapshot (link viejo, borrado o error de red): el endpoint decide
+  const response = await fetch(`${API_BASE_URL}/registro/${token}`, {
+    method: 'GET',
+    headers: {
+      'Content-Type': 'application/json',
+    }
+  });
+  const data = await response.json();
+  return { ok: response.ok, status: response.status, data };
+}
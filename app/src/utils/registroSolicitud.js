@@ -0,0 +1,67 @@
+// ===========================================
+// utils/registroSolicitud.js
+// Envía un registro público (POST /registro/{token}).
+// Con el modo surge activo el backend encola el registro
+// y responde 202 con un solicitudId; aquí se consulta
+// GET /registro/{token}/solicitudes/{solicitudId} hasta
+// que se resuelve, así el componente recibe siempre la
+// respuesta final con el mismo formato.
+// ===========================================
+
+import { API_BASE_URL } from './apiFetch';
+
+const INTERVALO_MS = 1000;
+const INTERVALO_MAX_MS = 4000;
+const ESPERA_MAX_MS = 60000;
+
+const esperar = (ms) => new Promise(resolve => setTimeout(resolve, ms));
+
+/**
+ * Devuelve { ok, status, data } con el formato del registro directo:
+ * data = { success, data } o { success: false, error: { message } }
+ */
+export async function enviarRegistro(token, payload) {
+  const response = await fetch(`${API_BASE_URL}/registro/${token}`, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json'
+    },
+    body: JSON.stringify(payload)
+  });
+  const data = await response.json();
+
+  if (response.status !== 202) {
+    return { ok: response.ok, status: response.status, data };
+  }
+
+  const { solicitudId } = data.data;
+  console.log('📨 Registro en cola:', solicitudId);
+
+  let intervalo = INTERVALO_MS;
+  const limite = Date.now() + ESPERA_MAX_MS;
+
+  while (Date.now() < limite) {
+    await esperar(intervalo);
+    intervalo = Math.min(intervalo * 2, INTERVALO_MAX_MS);
+
+    const consulta = await fetch(`${API_BASE_URL}/registro/${token}/solicitudes/${solicitudId}`, {
+      method: 'GET',
+      headers: {
+        'Content-Type': 'application/json'
+      }
+    });
+    if (consulta.status === 202) continue;
+
+    const resultado = await consulta.json();
+    return { ok: consulta.ok, status: consulta.status, data: resultado };
+  }
+
+  return {
+    ok: false,
+    status: 504,
+    data: {
+      success: false,
+      error: { message: 'Tu registro sigue en proceso. Revisa el tablero en unos minutos antes de intentarlo de nuevo.' }
+    }
+  };
+}
@@ -107,9 +107,10 @@ export const calcularFechaRonda = (fechaInicial, indice, frecuencia) => {
  * @param {string} fechaInicio - Fecha de inicio en formato YYYY-MM-DD
  * @param {number} totalRondas - Total de rondas
  * @param {string} frecuencia - 'semanal', 'quincenal' o 'mensual'
+ * @param {number} diasLimite - Días de gracia después del inicio de cada ronda
  * @returns {Array} Array de objetos con {numero, fechaInicio, fechaLimite}
  */
-export const calcularFechasRondas = (fechaInicio, totalRondas, frecuencia) => {
+export const calcularFechasRondas = (fechaInicio, totalRondas, frecuencia, diasLimite = DIAS_LIMITE_PAGO) => {
   const fechaBase = new Date(fechaInicio + 'T00:00:00');
   const rondas = [];
 
@@ -117,7 +118,7 @@ export const calcularFechasRondas = (fechaInicio, totalRondas, frecuencia) => {
     const fechaInicioRonda = calcularFechaRonda(fechaBase, i, frecuencia);
     
     const fechaLimite = new Date(fechaInicioRonda);
-    fechaLimite.setDate(fechaLimite.getDate() + DIAS_LIMITE_PAGO);
+    fechaLimite.setDate(fechaLimite.getDate() + diasLimite);
 
     rondas.push({
       numero: i,
@@ -129,6 +130,28 @@ export const calcularFechasRondas = (fechaInicio, totalRondas, frecuencia) => {
   return rondas;
 };
 
+/**
+ * Fechas de rondas de una tanda: usa el calendario que guarda el backend
+ * (calendarioRondas) y sólo las calcula si la tanda no lo trae
+ * @param {object} tanda - Tanda con fechaInicio, totalRondas, frecuencia
+ * @returns {Array} Array de objetos con {numero, fechaInicio, fechaLimite}
+ */
+export const fechasRondasDeTanda = (tanda) => {
+  if (tanda?.calendarioRondas?.length) {
+    return tanda.calendarioRondas.map((ronda, index) => ({
+      numero: index + 1,
+      fechaInicio: new Date(ronda.inicio + 'T00:00:00'),
+      fechaLimite: new Date(ronda.limite + 'T00:00:00')
+    }));
+  }
+  return calcularFechasRondas(
+    tanda.fechaInicio,
+    tanda.totalRondas,
+    tanda.frecuencia,
+    tanda.diasLimitePago || DIAS_LIMITE_PAGO
+  );
+};
+
 // ==================== CÁLCULO DE RONDA ACTUAL ====================
 
 /**
@@ -642,7 +665,7 @@ export const calcularEstadoTanda = (tanda) => {
   }
   if (!tanda.fechaInicio) return 'proximas';
   const fechaActual = new Date(); fechaActual.setHours(0, 0, 0, 0);
-  const fechasRondas = calcularFechasRondas(tanda.fechaInicio, tanda.totalRondas, tanda.frecuencia);
+  const fechasRondas = fechasRondasDeTanda(tanda);
   if (fechasRondas.length === 0) return 'proximas';
   const fechaInicio = fechasRondas[0].fechaInicio; fechaInicio.setHours(0, 0, 0, 0);
   const fechaFin = new Date(fechasRondas[fechasRondas.length - 1].fechaLimite); fechaFin.setHours(23, 59, 59, 999);
@@ -10,6 +10,11 @@ resource "aws_apigatewayv2_authorizer" "jwt" {
   name             = "lambda-authorizer"  
   authorizer_payload_format_version = "2.0"
   enable_simple_responses           = true
+
+  # Cachea la respuesta por header Authorization: los clientes activos no
+  # invocan el authorizer en cada request. Un token revocado o expirado
+  # puede seguir aceptándose hasta este TTL.
+  authorizer_result_ttl_in_seconds = 300
 }
 
 # Permiso para que API Gateway invoque el Lambda Authorizer
@@ -7,10 +7,11 @@ resource "aws_apigatewayv2_api" "main" {
   protocol_type = "HTTP"
   
   cors_configuration {
-    allow_origins = ["*"]
-    allow_methods = ["GET", "POST", "PUT", "DELETE", "OPTIONS"]
-    allow_headers = ["Content-Type", "Authorization"]
-    max_age       = 300
+    allow_origins  = ["*"]
+    allow_methods  = ["GET", "POST", "PUT", "DELETE", "OPTIONS"]
+    allow_headers  = ["Content-Type", "Authorization", "If-None-Match"]
+    expose_headers = ["ETag"]
+    max_age        = 300
   }
   
   tags = {
@@ -162,6 +163,15 @@ resource "aws_apigatewayv2_route" "participantes_crear" {
   authorizer_id      = aws_apigatewayv2_authorizer.jwt.id
 }
 
+#POST /tandas/{tandaId}/participantes:batch
+resource "aws_apigatewayv2_route" "participantes_importar" {
+  api_id    = aws_apigatewayv2_api.main.id
+  route_key = "POST /tandas/{tandaId}/participantes:batch"
+  target    = "integrations/${aws_apigatewayv2_integration.participantes.id}"
+  authorization_type = "CUSTOM"
+  authorizer_id      = aws_apigatewayv2_authorizer.jwt.id
+}
+
 #GET /tandas/{tandaId}/participantes
 resource "aws_apigatewayv2_route" "participantes_listar" {
   api_id    = aws_apigatewayv2_api.main.id
@@ -198,6 +208,14 @@ resource "aws_apigatewayv2_route" "registrar_participante_publico" {
   # Sin autorización (pública)
 }
 
+#GET /registro/{token}/solicitudes/{solicitudId}
+resource "aws_apigatewayv2_route" "obtener_solicitud_registro" {
+  api_id    = aws_apigatewayv2_api.main.id
+  route_key = "GET /registro/{token}/solicitudes/{solicitudId}"
+  target    = "integrations/${aws_apigatewayv2_integration.participantes.id}"
+  # Sin autorización (pública)
+}
+
 #Permiso para poder invocar lambda 
 resource "aws_lambda_permission" "participantes" {
   statement_id  = "AllowAPIGatewayInvoke"
@@ -225,6 +243,15 @@ resource "aws_apigatewayv2_route" "pagos_crear" {
   authorizer_id      = aws_apigatewayv2_authorizer.jwt.id
 }
 
+# POST /tandas/{tandaId}/pagos:batch
+resource "aws_apigatewayv2_route" "pagos_crear_lote" {
+  api_id    = aws_apigatewayv2_api.main.id
+  route_key = "POST /tandas/{tandaId}/pagos:batch"
+  target    = "integrations/${aws_apigatewayv2_integration.pagos.id}"
+  authorization_type = "CUSTOM"
+  authorizer_id      = aws_apigatewayv2_authorizer.jwt.id
+}
+
 #GET /tandas/{tandaId}/pagos
 resource "aws_apigatewayv2_route" "pagos_obtener" {
   api_id    = aws_apigatewayv2_api.main.id
@@ -333,6 +360,15 @@ resource "aws_apigatewayv2_route" "reportes" {
   authorizer_id      = aws_apigatewayv2_authorizer.jwt.id
 }
 
+#GET /tandas/{tandaId}/reporte/exportaciones/{exportId}
+resource "aws_apigatewayv2_route" "reporte_exportacion" {
+  api_id    = aws_apigatewayv2_api.main.id
+  route_key = "GET /tandas/{tandaId}/reporte/exportaciones/{exportId}"
+  target    = "integrations/${aws_apigatewayv2_integration.estadisticas.id}"
+  authorization_type = "CUSTOM"
+  authorizer_id      = aws_apigatewayv2_authorizer.jwt.id
+}
+
 #Permiso para poder invocar el lambda
 resource "aws_lambda_permission" "estadisticas" {
   statement_id  = "AllowAPIGatewayInvoke"
@@ -55,6 +55,12 @@ resource "aws_iam_policy" "dynamodb_rw_policy" {
           "arn:aws:dynamodb:*:*:table/pagos/index/*",
           "arn:aws:dynamodb:*:*:table/notificaciones",
           "arn:aws:dynamodb:*:*:table/notificaciones/index/*",
+          "arn:aws:dynamodb:*:*:table/${aws_dynamodb_table.tandas_vista.name}",
+          "arn:aws:dynamodb:*:*:table/${aws_dynamodb_table.pagos_agregados.name}",
+          "arn:aws:dynamodb:*:*:table/${aws_dynamodb_table.estadisticas_snapshots.name}",
+          "arn:aws:dynamodb:*:*:table/${aws_dynamodb_table.reportes_exportaciones.name}",
+          "arn:aws:dynamodb:*:*:table/${aws_dynamodb_table.participantes_slots.name}",
+          "arn:aws:dynamodb:*:*:table/${aws_dynamodb_table.registro_solicitudes.name}",
           "arn:aws:dynamodb:*:*:table/usuarios_admin",
           "arn:aws:dynamodb:*:*:table/usuarios_admin/index/*",
           "arn:aws:dynamodb:*:*:table/links_registro",
@@ -74,6 +80,116 @@ resource "aws_iam_policy" "dynamodb_rw_policy" {
   })
 }
 
+# -------------------------------------------------------------------
+# Snapshots públicos de registro en el bucket del sitio
+# -------------------------------------------------------------------
+resource "aws_iam_role_policy" "lambda_registro_snapshots" {
+  name = "lambda-registro-snapshots"
+  role = aws_iam_role.lambda_exec_role.name
+
+  policy = jsonencode({
+    Version = "2012-10-17"
+    Statement = [
+      {
+        Effect = "Allow"
+        Action = [
+          "s3:PutObject",
+          "s3:DeleteObject"
+        ]
+        Resource = "arn:aws:s3:::${var.site_bucket}/registro/*"
+      },
+      {
+        Effect   = "Allow"
+        Action   = ["s3:ListBucket"]
+        Resource = "arn:aws:s3:::${var.site_bucket}"
+        Condition = {
+          StringLike = { "s3:prefix" = ["registro/*"] }
+        }
+      }
+    ]
+  })
+}
+
+# -------------------------------------------------------------------
+# Reportes exportados (CSV/XLSX) de lambda estadísticas
+# -------------------------------------------------------------------
+resource "aws_s3_bucket" "reportes" {
+  bucket = "tandasmx-reportes-${var.environment}-${data.aws_caller_identity.current.account_id}"
+
+  tags = {
+    Name        = "TandasMX Reportes - ${var.environment}"
+    Environment = var.environment
+  }
+}
+
+resource "aws_s3_bucket_server_side_encryption_configuration" "reportes" {
+  bucket = aws_s3_bucket.reportes.id
+
+  rule {
+    apply_server_side_encryption_by_default {
+      sse_algorithm = "AES256"
+    }
+    bucket_key_enabled = true
+  }
+}
+
+resource "aws_s3_bucket_lifecycle_configuration" "reportes" {
+  bucket = aws_s3_bucket.reportes.id
+
+  # Un día después de que expira el registro en reportes_exportaciones
+  rule {
+    id     = "expire-reportes"
+    status = "Enabled"
+
+    filter {
+      prefix = "reportes/"
+    }
+
+    expiration {
+      days = 8
+    }
+  }
+
+  rule {
+    id     = "cleanup-incomplete-uploads"
+    status = "Enabled"
+
+    abort_incomplete_multipart_upload {
+      days_after_initiation = 1
+    }
+  }
+}
+
+resource "aws_s3_bucket_public_access_block" "reportes" {
+  bucket = aws_s3_bucket.reportes.id
+
+  block_public_acls       = true
+  block_public_policy     = true
+  ignore_public_acls      = true
+  restrict_public_buckets = true
+}
+
+resource "aws_iam_role_policy" "lambda_reportes" {
+  name = "lambda-reportes"
+  role = aws_iam_role.lambda_exec_role.name
+
+  policy = jsonencode({
+    Version = "2012-10-17"
+    Statement = [
+      {
+        Effect = "Allow"
+        Action = [
+          "s3:PutObject",
+          "s3:GetObject",
+          "s3:AbortMultipartUpload",
+          "s3:ListMultipartUploadParts"
+        ]
+        Resource = "${aws_s3_bucket.reportes.arn}/reportes/*"
+      }
+    ]
+  })
+}
+
 resource "aws_iam_role_policy" "lambda_ses" {
   name = "lambda-ses"
   role = aws_iam_role.lambda_exec_role.name
@@ -299,6 +415,7 @@ resource "aws_lambda_function" "lambda_auth" {
       USUARIOS_TABLE     = "usuarios_admin"
       JWT_SECRET         = var.jwt_secret
       JWT_REFRESH_SECRET = var.jwt_refresh_secret
+      SITE_BUCKET        = var.site_bucket
     }
   }
 
@@ -327,8 +444,16 @@ resource "aws_lambda_function" "lambda_tandas" {
       USUARIOS_TABLE      = aws_dynamodb_table.usuarios_admin.name
       PARTICIPANTES_TABLE = aws_dynamodb_table.participantes.name
       PAGOS_TABLE         = aws_dynamodb_table.pagos.name
+      TANDAS_VISTA_TABLE  = aws_dynamodb_table.tandas_vista.name
       JWT_SECRET          = var.jwt_secret
       APP_URL             = var.app_url
+
+      PAGOS_AGREGADOS_TABLE = aws_dynamodb_table.pagos_agregados.name
+      SITE_BUCKET         = var.site_bucket
+
+      DYNAMO_MAX_POOL_CONNECTIONS = "10"
+      FAN_OUT_TIMEOUT_SECONDS     = "5"
+      SLOTS_TABLE                 = aws_dynamodb_table.participantes_slots.name
     }
   }
 
@@ -337,6 +462,29 @@ resource "aws_lambda_function" "lambda_tandas" {
   tags = { Name = "lambda-tanda" }
 }
 
+# Purga de snapshots de registro de links expirados o desactivados
+resource "aws_cloudwatch_event_rule" "purgar_snapshots_registro" {
+  name                = "tandasmx-purgar-snapshots-registro"
+  description         = "Elimina registro/{token}.json de links expirados o desactivados"
+  schedule_expression = "rate(5 minutes)"
+
+  tags = { Name = "tandasmx-purgar-snapshots-registro", Environment = var.environment }
+}
+
+resource "aws_cloudwatch_event_target" "purgar_snapshots_registro" {
+  rule      = aws_cloudwatch_event_rule.purgar_snapshots_registro.name
+  target_id = "lambda-tandas-purgar-snapshots"
+  arn       = aws_lambda_function.lambda_tandas.arn
+}
+
+resource "aws_lambda_permission" "eventbridge_purgar_snapshots_registro" {
+  statement_id  = "AllowEventBridgePurgarSnapshots"
+  action        = "lambda:InvokeFunction"
+  function_name = aws_lambda_function.lambda_tandas.function_name
+  principal     = "events.amazonaws.com"
+  source_arn    = aws_cloudwatch_event_rule.purgar_snapshots_registro.arn
+}
+
 
 # -------------------------------------------------------------------
 # Lambda: PARTICIPANTES
@@ -353,9 +501,21 @@ resource "aws_lambda_function" "lambda_participantes" {
 
   environment {
     variables = {
-      TANDAS_TABLE        = aws_dynamodb_table.tandas.name
-      PARTICIPANTES_TABLE = aws_dynamodb_table.participantes.name
-      JWT_SECRET          = var.jwt_secret
+      TANDAS_TABLE         = aws_dynamodb_table.tandas.name
+      PARTICIPANTES_TABLE  = aws_dynamodb_table.participantes.name
+      PAGOS_TABLE          = aws_dynamodb_table.pagos.name
+      TANDAS_VISTA_TABLE   = aws_dynamodb_table.tandas_vista.name
+      JWT_SECRET           = var.jwt_secret
+      SITE_BUCKET          = var.site_bucket
+      SLOTS_TABLE          = aws_dynamodb_table.participantes_slots.name
+      NOTIFICACIONES_TABLE = aws_dynamodb_table.notificaciones.name
+      SCORE_EVENTS_TABLE   = aws_dynamodb_table.score_events.name
+
+      PAGOS_AGREGADOS_TABLE = aws_dynamodb_table.pagos_agregados.name
+
+      REGISTRO_SURGE_ENABLED   = var.registro_surge_enabled ? "true" : "false"
+      REGISTRO_SURGE_QUEUE_URL = aws_sqs_queue.registro_surge.url
+      SOLICITUDES_TABLE        = aws_dynamodb_table.registro_solicitudes.name
     }
   }
 
@@ -375,15 +535,22 @@ resource "aws_lambda_function" "lambda_pagos" {
   handler          = "handler.lambda_handler"
   source_code_hash = data.archive_file.lambda_pagos.output_base64sha256
   runtime          = "python3.12"
-  timeout          = 30
+  # La reconciliación programada recorre todas las tandas; las peticiones
+  # HTTP las sigue cortando API Gateway a los 30 s
+  timeout          = 120
   memory_size      = 256
 
   environment {
     variables = {
-      TANDAS_TABLE        = aws_dynamodb_table.tandas.name
-      PARTICIPANTES_TABLE = aws_dynamodb_table.participantes.name
-      PAGOS_TABLE         = aws_dynamodb_table.pagos.name
-      JWT_SECRET          = var.jwt_secret
+      TANDAS_TABLE             = aws_dynamodb_table.tandas.name
+      PARTICIPANTES_TABLE      = aws_dynamodb_table.participantes.name
+      PAGOS_TABLE              = aws_dynamodb_table.pagos.name
+      TANDAS_VISTA_TABLE       = aws_dynamodb_table.tandas_vista.name
+      JWT_SECRET               = var.jwt_secret
+      TANDA_CACHE_ENABLED      = "true"
+      TANDA_CACHE_TTL          = "60"
+      PAYMENT_EVENTS_QUEUE_URL = aws_sqs_queue.payment_events.url
+      PAGOS_AGREGADOS_TABLE    = aws_dynamodb_table.pagos_agregados.name
     }
   }
 
@@ -392,6 +559,29 @@ resource "aws_lambda_function" "lambda_pagos" {
   tags = { Name = "lambda_pagos" }
 }
 
+# Reconciliación diaria de pagos_agregados y tandas_vista contra las tablas fuente
+resource "aws_cloudwatch_event_rule" "reconciliar_pagos_agregados" {
+  name                = "tandasmx-reconciliar-pagos-agregados"
+  description         = "Recalcula los totales de pagos y la vista de cada tanda y reporta diferencias"
+  schedule_expression = "cron(0 9 * * ? *)"
+
+  tags = { Name = "tandasmx-reconciliar-pagos-agregados", Environment = var.environment }
+}
+
+resource "aws_cloudwatch_event_target" "reconciliar_pagos_agregados" {
+  rule      = aws_cloudwatch_event_rule.reconciliar_pagos_agregados.name
+  target_id = "lambda-pagos-reconciliar-agregados"
+  arn       = aws_lambda_function.lambda_pagos.arn
+}
+
+resource "aws_lambda_permission" "eventbridge_reconciliar_pagos_agregados" {
+  statement_id  = "AllowEventBridgeReconciliarAgregados"
+  action        = "lambda:InvokeFunction"
+  function_name = aws_lambda_function.lambda_pagos.function_name
+  principal     = "events.amazonaws.com"
+  source_arn    = aws_cloudwatch_event_rule.reconciliar_pagos_agregados.arn
+}
+
 
 # -------------------------------------------------------------------
 # Lambda: NOTIFICACIONES
@@ -412,6 +602,8 @@ resource "aws_lambda_function" "lambda_notificaciones" {
       PARTICIPANTES_TABLE  = aws_dynamodb_table.participantes.name
       NOTIFICACIONES_TABLE = aws_dynamodb_table.notificaciones.name
       JWT_SECRET           = var.jwt_secret
+      TANDA_CACHE_ENABLED  = "true"
+      TANDA_CACHE_TTL      = "60"
     }
   }
 
@@ -456,15 +648,26 @@ resource "aws_lambda_function" "estadisticas" {
   handler          = "handler.lambda_handler"
   source_code_hash = data.archive_file.lambda_estadisticas.output_base64sha256
   runtime          = "python3.12"
-  timeout          = 30
+  # Los snapshots programados recorren todas las tandas activas y las
+  # exportaciones de reportes leen tandas completas; las peticiones HTTP
+  # las sigue cortando API Gateway a los 30 s
+  timeout          = 300
   memory_size      = 256
 
   environment {
     variables = {
-      TANDAS_TABLE        = aws_dynamodb_table.tandas.name
-      PARTICIPANTES_TABLE = aws_dynamodb_table.participantes.name
-      PAGOS_TABLE         = aws_dynamodb_table.pagos.name
-      JWT_SECRET          = var.jwt_secret
+      TANDAS_TABLE                 = aws_dynamodb_table.tandas.name
+      PARTICIPANTES_TABLE          = aws_dynamodb_table.participantes.name
+      PAGOS_TABLE                  = aws_dynamodb_table.pagos.name
+      JWT_SECRET                   = var.jwt_secret
+      TANDA_CACHE_ENABLED          = "true"
+      TANDA_CACHE_TTL              = "60"
+      TANDAS_VISTA_TABLE           = aws_dynamodb_table.tandas_vista.name
+      PAGOS_AGREGADOS_TABLE        = aws_dynamodb_table.pagos_agregados.name
+      ESTADISTICAS_SNAPSHOTS_TABLE = aws_dynamodb_table.estadisticas_snapshots.name
+      EXPORTACIONES_TABLE          = aws_dynamodb_table.reportes_exportaciones.name
+      REPORTES_BUCKET              = aws_s3_bucket.reportes.id
+      REPORTES_QUEUE_URL           = aws_sqs_queue.reportes_export.url
     }
   }
 
@@ -473,6 +676,29 @@ resource "aws_lambda_function" "estadisticas" {
   tags = { Name = "tanda-manager-estadisticas" }
 }
 
+# Snapshots diarios de estadísticas de las tandas activas
+resource "aws_cloudwatch_event_rule" "snapshots_estadisticas" {
+  name                = "tandasmx-snapshots-estadisticas"
+  description         = "Precalcula las estadísticas de cada tanda activa con escrituras desde su último snapshot"
+  schedule_expression = "cron(0 6 * * ? *)"
+
+  tags = { Name = "tandasmx-snapshots-estadisticas", Environment = var.environment }
+}
+
+resource "aws_cloudwatch_event_target" "snapshots_estadisticas" {
+  rule      = aws_cloudwatch_event_rule.snapshots_estadisticas.name
+  target_id = "lambda-estadisticas-snapshots"
+  arn       = aws_lambda_function.estadisticas.arn
+}
+
+resource "aws_lambda_permission" "eventbridge_snapshots_estadisticas" {
+  statement_id  = "AllowEventBridgeSnapshotsEstadisticas"
+  action        = "lambda:InvokeFunction"
+  function_name = aws_lambda_function.estadisticas.function_name
+  principal     = "events.amazonaws.com"
+  source_arn    = aws_cloudwatch_event_rule.snapshots_estadisticas.arn
+}
+
 
 # -------------------------------------------------------------------
 # Lambda: FORGOT PASSWORD
@@ -41,6 +41,122 @@ resource "aws_lambda_event_source_mapping" "process_payment_events" {
   enabled          = true
 }
 
+# ===================================================================
+# SQS FIFO — Registro público en modo surge
+# Un MessageGroupId por tanda: los registros de una tanda se aplican en
+# orden y de a un lote a la vez; tandas distintas se procesan en paralelo.
+# ===================================================================
+
+resource "aws_sqs_queue" "registro_surge_dlq" {
+  name                      = "tandasmx-registro-surge-dlq.fifo"
+  fifo_queue                = true
+  message_retention_seconds = 1209600  # 14 días
+
+  tags = { Name = "tandasmx-registro-surge-dlq", Environment = var.environment }
+}
+
+resource "aws_sqs_queue" "registro_surge" {
+  name                        = "tandasmx-registro-surge.fifo"
+  fifo_queue                  = true
+  content_based_deduplication = false  # MessageDeduplicationId = solicitudId
+  visibility_timeout_seconds  = 180    # 6x el timeout de lambda-participantes
+  message_retention_seconds   = 86400  # 1 día
+
+  redrive_policy = jsonencode({
+    deadLetterTargetArn = aws_sqs_queue.registro_surge_dlq.arn
+    maxReceiveCount     = 5
+  })
+
+  tags = { Name = "tandasmx-registro-surge", Environment = var.environment }
+}
+
+resource "aws_iam_role_policy" "sqs_registro_surge" {
+  name = "sqs-registro-surge"
+  role = aws_iam_role.lambda_exec_role.id
+
+  policy = jsonencode({
+    Version = "2012-10-17"
+    Statement = [{
+      Effect = "Allow"
+      Action = [
+        "sqs:SendMessage",
+        "sqs:ReceiveMessage",
+        "sqs:DeleteMessage",
+        "sqs:GetQueueAttributes",
+        "sqs:GetQueueUrl",
+      ]
+      Resource = aws_sqs_queue.registro_surge.arn
+    }]
+  })
+}
+
+# Trigger SQS → lambda-participantes (procesar_cola_registro)
+resource "aws_lambda_event_source_mapping" "registro_surge" {
+  event_source_arn        = aws_sqs_queue.registro_surge.arn
+  function_name           = aws_lambda_function.lambda_participantes.arn
+  batch_size              = 10
+  function_response_types = ["ReportBatchItemFailures"]
+  enabled                 = true
+}
+
+# ===================================================================
+# SQS FIFO — Exportación de reportes (CSV/XLSX a S3)
+# Un MessageGroupId por tanda: las exportaciones de una tanda se generan
+# de a una; tandas distintas en paralelo.
+# ===================================================================
+
+resource "aws_sqs_queue" "reportes_export_dlq" {
+  name                      = "tandasmx-reportes-export-dlq.fifo"
+  fifo_queue                = true
+  message_retention_seconds = 1209600  # 14 días
+
+  tags = { Name = "tandasmx-reportes-export-dlq", Environment = var.environment }
+}
+
+resource "aws_sqs_queue" "reportes_export" {
+  name                        = "tandasmx-reportes-export.fifo"
+  fifo_queue                  = true
+  content_based_deduplication = false  # MessageDeduplicationId explícito
+  visibility_timeout_seconds  = 1800   # 6x el timeout de lambda estadísticas
+  message_retention_seconds   = 86400  # 1 día
+
+  redrive_policy = jsonencode({
+    deadLetterTargetArn = aws_sqs_queue.reportes_export_dlq.arn
+    maxReceiveCount     = 3
+  })
+
+  tags = { Name = "tandasmx-reportes-export", Environment = var.environment }
+}
+
+resource "aws_iam_role_policy" "sqs_reportes_export" {
+  name = "sqs-reportes-export"
+  role = aws_iam_role.lambda_exec_role.id
+
+  policy = jsonencode({
+    Version = "2012-10-17"
+    Statement = [{
+      Effect = "Allow"
+      Action = [
+        "sqs:SendMessage",
+        "sqs:ReceiveMessage",
+        "sqs:DeleteMessage",
+        "sqs:GetQueueAttributes",
+        "sqs:GetQueueUrl",
+      ]
+      Resource = aws_sqs_queue.reportes_export.arn
+    }]
+  })
+}
+
+# Trigger SQS → lambda estadísticas (procesar_cola_exportaciones)
+resource "aws_lambda_event_source_mapping" "reportes_export" {
+  event_source_arn        = aws_sqs_queue.reportes_export.arn
+  function_name           = aws_lambda_function.estadisticas.arn
+  batch_size              = 1
+  function_response_types = ["ReportBatchItemFailures"]
+  enabled                 = true
+}
+
 # ===================================================================
 # EventBridge — Ejecución semanal (domingos 8am UTC = 2am México Central)
 # ===================================================================
@@ -44,6 +44,20 @@ resource "aws_dynamodb_table" "participantes" {
     name = "participanteId"
     type = "S"
   }
+
+  attribute {
+    name = "birthdayKey"
+    type = "S"
+  }
+
+  # Orden de turnos en tandas cumpleañeras (MMDD#fechaRegistro).
+  # Es un GSI y no un LSI porque un LSI obliga a recrear la tabla.
+  global_secondary_index {
+    name            = "id-birthdayKey-index"
+    hash_key        = "id"
+    range_key       = "birthdayKey"
+    projection_type = "KEYS_ONLY"
+  }
   
   tags = {
     Name        = "participantes"
@@ -53,6 +67,33 @@ resource "aws_dynamodb_table" "participantes" {
 }
 
 
+# Tabla participantes_slots
+# Un item por número asignado en tandas normales; se escribe con
+# attribute_not_exists en la misma transacción que el participante
+resource "aws_dynamodb_table" "participantes_slots" {
+  name           = "participantes_slots"
+  billing_mode   = "PAY_PER_REQUEST"
+  hash_key       = "tandaId"
+  range_key      = "numero"
+
+  attribute {
+    name = "tandaId"
+    type = "S"
+  }
+
+  attribute {
+    name = "numero"
+    type = "N"
+  }
+
+  tags = {
+    Name        = "participantes_slots"
+    Environment = "dev"
+    Project     = "participantes"
+  }
+}
+
+
 # Tabla pagos
 resource "aws_dynamodb_table" "pagos" {
   name           = "pagos"
@@ -69,6 +110,19 @@ resource "aws_dynamodb_table" "pagos" {
     name = "pagoId"
     type = "S"
   }
+
+  attribute {
+    name = "ronda"
+    type = "N"
+  }
+
+  # Pagos de una ronda (GET /tandas/{tandaId}/pagos?ronda=) sin leer la tanda completa
+  global_secondary_index {
+    name            = "id-ronda-index"
+    hash_key        = "id"
+    range_key       = "ronda"
+    projection_type = "ALL"
+  }
   
   tags = {
     Name        = "pagos"
@@ -97,6 +151,103 @@ resource "aws_dynamodb_table" "notificaciones" {
 }
 
 
+
+# Tabla tandas_vista (modelo de lectura desnormalizado: tanda + participantes + pagos)
+resource "aws_dynamodb_table" "tandas_vista" {
+  name           = "tandas_vista"
+  billing_mode   = "PAY_PER_REQUEST"
+  hash_key       = "tandaId"
+
+  attribute {
+    name = "tandaId"
+    type = "S"
+  }
+
+  tags = {
+    Name        = "tandas_vista"
+    Environment = "dev"
+    Project     = "tandas"
+  }
+}
+
+# Tabla pagos_agregados (totales de pagos por tanda, participante y ronda)
+resource "aws_dynamodb_table" "pagos_agregados" {
+  name           = "pagos_agregados"
+  billing_mode   = "PAY_PER_REQUEST"
+  hash_key       = "tandaId"
+
+  attribute {
+    name = "tandaId"
+    type = "S"
+  }
+
+  tags = {
+    Name        = "pagos_agregados"
+    Environment = "dev"
+    Project     = "pagos"
+  }
+}
+
+# Tabla estadisticas_snapshots (estadísticas precalculadas por tanda y día)
+resource "aws_dynamodb_table" "estadisticas_snapshots" {
+  name           = "estadisticas_snapshots"
+  billing_mode   = "PAY_PER_REQUEST"
+  hash_key       = "tandaId"
+  range_key      = "fecha"
+
+  attribute {
+    name = "tandaId"
+    type = "S"
+  }
+
+  attribute {
+    name = "fecha"
+    type = "S"
+  }
+
+  # TTL: los snapshots se borran solos a los 30 días
+  ttl {
+    attribute_name = "ttl"
+    enabled        = true
+  }
+
+  tags = {
+    Name        = "estadisticas_snapshots"
+    Environment = "dev"
+    Project     = "tandas"
+  }
+}
+
+# Tabla reportes_exportaciones
+# Exportaciones CSV/XLSX de reportes (una por tanda, formato y versión de
+# la tanda); el cliente consulta aquí el estado. Se borran solas por TTL
+resource "aws_dynamodb_table" "reportes_exportaciones" {
+  name         = "reportes_exportaciones"
+  billing_mode = "PAY_PER_REQUEST"
+  hash_key     = "tandaId"
+  range_key    = "exportId"
+
+  attribute {
+    name = "tandaId"
+    type = "S"
+  }
+
+  attribute {
+    name = "exportId"
+    type = "S"
+  }
+
+  ttl {
+    attribute_name = "ttl"
+    enabled        = true
+  }
+
+  tags = {
+    Name        = "reportes_exportaciones"
+    Environment = var.environment
+  }
+}
+
 # Tabla usuarios_admin
 resource "aws_dynamodb_table" "usuarios_admin" {
   name           = "usuarios_admin"
@@ -143,6 +294,12 @@ resource "aws_dynamodb_table" "links_registro" {
     type = "S"
   }
 
+  # expiracion siempre en epoch (segundos); ver backup_system/migrar_expiracion_links.py
+  attribute {
+    name = "expiracion"
+    type = "N"
+  }
+
   # Index para buscar por tandaId
   global_secondary_index {
     name            = "tandaId-index"
@@ -150,6 +307,14 @@ resource "aws_dynamodb_table" "links_registro" {
     projection_type = "ALL"
   }
 
+  # Index para obtener el link vigente más reciente de una tanda
+  global_secondary_index {
+    name            = "tandaId-expiracion-index"
+    hash_key        = "tandaId"
+    range_key       = "expiracion"
+    projection_type = "ALL"
+  }
+
   # TTL para auto-eliminación
   ttl {
     attribute_name = "ttl"
@@ -163,6 +328,31 @@ resource "aws_dynamodb_table" "links_registro" {
 }
 
 
+# Tabla registro_solicitudes
+# Registros públicos encolados en modo surge; el cliente consulta aquí el
+# resultado. Se borran solas por TTL al día siguiente
+resource "aws_dynamodb_table" "registro_solicitudes" {
+  name         = "registro_solicitudes"
+  billing_mode = "PAY_PER_REQUEST"
+  hash_key     = "solicitudId"
+
+  attribute {
+    name = "solicitudId"
+    type = "S"
+  }
+
+  ttl {
+    attribute_name = "ttl"
+    enabled        = true
+  }
+
+  tags = {
+    Name        = "TandasRegistroSolicitudes"
+    Environment = var.environment
+  }
+}
+
+
 # ═══════════════════════════════════════════════════════════════
 # Score System Tables
 # ═══════════════════════════════════════════════════════════════
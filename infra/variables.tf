@@ -207,3 +207,15 @@ variable "token_expiration_hours" {
   type        = number
   default     = 24
 }
+
+variable "site_bucket" {
+  description = "Bucket S3 del sitio estático (también sirve registro/{token}.json)"
+  type        = string
+  default     = "app-tandasmx"
+}
+
+variable "registro_surge_enabled" {
+  description = "Encolar el registro público (POST /registro/{token}) y aplicarlo por tanda en orden; responde 202 y se consulta la solicitud"
+  type        = bool
+  default     = false
+}
@@ -0,0 +1,112 @@
+"""
+Migración: birthdayKey en participantes
+=======================================
+Los participantes nuevos guardan `birthdayKey` (MMDD#fechaRegistro), que
+indexa id-birthdayKey-index para calcular el número en tandas cumpleañeras
+sin ordenar a todos los participantes. Los registros anteriores no la
+tienen y no aparecen en el índice hasta que se calcula.
+
+Recorre la tabla y escribe `birthdayKey` a cada participante con
+fechaCumpleaños que no la tenga. La escritura es condicional
+(attribute_not_exists), así que se puede correr las veces que sea necesario.
+
+Uso:
+  # Ver qué se cambiaría sin escribir nada
+  python migrar_birthday_key.py --dry-run
+
+  # Aplicar la migración
+  python migrar_birthday_key.py
+
+Requisitos:
+  pip install boto3
+"""
+
+import boto3
+import argparse
+from datetime import datetime
+from botocore.exceptions import ClientError
+
+
+# ============================================================================
+# CONFIGURACIÓN — ajusta estos valores antes de correr
+# ============================================================================
+
+AWS_PROFILE = "tandasmx"
+AWS_REGION  = "us-east-1"
+
+PARTICIPANTES_TABLE = "participantes"
+
+# ============================================================================
+
+
+session  = boto3.Session(profile_name=AWS_PROFILE, region_name=AWS_REGION)
+dynamodb = session.resource("dynamodb")
+
+
+def clave_cumpleanos(fecha_cumpleanos, fecha_registro):
+    """Misma clave que lambda_participantes.clave_cumpleaños."""
+    fecha = datetime.fromisoformat(fecha_cumpleanos)
+    return f"{fecha.month:02d}{fecha.day:02d}#{fecha_registro or ''}"
+
+
+def migrar(dry_run=False):
+    table = dynamodb.Table(PARTICIPANTES_TABLE)
+
+    revisados = 0
+    convertidos = 0
+    errores = 0
+
+    kwargs = {
+        "ProjectionExpression": "id, participanteId, #fc, fechaRegistro, createdAt, birthdayKey",
+        "ExpressionAttributeNames": {"#fc": "fechaCumpleaños"},
+    }
+    while True:
+        response = table.scan(**kwargs)
+
+        for p in response.get("Items", []):
+            revisados += 1
+            if p.get("birthdayKey") or not p.get("fechaCumpleaños"):
+                continue
+
+            try:
+                clave = clave_cumpleanos(p["fechaCumpleaños"], p.get("fechaRegistro", p.get("createdAt")))
+            except ValueError:
+                print(f"  ✗ {p['id']}/{p['participanteId']}: fecha no reconocida '{p['fechaCumpleaños']}'")
+                errores += 1
+                continue
+
+            print(f"  {p['id']}/{p['participanteId']}: {clave}")
+            if dry_run:
+                convertidos += 1
+                continue
+
+            try:
+                table.update_item(
+                    Key={"id": p["id"], "participanteId": p["participanteId"]},
+                    UpdateExpression="SET birthdayKey = :clave",
+                    ConditionExpression="attribute_exists(participanteId) AND attribute_not_exists(birthdayKey)",
+                    ExpressionAttributeValues={":clave": clave},
+                )
+                convertidos += 1
+            except ClientError as e:
+                if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                    # Ya la escribió la lambda (o se borró) mientras corría
+                    continue
+                print(f"  ✗ {p['id']}/{p['participanteId']}: {e}")
+                errores += 1
+
+        if "LastEvaluatedKey" not in response:
+            break
+        kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    accion = "Por convertir" if dry_run else "Convertidos"
+    print(f"\nRevisados: {revisados} | {accion}: {convertidos} | Errores: {errores}")
+    return errores == 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Calcular birthdayKey de participantes existentes")
+    parser.add_argument("--dry-run", action="store_true", help="Sólo mostrar los cambios")
+    args = parser.parse_args()
+
+    exit(0 if migrar(dry_run=args.dry_run) else 1)
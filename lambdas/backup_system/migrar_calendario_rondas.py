@@ -0,0 +1,115 @@
+"""
+Migración: calendario de rondas en tandas
+=========================================
+Al crear o actualizar una tanda, lambda_tandas guarda las fechas de todas
+sus rondas (calendarioRondas) y los parámetros con que se generaron
+(calendarioClave). Las tandas anteriores no lo tienen, y sus lectores lo
+calculan en cada llamada hasta correr esta migración.
+
+Recorre las tandas con frecuencia semanal, quincenal o mensual y escribe
+el calendario donde falta o no corresponde a fechaInicio, totalRondas y
+diasLimitePago actuales. También refresca la tanda dentro de tandas_vista.
+
+Uso:
+  # Ver qué se cambiaría sin escribir nada
+  python migrar_calendario_rondas.py --dry-run
+
+  # Aplicar la migración
+  python migrar_calendario_rondas.py
+
+Requisitos:
+  pip install boto3
+"""
+
+import argparse
+import os
+import sys
+
+
+# ============================================================================
+# CONFIGURACIÓN — ajusta estos valores antes de correr
+# ============================================================================
+
+AWS_PROFILE = "tandasmx"
+AWS_REGION  = "us-east-1"
+
+# ============================================================================
+
+
+os.environ.setdefault("AWS_PROFILE", AWS_PROFILE)
+os.environ.setdefault("AWS_DEFAULT_REGION", AWS_REGION)
+
+# Reutilizar exactamente la misma lógica que usan las lambdas
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "lambda_tandas"))
+
+from utils.calendario_rondas import calendario_para_guardar  # noqa: E402
+from utils.tanda_vista import actualizar_tanda_vista, _tandas_table  # noqa: E402
+
+
+def scan_all(table, **kwargs):
+    response = table.scan(**kwargs)
+    items = response.get("Items", [])
+    while "LastEvaluatedKey" in response:
+        response = table.scan(ExclusiveStartKey=response["LastEvaluatedKey"], **kwargs)
+        items.extend(response.get("Items", []))
+    return items
+
+
+def migrar(dry_run=False):
+    tandas = scan_all(_tandas_table)
+    print(f"Tandas: {len(tandas)}")
+
+    escritas = 0
+    al_dia = 0
+    sin_calendario = 0
+    errores = 0
+
+    for tanda in tandas:
+        tanda_id = tanda.get("id")
+        try:
+            calendario = calendario_para_guardar(tanda)
+        except ValueError as e:
+            print(f"  ✗ {tanda_id}: fechaInicio inválida ({e})")
+            errores += 1
+            continue
+
+        if not calendario:
+            sin_calendario += 1
+            continue
+        if calendario["calendarioClave"] == tanda.get("calendarioClave"):
+            al_dia += 1
+            continue
+
+        if dry_run:
+            print(f"  · {tanda_id}: {calendario['calendarioClave']}")
+            escritas += 1
+            continue
+
+        try:
+            actualizada = _tandas_table.update_item(
+                Key={"id": tanda_id},
+                UpdateExpression="SET calendarioRondas = :rondas, calendarioClave = :clave",
+                ExpressionAttributeValues={
+                    ":rondas": calendario["calendarioRondas"],
+                    ":clave": calendario["calendarioClave"],
+                },
+                ReturnValues="ALL_NEW",
+            )
+            actualizar_tanda_vista(actualizada["Attributes"])
+            print(f"  ✓ {tanda_id}: {len(calendario['calendarioRondas'])} rondas")
+            escritas += 1
+        except Exception as e:
+            print(f"  ✗ {tanda_id}: {e}")
+            errores += 1
+
+    accion = "Por escribir" if dry_run else "Escritas"
+    print(f"\n{accion}: {escritas} | Al día: {al_dia} | Sin calendario fijo: {sin_calendario} | Errores: {errores}")
+    return errores == 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Guardar el calendario de rondas en tandas existentes")
+    parser.add_argument("--dry-run", action="store_true", help="Sólo mostrar los cambios")
+    args = parser.parse_args()
+
+    sys.exit(0 if migrar(dry_run=args.dry_run) else 1)
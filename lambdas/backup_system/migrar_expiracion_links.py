@@ -0,0 +1,120 @@
+"""
+Migración: expiracion de links_registro a epoch
+===============================================
+Los links antiguos guardaban `expiracion` como string ISO; los nuevos la
+guardan como epoch (segundos). El índice tandaId-expiracion-index es de
+tipo numérico, así que los links con string no aparecen en él hasta que
+se convierten.
+
+Recorre la tabla y convierte cada `expiracion` ISO a epoch. La escritura
+es condicional sobre el valor leído, así que se puede correr las veces
+que sea necesario (antes o después de crear el índice).
+
+Uso:
+  # Ver qué se cambiaría sin escribir nada
+  python migrar_expiracion_links.py --dry-run
+
+  # Aplicar la migración
+  python migrar_expiracion_links.py
+
+Requisitos:
+  pip install boto3
+"""
+
+import boto3
+import argparse
+from datetime import datetime, timezone
+from botocore.exceptions import ClientError
+
+
+# ============================================================================
+# CONFIGURACIÓN — ajusta estos valores antes de correr
+# ============================================================================
+
+AWS_PROFILE = "tandasmx"
+AWS_REGION  = "us-east-1"
+
+LINKS_TABLE = "links_registro"
+
+# Mismo margen que usa generar_link_registro para el TTL
+TTL_MARGEN_SEGUNDOS = 24 * 3600
+
+# ============================================================================
+
+
+session  = boto3.Session(profile_name=AWS_PROFILE, region_name=AWS_REGION)
+dynamodb = session.resource("dynamodb")
+
+
+def iso_a_epoch(valor):
+    """Convierte un ISO (con o sin Z / zona) a epoch en segundos."""
+    fecha = datetime.fromisoformat(valor.replace("Z", "+00:00"))
+    if fecha.tzinfo is None:
+        fecha = fecha.replace(tzinfo=timezone.utc)
+    return int(fecha.timestamp())
+
+
+def migrar(dry_run=False):
+    table = dynamodb.Table(LINKS_TABLE)
+
+    revisados = 0
+    convertidos = 0
+    errores = 0
+
+    kwargs = {"ProjectionExpression": "#t, expiracion", "ExpressionAttributeNames": {"#t": "token"}}
+    while True:
+        response = table.scan(**kwargs)
+
+        for link in response.get("Items", []):
+            revisados += 1
+            expiracion = link.get("expiracion")
+            if not isinstance(expiracion, str):
+                continue
+
+            try:
+                epoch = iso_a_epoch(expiracion)
+            except ValueError:
+                print(f"  ✗ {link['token']}: expiracion no reconocida '{expiracion}'")
+                errores += 1
+                continue
+
+            print(f"  {link['token']}: '{expiracion}' → {epoch}")
+            if dry_run:
+                convertidos += 1
+                continue
+
+            try:
+                table.update_item(
+                    Key={"token": link["token"]},
+                    UpdateExpression="SET expiracion = :epoch, #ttl = if_not_exists(#ttl, :ttl)",
+                    ConditionExpression="expiracion = :anterior",
+                    ExpressionAttributeNames={"#ttl": "ttl"},
+                    ExpressionAttributeValues={
+                        ":epoch": epoch,
+                        ":ttl": epoch + TTL_MARGEN_SEGUNDOS,
+                        ":anterior": expiracion,
+                    },
+                )
+                convertidos += 1
+            except ClientError as e:
+                if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                    # Cambió o se borró (TTL) mientras corría la migración
+                    continue
+                print(f"  ✗ {link['token']}: {e}")
+                errores += 1
+
+        if "LastEvaluatedKey" not in response:
+            break
+        kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    accion = "Por convertir" if dry_run else "Convertidos"
+    print(f"\nRevisados: {revisados} | {accion}: {convertidos} | Errores: {errores}")
+    return errores == 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Normalizar expiracion de links_registro a epoch")
+    parser.add_argument("--dry-run", action="store_true", help="Sólo mostrar los cambios")
+    args = parser.parse_args()
+
+    exit(0 if migrar(dry_run=args.dry_run) else 1)
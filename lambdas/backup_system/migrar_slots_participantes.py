@@ -0,0 +1,127 @@
+"""
+Migración: slots de números en participantes_slots
+==================================================
+En tandas normales cada número asignado se respalda con un item
+(tandaId, numero) en participantes_slots, escrito con attribute_not_exists
+junto con el participante. Los participantes anteriores no tienen slot, así
+que su número no está protegido hasta correr esta migración.
+
+Recorre las tandas normales (frecuencia distinta de 'cumpleaños'), y para
+cada participante escribe su slot si no existe. Si dos participantes ya
+comparten número se reporta como duplicado y se deja el primero.
+
+Uso:
+  # Ver qué se cambiaría sin escribir nada
+  python migrar_slots_participantes.py --dry-run
+
+  # Aplicar la migración
+  python migrar_slots_participantes.py
+
+Requisitos:
+  pip install boto3
+"""
+
+import boto3
+import argparse
+from boto3.dynamodb.conditions import Key
+from botocore.exceptions import ClientError
+
+
+# ============================================================================
+# CONFIGURACIÓN — ajusta estos valores antes de correr
+# ============================================================================
+
+AWS_PROFILE = "tandasmx"
+AWS_REGION  = "us-east-1"
+
+TANDAS_TABLE        = "tandas"
+PARTICIPANTES_TABLE = "participantes"
+SLOTS_TABLE         = "participantes_slots"
+
+# ============================================================================
+
+
+session  = boto3.Session(profile_name=AWS_PROFILE, region_name=AWS_REGION)
+dynamodb = session.resource("dynamodb")
+
+
+def scan_all(table, **kwargs):
+    response = table.scan(**kwargs)
+    items = response.get("Items", [])
+    while "LastEvaluatedKey" in response:
+        response = table.scan(ExclusiveStartKey=response["LastEvaluatedKey"], **kwargs)
+        items.extend(response.get("Items", []))
+    return items
+
+
+def query_all(table, **kwargs):
+    response = table.query(**kwargs)
+    items = response.get("Items", [])
+    while "LastEvaluatedKey" in response:
+        response = table.query(ExclusiveStartKey=response["LastEvaluatedKey"], **kwargs)
+        items.extend(response.get("Items", []))
+    return items
+
+
+def migrar(dry_run=False):
+    tandas_table = dynamodb.Table(TANDAS_TABLE)
+    participantes_table = dynamodb.Table(PARTICIPANTES_TABLE)
+    slots_table = dynamodb.Table(SLOTS_TABLE)
+
+    tandas = scan_all(tandas_table, ProjectionExpression="id, frecuencia")
+    normales = [t["id"] for t in tandas if t.get("frecuencia") != "cumpleaños"]
+    print(f"Tandas normales: {len(normales)} de {len(tandas)}")
+
+    escritos = 0
+    existentes = 0
+    duplicados = 0
+    errores = 0
+
+    for tanda_id in normales:
+        participantes = query_all(
+            participantes_table,
+            KeyConditionExpression=Key("id").eq(tanda_id),
+            ProjectionExpression="participanteId, numeroAsignado",
+        )
+
+        vistos = {}
+        for p in sorted(participantes, key=lambda p: p["participanteId"]):
+            numero = p.get("numeroAsignado")
+            if numero is None:
+                continue
+            numero = int(numero)
+
+            if numero in vistos:
+                print(f"  ✗ {tanda_id}: número {numero} duplicado ({vistos[numero]} y {p['participanteId']})")
+                duplicados += 1
+                continue
+            vistos[numero] = p["participanteId"]
+
+            if dry_run:
+                escritos += 1
+                continue
+
+            try:
+                slots_table.put_item(
+                    Item={"tandaId": tanda_id, "numero": numero, "participanteId": p["participanteId"]},
+                    ConditionExpression="attribute_not_exists(numero)",
+                )
+                escritos += 1
+            except ClientError as e:
+                if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                    existentes += 1
+                    continue
+                print(f"  ✗ {tanda_id}/{numero}: {e}")
+                errores += 1
+
+    accion = "Por escribir" if dry_run else "Escritos"
+    print(f"\n{accion}: {escritos} | Ya existían: {existentes} | Duplicados: {duplicados} | Errores: {errores}")
+    return errores == 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Crear slots de números para participantes existentes")
+    parser.add_argument("--dry-run", action="store_true", help="Sólo mostrar los cambios")
+    args = parser.parse_args()
+
+    exit(0 if migrar(dry_run=args.dry_run) else 1)
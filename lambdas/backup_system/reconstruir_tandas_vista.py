@@ -0,0 +1,85 @@
+"""
+Script de Reconstrucción de la Vista de Tandas
+==============================================
+Regenera los items de la tabla tandas_vista a partir de las tablas
+fuente (tandas, participantes, pagos) y corrige el totalParticipantes
+del item de cada tanda. Útil después de restaurar un backup, si se
+sospecha que alguna vista quedó desincronizada o para inicializar el
+contador en tandas creadas antes de que existiera.
+
+Uso:
+  # Reconstruir todas las tandas
+  python reconstruir_tandas_vista.py
+
+  # Reconstruir una tanda específica
+  python reconstruir_tandas_vista.py --tanda tanda_abc123
+
+Requisitos:
+  pip install boto3
+"""
+
+import argparse
+import os
+import sys
+
+
+# ============================================================================
+# CONFIGURACIÓN — ajusta estos valores antes de correr
+# ============================================================================
+
+AWS_PROFILE = "tandasmx"
+AWS_REGION  = "us-east-1"
+
+# ============================================================================
+
+
+os.environ.setdefault("AWS_PROFILE", AWS_PROFILE)
+os.environ.setdefault("AWS_DEFAULT_REGION", AWS_REGION)
+
+# Reutilizar exactamente la misma lógica que usan las lambdas
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "lambda_tandas"))
+
+from utils.tanda_vista import reconstruir_vista, _tandas_table  # noqa: E402
+
+
+def listar_tanda_ids():
+    """Recorre la tabla tandas y devuelve todos los ids."""
+    ids = []
+    kwargs = {"ProjectionExpression": "id"}
+    while True:
+        response = _tandas_table.scan(**kwargs)
+        ids.extend(item["id"] for item in response.get("Items", []))
+        if "LastEvaluatedKey" not in response:
+            return ids
+        kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+def reconstruir(tanda_ids):
+    ok = 0
+    errores = 0
+
+    for tanda_id in tanda_ids:
+        try:
+            vista = reconstruir_vista(tanda_id)
+            if vista is None:
+                print(f"  - {tanda_id}: tanda no existe, vista eliminada")
+                continue
+            print(f"  ✓ {tanda_id}: {vista.get('totalParticipantes', 0)} participantes (v{vista.get('version')})")
+            ok += 1
+        except Exception as e:
+            print(f"  ✗ {tanda_id}: {str(e)}")
+            errores += 1
+
+    print(f"\nReconstruidas: {ok} | Errores: {errores}")
+    return errores == 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reconstruir la tabla tandas_vista desde las tablas fuente")
+    parser.add_argument("--tanda", help="Id de una tanda específica a reconstruir")
+    args = parser.parse_args()
+
+    tanda_ids = [args.tanda] if args.tanda else listar_tanda_ids()
+    print(f"Reconstruyendo {len(tanda_ids)} tanda(s)...")
+
+    sys.exit(0 if reconstruir(tanda_ids) else 1)
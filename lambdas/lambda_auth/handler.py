@@ -18,6 +18,8 @@ from exception.custom_http_exception import CustomClientError
 
 dynamodb = boto3.resource('dynamodb')
 usuarios_table = dynamodb.Table(os.environ['USUARIOS_TABLE'])
+s3 = boto3.client('s3')
+SITE_BUCKET = os.environ.get('SITE_BUCKET', 'app-tandasmx')
 
 # Configuración JWT
 JWT_SECRET = os.environ['JWT_SECRET']
@@ -378,6 +380,7 @@ def eliminar_usuario(event, context):
         participantes_table = dynamodb.Table('participantes')
         pagos_table = dynamodb.Table('pagos')
         links_table = dynamodb.Table('links_registro')
+        slots_table = dynamodb.Table('participantes_slots')
         for tanda in tandas:
             tanda_id = tanda['id']
             print(f"🗑️ Procesando tanda: {tanda_id}")
@@ -416,6 +419,20 @@ def eliminar_usuario(event, context):
                 )
                 contadores['pagos_eliminados'] += 1
             
+            # 2b'. Liberar los números reservados de esta tanda
+            slots_response = slots_table.query(
+                KeyConditionExpression=Key('tandaId').eq(tanda_id),
+                ProjectionExpression='tandaId, numero'
+            )
+            
+            for slot in slots_response.get('Items', []):
+                slots_table.delete_item(
+                    Key={
+                        'tandaId': tanda_id,
+                        'numero': slot['numero']
+                    }
+                )
+            
             # 2c. Eliminar links de registro de esta tanda
             links_response = links_table.query(
                 IndexName='tandaId-index',  # Asegúrate de tener este GSI
@@ -433,6 +450,19 @@ def eliminar_usuario(event, context):
                 )
                 contadores['links_eliminados'] += 1
             
+            # Páginas públicas de registro publicadas en el bucket del sitio
+            if links:
+                try:
+                    s3.delete_objects(
+                        Bucket=SITE_BUCKET,
+                        Delete={
+                            'Objects': [{'Key': f"registro/{link['token']}.json"} for link in links],
+                            'Quiet': True
+                        }
+                    )
+                except Exception as e:
+                    print(f"  ⚠️ Error eliminando snapshots de registro: {str(e)}")
+            
             # 2d. Eliminar la tanda
             tandas_table.delete_item(
                 Key={
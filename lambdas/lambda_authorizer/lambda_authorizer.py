@@ -16,10 +16,9 @@ def handler(event, context):
     Valida el token JWT y retorna una política de acceso
     """
     try:
-        # Extraer token
-        print(f'event: {event}')
+        # Extraer token (no se imprime: el log no debe contener credenciales)
+        print(f"routeKey: {event.get('routeKey')}")
         token = event.get('headers',{}).get('authorization',None)
-        print(f'token: {token}')
         
         if not token:
             print('No authorization header found')
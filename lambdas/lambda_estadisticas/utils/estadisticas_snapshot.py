@@ -0,0 +1,231 @@
+# ========================================
+# utils/estadisticas_snapshot.py
+# Snapshots diarios de GET /tandas/{tandaId}/estadisticas
+#
+# Un item por tanda y día (UTC) en la tabla estadisticas_snapshots:
+#   tandaId, fecha         → llave ('YYYY-MM-DD')
+#   estadisticas           → payload completo como JSON (esCumpleañera,
+#                            estadisticas, distribucionPagos); como texto
+#                            la respuesta sale idéntica a la calculada
+#   participantes          → participantes con los campos que usa el cálculo
+#   version, versionPagos  → contadores de la tanda al generar el snapshot
+#   generadoEn, ttl        → ISO de generación y expiración
+#
+# Al leer (resolver_estadisticas) se compara contra los contadores
+# actuales de la tanda:
+#   - snapshot de hoy y misma version      → se devuelve tal cual
+#   - desde el snapshot sólo hubo pagos    → participantes del snapshot +
+#                                            totales de pagos_agregados
+#   - cambió otra cosa o no hay snapshot   → vista + pagos_agregados
+#
+# generar_snapshots corre diario (EventBridge) sobre las tandas activas,
+# en lotes paralelos, y omite las que no tuvieron escrituras desde su
+# último snapshot.
+# ========================================
+
+import os
+import json
+import time
+import boto3
+from datetime import datetime, timezone
+from decimal import Decimal
+from boto3.dynamodb.conditions import Key
+
+from utils.fan_out import fan_out
+from utils.motor_estadisticas import calcular_estadisticas_agregadas
+from utils.pagos_agregados import obtener_agregados
+from utils.tanda_vista import obtener_vista
+
+dynamodb = boto3.resource('dynamodb')
+snapshots_table = dynamodb.Table(os.environ.get('ESTADISTICAS_SNAPSHOTS_TABLE', 'estadisticas_snapshots'))
+_tandas_table = dynamodb.Table(os.environ.get('TANDAS_TABLE', 'tandas'))
+
+DIAS_EXPIRACION = int(os.environ.get('ESTADISTICAS_SNAPSHOT_DIAS', '30'))
+TAMANO_LOTE = int(os.environ.get('ESTADISTICAS_SNAPSHOT_LOTE', '50'))
+# Plazo de cada lote; los snapshots que sigan en curso al vencer se esperan
+TIMEOUT_LOTE = int(os.environ.get('ESTADISTICAS_SNAPSHOT_TIMEOUT_LOTE', '60'))
+
+# Campos del participante que usa motor_estadisticas
+CAMPOS_PARTICIPANTE = ['nombre', 'numeroAsignado', 'fechaCumpleaños', 'fechaRegistro', 'createdAt']
+
+STATUS_ACTIVOS = ('active', 'activa')
+
+
+# ========================================
+# Utilidades
+# ========================================
+def _contadores(item):
+    """(version, versionPagos) de una tanda o de un snapshot"""
+    return int(item.get('version', 0)), int(item.get('versionPagos', 0))
+
+
+def _decimal_json(obj):
+    if isinstance(obj, Decimal):
+        return int(obj) if obj % 1 == 0 else float(obj)
+    raise TypeError(f"Tipo no serializable: {type(obj)}")
+
+
+def participantes_vista(vista):
+    return [
+        {'participanteId': participante_id, **datos}
+        for participante_id, datos in (vista or {}).get('participantes', {}).items()
+    ]
+
+
+def _compactos(participantes):
+    return [
+        {
+            'participanteId': p['participanteId'],
+            **{campo: p[campo] for campo in CAMPOS_PARTICIPANTE if p.get(campo) not in (None, '')}
+        }
+        for p in participantes
+    ]
+
+
+def ultimo_snapshot(tanda_id):
+    """Snapshot más reciente de la tanda, o None"""
+    response = snapshots_table.query(
+        KeyConditionExpression=Key('tandaId').eq(tanda_id),
+        ScanIndexForward=False,
+        Limit=1
+    )
+    items = response.get('Items', [])
+    return items[0] if items else None
+
+
+# ========================================
+# Lectura
+# ========================================
+def estadisticas_completas(tanda, ahora=None):
+    """(resultado, participantes) leyendo la vista y pagos_agregados"""
+    participantes = participantes_vista(obtener_vista(tanda['id']))
+    agregados = obtener_agregados(tanda['id'])
+    return calcular_estadisticas_agregadas(tanda, participantes, agregados, ahora), participantes
+
+
+def resolver_estadisticas(tanda, ahora=None):
+    """
+    Estadísticas de la tanda usando su último snapshot cuando sirve.
+
+    Args:
+        tanda: Item actual de la tanda (con version y versionPagos)
+        ahora: datetime aware; por default la hora UTC actual
+
+    Returns:
+        tuple: (resultado, origen) con origen 'snapshot', 'delta' o 'completo'
+    """
+    ahora = ahora or datetime.now(timezone.utc)
+    try:
+        snapshot = ultimo_snapshot(tanda['id'])
+    except Exception as e:
+        print(f"⚠️ No se pudo leer el snapshot de estadísticas de {tanda['id']}: {e}")
+        snapshot = None
+
+    if snapshot:
+        version, version_pagos = _contadores(tanda)
+        snap_version, snap_version_pagos = _contadores(snapshot)
+
+        if snapshot['fecha'] == ahora.date().isoformat() and snap_version == version:
+            return json.loads(snapshot['estadisticas']), 'snapshot'
+
+        # Las escrituras que no son de pagos (participantes, datos de la
+        # tanda) son version - versionPagos; si no cambió, los
+        # participantes del snapshot siguen vigentes y sólo faltan los
+        # pagos, que ya están sumados en pagos_agregados
+        if version - version_pagos == snap_version - snap_version_pagos:
+            agregados = obtener_agregados(tanda['id'])
+            resultado = calcular_estadisticas_agregadas(tanda, snapshot['participantes'], agregados, ahora)
+            return resultado, 'delta'
+
+    resultado, _ = estadisticas_completas(tanda, ahora)
+    return resultado, 'completo'
+
+
+# ========================================
+# Generación programada
+# ========================================
+def generar_snapshot(tanda, ahora=None):
+    """Calcula y guarda el snapshot del día para una tanda"""
+    ahora = ahora or datetime.now(timezone.utc)
+    version, version_pagos = _contadores(tanda)
+    resultado, participantes = estadisticas_completas(tanda, ahora)
+
+    snapshots_table.put_item(Item={
+        'tandaId': tanda['id'],
+        'fecha': ahora.date().isoformat(),
+        'estadisticas': json.dumps(resultado, default=_decimal_json),
+        'participantes': _compactos(participantes),
+        'version': version,
+        'versionPagos': version_pagos,
+        'generadoEn': ahora.isoformat(),
+        'ttl': int(ahora.timestamp()) + DIAS_EXPIRACION * 86400,
+    })
+    return resultado
+
+
+def _procesar_tanda(tanda, ahora):
+    """'generada' u 'omitida' si la tanda no tuvo escrituras desde su último snapshot"""
+    snapshot = ultimo_snapshot(tanda['id'])
+    if snapshot and _contadores(snapshot)[0] == _contadores(tanda)[0]:
+        return 'omitida'
+    generar_snapshot(tanda, ahora)
+    return 'generada'
+
+
+def generar_snapshots(ahora=None, tamano_lote=TAMANO_LOTE):
+    """
+    Genera el snapshot del día de cada tanda activa.
+
+    Las tandas se procesan en lotes de `tamano_lote`; dentro del lote en
+    paralelo (fan_out). Una falla en una tanda no detiene las demás.
+
+    Returns:
+        dict: revisadas, generadas, omitidas, errores y duracionMs
+    """
+    ahora = ahora or datetime.now(timezone.utc)
+    inicio = time.monotonic()
+    reporte = {'revisadas': 0, 'generadas': 0, 'omitidas': 0, 'errores': 0}
+
+    lote = []
+    for tanda in _scan_tandas_activas():
+        lote.append(tanda)
+        if len(lote) >= tamano_lote:
+            _procesar_lote(lote, ahora, reporte)
+            lote = []
+    if lote:
+        _procesar_lote(lote, ahora, reporte)
+
+    reporte['duracionMs'] = int((time.monotonic() - inicio) * 1000)
+    print(f"📊 Snapshots de estadísticas: {reporte}")
+    return reporte
+
+
+def _procesar_lote(lote, ahora, reporte):
+    tandas = {tanda['id']: tanda for tanda in lote}
+    resultados, errores = fan_out(
+        lambda tanda_id: _procesar_tanda(tandas[tanda_id], ahora),
+        tandas.keys(),
+        timeout=TIMEOUT_LOTE,
+        esperar_pendientes=True
+    )
+
+    for tanda_id, mensaje in errores.items():
+        print(f"❌ Error generando snapshot de estadísticas de tanda {tanda_id}: {mensaje}")
+
+    reporte['revisadas'] += len(tandas)
+    reporte['errores'] += len(errores)
+    for estado in resultados.values():
+        reporte['generadas' if estado == 'generada' else 'omitidas'] += 1
+
+
+def _scan_tandas_activas():
+    """Tandas activas (las que no tienen status se consideran activas)"""
+    kwargs = {}
+    while True:
+        response = _tandas_table.scan(**kwargs)
+        for tanda in response.get('Items', []):
+            if tanda.get('status', 'active') in STATUS_ACTIVOS:
+                yield tanda
+        if 'LastEvaluatedKey' not in response:
+            return
+        kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
@@ -0,0 +1,64 @@
+# ========================================
+# utils/etag.py
+# GET condicional (ETag / If-None-Match) basado en la versión de la tanda
+#
+# Cada escritura sobre una tanda, sus participantes o sus pagos incrementa
+# el atributo `version` del item de la tanda (ver tanda_vista). Ese item es
+# pequeño y los handlers ya lo leen para verificar permisos, así que decidir
+# si responder 304 no agrega lecturas.
+# ========================================
+
+# El cliente siempre revalida; como la respuesta depende del usuario no se
+# permite guardarla en caches compartidos.
+CACHE_CONTROL = 'private, no-cache'
+
+
+def etag_tanda(tanda, *extra):
+    """
+    ETag débil a partir de la versión de la tanda.
+
+    Args:
+        tanda: Item de la tanda (o dict con 'version')
+        extra: Componentes adicionales para respuestas que además dependen
+               de otra cosa (ej. la hora actual)
+    """
+    partes = [f"v{int(tanda.get('version', 0))}"] + [str(e) for e in extra]
+    return f'W/"{"-".join(partes)}"'
+
+
+def if_none_match(event):
+    """Devuelve la lista de ETags enviados en If-None-Match"""
+    headers = event.get('headers') or {}
+    valor = headers.get('if-none-match') or headers.get('If-None-Match')
+    if not valor:
+        return []
+    return [e.strip() for e in valor.split(',') if e.strip()]
+
+
+def no_modificado(event, etag):
+    """
+    True si el cliente ya tiene la representación actual.
+    La comparación es débil: se ignora el prefijo W/.
+    """
+    actual = etag.removeprefix('W/')
+    for enviado in if_none_match(event):
+        if enviado == '*' or enviado.removeprefix('W/') == actual:
+            return True
+    return False
+
+
+def etag_headers(etag):
+    return {
+        'ETag': etag,
+        'Cache-Control': CACHE_CONTROL,
+        'Access-Control-Expose-Headers': 'ETag'
+    }
+
+
+def respuesta_no_modificada(headers_base, etag):
+    """Respuesta 304 sin cuerpo"""
+    return {
+        'statusCode': 304,
+        'headers': {**headers_base, **etag_headers(etag)},
+        'body': ''
+    }
@@ -0,0 +1,268 @@
+# ========================================
+# utils/exportacion_reporte.py
+# Exportación asíncrona del reporte de una tanda a S3 (CSV / XLSX)
+#
+# GET /tandas/{tandaId}/reporte?formato=csv|excel no arma el reporte en
+# la respuesta (el límite de Lambda es 6 MB): registra la exportación en
+# la tabla reportes_exportaciones y la encola. Esta misma Lambda consume
+# la cola, lee participantes y pagos página por página y los escribe en
+# un multipart upload de S3 conforme llegan. El cliente consulta el
+# estado en GET /tandas/{tandaId}/reporte/exportaciones/{exportId}, que
+# al terminar devuelve una URL prefirmada de descarga.
+#
+# exportId = '{formato}-v{version de la tanda}': cualquier escritura en
+# la tanda incrementa version, así que pedir otra vez el mismo formato sin
+# cambios reutiliza el archivo ya generado.
+# ========================================
+
+import os
+import json
+import boto3
+from datetime import datetime, timedelta
+from boto3.dynamodb.conditions import Key, Attr
+from botocore.exceptions import ClientError
+
+from utils.reporte_archivos import ESCRITORES, CONTENT_TYPES
+from utils.subida_multipart import SubidaMultipart, s3
+
+dynamodb = boto3.resource('dynamodb')
+sqs = boto3.client('sqs')
+exportaciones_table = dynamodb.Table(os.environ.get('EXPORTACIONES_TABLE', 'reportes_exportaciones'))
+_participantes_table = dynamodb.Table(os.environ.get('PARTICIPANTES_TABLE', 'participantes'))
+_pagos_table = dynamodb.Table(os.environ.get('PAGOS_TABLE', 'pagos'))
+
+REPORTES_BUCKET = os.environ.get('REPORTES_BUCKET', '')
+REPORTES_QUEUE_URL = os.environ.get('REPORTES_QUEUE_URL', '')
+
+# Vigencia de la URL prefirmada y de los archivos generados (el bucket
+# borra los objetos un día después de que expira el registro)
+URL_EXPIRACION_SEGUNDOS = int(os.environ.get('REPORTE_URL_EXPIRACION', '900'))
+EXPORTACION_TTL_SEGUNDOS = 7 * 24 * 3600
+
+# Una exportación pendiente por más tiempo se considera perdida y se reencola
+PENDIENTE_MAXIMO = timedelta(minutes=15)
+
+# formato del query string → extensión del archivo
+FORMATOS = {
+    'csv': 'csv',
+    'excel': 'xlsx',
+    'xlsx': 'xlsx',
+}
+
+COLUMNAS_PARTICIPANTES = ['numeroAsignado', 'participanteId', 'nombre', 'telefono', 'email']
+COLUMNAS_PAGOS = ['pagoId', 'participanteId', 'numeroAsignado', 'nombre', 'ronda', 'pagado', 'monto', 'fechaPago', 'metodoPago']
+
+
+def export_id(extension, tanda):
+    return f"{extension}-v{int(tanda.get('version', 0))}"
+
+
+def s3_key(tanda_id, exportacion_id):
+    extension = exportacion_id.split('-', 1)[0]
+    return f"reportes/{tanda_id}/{exportacion_id}.{extension}"
+
+
+def obtener_exportacion(tanda_id, exportacion_id):
+    return exportaciones_table.get_item(
+        Key={'tandaId': tanda_id, 'exportId': exportacion_id}
+    ).get('Item')
+
+
+def url_descarga(exportacion, nombre_tanda=''):
+    """URL prefirmada del archivo de una exportación completada"""
+    extension = exportacion['exportId'].split('-', 1)[0]
+    nombre = ''.join(c if c.isalnum() else '-' for c in (nombre_tanda or 'tanda')).strip('-') or 'tanda'
+    return s3.generate_presigned_url(
+        'get_object',
+        Params={
+            'Bucket': REPORTES_BUCKET,
+            'Key': exportacion['s3Key'],
+            'ResponseContentDisposition': f'attachment; filename="reporte-{nombre}-{exportacion["exportId"]}.{extension}"',
+        },
+        ExpiresIn=URL_EXPIRACION_SEGUNDOS
+    )
+
+
+def resumen_exportacion(exportacion, nombre_tanda=''):
+    """Datos que ve el cliente; con la URL si ya está lista"""
+    datos = {
+        'exportId': exportacion['exportId'],
+        'estado': exportacion['estado'],
+        'createdAt': exportacion.get('createdAt'),
+    }
+    if exportacion['estado'] == 'completada':
+        datos.update({
+            'url': url_descarga(exportacion, nombre_tanda),
+            'expiraEn': URL_EXPIRACION_SEGUNDOS,
+            'tamanoBytes': exportacion.get('tamanoBytes'),
+            'filas': exportacion.get('filas'),
+            'generadoEn': exportacion.get('generadoEn'),
+        })
+    elif exportacion['estado'] == 'fallida':
+        datos['error'] = exportacion.get('error')
+    return datos
+
+
+# ========================================
+# Solicitud
+# ========================================
+def solicitar_exportacion(tanda, formato):
+    """
+    Devuelve la exportación de la versión actual de la tanda; si no existe,
+    falló o quedó pendiente demasiado tiempo, la registra y la encola.
+
+    Returns:
+        dict: Item de reportes_exportaciones
+    """
+    tanda_id = tanda['id']
+    exportacion_id = export_id(FORMATOS[formato], tanda)
+
+    existente = obtener_exportacion(tanda_id, exportacion_id)
+    if existente and not _reintentar(existente):
+        return existente
+
+    ahora = datetime.utcnow()
+    item = {
+        'tandaId': tanda_id,
+        'exportId': exportacion_id,
+        'estado': 'pendiente',
+        'version': int(tanda.get('version', 0)),
+        'createdAt': ahora.isoformat(),
+        'ttl': int(ahora.timestamp()) + EXPORTACION_TTL_SEGUNDOS
+    }
+    try:
+        # Si dos peticiones llegan juntas sólo una encola
+        exportaciones_table.put_item(
+            Item=item,
+            ConditionExpression=Attr('exportId').not_exists() | Attr('createdAt').eq(
+                existente['createdAt'] if existente else ''
+            )
+        )
+    except ClientError as e:
+        if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+            return obtener_exportacion(tanda_id, exportacion_id) or item
+        raise
+
+    sqs.send_message(
+        QueueUrl=REPORTES_QUEUE_URL,
+        MessageBody=json.dumps({'tandaId': tanda_id, 'exportId': exportacion_id}),
+        MessageGroupId=tanda_id,
+        MessageDeduplicationId=f"{tanda_id}-{exportacion_id}-{int(ahora.timestamp())}"
+    )
+    print(f"📨 Exportación {exportacion_id} encolada para tanda {tanda_id}")
+    return item
+
+
+def _reintentar(exportacion):
+    if exportacion['estado'] == 'fallida':
+        return True
+    if exportacion['estado'] == 'pendiente':
+        return datetime.utcnow() - datetime.fromisoformat(exportacion['createdAt']) > PENDIENTE_MAXIMO
+    return False
+
+
+# ========================================
+# Generación (consumidor de la cola)
+# ========================================
+def _paginas(table, tanda_id):
+    """Items de la partición de la tanda, una página de DynamoDB a la vez"""
+    kwargs = {'KeyConditionExpression': Key('id').eq(tanda_id)}
+    while True:
+        response = table.query(**kwargs)
+        yield from response.get('Items', [])
+        if 'LastEvaluatedKey' not in response:
+            return
+        kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
+def secciones_reporte(tanda_id):
+    """
+    Secciones del reporte como iteradores de filas.
+
+    Los participantes se leen completos para ordenarlos por número y para
+    poner nombre y número en cada pago (uno por participante, pocos por
+    tanda); los pagos, que crecen con participantes × rondas, se escriben
+    página por página sin acumularse.
+    """
+    participantes = sorted(
+        _paginas(_participantes_table, tanda_id),
+        key=lambda p: p.get('numeroAsignado', 999)
+    )
+    por_id = {p['participanteId']: p for p in participantes}
+
+    filas_participantes = (
+        [p.get('numeroAsignado'), p['participanteId'], p.get('nombre'), p.get('telefono'), p.get('email', '')]
+        for p in participantes
+    )
+
+    def filas_pagos():
+        for pago in _paginas(_pagos_table, tanda_id):
+            participante = por_id.get(pago.get('participanteId'), {})
+            yield [
+                pago['pagoId'], pago.get('participanteId'),
+                participante.get('numeroAsignado'), participante.get('nombre'),
+                pago.get('ronda'), pago.get('pagado', False), pago.get('monto', 0),
+                pago.get('fechaPago', ''), pago.get('metodoPago', ''),
+            ]
+
+    return [
+        ('Participantes', COLUMNAS_PARTICIPANTES, filas_participantes),
+        ('Pagos', COLUMNAS_PAGOS, filas_pagos()),
+    ]
+
+
+def generar_exportacion(tanda_id, exportacion_id):
+    exportacion = obtener_exportacion(tanda_id, exportacion_id)
+    if not exportacion or exportacion.get('estado') != 'pendiente':
+        # Reintento de SQS de una exportación que ya se resolvió
+        return
+
+    extension = exportacion_id.split('-', 1)[0]
+    key = s3_key(tanda_id, exportacion_id)
+    try:
+        with SubidaMultipart(REPORTES_BUCKET, key, CONTENT_TYPES[extension]) as destino:
+            filas = ESCRITORES[extension](destino, secciones_reporte(tanda_id))
+    except Exception as e:
+        print(f"❌ Error generando exportación {exportacion_id} de tanda {tanda_id}: {e}")
+        # 'error' es palabra reservada de DynamoDB
+        _actualizar_estado(tanda_id, exportacion_id, 'fallida', {':error': str(e)[:500]}, '#error = :error',
+                           nombres={'#error': 'error'})
+        return
+
+    _actualizar_estado(tanda_id, exportacion_id, 'completada', {
+        ':key': key,
+        ':tamano': destino.bytes_escritos,
+        ':filas': filas,
+        ':generado': datetime.utcnow().isoformat(),
+    }, 's3Key = :key, tamanoBytes = :tamano, filas = :filas, generadoEn = :generado')
+    print(f"✅ Exportación {exportacion_id} de tanda {tanda_id}: {filas} filas, {destino.bytes_escritos} bytes")
+
+
+def _actualizar_estado(tanda_id, exportacion_id, estado, valores, set_extra, nombres=None):
+    update_params = {
+        'Key': {'tandaId': tanda_id, 'exportId': exportacion_id},
+        'UpdateExpression': f'SET estado = :estado, {set_extra}',
+        'ExpressionAttributeValues': {':estado': estado, **valores}
+    }
+    # Solo agregar ExpressionAttributeNames si hay palabras reservadas
+    if nombres:
+        update_params['ExpressionAttributeNames'] = nombres
+    exportaciones_table.update_item(**update_params)
+
+
+def procesar_cola_exportaciones(event):
+    """
+    Consumidor de la cola FIFO de exportaciones. Las fallas al generar el
+    archivo quedan registradas como 'fallida' (el cliente puede pedirla de
+    nuevo); sólo se reintentan por SQS los errores al registrar el estado.
+    """
+    fallidos = []
+    for record in event['Records']:
+        try:
+            mensaje = json.loads(record['body'])
+            generar_exportacion(mensaje['tandaId'], mensaje['exportId'])
+        except Exception as e:
+            print(f"❌ Error procesando exportación {record.get('messageId')}: {str(e)}")
+            fallidos.append({'itemIdentifier': record['messageId']})
+
+    return {'batchItemFailures': fallidos}
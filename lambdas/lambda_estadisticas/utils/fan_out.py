@@ -0,0 +1,74 @@
+# ========================================
+# utils/fan_out.py
+# Ejecución concurrente acotada de llamadas a DynamoDB
+# ========================================
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+
+# El pool de hilos se dimensiona igual que el pool de conexiones de boto3:
+# más hilos que conexiones sólo generaría espera por una conexión libre.
+MAX_POOL_CONNECTIONS = int(os.environ.get('DYNAMO_MAX_POOL_CONNECTIONS', '10'))
+FAN_OUT_TIMEOUT = float(os.environ.get('FAN_OUT_TIMEOUT_SECONDS', '5'))
+
+
+def fan_out(fn, keys, max_workers=MAX_POOL_CONNECTIONS, timeout=FAN_OUT_TIMEOUT, esperar_pendientes=False):
+    """
+    Ejecuta fn(key) para cada key en paralelo con concurrencia acotada.
+
+    Una falla o timeout en una key no cancela las demás: se reporta
+    por separado para que el caller decida cómo responder.
+
+    `timeout` es un plazo total para todas las llamadas, no por llamada.
+    Al vencer, las llamadas que aún no empezaban se cancelan y se reportan
+    como 'timeout'. Las que ya están corriendo no se pueden interrumpir:
+      - esperar_pendientes=False: se reportan como 'timeout' y terminan en
+        segundo plano (para lecturas, donde basta con no esperar).
+      - esperar_pendientes=True: se espera a que terminen y se reporta su
+        resultado real (para escrituras: no reportar como fallido algo
+        que sí se completó).
+
+    Args:
+        fn: Función a ejecutar por cada key
+        keys: Lista de keys (ej. tandaIds)
+        max_workers: Máximo de llamadas simultáneas
+        timeout: Segundos para el conjunto de llamadas
+        esperar_pendientes: Esperar a las llamadas en curso al vencer el plazo
+
+    Returns:
+        tuple: (resultados {key: valor}, errores {key: mensaje})
+    """
+    keys = list(keys)
+    resultados = {}
+    errores = {}
+
+    if not keys:
+        return resultados, errores
+
+    workers = max(1, min(max_workers, len(keys)))
+    deadline = time.monotonic() + timeout
+
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        futures = {key: executor.submit(fn, key) for key in keys}
+
+        for key, future in futures.items():
+            try:
+                resultados[key] = future.result(timeout=max(0, deadline - time.monotonic()))
+            except FuturesTimeoutError:
+                if future.cancel() or not esperar_pendientes:
+                    errores[key] = 'timeout'
+                    continue
+                try:
+                    resultados[key] = future.result()
+                except Exception as e:
+                    errores[key] = str(e)
+            except Exception as e:
+                errores[key] = str(e)
+    finally:
+        # Sin esperar_pendientes no se bloquea la respuesta por llamadas
+        # que ya excedieron el plazo
+        executor.shutdown(wait=esperar_pendientes, cancel_futures=True)
+
+    return resultados, errores
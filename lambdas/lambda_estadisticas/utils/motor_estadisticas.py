@@ -0,0 +1,268 @@
+# ========================================
+# utils/motor_estadisticas.py
+# Cálculo de las estadísticas de una tanda, sin acceso a DynamoDB
+#
+# Los pagos se recorren una sola vez: pagos realizados por participante,
+# total recaudado y pagos del último mes salen de la misma pasada, y cada
+# fechaPago se parsea una sola vez. Antes cada participante filtraba la
+# lista completa de pagos (participantes × pagos).
+#
+# El handler ya no lee los pagos: usa los totales que lambda_pagos
+# mantiene en pagos_agregados (calcular_estadisticas_agregadas).
+# ========================================
+
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from utils.calendario_rondas import fechas_ronda
+
+
+# ========================================
+# Utilidades
+# ========================================
+def parse_fecha_pago(fecha_str):
+    if not fecha_str:
+        return None
+    try:
+        # Convierte ISO con Z a UTC aware
+        if fecha_str.endswith('Z'):
+            fecha_str = fecha_str.replace('Z', '+00:00')
+        fecha = datetime.fromisoformat(fecha_str)
+        # Asegurar que sea aware
+        if fecha.tzinfo is None:
+            fecha = fecha.replace(tzinfo=timezone.utc)
+        return fecha
+    except Exception as e:
+        print(f"Error parseando fecha: {fecha_str}, error: {e}")
+        return None
+
+
+def ordenar_participantes(participantes, es_cumpleañera):
+    """Cumpleañeras por fecha de cumpleaños; normales por número asignado"""
+    if es_cumpleañera:
+        def ordenar_cumpleañera(p):
+            if p.get('fechaCumpleaños'):
+                try:
+                    fecha = datetime.fromisoformat(p['fechaCumpleaños'])
+                    fecha_registro = datetime.fromisoformat(p.get('fechaRegistro', p.get('createdAt')))
+                    return (fecha.month, fecha.day, fecha_registro.timestamp())
+                except:
+                    return (13, 32, 0)
+            return (13, 32, 0)
+
+        return sorted(participantes, key=ordenar_cumpleañera)
+    return sorted(participantes, key=lambda p: p.get('numeroAsignado', 999))
+
+
+# ========================================
+# Pagos: una sola pasada, o los totales de pagos_agregados
+# ========================================
+def resumir_pagos(pagos, monto_por_ronda, desde):
+    """
+    Args:
+        pagos: Items de la tabla pagos
+        monto_por_ronda: Monto a usar si un pago pagado no tiene monto
+        desde: datetime aware; pagos posteriores cuentan en pagosUltimoMes
+
+    Returns:
+        dict: pagadosPorParticipante (Counter), totalRecaudado, pagosUltimoMes
+    """
+    pagados = Counter()
+    montos = []
+    montos_ultimo_mes = []
+
+    for pago in pagos:
+        if not pago.get('pagado', False):
+            continue
+        pagados[pago['participanteId']] += 1
+        montos.append(float(pago.get('monto', monto_por_ronda)))
+
+        fecha = parse_fecha_pago(pago.get('fechaPago'))
+        if fecha is not None and fecha > desde:
+            montos_ultimo_mes.append(float(pago.get('monto', 0)))
+
+    # sum() y no += en el ciclo: en 3.12 sum() compensa el redondeo de
+    # floats y así los totales coinciden con el cálculo anterior
+    return {
+        'pagadosPorParticipante': pagados,
+        'totalRecaudado': sum(montos),
+        'pagosUltimoMes': sum(montos_ultimo_mes),
+    }
+
+
+def resumen_agregados(agregados, desde):
+    """
+    Mismo resultado que resumir_pagos, a partir del item de pagos_agregados.
+
+    pagosUltimoMes se arma con los montos por día de fechaPago: un día
+    cuenta si su medianoche (UTC) es posterior a `desde`. Con fechas sin
+    hora es idéntico a resumir_pagos; con hora sólo difieren los pagos
+    del día de `desde` posteriores a esa hora, que aquí no cuentan.
+    """
+    montos_ultimo_mes = [
+        float(monto)
+        for dia, monto in agregados.get('montoDias', {}).items()
+        if parse_fecha_pago(dia) > desde
+    ]
+    return {
+        'pagadosPorParticipante': Counter({
+            participante_id: int(pagados)
+            for participante_id, pagados in agregados.get('pagadosParticipantes', {}).items()
+        }),
+        'totalRecaudado': float(agregados.get('totalMonto', 0)),
+        'pagosUltimoMes': sum(montos_ultimo_mes),
+    }
+
+
+def distribucion_pagos(participantes, pagados_por_participante, ronda_actual):
+    """(al corriente, atrasados, adelantados) contra ronda_actual - 1 pagos esperados"""
+    pagos_esperados = ronda_actual - 1
+    al_corriente = atrasados = adelantados = 0
+
+    for participante in participantes:
+        pagos_realizados = pagados_por_participante.get(participante['participanteId'], 0)
+        if pagos_realizados >= pagos_esperados:
+            al_corriente += 1
+        else:
+            atrasados += 1
+        if pagos_realizados > pagos_esperados:
+            adelantados += 1
+
+    return al_corriente, atrasados, adelantados
+
+
+# ========================================
+# Próximo número
+# ========================================
+def proximo_numero(tanda, participantes, es_cumpleañera, ahora):
+    if es_cumpleañera:
+        # Para tanda cumpleañera: buscar el próximo cumpleaños
+        proximos_cumpleaños = []
+
+        for participante in participantes:
+            if participante.get('fechaCumpleaños'):
+                try:
+                    fecha_cumple = datetime.fromisoformat(participante['fechaCumpleaños'])
+
+                    # Calcular próximo cumpleaños este año
+                    cumple_este_año = fecha_cumple.replace(year=ahora.year)
+
+                    # Si ya pasó este año, usar el del año siguiente
+                    if cumple_este_año < ahora:
+                        cumple_este_año = cumple_este_año.replace(year=ahora.year + 1)
+
+                    dias_faltantes = (cumple_este_año - ahora).days
+
+                    proximos_cumpleaños.append({
+                        'participante': participante,
+                        'fechaCumpleaños': cumple_este_año,
+                        'diasFaltantes': dias_faltantes
+                    })
+                except Exception as e:
+                    print(f"Error procesando cumpleaños de {participante.get('nombre')}: {e}")
+
+        # Ordenar por días faltantes y tomar el más próximo
+        if not proximos_cumpleaños:
+            return None
+        proximos_cumpleaños.sort(key=lambda x: x['diasFaltantes'])
+        proximo = proximos_cumpleaños[0]
+
+        return {
+            'participanteId': proximo['participante']['participanteId'],
+            'nombre': proximo['participante']['nombre'],
+            'numeroAsignado': proximo['participante']['numeroAsignado'],
+            'fechaEstimada': proximo['fechaCumpleaños'].strftime('%Y-%m-%d'),
+            'diasFaltantes': proximo['diasFaltantes'],
+            'esCumpleaños': True
+        }
+
+    # Para tanda normal: buscar por número de ronda actual
+    if not tanda.get('fechaInicio'):
+        return None
+
+    ronda_actual = int(tanda['rondaActual'])
+    try:
+        for participante in participantes:
+            if participante['numeroAsignado'] == ronda_actual:
+                # Inicio de la ronda según el calendario de la tanda
+                fechas = fechas_ronda(tanda, ronda_actual)
+                if not fechas:
+                    return None
+
+                return {
+                    'participanteId': participante['participanteId'],
+                    'nombre': participante['nombre'],
+                    'numeroAsignado': participante['numeroAsignado'],
+                    'fechaEstimada': fechas[0].isoformat(),
+                    'esCumpleaños': False
+                }
+    except Exception as e:
+        print(f"Error calculando fecha estimada: {e}")
+    return None
+
+
+# ========================================
+# Estadísticas completas
+# ========================================
+def calcular_estadisticas(tanda, participantes, pagos, ahora=None):
+    """
+    Estadísticas de la tanda a partir de sus participantes y pagos.
+
+    Returns:
+        dict: esCumpleañera, estadisticas y distribucionPagos (mismo formato
+        que GET /tandas/{tandaId}/estadisticas)
+    """
+    ahora = ahora or datetime.now(timezone.utc)
+    resumen = resumir_pagos(pagos, float(tanda['montoPorRonda']), ahora - timedelta(days=30))
+    return estadisticas_desde_resumen(tanda, participantes, resumen, ahora)
+
+
+def calcular_estadisticas_agregadas(tanda, participantes, agregados, ahora=None):
+    """Igual que calcular_estadisticas, con los totales de pagos_agregados en lugar de los pagos"""
+    ahora = ahora or datetime.now(timezone.utc)
+    resumen = resumen_agregados(agregados, ahora - timedelta(days=30))
+    return estadisticas_desde_resumen(tanda, participantes, resumen, ahora)
+
+
+def estadisticas_desde_resumen(tanda, participantes, resumen, ahora):
+    es_cumpleañera = tanda.get('frecuencia') == 'cumpleaños'
+    participantes = ordenar_participantes(participantes, es_cumpleañera)
+
+    total_participantes = len(participantes)
+    ronda_actual = int(tanda['rondaActual'])
+    total_rondas = int(tanda['totalRondas'])
+    monto_por_ronda = float(tanda['montoPorRonda'])
+
+    al_corriente, atrasados, adelantados = distribucion_pagos(
+        participantes, resumen['pagadosPorParticipante'], ronda_actual
+    )
+
+    total_recaudado = resumen['totalRecaudado']
+    # Igual en tandas normales y cumpleañeras: cada participante aporta
+    # montoPorRonda en cada ronda ya vencida
+    total_esperado = monto_por_ronda * total_participantes * (ronda_actual - 1)
+    porcentaje_recaudacion = (total_recaudado / total_esperado * 100) if total_esperado > 0 else 0
+    pagos_promedio_por_ronda = total_recaudado / max(ronda_actual - 1, 1)
+
+    return {
+        'esCumpleañera': es_cumpleañera,
+        'estadisticas': {
+            'totalParticipantes': total_participantes,
+            'participantesAlCorriente': al_corriente,
+            'participantesAtrasados': atrasados,
+            'rondaActual': ronda_actual,
+            'totalRondas': total_rondas,
+            'progresoTanda': round((ronda_actual / total_rondas) * 100),
+            'totalRecaudado': round(total_recaudado, 2),
+            'totalEsperado': round(total_esperado, 2),
+            'porcentajeRecaudacion': round(porcentaje_recaudacion, 2),
+            'proximoNumero': proximo_numero(tanda, participantes, es_cumpleañera, ahora),
+            'pagosUltimoMes': round(resumen['pagosUltimoMes'], 2),
+            'pagosPromedioPorRonda': round(pagos_promedio_por_ronda, 2)
+        },
+        'distribucionPagos': {
+            'al_corriente': al_corriente,
+            'atrasados': atrasados,
+            'adelantados': adelantados
+        }
+    }
@@ -0,0 +1,192 @@
+# ========================================
+# utils/reporte_archivos.py
+# Escritores de reportes CSV y XLSX fila por fila
+#
+# Ambos reciben las secciones del reporte como iteradores de filas y las
+# escriben conforme llegan a un destino con write() (SubidaMultipart),
+# sin armar el archivo completo en memoria.
+#
+#   secciones = [(nombre, columnas, filas), ...]
+#
+# El XLSX se genera con zipfile en modo streaming (cada hoja es una
+# entrada del zip que se comprime mientras se escribe); no hace falta
+# ninguna librería fuera de la biblioteca estándar.
+# ========================================
+
+import re
+import csv
+import zipfile
+from decimal import Decimal
+from xml.sax.saxutils import escape
+
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+# Caracteres de control que XML 1.0 no permite
+_XML_INVALIDOS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+def _valor(valor):
+    if isinstance(valor, bool):
+        return 'Sí' if valor else 'No'
+    if isinstance(valor, Decimal):
+        return int(valor) if valor % 1 == 0 else float(valor)
+    if valor is None:
+        return ''
+    return valor
+
+
+# ========================================
+# CSV
+# ========================================
+class _TextoUtf8:
+    """Adaptador str → bytes para csv.writer"""
+    def __init__(self, destino):
+        self.destino = destino
+
+    def write(self, texto):
+        return self.destino.write(texto.encode('utf-8'))
+
+
+def escribir_csv(destino, secciones):
+    """
+    Una sección tras otra, cada una con su título y encabezados, separadas
+    por una línea vacía. Lleva BOM para que Excel detecte UTF-8.
+
+    Returns:
+        int: Filas de datos escritas
+    """
+    destino.write('\ufeff'.encode('utf-8'))
+    writer = csv.writer(_TextoUtf8(destino))
+    filas_escritas = 0
+
+    for i, (nombre, columnas, filas) in enumerate(secciones):
+        if i:
+            writer.writerow([])
+        writer.writerow([nombre])
+        writer.writerow(columnas)
+        for fila in filas:
+            writer.writerow([_valor(v) for v in fila])
+            filas_escritas += 1
+
+    return filas_escritas
+
+
+# ========================================
+# XLSX
+# ========================================
+def _columna(indice):
+    """0 → A, 25 → Z, 26 → AA"""
+    letras = ''
+    indice += 1
+    while indice:
+        indice, resto = divmod(indice - 1, 26)
+        letras = chr(65 + resto) + letras
+    return letras
+
+
+def _celda(referencia, valor):
+    valor = _valor(valor)
+    if isinstance(valor, (int, float)):
+        return f'<c r="{referencia}"><v>{valor}</v></c>'
+    texto = escape(_XML_INVALIDOS.sub('', str(valor)))
+    return f'<c r="{referencia}" t="inlineStr"><is><t xml:space="preserve">{texto}</t></is></c>'
+
+
+def _fila_xml(numero, valores):
+    celdas = ''.join(_celda(f'{_columna(i)}{numero}', v) for i, v in enumerate(valores))
+    return f'<row r="{numero}">{celdas}</row>'.encode('utf-8')
+
+
+def _xml_libro(nombres):
+    hojas = ''.join(
+        f'<sheet name="{escape(nombre[:31])}" sheetId="{i}" r:id="rId{i}"/>'
+        for i, nombre in enumerate(nombres, 1)
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        f'<sheets>{hojas}</sheets></workbook>'
+    )
+
+
+def _xml_relaciones_libro(total):
+    relaciones = ''.join(
+        f'<Relationship Id="rId{i}" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        f'Target="worksheets/sheet{i}.xml"/>'
+        for i in range(1, total + 1)
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        f'{relaciones}</Relationships>'
+    )
+
+
+def _xml_content_types(total):
+    hojas = ''.join(
+        f'<Override PartName="/xl/worksheets/sheet{i}.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        for i in range(1, total + 1)
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        f'{hojas}</Types>'
+    )
+
+
+_XML_RELACIONES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/></Relationships>'
+)
+
+
+def escribir_xlsx(destino, secciones):
+    """
+    Un libro con una hoja por sección (encabezados en la fila 1).
+
+    Returns:
+        int: Filas de datos escritas
+    """
+    secciones = list(secciones)
+    filas_escritas = 0
+
+    with zipfile.ZipFile(destino, 'w', compression=zipfile.ZIP_DEFLATED) as libro:
+        for i, (_, columnas, filas) in enumerate(secciones, 1):
+            with libro.open(f'xl/worksheets/sheet{i}.xml', 'w', force_zip64=True) as hoja:
+                hoja.write(
+                    b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                    b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                    b'<sheetData>'
+                )
+                hoja.write(_fila_xml(1, columnas))
+                for numero, fila in enumerate(filas, 2):
+                    hoja.write(_fila_xml(numero, fila))
+                    filas_escritas += 1
+                hoja.write(b'</sheetData></worksheet>')
+
+        nombres = [nombre for nombre, _, _ in secciones]
+        libro.writestr('[Content_Types].xml', _xml_content_types(len(secciones)))
+        libro.writestr('_rels/.rels', _XML_RELACIONES)
+        libro.writestr('xl/workbook.xml', _xml_libro(nombres))
+        libro.writestr('xl/_rels/workbook.xml.rels', _xml_relaciones_libro(len(secciones)))
+
+    return filas_escritas
+
+
+ESCRITORES = {
+    'csv': escribir_csv,
+    'xlsx': escribir_xlsx,
+}
@@ -0,0 +1,123 @@
+# ========================================
+# utils/subida_multipart.py
+# Escritura en S3 por partes (multipart upload) con memoria constante
+#
+# SubidaMultipart se usa como un archivo binario: write() acumula en un
+# buffer y cada vez que llega a TAMANO_PARTE lo sube como una parte. En
+# memoria nunca hay más de una parte, sin importar el tamaño final del
+# objeto. Si el objeto completo cabe en una parte se sube con un solo
+# PutObject.
+# ========================================
+
+import os
+import boto3
+
+s3 = boto3.client('s3')
+
+# S3 exige partes de al menos 5 MiB (salvo la última)
+TAMANO_PARTE = max(5, int(os.environ.get('S3_TAMANO_PARTE_MB', '8'))) * 1024 * 1024
+
+
+class SubidaMultipart:
+    """
+    Archivo de sólo escritura respaldado por un multipart upload.
+
+    Uso:
+        with SubidaMultipart(bucket, key, 'text/csv') as destino:
+            destino.write(b'...')
+        destino.bytes_escritos
+
+    Al salir del with sin errores se completa la subida; con un error se
+    aborta para no dejar partes huérfanas cobrándose en el bucket.
+    """
+
+    def __init__(self, bucket, key, content_type, tamano_parte=TAMANO_PARTE, cliente=None):
+        self.bucket = bucket
+        self.key = key
+        self.content_type = content_type
+        self.tamano_parte = tamano_parte
+        self.s3 = cliente or s3
+        self.bytes_escritos = 0
+        self._buffer = bytearray()
+        self._upload_id = None
+        self._partes = []
+        self._cerrado = False
+
+    # --- interfaz de archivo (csv, zipfile) ---
+    def write(self, datos):
+        if self._cerrado:
+            raise ValueError('Escritura en una subida ya cerrada')
+        self._buffer += datos
+        self.bytes_escritos += len(datos)
+        while len(self._buffer) >= self.tamano_parte:
+            # Una sola copia de la parte (sin el slice intermedio)
+            with memoryview(self._buffer) as vista:
+                parte = bytes(vista[:self.tamano_parte])
+            self._subir_parte(parte)
+            del parte
+            del self._buffer[:self.tamano_parte]
+        return len(datos)
+
+    def tell(self):
+        return self.bytes_escritos
+
+    def flush(self):
+        pass
+
+    def writable(self):
+        return True
+
+    def seekable(self):
+        return False
+
+    # --- ciclo de vida ---
+    def _subir_parte(self, datos):
+        if self._upload_id is None:
+            self._upload_id = self.s3.create_multipart_upload(
+                Bucket=self.bucket, Key=self.key, ContentType=self.content_type
+            )['UploadId']
+        numero = len(self._partes) + 1
+        respuesta = self.s3.upload_part(
+            Bucket=self.bucket, Key=self.key, UploadId=self._upload_id,
+            PartNumber=numero, Body=datos
+        )
+        self._partes.append({'PartNumber': numero, 'ETag': respuesta['ETag']})
+
+    def completar(self):
+        self._cerrado = True
+        if self._upload_id is None:
+            # Todo cupo en una parte: un PutObject normal
+            self.s3.put_object(
+                Bucket=self.bucket, Key=self.key, Body=bytes(self._buffer),
+                ContentType=self.content_type
+            )
+            self._buffer = bytearray()
+            return
+
+        if self._buffer:
+            self._subir_parte(bytes(self._buffer))
+            self._buffer = bytearray()
+        self.s3.complete_multipart_upload(
+            Bucket=self.bucket, Key=self.key, UploadId=self._upload_id,
+            MultipartUpload={'Parts': self._partes}
+        )
+
+    def abortar(self):
+        self._cerrado = True
+        self._buffer = bytearray()
+        if self._upload_id is None:
+            return
+        try:
+            self.s3.abort_multipart_upload(Bucket=self.bucket, Key=self.key, UploadId=self._upload_id)
+        except Exception as e:
+            print(f"⚠️ No se pudo abortar la subida {self.key}: {e}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        if tipo is None:
+            self.completar()
+        else:
+            self.abortar()
+        return False
@@ -0,0 +1,100 @@
+# ========================================
+# utils/tanda_cache.py
+# Cache entre invocaciones del item de la tanda
+#
+# Casi todas las rutas leen el mismo item de `tandas` sólo para validar
+# adminId y tomar montoPorRonda, rondaActual, totalRondas, configuración...
+# En un contenedor caliente ese item se guarda en un LRU acotado:
+#
+# - validar=False (lecturas): se sirve del cache mientras no pase el TTL.
+# - validar=True (escrituras y GET condicionales): se hace un GetItem
+#   proyectado a version/updatedAt; si coincide con lo guardado se usa el
+#   cache, si no se vuelve a leer el item completo.
+#
+# `version` la incrementa utils.tanda_vista en cada cambio de la tanda,
+# sus participantes o sus pagos; `updatedAt` cubre tandas sin versión.
+#
+# TANDA_CACHE_ENABLED=false apaga el cache (siempre se lee de DynamoDB).
+# ========================================
+
+import os
+import copy
+import time
+from collections import OrderedDict
+
+TANDA_CACHE_ENABLED = os.environ.get('TANDA_CACHE_ENABLED', 'true').lower() == 'true'
+TANDA_CACHE_TTL = int(os.environ.get('TANDA_CACHE_TTL', '60'))
+TANDA_CACHE_SIZE = int(os.environ.get('TANDA_CACHE_SIZE', '128'))
+
+# tandaId → (item, guardado_en)
+_tandas = OrderedDict()
+_metricas = {'hits': 0, 'validados': 0, 'misses': 0}
+
+
+def _firma(item):
+    return (item.get('version'), item.get('updatedAt'))
+
+
+def _guardar(tanda_id, item):
+    _tandas[tanda_id] = (item, time.time())
+    _tandas.move_to_end(tanda_id)
+    while len(_tandas) > TANDA_CACHE_SIZE:
+        _tandas.popitem(last=False)
+
+
+def _registrar(tanda_id, resultado):
+    _metricas[resultado] += 1
+    total = sum(_metricas.values())
+    aciertos = _metricas['hits'] + _metricas['validados']
+    print(f"🗂️ Tanda {tanda_id}: {resultado} (hit ratio {aciertos}/{total} = {aciertos / total:.0%})")
+
+
+def invalidar_tanda(tanda_id):
+    _tandas.pop(tanda_id, None)
+
+
+def obtener_tanda(tandas_table, tanda_id, validar=False):
+    """
+    Item de la tanda, o None si no existe.
+
+    Args:
+        tandas_table: Tabla de tandas
+        tanda_id: ID de la tanda
+        validar: Confirmar contra DynamoDB (version/updatedAt) antes de usar el cache
+    """
+    if not TANDA_CACHE_ENABLED:
+        return tandas_table.get_item(Key={'id': tanda_id}).get('Item')
+
+    entrada = _tandas.get(tanda_id)
+
+    if entrada:
+        item, guardado_en = entrada
+
+        if not validar and time.time() - guardado_en < TANDA_CACHE_TTL:
+            _tandas.move_to_end(tanda_id)
+            _registrar(tanda_id, 'hits')
+            return copy.deepcopy(item)
+
+        if validar:
+            actual = tandas_table.get_item(
+                Key={'id': tanda_id},
+                ProjectionExpression='version, updatedAt'
+            ).get('Item')
+
+            if not actual:
+                invalidar_tanda(tanda_id)
+                _registrar(tanda_id, 'misses')
+                return None
+
+            if any(_firma(actual)) and _firma(actual) == _firma(item):
+                _guardar(tanda_id, item)
+                _registrar(tanda_id, 'validados')
+                return copy.deepcopy(item)
+
+    item = tandas_table.get_item(Key={'id': tanda_id}).get('Item')
+    if item:
+        _guardar(tanda_id, item)
+    else:
+        invalidar_tanda(tanda_id)
+    _registrar(tanda_id, 'misses')
+    return copy.deepcopy(item)
@@ -6,7 +6,6 @@
 import json
 import boto3
 import os
-import jwt
 from datetime import datetime
 from decimal import Decimal
 
@@ -14,14 +13,16 @@ from decimal import Decimal
 from exception.custom_http_exception import CustomError
 from exception.custom_http_exception import CustomClientError
 
+from utils.identity import extract_user_id
+from utils.unidad_trabajo import TablaCacheada, unidad_de_trabajo
+from utils.tanda_cache import obtener_tanda
+
 dynamodb = boto3.resource('dynamodb')
 sns = boto3.client('sns')
 
-tandas_table = dynamodb.Table(os.environ['TANDAS_TABLE'])
-participantes_table = dynamodb.Table(os.environ['PARTICIPANTES_TABLE'])
-notificaciones_table = dynamodb.Table(os.environ['NOTIFICACIONES_TABLE'])
-
-JWT_SECRET = os.environ['JWT_SECRET']
+tandas_table = TablaCacheada(dynamodb.Table(os.environ['TANDAS_TABLE']))
+participantes_table = TablaCacheada(dynamodb.Table(os.environ['PARTICIPANTES_TABLE']))
+notificaciones_table = TablaCacheada(dynamodb.Table(os.environ['NOTIFICACIONES_TABLE']))
 
 # Utilidades
 def cors_headers():
@@ -45,29 +46,18 @@ class DecimalEncoder(json.JSONEncoder):
             return int(obj) if obj % 1 == 0 else float(obj)
         return super(DecimalEncoder, self).default(obj)
 
-def extract_user_id(event):
-    try:
-        auth_header = event['headers'].get('Authorization') or event['headers'].get('authorization')
-        if not auth_header:
-            return None
-        token = auth_header.replace('Bearer ', '')
-        payload = jwt.decode(token, JWT_SECRET, algorithms=['HS256'])
-        return payload['id']
-    except:
-        return None
-
 def generate_short_id():
     import random
     import string
     return ''.join(random.choices(string.ascii_lowercase + string.digits, k=8))
 
-def verificar_permisos_tanda(tanda_id, user_id):
-    result = tandas_table.get_item(Key={'id': tanda_id})
-    if not result.get('Item'):
+def verificar_permisos_tanda(tanda_id, user_id, validar=False):
+    tanda = obtener_tanda(tandas_table, tanda_id, validar=validar)
+    if not tanda:
         return False, None
-    if result['Item']['adminId'] != user_id:
+    if tanda['adminId'] != user_id:
         return False, None
-    return True, result['Item']
+    return True, tanda
 
 def enviar_sms(telefono, mensaje):
     """Envía SMS usando AWS SNS"""
@@ -139,7 +129,7 @@ def enviar_recordatorio(event, context):
         body = json.loads(event['body'])
         
         # Verificar permisos
-        tiene_permisos, tanda = verificar_permisos_tanda(tanda_id, user_id)
+        tiene_permisos, tanda = verificar_permisos_tanda(tanda_id, user_id, validar=True)
         if not tiene_permisos:
             return response(403, {
                 'success': False,
@@ -236,7 +226,7 @@ def enviar_recordatorio_masivo(event, context):
         body = json.loads(event['body'])
         
         # Verificar permisos
-        tiene_permisos, tanda = verificar_permisos_tanda(tanda_id, user_id)
+        tiene_permisos, tanda = verificar_permisos_tanda(tanda_id, user_id, validar=True)
         if not tiene_permisos:
             return response(403, {
                 'success': False,
@@ -388,6 +378,7 @@ def obtener(event, context):
         })
 
 
+@unidad_de_trabajo
 def lambda_handler(event, context):
     print(f"event: {event}")    
     routeKey = event.get('routeKey')
@@ -6,20 +6,37 @@
 import json
 import boto3
 import os
-import jwt
-from datetime import datetime
+import uuid
+import hashlib
+from datetime import datetime, date
 from decimal import Decimal
+from collections import Counter
+from boto3.dynamodb.conditions import Key
+from botocore.exceptions import ClientError
 
 #custom error
 from exception.custom_http_exception import CustomError
 from exception.custom_http_exception import CustomClientError
 
+from utils.tanda_vista import registrar_pago_vista, registrar_pagos_vista, bit_ronda, reconciliar_vistas
+from utils.dynamo_utils import query_all, batch_get, batch_put, codificar_cursor, decodificar_cursor
+from utils.pagos_agregados import (
+    obtener_agregados, registrar_pago_agregados, registrar_pagos_agregados, monto_pagado, reconciliar_agregados
+)
+from utils.etag import etag_tanda, no_modificado, etag_headers, respuesta_no_modificada
+from utils.identity import extract_user_id
+from utils.unidad_trabajo import TablaCacheada, unidad_de_trabajo
+from utils.tanda_cache import obtener_tanda
+from utils.calendario_rondas import fechas_ronda
+
 dynamodb = boto3.resource('dynamodb')
-tandas_table = dynamodb.Table(os.environ['TANDAS_TABLE'])
-participantes_table = dynamodb.Table(os.environ['PARTICIPANTES_TABLE'])
-pagos_table = dynamodb.Table(os.environ['PAGOS_TABLE'])
+tandas_table = TablaCacheada(dynamodb.Table(os.environ['TANDAS_TABLE']))
+participantes_table = TablaCacheada(dynamodb.Table(os.environ['PARTICIPANTES_TABLE']))
+pagos_table = TablaCacheada(dynamodb.Table(os.environ['PAGOS_TABLE']))
 
-JWT_SECRET = os.environ['JWT_SECRET']
+# Eventos de score (misma cola FIFO que usa webhook_pagos)
+sqs = boto3.client('sqs')
+PAYMENT_EVENTS_QUEUE_URL = os.environ.get('PAYMENT_EVENTS_QUEUE_URL', '')
 
 # Utilidades
 def cors_headers():
@@ -30,10 +47,10 @@ def cors_headers():
         'Content-Type': 'application/json'
     }
 
-def response(status_code, body):
+def response(status_code, body, headers=None):
     return {
         'statusCode': status_code,
-        'headers': cors_headers(),
+        'headers': {**cors_headers(), **(headers or {})},
         'body': json.dumps(body, cls=DecimalEncoder)
     }
 
@@ -43,24 +60,13 @@ class DecimalEncoder(json.JSONEncoder):
             return int(obj) if obj % 1 == 0 else float(obj)
         return super(DecimalEncoder, self).default(obj)
 
-def extract_user_id(event):
-    try:
-        auth_header = event['headers'].get('Authorization') or event['headers'].get('authorization')
-        if not auth_header:
-            return None
-        token = auth_header.replace('Bearer ', '')
-        payload = jwt.decode(token, JWT_SECRET, algorithms=['HS256'])
-        return payload['id']
-    except:
-        return None
-
-def verificar_permisos_tanda(tanda_id, user_id):
-    result = tandas_table.get_item(Key={'id': tanda_id})
-    if not result.get('Item'):
+def verificar_permisos_tanda(tanda_id, user_id, validar=False):
+    tanda = obtener_tanda(tandas_table, tanda_id, validar=validar)
+    if not tanda:
         return False, None
-    if result['Item']['adminId'] != user_id:
+    if tanda['adminId'] != user_id:
         return False, None
-    return True, result['Item']
+    return True, tanda
 
 # ========================================
 # HANDLER: REGISTRAR PAGO
@@ -78,7 +84,7 @@ def registrar(event, context):
         body = json.loads(event['body'])
         
         # Verificar permisos
-        tiene_permisos, tanda = verificar_permisos_tanda(tanda_id, user_id)
+        tiene_permisos, tanda = verificar_permisos_tanda(tanda_id, user_id, validar=True)
         if not tiene_permisos:
             return response(403, {
                 'success': False,
@@ -128,7 +134,9 @@ def registrar(event, context):
             'exentoPago': body.get('exentoPago', False)
         }
         
-        pagos_table.put_item(Item=pago)
+        anterior = pagos_table.put_item(Item=pago, ReturnValues='ALL_OLD')
+        registrar_pago_vista(tanda_id, pago, anterior.get('Attributes'))
+        registrar_pago_agregados(tanda_id, pago, anterior.get('Attributes'))
         pago['tandaId']=tanda_id
         
         return response(201, {
@@ -160,24 +168,13 @@ def actualizar(event, context):
         body = json.loads(event['body'])
         
         # Verificar permisos
-        tiene_permisos, _ = verificar_permisos_tanda(tanda_id, user_id)
+        tiene_permisos, _ = verificar_permisos_tanda(tanda_id, user_id, validar=True)
         if not tiene_permisos:
             return response(403, {
                 'success': False,
                 'error': {'code': 'FORBIDDEN', 'message': 'Sin permisos'}
             })
         
-        # Verificar que el pago existe
-        pago = pagos_table.get_item(
-            Key={'id': tanda_id, 'pagoId': pago_id}
-        )
-        
-        if not pago.get('Item'):
-            return response(404, {
-                'success': False,
-                'error': {'code': 'NOT_FOUND', 'message': 'Pago no encontrado'}
-            })
-        
         # Construir expresión de actualización
         update_expression = "SET updatedAt = :now"
         expression_values = {':now': datetime.utcnow().isoformat()}
@@ -202,12 +199,32 @@ def actualizar(event, context):
             update_expression += ", exentoPago = :exentoPago"
             expression_values[':exentoPago'] = body['exentoPago']
         
-        # Actualizar
-        pagos_table.update_item(
-            Key={'id': tanda_id, 'pagoId': pago_id},
-            UpdateExpression=update_expression,
-            ExpressionAttributeValues=expression_values
-        )
+        # Actualizar sólo si el pago existe. La imagen anterior sale de la
+        # misma escritura: con una lectura previa, dos ediciones simultáneas
+        # verían el mismo pago anterior y la vista y los totales sumarían
+        # el delta dos veces
+        try:
+            anterior = pagos_table.update_item(
+                Key={'id': tanda_id, 'pagoId': pago_id},
+                UpdateExpression=update_expression,
+                ConditionExpression='attribute_exists(pagoId)',
+                ExpressionAttributeValues=expression_values,
+                ReturnValues='ALL_OLD'
+            )['Attributes']
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                raise
+            return response(404, {
+                'success': False,
+                'error': {'code': 'NOT_FOUND', 'message': 'Pago no encontrado'}
+            })
+
+        pago = {**anterior, 'updatedAt': expression_values[':now']}
+        for campo in ('pagado', 'fechaPago', 'notas', 'comprobante', 'exentoPago'):
+            if campo in body:
+                pago[campo] = body[campo]
+        registrar_pago_vista(tanda_id, pago, anterior)
+        registrar_pago_agregados(tanda_id, pago, anterior)
         
         return response(200, {
             'success': True,
@@ -224,9 +241,300 @@ def actualizar(event, context):
             'error': {'code': 'INTERNAL_SERVER_ERROR', 'message': 'Error al actualizar'}
         })
 
+# ========================================
+# HANDLER: REGISTRAR PAGOS EN LOTE
+# ========================================
+PAGOS_LOTE_MAX_FILAS = 200
+
+# SendMessageBatch acepta hasta 10 mensajes por llamada
+EVENTOS_POR_LOTE = 10
+
+
+def clasificar_tipo_pago(tanda, ronda, fecha_pago):
+    """
+    Tipo de evento de score y metadata del pago (mismo formato que
+    PagosView.enviarEventoPago, para que PAYMENT_CANCEL encuentre al original).
+    """
+    fecha_pago_str = str(fecha_pago or '').split('T')[0]
+    metadata = {'roundNumber': int(ronda), 'fechaRonda': '', 'fechaPago': fecha_pago_str}
+
+    # Fechas del calendario guardado en la tanda (calendario_rondas)
+    fechas = fechas_ronda(tanda, ronda)
+    if not fechas:
+        return 'PAYMENT_ON_TIME', metadata
+
+    fecha_ronda, fecha_limite = fechas
+    metadata['fechaRonda'] = fecha_ronda.isoformat()
+
+    try:
+        pagado_el = date.fromisoformat(fecha_pago_str)
+    except ValueError:
+        return 'PAYMENT_ON_TIME', metadata
+
+    if pagado_el < fecha_ronda:
+        return 'PAYMENT_EARLY', metadata
+    if pagado_el <= fecha_limite:
+        return 'PAYMENT_ON_TIME', metadata
+    return 'PAYMENT_LATE', metadata
+
+
+def leer_filas_pagos(event):
+    """Filas del body: {"pagos": [...]} o directamente la lista"""
+    datos = json.loads(event.get('body') or '{}')
+    filas = datos.get('pagos') if isinstance(datos, dict) else datos
+    if not isinstance(filas, list):
+        raise ValueError('Se esperaba una lista en "pagos"')
+    return filas
+
+
+def validar_filas_pagos(filas, tanda, participantes_ids):
+    """
+    Valida todas las filas contra una sola lectura de participantes.
+
+    Returns:
+        tuple: (filas normalizadas, lista de errores {fila, campo, message})
+    """
+    total_rondas = int(tanda.get('totalRondas', 0))
+    errores = []
+    validas = []
+    vistos = {}
+
+    for i, fila in enumerate(filas, start=1):
+        if not isinstance(fila, dict):
+            errores.append({'fila': i, 'campo': None, 'message': 'Fila inválida'})
+            continue
+
+        participante_id = str(fila.get('participanteId') or '').strip()
+        if not participante_id:
+            errores.append({'fila': i, 'campo': 'participanteId', 'message': 'El participanteId es requerido'})
+        elif participante_id not in participantes_ids:
+            errores.append({'fila': i, 'campo': 'participanteId', 'message': f'Participante {participante_id} no encontrado'})
+
+        try:
+            ronda = int(fila.get('ronda'))
+        except (TypeError, ValueError):
+            ronda = None
+            errores.append({'fila': i, 'campo': 'ronda', 'message': 'La ronda es requerida'})
+        else:
+            if ronda < 1 or ronda > total_rondas:
+                errores.append({'fila': i, 'campo': 'ronda', 'message': f'Ronda {ronda} fuera de rango (1-{total_rondas})'})
+
+        if not isinstance(fila.get('pagado'), bool):
+            errores.append({'fila': i, 'campo': 'pagado', 'message': 'pagado es requerido (true/false)'})
+
+        monto = fila.get('monto', tanda['montoPorRonda'])
+        try:
+            monto = Decimal(str(monto))
+        except ArithmeticError:
+            errores.append({'fila': i, 'campo': 'monto', 'message': f'Monto inválido: {monto}'})
+
+        llave = (participante_id, ronda)
+        if participante_id and ronda is not None:
+            if llave in vistos:
+                errores.append({'fila': i, 'campo': 'ronda', 'message': f'El pago se repite en la fila {vistos[llave]}'})
+            else:
+                vistos[llave] = i
+
+        validas.append({**fila, 'participanteId': participante_id, 'ronda': ronda, 'monto': monto})
+
+    return validas, errores
+
+
+def eventos_score_lote(tanda, user_id, pagos, anteriores):
+    """
+    Eventos de score equivalentes a los que PagosView manda por pago:
+    marcar como pagado → PAYMENT_EARLY/ON_TIME/LATE, desmarcar un pago
+    que estaba pagado → PAYMENT_CANCEL con la metadata del pago original.
+    Los exentos no generan eventos.
+    """
+    eventos = []
+    for pago in pagos:
+        anterior = anteriores.get(pago['pagoId']) or {}
+
+        if pago['pagado'] and not pago['exentoPago']:
+            if anterior.get('pagado') and not anterior.get('exentoPago'):
+                continue
+            event_type, metadata = clasificar_tipo_pago(tanda, pago['ronda'], pago['fechaPago'])
+        elif not pago['pagado'] and anterior.get('pagado') and not anterior.get('exentoPago'):
+            event_type = 'PAYMENT_CANCEL'
+            _, metadata = clasificar_tipo_pago(tanda, pago['ronda'], anterior.get('fechaPago'))
+        else:
+            continue
+
+        eventos.append({
+            'eventId': str(uuid.uuid4()),
+            'actorType': 'participante',
+            'adminUserId': user_id,
+            'participanteId': pago['participanteId'],
+            'scoreSubjectId': pago['participanteId'],
+            'eventType': event_type,
+            'tandaId': tanda['id'],
+            'metadata': metadata,
+            'enqueuedAt': datetime.utcnow().isoformat(),
+        })
+    return eventos
+
+
+def encolar_eventos_score(eventos):
+    """
+    Envía los eventos con SendMessageBatch (10 por llamada). Mismo
+    MessageGroupId/MessageDeduplicationId que webhook_pagos.
+
+    Returns:
+        int: Eventos que no se pudieron encolar
+    """
+    fallidos = 0
+    for inicio in range(0, len(eventos), EVENTOS_POR_LOTE):
+        entradas = []
+        for i, evento in enumerate(eventos[inicio:inicio + EVENTOS_POR_LOTE]):
+            dedup_src = f"{evento['scoreSubjectId']}:{evento['eventType']}:{json.dumps(evento['metadata'], sort_keys=True, default=str)}"
+            entradas.append({
+                'Id': str(i),
+                'MessageBody': json.dumps(evento),
+                'MessageGroupId': evento['scoreSubjectId'],
+                'MessageDeduplicationId': hashlib.sha256(dedup_src.encode()).hexdigest(),
+            })
+
+        try:
+            resp = sqs.send_message_batch(QueueUrl=PAYMENT_EVENTS_QUEUE_URL, Entries=entradas)
+            for fallo in resp.get('Failed', []):
+                print(f"❌ Evento de score no encolado: {fallo}")
+            fallidos += len(resp.get('Failed', []))
+        except Exception as e:
+            print(f"❌ Error encolando eventos de score: {str(e)}")
+            fallidos += len(entradas)
+    return fallidos
+
+
+def registrar_lote(event, context):
+    try:
+        user_id = extract_user_id(event)
+        if not user_id:
+            return response(401, {
+                'success': False,
+                'error': {'code': 'UNAUTHORIZED', 'message': 'Token inválido'}
+            })
+
+        tanda_id = event['pathParameters']['tandaId']
+
+        tiene_permisos, tanda = verificar_permisos_tanda(tanda_id, user_id, validar=True)
+        if not tiene_permisos:
+            return response(403, {
+                'success': False,
+                'error': {'code': 'FORBIDDEN', 'message': 'Sin permisos'}
+            })
+
+        try:
+            filas = leer_filas_pagos(event)
+        except ValueError as e:
+            return response(400, {
+                'success': False,
+                'error': {'code': 'INVALID_BODY', 'message': str(e)}
+            })
+
+        if not filas:
+            return response(400, {
+                'success': False,
+                'error': {'code': 'MISSING_FIELDS', 'message': 'No hay pagos para registrar'}
+            })
+
+        if len(filas) > PAGOS_LOTE_MAX_FILAS:
+            return response(400, {
+                'success': False,
+                'error': {'code': 'DEMASIADAS_FILAS', 'message': f'Máximo {PAGOS_LOTE_MAX_FILAS} pagos por lote'}
+            })
+
+        # Una sola lectura de la partición de participantes para validar todas las filas
+        participantes = query_all(
+            participantes_table,
+            KeyConditionExpression=Key('id').eq(tanda_id),
+            ProjectionExpression='participanteId'
+        )
+        validas, errores = validar_filas_pagos(filas, tanda, {p['participanteId'] for p in participantes})
+        if errores:
+            return response(400, {
+                'success': False,
+                'error': {
+                    'code': 'INVALID_ROWS',
+                    'message': f'{len(errores)} error(es) en el lote; no se registró ningún pago',
+                    'errores': errores
+                }
+            })
+
+        # Sólo los pagos del lote, justo antes de escribir: BatchWriteItem no
+        # devuelve el item anterior, y de él salen los deltas de la vista y
+        # de los totales y los eventos de score
+        anteriores = {
+            p['pagoId']: p
+            for p in batch_get(
+                pagos_table,
+                [{'id': tanda_id, 'pagoId': f"{fila['participanteId']}_{fila['ronda']}"} for fila in validas],
+                projection=['pagoId', 'pagado', 'exentoPago', 'monto', 'fechaPago'],
+                consistent=True
+            )
+        }
+
+        timestamp = datetime.utcnow().isoformat()
+        metodo_pago = tanda['configuracion'].get('metodoPago', '')
+        pagos = [
+            {
+                'id': tanda_id,
+                'pagoId': f"{fila['participanteId']}_{fila['ronda']}",
+                'participanteId': fila['participanteId'],
+                'ronda': fila['ronda'],
+                'pagado': fila['pagado'],
+                'monto': fila['monto'],
+                'fechaPago': fila.get('fechaPago') or timestamp,
+                'metodoPago': fila.get('metodoPago', metodo_pago),
+                'comprobante': fila.get('comprobante', ''),
+                'notas': fila.get('notas', ''),
+                'createdAt': timestamp,
+                'updatedAt': timestamp,
+                'exentoPago': bool(fila.get('exentoPago', False))
+            }
+            for fila in validas
+        ]
+
+        batch_put(pagos_table, pagos)
+        registrar_pagos_vista(tanda_id, pagos, anteriores)
+        registrar_pagos_agregados(tanda_id, pagos, anteriores)
+        print(f"✅ {len(pagos)} pagos registrados en lote en tanda {tanda_id}")
+
+        eventos = eventos_score_lote(tanda, user_id, pagos, anteriores)
+        fallidos = encolar_eventos_score(eventos) if eventos and PAYMENT_EVENTS_QUEUE_URL else 0
+
+        return response(201, {
+            'success': True,
+            'data': {
+                'tandaId': tanda_id,
+                'registrados': len(pagos),
+                'eventosScore': len(eventos) - fallidos,
+                'eventosFallidos': fallidos,
+                'pagos': [{'pagoId': p['pagoId'], 'pagado': p['pagado']} for p in pagos]
+            }
+        })
+
+    except Exception as e:
+        print(f"Error en registrar pagos en lote: {str(e)}")
+        return response(500, {
+            'success': False,
+            'error': {'code': 'INTERNAL_SERVER_ERROR', 'message': 'Error al registrar pagos'}
+        })
+
 # ========================================
 # HANDLER: OBTENER HISTORIAL DE PAGOS
+#
+# Los filtros van en la llave, así que sólo se leen las filas devueltas:
+#   participanteId + ronda → GetItem de pagoId = <participanteId>_<ronda>
+#   participanteId         → begins_with(pagoId, '<participanteId>_')
+#   ronda                  → índice id-ronda-index (tandaId + ronda)
+# ?limit= devuelve una página y nextToken para continuar; sin limit se
+# devuelven todos (comportamiento original). totalMonto sale de
+# pagos_agregados (ver utils/pagos_agregados.py), no de sumar las filas.
 # ========================================
+PAGOS_LIMITE_MAXIMO = 500
+
+
 def obtener(event, context):
     try:
         user_id = extract_user_id(event)
@@ -250,26 +558,81 @@ def obtener(event, context):
         query_params = event.get('queryStringParameters') or {}
         participante_id = query_params.get('participanteId')
         ronda = query_params.get('ronda')
-        
-        # Obtener pagos
-        pagos_result = pagos_table.query(
-            KeyConditionExpression='id = :tandaId',
-            ExpressionAttributeValues={':tandaId': tanda_id}
-        )
-        
-        pagos = pagos_result.get('Items', [])
-        #for pago in pagos:
-        #    pago['tandaId'] = tanda_id
-        
-        # Aplicar filtros
-        if participante_id:
-            pagos = [p for p in pagos if p['participanteId'] == participante_id]
-        
+
         if ronda:
-            pagos = [p for p in pagos if p['ronda'] == int(ronda)]
-        
-        # Calcular total
-        total_monto = sum(p['monto'] for p in pagos if p.get('pagado', False))
+            try:
+                ronda = int(ronda)
+            except ValueError:
+                return response(400, {
+                    'success': False,
+                    'error': {'code': 'INVALID_PARAMS', 'message': 'ronda debe ser un número'}
+                })
+
+        limite = None
+        if query_params.get('limit'):
+            try:
+                limite = int(query_params['limit'])
+            except ValueError:
+                limite = 0
+            if not 1 <= limite <= PAGOS_LIMITE_MAXIMO:
+                return response(400, {
+                    'success': False,
+                    'error': {'code': 'INVALID_LIMIT', 'message': f'limit debe estar entre 1 y {PAGOS_LIMITE_MAXIMO}'}
+                })
+
+        # Un pago concreto: la llave completa
+        if participante_id and ronda:
+            pago = pagos_table.get_item(
+                Key={'id': tanda_id, 'pagoId': f"{participante_id}_{ronda}"}
+            ).get('Item')
+            pagos = [pago] if pago else []
+
+            return response(200, {
+                'success': True,
+                'data': {
+                    'pagos': pagos,
+                    'total': len(pagos),
+                    'totalMonto': sum(p['monto'] for p in pagos if p.get('pagado', False)),
+                    'tandaId': tanda_id,
+                    'nextToken': None
+                }
+            })
+
+        if participante_id:
+            query_kwargs = {
+                'KeyConditionExpression': Key('id').eq(tanda_id) & Key('pagoId').begins_with(f"{participante_id}_")
+            }
+        elif ronda:
+            query_kwargs = {
+                'IndexName': 'id-ronda-index',
+                'KeyConditionExpression': Key('id').eq(tanda_id) & Key('ronda').eq(ronda)
+            }
+        else:
+            query_kwargs = {'KeyConditionExpression': Key('id').eq(tanda_id)}
+
+        if query_params.get('nextToken'):
+            try:
+                inicio = decodificar_cursor(query_params['nextToken'])
+            except ValueError:
+                inicio = None
+            # El cursor sólo puede continuar la consulta de la misma tanda
+            if not inicio or inicio.get('id') != tanda_id:
+                return response(400, {
+                    'success': False,
+                    'error': {'code': 'INVALID_NEXT_TOKEN', 'message': 'nextToken inválido'}
+                })
+            query_kwargs['ExclusiveStartKey'] = inicio
+
+        next_token = None
+        if limite:
+            resultado = pagos_table.query(Limit=limite, **query_kwargs)
+            pagos = resultado.get('Items', [])
+            next_token = codificar_cursor(resultado.get('LastEvaluatedKey'))
+        else:
+            pagos = query_all(pagos_table, **query_kwargs)
+
+        # Total del filtro completo (no sólo de la página), sin recontar
+        total_monto = monto_pagado(obtener_agregados(tanda_id), participante_id, ronda or None)
         
         return response(200, {
             'success': True,
@@ -277,7 +640,8 @@ def obtener(event, context):
                 'pagos': pagos,
                 'total': len(pagos),
                 'totalMonto': total_monto,
-                'tandaId': tanda_id
+                'tandaId': tanda_id,
+                'nextToken': next_token
             }
         })
         
@@ -288,6 +652,207 @@ def obtener(event, context):
             'error': {'code': 'INTERNAL_SERVER_ERROR', 'message': 'Error al obtener pagos'}
         })
 
+# ========================================
+# MATRIZ DE PAGOS: ventana de rondas y formato compacto
+#
+# ?desde=&hasta= limitan las rondas que se devuelven (estadoGeneral y
+# pagosAdelantados siempre se calculan sobre la tanda completa).
+#
+# ?format=compact en lugar de un objeto por participante × ronda devuelve:
+#   pagados / exentos → bitmap por participante, bit (ronda - desde)
+#   futuro            → bitmap de las rondas posteriores a rondaActual
+#                       (es igual para todos los participantes)
+#   detalles          → sólo las celdas que no se deducen de los bitmaps y
+#                       los predeterminados, como filas
+#                       [ronda, fechaPago, monto, metodoPago, notas]
+#                       sin los nulos finales
+#   predeterminados   → monto y metodoPago más comunes en la ventana; en
+#                       `detalles` van como null sólo las celdas iguales al
+#                       predeterminado, y como '' las que no tienen valor
+#                       (null sería el predeterminado). Los campos sin
+#                       predeterminado usan null para "sin valor"
+# La ventana compacta es de MATRIZ_VENTANA_MAX rondas como máximo para que
+# los bitmaps sigan siendo enteros exactos en JavaScript (< 2^53).
+# ========================================
+MATRIZ_VENTANA_MAX = 52
+MATRIZ_CAMPOS_DETALLE = ['fechaPago', 'monto', 'metodoPago', 'notas']
+MATRIZ_CAMPOS_PREDETERMINADOS = ['monto', 'metodoPago']
+
+
+def leer_ventana_matriz(query_params, total_rondas, compacto):
+    """
+    Returns:
+        tuple: (desde, hasta)
+
+    Raises:
+        ValueError: Ventana fuera de la tanda
+    """
+    if not query_params.get('desde') and not query_params.get('hasta'):
+        desde, hasta = 1, total_rondas
+    else:
+        try:
+            desde = int(query_params.get('desde') or 1)
+            hasta = int(query_params.get('hasta') or total_rondas)
+        except ValueError:
+            raise ValueError('desde y hasta deben ser números de ronda')
+        if desde < 1 or hasta > total_rondas or desde > hasta:
+            raise ValueError(f'Ventana de rondas inválida (1-{total_rondas})')
+
+    if compacto:
+        hasta = min(hasta, desde + MATRIZ_VENTANA_MAX - 1)
+    return desde, hasta
+
+
+def estado_participante(pagados, ronda_actual, total_rondas):
+    """(estadoGeneral, pagosAdelantados) a partir del bitmap de pagados"""
+    todas = (1 << total_rondas) - 1
+    hasta_actual = (1 << ronda_actual) - 1
+    futuras = todas & ~hasta_actual
+    pagados &= todas
+    pagos_realizados = bin(pagados & hasta_actual).count('1')
+    pagos_adelantados = bin(pagados & futuras).count('1')
+
+    # Pagos esperados hasta la ronda pasada
+    pagos_esperados = max(0, ronda_actual - 1)
+    estado_general = 'al_corriente' if pagos_realizados >= pagos_esperados else 'atrasado'
+    return estado_general, pagos_adelantados
+
+
+def matriz_compacta(participantes, pagos, ronda_actual, total_rondas, desde, hasta):
+    filas = {
+        p['participanteId']: {'pagados': 0, 'exentos': 0, 'detalles': []}
+        for p in participantes
+    }
+
+    for pago in pagos:
+        fila = filas.get(pago.get('participanteId'))
+        ronda = int(pago['ronda'])
+        if fila is None or not 1 <= ronda <= total_rondas:
+            # Igual que la matriz detallada, que sólo recorre 1..total_rondas
+            continue
+
+        if pago.get('pagado', False):
+            fila['pagados'] |= bit_ronda(ronda)
+        if pago.get('exentoPago', False):
+            fila['exentos'] |= bit_ronda(ronda)
+
+        if desde <= ronda <= hasta:
+            fila['detalles'].append([ronda] + [pago.get(campo) for campo in MATRIZ_CAMPOS_DETALLE])
+
+    predeterminados = {}
+    for campo in MATRIZ_CAMPOS_PREDETERMINADOS:
+        columna = 1 + MATRIZ_CAMPOS_DETALLE.index(campo)
+        frecuencias = Counter(
+            detalle[columna]
+            for fila in filas.values() for detalle in fila['detalles']
+            if detalle[columna] not in (None, '')
+        )
+        if frecuencias:
+            predeterminados[campo] = frecuencias.most_common(1)[0][0]
+
+    for fila in filas.values():
+        detalles = []
+        for detalle in fila['detalles']:
+            for columna, campo in enumerate(MATRIZ_CAMPOS_DETALLE, start=1):
+                if campo not in predeterminados:
+                    detalle[columna] = detalle[columna] if detalle[columna] != '' else None
+                elif detalle[columna] is None:
+                    # Sin valor: null se leería como el predeterminado
+                    detalle[columna] = ''
+                elif detalle[columna] == predeterminados[campo]:
+                    detalle[columna] = None
+            while len(detalle) > 1 and detalle[-1] is None:
+                detalle.pop()
+            if len(detalle) > 1:
+                detalles.append(detalle)
+        fila['detalles'] = detalles
+
+    ventana = (1 << (hasta - desde + 1)) - 1
+    futuro = ((1 << total_rondas) - 1) & ~((1 << ronda_actual) - 1)
+
+    matriz = []
+    for participante in participantes:
+        fila = filas[participante['participanteId']]
+        estado_general, pagos_adelantados = estado_participante(fila['pagados'], ronda_actual, total_rondas)
+        matriz.append({
+            'participanteId': participante['participanteId'],
+            'nombre': participante['nombre'],
+            'numeroAsignado': participante['numeroAsignado'],
+            'estadoGeneral': estado_general,
+            'pagosAdelantados': pagos_adelantados,
+            'pagados': (fila['pagados'] >> (desde - 1)) & ventana,
+            'exentos': (fila['exentos'] >> (desde - 1)) & ventana,
+            'detalles': sorted(fila['detalles'])
+        })
+
+    return {
+        'formato': 'compact',
+        'desde': desde,
+        'hasta': hasta,
+        'futuro': (futuro >> (desde - 1)) & ventana,
+        'campos': ['ronda'] + MATRIZ_CAMPOS_DETALLE,
+        'predeterminados': predeterminados,
+        'participantes': matriz
+    }
+
+
+def matriz_detallada(participantes, pagos, ronda_actual, total_rondas, desde, hasta):
+    # Diccionario de pagos: participante_ronda
+    pagos_dict = {}
+    for pago in pagos:
+        key = f"{pago['participanteId']}_{int(pago['ronda'])}"
+        pagos_dict[key] = {
+            'pagado': pago.get('pagado', False),
+            'fechaPago': pago.get('fechaPago'),
+            'exentoPago': pago.get('exentoPago',False),
+            'metodoPago': pago.get('metodoPago'),
+            'monto': pago.get('monto'),
+            'notas': pago.get('notas')
+        }
+    
+    matriz = []
+    
+    for participante in participantes:
+        pagos_participante = {}
+        pagados = 0
+        
+        for ronda in range(1, total_rondas + 1):
+            key = f"{participante['participanteId']}_{ronda}"
+            pago_info = pagos_dict.get(
+                key,
+                {'pagado': False, 'fechaPago': None}
+            )
+            
+            if pago_info['pagado']:
+                pagados |= bit_ronda(ronda)
+            
+            if ronda < desde or ronda > hasta:
+                continue
+            
+            pagos_participante[str(ronda)] = {
+                'pagado': pago_info['pagado'],
+                'fechaPago': pago_info['fechaPago'],
+                'esFuturo': ronda > ronda_actual,
+                'exentoPago': pago_info.get('exentoPago',False),
+                'metodoPago': pago_info.get('metodoPago'),
+                'monto': pago_info.get('monto'),
+                'notas': pago_info.get('notas')
+            }
+        
+        estado_general, pagos_adelantados = estado_participante(pagados, ronda_actual, total_rondas)
+        
+        matriz.append({
+            'participanteId': participante['participanteId'],
+            'nombre': participante['nombre'],
+            'numeroAsignado': participante['numeroAsignado'],
+            'pagos': pagos_participante,
+            'estadoGeneral': estado_general,
+            'pagosAdelantados': pagos_adelantados
+        })
+    
+    return {'matriz': matriz}
+
+
 # ========================================
 # HANDLER: OBTENER MATRIZ DE PAGOS
 # ========================================
@@ -303,91 +868,41 @@ def obtener_matriz(event, context):
         tanda_id = event['pathParameters']['tandaId']
         
         # Verificar permisos
-        tiene_permisos, tanda = verificar_permisos_tanda(tanda_id, user_id)
+        tiene_permisos, tanda = verificar_permisos_tanda(tanda_id, user_id, validar=True)
         if not tiene_permisos:
             return response(403, {
                 'success': False,
                 'error': {'code': 'FORBIDDEN', 'message': 'Sin permisos'}
             })
         
-        # Obtener participantes
-        participantes_result = participantes_table.query(
-            KeyConditionExpression='id = :tandaId',
-            ExpressionAttributeValues={':tandaId': tanda_id}
-        )
-        
-        # Obtener pagos
-        pagos_result = pagos_table.query(
-            KeyConditionExpression='id = :tandaId',
-            ExpressionAttributeValues={':tandaId': tanda_id}
-        )
-        
-        # Diccionario de pagos: participante_ronda
-        pagos_dict = {}
-        for pago in pagos_result.get('Items', []):
-            key = f"{pago['participanteId']}_{int(pago['ronda'])}"
-            pagos_dict[key] = {
-                'pagado': pago.get('pagado', False),
-                'fechaPago': pago.get('fechaPago'),
-                'exentoPago': pago.get('exentoPago',False),
-                'metodoPago': pago.get('metodoPago'),
-                'monto': pago.get('monto'),
-                'notas': pago.get('notas')
-            }
-        
         ronda_actual = int(tanda['rondaActual'])
         total_rondas = int(tanda['totalRondas'])
         
-        matriz = []
+        query_params = event.get('queryStringParameters') or {}
+        compacto = query_params.get('format') == 'compact'
+        try:
+            desde, hasta = leer_ventana_matriz(query_params, total_rondas, compacto)
+        except ValueError as e:
+            return response(400, {
+                'success': False,
+                'error': {'code': 'INVALID_PARAMS', 'message': str(e)}
+            })
+        
+        # GET condicional: la versión viene en el item que ya se leyó
+        etag = etag_tanda(tanda)
+        if no_modificado(event, etag):
+            return respuesta_no_modificada(cors_headers(), etag)
         
-        for participante in sorted(
-            participantes_result.get('Items', []),
+        # Obtener participantes
+        participantes = sorted(
+            query_all(participantes_table, KeyConditionExpression=Key('id').eq(tanda_id)),
             key=lambda x: x['numeroAsignado']
-        ):
-            pagos_participante = {}
-            pagos_realizados = 0
-            pagos_adelantados = 0
-            
-            for ronda in range(1, total_rondas + 1):
-                key = f"{participante['participanteId']}_{ronda}"
-                pago_info = pagos_dict.get(
-                    key,
-                    {'pagado': False, 'fechaPago': None}
-                )
-                
-                pagos_participante[str(ronda)] = {
-                    'pagado': pago_info['pagado'],
-                    'fechaPago': pago_info['fechaPago'],
-                    'esFuturo': ronda > ronda_actual,
-                    'exentoPago': pago_info.get('exentoPago',False),
-                    'metodoPago': pago_info.get('metodoPago'),
-                    'monto': pago_info.get('monto'),
-                    'notas': pago_info.get('notas')
-                }
-                
-                if pago_info['pagado']:
-                    if ronda <= ronda_actual:
-                        pagos_realizados += 1
-                    else:
-                        pagos_adelantados += 1
-            
-            # Pagos esperados hasta la ronda pasada
-            pagos_esperados = max(0, ronda_actual - 1)
-            
-            # Estado general
-            if pagos_realizados >= pagos_esperados:
-                estado_general = 'al_corriente'
-            else:
-                estado_general = 'atrasado'
-            
-            matriz.append({
-                'participanteId': participante['participanteId'],
-                'nombre': participante['nombre'],
-                'numeroAsignado': participante['numeroAsignado'],
-                'pagos': pagos_participante,
-                'estadoGeneral': estado_general,
-                'pagosAdelantados': pagos_adelantados
-            })
+        )
+        
+        # Obtener pagos
+        pagos = query_all(pagos_table, KeyConditionExpression=Key('id').eq(tanda_id))
+        
+        construir = matriz_compacta if compacto else matriz_detallada
         
         return response(200, {
             'success': True,
@@ -395,9 +910,9 @@ def obtener_matriz(event, context):
                 'rondaActual': ronda_actual,
                 'totalRondas': total_rondas,
                 'tandaId': tanda_id,
-                'matriz': matriz
+                **construir(participantes, pagos, ronda_actual, total_rondas, desde, hasta)
             }
-        })
+        }, etag_headers(etag))
         
     except Exception as e:
         print(f"Error en obtener matriz: {str(e)}")
@@ -412,8 +927,16 @@ def obtener_matriz(event, context):
 
 
 
+@unidad_de_trabajo
 def lambda_handler(event, context):
     print(f"event: {event}")
+
+    # Reconciliación programada (EventBridge) de los totales de pagos y de
+    # la vista de cada tanda
+    if event.get('source') == 'aws.events':
+        reporte = {'agregados': reconciliar_agregados(), 'vista': reconciliar_vistas()}
+        return json.loads(json.dumps(reporte, cls=DecimalEncoder))
+
     path = event.get("path")
     routeKey = event.get('routeKey')
     
@@ -423,6 +946,10 @@ def lambda_handler(event, context):
             print('Crear Pago')
             return registrar(event,context)
         
+        elif routeKey == 'POST /tandas/{tandaId}/pagos:batch':
+            print('Registrar pagos en lote')
+            return registrar_lote(event,context)
+
         elif routeKey == 'PUT /tandas/{tandaId}/pagos/{pagoId}':
             print('Actualizar pago')
             return actualizar(event,context)
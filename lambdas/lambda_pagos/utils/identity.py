@@ -0,0 +1,89 @@
+# ========================================
+# utils/identity.py
+# Identidad del usuario que hace la petición
+#
+# El Lambda Authorizer de API Gateway ya validó el JWT y deja userId/email
+# en requestContext.authorizer.lambda; si está presente se usa tal cual.
+# Sólo en rutas sin authorizer (o invocaciones directas) se decodifica el
+# token aquí, con un LRU pequeño de tokens ya verificados para no repetir
+# la verificación HS256 en invocaciones calientes.
+# ========================================
+
+import os
+import time
+import hashlib
+import jwt
+from collections import OrderedDict
+
+JWT_SECRET = os.environ['JWT_SECRET']
+
+# Tokens verificados: sha256(token) → (payload, exp)
+IDENTITY_CACHE_SIZE = int(os.environ.get('IDENTITY_CACHE_SIZE', '256'))
+_verificados = OrderedDict()
+
+
+def _token_de(event):
+    headers = event.get('headers') or {}
+    auth_header = headers.get('Authorization') or headers.get('authorization')
+    if not auth_header:
+        return None
+    return auth_header.replace('Bearer ', '')
+
+
+def _contexto_authorizer(event):
+    contexto = ((event.get('requestContext') or {}).get('authorizer') or {}).get('lambda') or {}
+    return contexto if contexto.get('userId') else None
+
+
+def decodificar_token(token):
+    """
+    Verifica el JWT (firma y exp) reutilizando verificaciones previas.
+    Lanza jwt.InvalidTokenError si no es válido.
+
+    Sólo se guardan tokens con exp, y cada entrada deja de usarse en
+    cuanto el token expira.
+    """
+    clave = hashlib.sha256(token.encode()).hexdigest()
+    ahora = time.time()
+
+    entrada = _verificados.get(clave)
+    if entrada:
+        payload, exp = entrada
+        if exp > ahora:
+            _verificados.move_to_end(clave)
+            return payload
+        del _verificados[clave]
+
+    payload = jwt.decode(token, JWT_SECRET, algorithms=['HS256'])
+
+    exp = payload.get('exp')
+    if exp:
+        _verificados[clave] = (payload, exp)
+        while len(_verificados) > IDENTITY_CACHE_SIZE:
+            _verificados.popitem(last=False)
+
+    return payload
+
+
+def obtener_identidad(event):
+    """
+    Returns:
+        dict | None: {'userId', 'email'} o None si no hay token válido
+    """
+    contexto = _contexto_authorizer(event)
+    if contexto:
+        return {'userId': contexto['userId'], 'email': contexto.get('email')}
+
+    try:
+        token = _token_de(event)
+        if not token:
+            return None
+        payload = decodificar_token(token)
+        return {'userId': payload['id'], 'email': payload.get('email')}
+    except Exception:
+        return None
+
+
+def extract_user_id(event):
+    identidad = obtener_identidad(event)
+    return identidad['userId'] if identidad else None
@@ -6,22 +6,36 @@
 import json
 import boto3
 import os
-import jwt
-from datetime import datetime
+import re
+import io
+import csv
+import base64
+from datetime import datetime, timedelta
 from decimal import Decimal
 import uuid
+from bisect import bisect_left
+from boto3.dynamodb.conditions import Key, Attr
+from botocore.exceptions import ClientError
 
 #custom error
 from exception.custom_http_exception import CustomError
 from exception.custom_http_exception import CustomClientError
 
+from utils.dynamo_utils import query_all, batch_put, delete_by_query
+from utils.tanda_vista import registrar_participante_vista, registrar_participantes_vista, actualizar_numeros_vista, eliminar_participante_vista
+from utils.pagos_agregados import recalcular_agregados
+from utils.registro_snapshot import publicar_snapshots_tanda
+from utils.identity import extract_user_id
+from utils.unidad_trabajo import TablaCacheada, unidad_de_trabajo
+
 dynamodb = boto3.resource('dynamodb')
-tandas_table = dynamodb.Table(os.environ['TANDAS_TABLE'])
-participantes_table = dynamodb.Table(os.environ['PARTICIPANTES_TABLE'])
+tandas_table = TablaCacheada(dynamodb.Table(os.environ['TANDAS_TABLE']))
+participantes_table = TablaCacheada(dynamodb.Table(os.environ['PARTICIPANTES_TABLE']))
+pagos_table = TablaCacheada(dynamodb.Table(os.environ['PAGOS_TABLE']))
+notificaciones_table = TablaCacheada(dynamodb.Table(os.environ['NOTIFICACIONES_TABLE']))
+score_events_table = dynamodb.Table(os.environ['SCORE_EVENTS_TABLE'])
+SLOTS_TABLE = os.environ['SLOTS_TABLE']
 LINKS_TABLE = 'links_registro'
-pagos_table = 'pagos'
-
-JWT_SECRET = os.environ['JWT_SECRET']
 
 # Utilidades (mismas que en tandas_handler.py)
 def cors_headers():
@@ -51,18 +65,6 @@ class DecimalEncoder(json.JSONEncoder):
             return int(obj) if obj % 1 == 0 else float(obj)
         return super(DecimalEncoder, self).default(obj)
 
-def extract_user_id(event):
-    try:
-        auth_header = event['headers'].get('Authorization') or event['headers'].get('authorization')
-        if not auth_header:
-            return None
-        token = auth_header.replace('Bearer ', '')
-        payload = jwt.decode(token, JWT_SECRET, algorithms=['HS256'])
-        print(f'payload token: {payload}')
-        return payload['id']
-    except:
-        return None
-
 def generate_short_id():
     import random
     import string
@@ -77,6 +79,57 @@ def verificar_permisos_tanda(tanda_id, user_id):
         return False, 'Sin permisos'
     return True, result['Item']
 
+# ========================================
+# RESERVA DE NÚMEROS (tandas normales)
+# Cada número asignado tiene un item (tandaId, numero) en SLOTS_TABLE que se
+# escribe en la misma transacción que el participante, con la condición de
+# que no exista: dos registros simultáneos no pueden quedarse con el mismo
+# número. Las tandas cumpleañeras no usan slots (el número se deriva de la
+# fecha de cumpleaños y se recalcula).
+# ========================================
+def reservar_slot_tx(tanda_id, numero, participante_id):
+    return {
+        'Put': {
+            'TableName': SLOTS_TABLE,
+            'Item': {'tandaId': tanda_id, 'numero': int(numero), 'participanteId': participante_id},
+            'ConditionExpression': 'attribute_not_exists(numero)'
+        }
+    }
+
+
+def liberar_slot_tx(tanda_id, numero, participante_id):
+    # Sólo si el slot es de este participante (o no existe, en participantes
+    # anteriores a los slots)
+    return {
+        'Delete': {
+            'TableName': SLOTS_TABLE,
+            'Key': {'tandaId': tanda_id, 'numero': int(numero)},
+            'ConditionExpression': 'attribute_not_exists(numero) OR participanteId = :pid',
+            'ExpressionAttributeValues': {':pid': participante_id}
+        }
+    }
+
+
+def slots_ocupados(error, transaccion):
+    """Números que ya estaban reservados según los CancellationReasons de la transacción"""
+    razones = error.response.get('CancellationReasons') or []
+    return [
+        int(accion['Put']['Item']['numero'])
+        for razon, accion in zip(razones, transaccion)
+        if razon.get('Code') == 'ConditionalCheckFailed'
+        and accion.get('Put', {}).get('TableName') == SLOTS_TABLE
+    ]
+
+
+def ejecutar_transaccion(transaccion):
+    """
+    TransactWriteItems a través de la tabla para invalidar sus lecturas
+    cacheadas. El cliente del recurso serializa igual que Table: los items
+    van con tipos de Python, no en formato {'S': ...}.
+    """
+    participantes_table.meta.client.transact_write_items(TransactItems=transaccion)
+
+
 # ========================================
 # HANDLER: AGREGAR PARTICIPANTE
 # ========================================
@@ -143,39 +196,41 @@ def agregar(event, context):
                     }
                 })
         
-        # Obtener participantes existentes
-        participantes_result = participantes_table.query(
-            KeyConditionExpression='id = :tandaId',
-            ExpressionAttributeValues={':tandaId': tanda_id}
-        )
-        print(f'participantes_result: {participantes_result}')
-        
-        participantes_existentes = participantes_result.get('Items', [])
-        
+        timestamp = datetime.utcnow().isoformat()
+        birthday_key = None
+        if body.get('fechaCumpleaños'):
+            try:
+                birthday_key = clave_cumpleaños(body['fechaCumpleaños'], timestamp)
+            except ValueError:
+                return response(400, {
+                    'success': False,
+                    'error': {
+                        'code': 'INVALID_BIRTHDAY',
+                        'message': 'La fecha de cumpleaños debe tener formato YYYY-MM-DD'
+                    }
+                })
+
         # 🆕 CALCULAR NÚMERO ASIGNADO
         if es_cumpleañera:
-            # Para tanda cumpleañera: calcular automáticamente
+            # Para tanda cumpleañera: calcular automáticamente (y recalcular
+            # a los demás después), así que sí se necesitan todos
+            participantes_existentes = query_all(
+                participantes_table,
+                KeyConditionExpression=Key('id').eq(tanda_id),
+                ConsistentRead=True
+            )
+            
             numero_asignado = calcular_numero_automatico_cumpleañera(
-                body['fechaCumpleaños'],
+                birthday_key,
                 participantes_existentes
             )
         else:
-            # Para tanda normal: usar el número proporcionado y verificar duplicados
+            # Para tanda normal: usar el número proporcionado; el duplicado
+            # lo detecta la reserva del slot al escribir
             numero_asignado = int(body['numeroAsignado'])
-            
-            for p in participantes_existentes:
-                if p['numeroAsignado'] == numero_asignado:
-                    return response(400, {
-                        'success': False,
-                        'error': {
-                            'code': 'NUMERO_DUPLICADO',
-                            'message': f"El número {numero_asignado} ya está asignado"
-                        }
-                    })
         
         # Crear participante
         participante_id = f"part_{generate_short_id()}"
-        timestamp = datetime.utcnow().isoformat()
         
         participante = {
             'id': tanda_id,
@@ -192,14 +247,39 @@ def agregar(event, context):
         # 🆕 Agregar fecha de cumpleaños si existe
         if body.get('fechaCumpleaños'):
             participante['fechaCumpleaños'] = body['fechaCumpleaños']
+            participante['birthdayKey'] = birthday_key
         
-        participantes_table.put_item(Item=participante)
+        if es_cumpleañera:
+            participantes_table.put_item(Item=participante)
+        else:
+            transaccion = [
+                {'Put': {'TableName': participantes_table.name, 'Item': participante}},
+                reservar_slot_tx(tanda_id, numero_asignado, participante_id)
+            ]
+            try:
+                ejecutar_transaccion(transaccion)
+            except ClientError as e:
+                if slots_ocupados(e, transaccion):
+                    return response(400, {
+                        'success': False,
+                        'error': {
+                            'code': 'NUMERO_DUPLICADO',
+                            'message': f"El número {numero_asignado} ya está asignado"
+                        }
+                    })
+                raise
+        registrar_participante_vista(tanda_id, participante, nuevo=True)
         
         # 🆕 SI ES CUMPLEAÑERA, RECALCULAR NÚMEROS DE TODOS LOS PARTICIPANTES
+        reordenados = 0
         if es_cumpleañera:
-            recalcular_numeros_cumpleañera(tanda_id, participantes_existentes + [participante])
+            reordenados = recalcular_numeros_cumpleañera(tanda_id, participantes_existentes + [participante])
+        
+        # Regenerar páginas públicas de registro de la tanda
+        publicar_snapshots_tanda(tanda_id)
         
         participante['tandaId'] = tanda_id
+        participante['participantesReordenados'] = reordenados
         
         return response(201, {
             'success': True,
@@ -216,166 +296,114 @@ def agregar(event, context):
         })
 
 
-# 🆕 FUNCIÓN AUXILIAR: Calcular número automático para tanda cumpleañera
-def calcular_numero_automatico_cumpleañera(nueva_fecha_cumpleaños, participantes_existentes):
+# ========================================
+# HANDLER: IMPORTAR PARTICIPANTES (alta masiva)
+# POST /tandas/{tandaId}/participantes:batch con JSON
+# ({"participantes": [...]}) o CSV (Content-Type: text/csv, encabezados
+# nombre,telefono,email,numeroAsignado,fechaCumpleaños). Se validan todas
+# las filas antes de escribir nada; los números se asignan una sola vez y,
+# en cumpleañeras, se reordena a los existentes una sola vez al final.
+# ========================================
+IMPORTAR_MAX_FILAS = 200
+
+# Tandas normales: participante + slot por fila, 100 acciones por transacción
+IMPORTAR_FILAS_POR_TRANSACCION = 50
+
+# "52-5512345678" (formato del frontend) o sólo dígitos (registros anteriores)
+TELEFONO_RE = re.compile(r'^(\d{1,3}-)?\d{9,10}$')
+
+
+def leer_filas_importacion(event):
+    """Filas del body como lista de dicts (JSON o CSV)"""
+    body = event.get('body') or ''
+    if event.get('isBase64Encoded'):
+        body = base64.b64decode(body).decode('utf-8-sig')
+
+    headers = {k.lower(): v for k, v in (event.get('headers') or {}).items()}
+    if 'text/csv' in headers.get('content-type', ''):
+        lector = csv.DictReader(io.StringIO(body.lstrip('\ufeff')))
+        return [
+            {(k or '').strip(): (v or '').strip() for k, v in fila.items()}
+            for fila in lector
+        ]
+
+    datos = json.loads(body)
+    filas = datos.get('participantes') if isinstance(datos, dict) else datos
+    if not isinstance(filas, list):
+        raise ValueError('Se esperaba una lista en "participantes"')
+    return filas
+
+
+def normalizar_telefono(telefono):
+    return re.sub(r'[\s().+]', '', str(telefono or ''))
+
+
+def validar_filas_importacion(filas, tanda, numeros_ocupados):
     """
-    Calcula el número automático basado en la fecha de cumpleaños.
-    Ordena por mes/día de cumpleaños, y en caso de empate, por fecha de registro.
-    
-    Args:
-        nueva_fecha_cumpleaños: String con formato ISO (YYYY-MM-DD)
-        participantes_existentes: Lista de participantes actuales
-    
+    Valida todas las filas en una pasada.
+
     Returns:
-        int: Número asignado (1-N)
+        tuple: (filas normalizadas, lista de errores {fila, campo, message})
     """
-    from datetime import datetime
-    
-    # Si no hay participantes, es el número 1
-    if not participantes_existentes:
-        return 1
-    
-    # Crear lista con info de cumpleaños
-    lista_cumpleaños = []
-    
-    # Agregar participantes existentes
-    for p in participantes_existentes:
-        if p.get('fechaCumpleaños'):
-            try:
-                fecha_cumple = datetime.fromisoformat(p['fechaCumpleaños'])
-                fecha_registro = datetime.fromisoformat(p.get('fechaRegistro', p.get('createdAt')))
-                
-                lista_cumpleaños.append({
-                    'mes': fecha_cumple.month,
-                    'dia': fecha_cumple.day,
-                    'fechaRegistro': fecha_registro,
-                    'participanteId': p['participanteId']
-                })
-            except Exception as e:
-                print(f"Error procesando fecha de participante {p.get('participanteId')}: {e}")
-                continue
-    
-    # Agregar el nuevo participante
-    try:
-        nueva_fecha = datetime.fromisoformat(nueva_fecha_cumpleaños)
-        lista_cumpleaños.append({
-            'mes': nueva_fecha.month,
-            'dia': nueva_fecha.day,
-            'fechaRegistro': datetime.utcnow(),
-            'esNuevo': True
-        })
-    except Exception as e:
-        print(f"Error procesando nueva fecha de cumpleaños: {e}")
-        return 1
-    
-    # Ordenar por mes, día y fecha de registro
-    lista_cumpleaños.sort(key=lambda x: (x['mes'], x['dia'], x['fechaRegistro']))
-    
-    # Encontrar la posición del nuevo participante
-    for i, item in enumerate(lista_cumpleaños):
-        if item.get('esNuevo'):
-            return i + 1
-    
-    # Fallback (no debería llegar aquí)
-    return len(lista_cumpleaños)
+    es_cumpleañera = tanda.get('frecuencia') == 'cumpleaños'
+    total_rondas = int(tanda.get('totalRondas', 0))
+    errores = []
+    validas = []
+    numeros_vistos = {}
 
+    for i, fila in enumerate(filas, start=1):
+        if not isinstance(fila, dict):
+            errores.append({'fila': i, 'campo': None, 'message': 'Fila inválida'})
+            continue
 
-# 🆕 FUNCIÓN AUXILIAR: Recalcular números de todos los participantes en tanda cumpleañera
-def recalcular_numeros_cumpleañera(tanda_id, todos_participantes):
-    """
-    Recalcula y actualiza los números de TODOS los participantes en una tanda cumpleañera.
-    Se ejecuta cada vez que se agrega, modifica o elimina un participante.
-    
-    Args:
-        tanda_id: ID de la tanda
-        todos_participantes: Lista con TODOS los participantes (incluyendo el recién agregado)
-    """
-    from datetime import datetime
-    
-    if not todos_participantes:
-        return
-    
-    # Filtrar solo participantes con fecha de cumpleaños
-    participantes_con_cumple = []
-    
-    for p in todos_participantes:
-        if p.get('fechaCumpleaños'):
+        nombre = str(fila.get('nombre') or '').strip()
+        telefono = normalizar_telefono(fila.get('telefono'))
+        email = str(fila.get('email') or '').strip()
+        fecha_cumpleaños = str(fila.get('fechaCumpleaños') or '').strip()
+        numero = None
+
+        if not nombre:
+            errores.append({'fila': i, 'campo': 'nombre', 'message': 'El nombre es requerido'})
+        if not telefono:
+            errores.append({'fila': i, 'campo': 'telefono', 'message': 'El teléfono es requerido'})
+        elif not TELEFONO_RE.match(telefono):
+            errores.append({'fila': i, 'campo': 'telefono', 'message': f"Teléfono inválido: {fila.get('telefono')}"})
+
+        if fecha_cumpleaños:
             try:
-                fecha_cumple = datetime.fromisoformat(p['fechaCumpleaños'])
-                fecha_registro = datetime.fromisoformat(p.get('fechaRegistro', p.get('createdAt')))
-                
-                participantes_con_cumple.append({
-                    'participanteId': p['participanteId'],
-                    'mes': fecha_cumple.month,
-                    'dia': fecha_cumple.day,
-                    'fechaRegistro': fecha_registro
-                })
-            except Exception as e:
-                print(f"Error procesando participante {p.get('participanteId')}: {e}")
-                continue
-    
-    # Ordenar por mes, día y fecha de registro
-    participantes_con_cumple.sort(key=lambda x: (x['mes'], x['dia'], x['fechaRegistro']))
-    
-    # Actualizar números en DynamoDB
-    timestamp = datetime.utcnow().isoformat()
-    
-    for i, p in enumerate(participantes_con_cumple):
-        numero_nuevo = i + 1
-        
-        try:
-            participantes_table.update_item(
-                Key={
-                    'id': tanda_id,
-                    'participanteId': p['participanteId']
-                },
-                UpdateExpression='SET numeroAsignado = :num, updatedAt = :timestamp',
-                ExpressionAttributeValues={
-                    ':num': numero_nuevo,
-                    ':timestamp': timestamp
-                }
-            )
-            print(f"✅ Actualizado participante {p['participanteId']} a número {numero_nuevo}")
-        except Exception as e:
-            print(f"❌ Error actualizando participante {p['participanteId']}: {e}")
+                datetime.fromisoformat(fecha_cumpleaños)
+            except ValueError:
+                errores.append({'fila': i, 'campo': 'fechaCumpleaños', 'message': 'La fecha de cumpleaños debe tener formato YYYY-MM-DD'})
+        elif es_cumpleañera:
+            errores.append({'fila': i, 'campo': 'fechaCumpleaños', 'message': 'La fecha de cumpleaños es obligatoria para tandas cumpleañeras'})
 
-# ========================================
-# HANDLER: LISTAR PARTICIPANTES
-# ========================================
-def listar(event, context):
-    try:
-        tanda_id = event['pathParameters']['tandaId']
-        
-        # Obtener participantes
-        result = participantes_table.query(
-            KeyConditionExpression='id = :tandaId',
-            ExpressionAttributeValues={':tandaId': tanda_id}
-        )
-        
-        participantes = result.get('Items', [])
-        
-        # Ordenar por número asignado
-        participantes.sort(key=lambda x: x['numeroAsignado'])
-        
-        return response(200, {
-            'success': True,
-            'data': {
-                'participantes': participantes,
-                'total': len(participantes)
-            }
-        })
-        
-    except Exception as e:
-        print(f"Error en listar participantes: {str(e)}")
-        return response(500, {
-            'success': False,
-            'error': {'code': 'INTERNAL_SERVER_ERROR', 'message': 'Error al listar'}
+        if not es_cumpleañera:
+            try:
+                numero = int(str(fila.get('numeroAsignado') or '').strip())
+            except ValueError:
+                errores.append({'fila': i, 'campo': 'numeroAsignado', 'message': 'El número asignado es requerido'})
+            else:
+                if numero < 1 or numero > total_rondas:
+                    errores.append({'fila': i, 'campo': 'numeroAsignado', 'message': f'Número {numero} fuera de rango (1-{total_rondas})'})
+                elif numero in numeros_ocupados:
+                    errores.append({'fila': i, 'campo': 'numeroAsignado', 'message': f'El número {numero} ya está asignado'})
+                elif numero in numeros_vistos:
+                    errores.append({'fila': i, 'campo': 'numeroAsignado', 'message': f'El número {numero} se repite en la fila {numeros_vistos[numero]}'})
+                else:
+                    numeros_vistos[numero] = i
+
+        validas.append({
+            'nombre': nombre,
+            'telefono': telefono,
+            'email': email,
+            'fechaCumpleaños': fecha_cumpleaños,
+            'numeroAsignado': numero
         })
 
-# ========================================
-# HANDLER: ACTUALIZAR PARTICIPANTE
-# ========================================
-def actualizar(event, context):
+    return validas, errores
+
+
+def importar(event, context):
     try:
         user_id = extract_user_id(event)
         if not user_id:
@@ -383,122 +411,471 @@ def actualizar(event, context):
                 'success': False,
                 'error': {'code': 'UNAUTHORIZED', 'message': 'Token inválido'}
             })
-        
+
         tanda_id = event['pathParameters']['tandaId']
-        participante_id = event['pathParameters']['participanteId']
-        body = json.loads(event['body'])
-        
-        # Verificar permisos
-        tiene_permisos, _ = verificar_permisos_tanda(tanda_id, user_id)
+
+        tiene_permisos, tanda = verificar_permisos_tanda(tanda_id, user_id)
         if not tiene_permisos:
-            return response(403, {
+            return response(403 if tanda != 'Tanda no encontrada' else 404, {
                 'success': False,
-                'error': {'code': 'FORBIDDEN', 'message': 'Sin permisos'}
+                'error': {'code': 'FORBIDDEN', 'message': tanda}
             })
-        
-        # 🆕 OBTENER INFORMACIÓN DE LA TANDA
-        tanda = tandas_table.get_item(Key={'id': tanda_id}).get('Item')
-        if not tanda:
-            return response(404, {
+
+        try:
+            filas = leer_filas_importacion(event)
+        except (ValueError, csv.Error) as e:
+            return response(400, {
                 'success': False,
-                'error': {'code': 'NOT_FOUND', 'message': 'Tanda no encontrada'}
+                'error': {'code': 'INVALID_BODY', 'message': f'No se pudo leer la importación: {str(e)}'}
             })
-        
+
+        if not filas:
+            return response(400, {
+                'success': False,
+                'error': {'code': 'MISSING_FIELDS', 'message': 'No hay participantes para importar'}
+            })
+
+        if len(filas) > IMPORTAR_MAX_FILAS:
+            return response(400, {
+                'success': False,
+                'error': {'code': 'DEMASIADAS_FILAS', 'message': f'Máximo {IMPORTAR_MAX_FILAS} participantes por importación'}
+            })
+
         es_cumpleañera = tanda.get('frecuencia') == 'cumpleaños'
-        
-        # Verificar que el participante existe
-        participante_result = participantes_table.get_item(
-            Key={'id': tanda_id, 'participanteId': participante_id}
-        )
-        
-        if not participante_result.get('Item'):
-            return response(404, {
+
+        # Una sola lectura de la partición: números ocupados (normales) o
+        # todos los participantes para ordenar (cumpleañeras)
+        if es_cumpleañera:
+            existentes = query_all(
+                participantes_table,
+                KeyConditionExpression=Key('id').eq(tanda_id),
+                ConsistentRead=True
+            )
+            numeros_ocupados = set()
+        else:
+            existentes = query_all(
+                participantes_table,
+                KeyConditionExpression=Key('id').eq(tanda_id),
+                ProjectionExpression='numeroAsignado'
+            )
+            numeros_ocupados = {int(p['numeroAsignado']) for p in existentes if p.get('numeroAsignado') is not None}
+
+        validas, errores = validar_filas_importacion(filas, tanda, numeros_ocupados)
+        if errores:
+            return response(400, {
                 'success': False,
-                'error': {'code': 'NOT_FOUND', 'message': 'Participante no encontrado'}
+                'error': {
+                    'code': 'INVALID_ROWS',
+                    'message': f'{len(errores)} error(es) en la importación; no se registró ningún participante',
+                    'errores': errores
+                }
             })
-        
-        participante_actual = participante_result['Item']
-        
-        # 🆕 VALIDACIÓN PARA TANDAS CUMPLEAÑERAS
+
+        # El orden del archivo es el orden de registro (desempate en cumpleañeras)
+        ahora = datetime.utcnow()
+        nuevos = []
+        for i, fila in enumerate(validas):
+            timestamp = (ahora + timedelta(microseconds=i)).isoformat()
+            participante = {
+                'id': tanda_id,
+                'participanteId': f"part_{generate_short_id()}",
+                'nombre': fila['nombre'],
+                'telefono': fila['telefono'],
+                'email': fila['email'],
+                'numeroAsignado': fila['numeroAsignado'],
+                'createdAt': timestamp,
+                'updatedAt': timestamp,
+                'fechaRegistro': timestamp
+            }
+            if fila['fechaCumpleaños']:
+                participante['fechaCumpleaños'] = fila['fechaCumpleaños']
+                participante['birthdayKey'] = clave_cumpleaños(fila['fechaCumpleaños'], timestamp)
+            nuevos.append(participante)
+
+        reordenados = 0
         if es_cumpleañera:
-            # En tandas cumpleañeras NO se puede cambiar manualmente el número
-            # EXCEPTO si viene del recálculo automático por cambio de fecha
-            if 'numeroAsignado' in body and 'fechaCumpleaños' not in body:
-                return response(400, {
-                    'success': False,
-                    'error': {
-                        'code': 'NUMERO_NO_EDITABLE',
-                        'message': 'En tandas cumpleañeras el número se asigna automáticamente por fecha de cumpleaños'
-                    }
-                })
+            # Los nuevos se escriben ya con su número final; después sólo se
+            # mueven los existentes que cambian de lugar
+            numeros = ordenar_cumpleañera(existentes + nuevos)
+            for participante in nuevos:
+                participante['numeroAsignado'] = numeros[participante['participanteId']]
+
+            batch_put(participantes_table, nuevos)
+            reordenados = recalcular_numeros_cumpleañera(tanda_id, existentes + nuevos)
         else:
-            # Para tandas normales, validar número duplicado si se está cambiando
-            if 'numeroAsignado' in body:
-                participantes_result = participantes_table.query(
-                    KeyConditionExpression='id = :tandaId',
-                    ExpressionAttributeValues={':tandaId': tanda_id}
-                )
-                
-                for p in participantes_result.get('Items', []):
-                    if (p['participanteId'] != participante_id and 
-                        p['numeroAsignado'] == int(body['numeroAsignado'])):
-                        return response(400, {
-                            'success': False,
-                            'error': {
-                                'code': 'NUMERO_DUPLICADO',
-                                'message': f"El número {body['numeroAsignado']} ya está asignado"
-                            }
-                        })
-        
-        # 🆕 DETECTAR SI CAMBIÓ LA FECHA DE CUMPLEAÑOS EN TANDA CUMPLEAÑERA
-        fecha_cumpleaños_cambio = False
-        numero_nuevo_calculado = None
-        numero_anterior = participante_actual.get('numeroAsignado')
-        
-        if es_cumpleañera and 'fechaCumpleaños' in body:
-            fecha_actual = participante_actual.get('fechaCumpleaños')
-            fecha_nueva = body['fechaCumpleaños']
-            
-            if fecha_actual != fecha_nueva:
-                fecha_cumpleaños_cambio = True
-                
-                # 🆕 CALCULAR EL NUEVO NÚMERO BASADO EN LA FECHA DE CUMPLEAÑOS
-                
-                participantes_result = participantes_table.query(
-                        KeyConditionExpression='id = :tandaId',
-                        ExpressionAttributeValues={':tandaId': tanda_id}
-                    )
-                    
-                todos_participantes = participantes_result.get('Items', [])
-                    
-                # Crear lista temporal con la nueva fecha
-                participantes_temp = []
-                for p in todos_participantes:
-                    if p['participanteId'] == participante_id:
-                        # Usar la nueva fecha para este participante
-                        p_temp = p.copy()
-                        p_temp['fechaCumpleaños'] = fecha_nueva
-                        participantes_temp.append(p_temp)
-                    else:
-                        participantes_temp.append(p)
-                    
-                # Ordenar por fecha de cumpleaños
-                participantes_ordenados = sorted(
-                    participantes_temp,
-                    key=lambda x: datetime.strptime(x['fechaCumpleaños'], '%Y-%m-%d')
-                )
-                    
-                # Encontrar el nuevo número
-                for idx, p in enumerate(participantes_ordenados, 1):
-                    if p['participanteId'] == participante_id:
-                        numero_nuevo_calculado = idx
-                        break
-        
-        # 🆕 Construir expresión de actualización con ExpressionAttributeNames
-        update_expression = "SET updatedAt = :now"
-        expression_values = {':now': datetime.utcnow().isoformat()}
-        expression_names = {}  # Para atributos con caracteres especiales
-        
+            # BatchWriteItem no admite condiciones: para conservar la reserva
+            # de números se escriben participante + slot en transacciones
+            for inicio in range(0, len(nuevos), IMPORTAR_FILAS_POR_TRANSACCION):
+                lote = nuevos[inicio:inicio + IMPORTAR_FILAS_POR_TRANSACCION]
+                transaccion = []
+                for participante in lote:
+                    transaccion.append({'Put': {'TableName': participantes_table.name, 'Item': participante}})
+                    transaccion.append(reservar_slot_tx(tanda_id, participante['numeroAsignado'], participante['participanteId']))
+
+                try:
+                    ejecutar_transaccion(transaccion)
+                except ClientError as e:
+                    ocupados = slots_ocupados(e, transaccion)
+                    if not ocupados:
+                        raise
+                    importados = nuevos[:inicio]
+                    if importados:
+                        registrar_participantes_vista(tanda_id)
+                        publicar_snapshots_tanda(tanda_id)
+                    return response(409, {
+                        'success': False,
+                        'error': {
+                            'code': 'NUMERO_DUPLICADO',
+                            'message': f'El número {ocupados[0]} se asignó mientras se importaba; '
+                                       f'se registraron {len(importados)} de {len(nuevos)} participantes',
+                            'importados': [p['participanteId'] for p in importados]
+                        }
+                    })
+
+        registrar_participantes_vista(tanda_id)
+        publicar_snapshots_tanda(tanda_id)
+
+        print(f"📥 {len(nuevos)} participantes importados en tanda {tanda_id}")
+
+        return response(201, {
+            'success': True,
+            'data': {
+                'tandaId': tanda_id,
+                'participantes': nuevos,
+                'total': len(nuevos),
+                'participantesReordenados': reordenados
+            }
+        })
+
+    except Exception as e:
+        print(f"Error en importar participantes: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return response(500, {
+            'success': False,
+            'error': {'code': 'INTERNAL_SERVER_ERROR', 'message': 'Error al importar participantes'}
+        })
+
+
+# 🆕 ORDEN DE TANDA CUMPLEAÑERA
+# birthdayKey = MMDD#fechaRegistro: ordenar estas cadenas da el mismo orden que
+# (mes, día, fecha de registro), sin parsear fechas en cada cálculo. Se escribe
+# al crear/actualizar al participante y la indexa id-birthdayKey-index.
+BIRTHDAY_INDEX = 'id-birthdayKey-index'
+
+
+def clave_cumpleaños(fecha_cumpleaños, fecha_registro):
+    """
+    Args:
+        fecha_cumpleaños: String ISO (YYYY-MM-DD); el año no cuenta para el orden
+        fecha_registro: Timestamp ISO de registro (desempate)
+
+    Returns:
+        str: MMDD#fechaRegistro
+    """
+    fecha = datetime.fromisoformat(fecha_cumpleaños)
+    return f"{fecha.month:02d}{fecha.day:02d}#{fecha_registro or ''}"
+
+
+def clave_de(participante):
+    """birthdayKey del participante (la calcula para registros anteriores al índice)"""
+    if participante.get('birthdayKey'):
+        return participante['birthdayKey']
+    if not participante.get('fechaCumpleaños'):
+        return None
+    try:
+        return clave_cumpleaños(
+            participante['fechaCumpleaños'],
+            participante.get('fechaRegistro', participante.get('createdAt'))
+        )
+    except Exception as e:
+        print(f"Error procesando participante {participante.get('participanteId')}: {e}")
+        return None
+
+
+def calcular_numero_automatico_cumpleañera(nueva_clave, participantes_existentes):
+    """
+    Número del nuevo participante: posición de su birthdayKey en la lista
+    ordenada de claves existentes.
+
+    Args:
+        nueva_clave: birthdayKey del nuevo participante
+        participantes_existentes: Lista de participantes actuales
+
+    Returns:
+        int: Número asignado (1-N)
+    """
+    claves = sorted(c for c in map(clave_de, participantes_existentes) if c)
+    return bisect_left(claves, nueva_clave) + 1
+
+
+def posicion_cumpleaños(tanda_id, clave, clave_anterior=None):
+    """
+    Número que le toca a `clave` contando en id-birthdayKey-index cuántas
+    claves de la tanda son menores (Select=COUNT, sin traer participantes).
+
+    Args:
+        clave: birthdayKey a ubicar
+        clave_anterior: birthdayKey actual del mismo participante, que no
+            debe contarse
+    """
+    kwargs = {
+        'IndexName': BIRTHDAY_INDEX,
+        'KeyConditionExpression': Key('id').eq(tanda_id) & Key('birthdayKey').lt(clave),
+        'Select': 'COUNT'
+    }
+    menores = 0
+    while True:
+        resp = participantes_table.query(**kwargs)
+        menores += resp['Count']
+        if 'LastEvaluatedKey' not in resp:
+            break
+        kwargs['ExclusiveStartKey'] = resp['LastEvaluatedKey']
+
+    if clave_anterior and clave_anterior < clave:
+        menores -= 1
+
+    return menores + 1
+
+
+# 🆕 FUNCIÓN AUXILIAR: Recalcular números de todos los participantes en tanda cumpleañera
+# TransactWriteItems admite hasta 100 acciones por llamada
+REORDENAR_LOTE = 100
+REORDENAR_REINTENTOS = 3
+
+
+def ordenar_cumpleañera(todos_participantes):
+    """
+    Orden de turnos de una tanda cumpleañera: mes/día de cumpleaños y, en
+    caso de empate, fecha de registro (ver clave_de).
+
+    Returns:
+        dict: participanteId → número (1-N)
+    """
+    con_clave = [(clave_de(p), p['participanteId']) for p in todos_participantes]
+    con_clave = sorted((c, pid) for c, pid in con_clave if c)
+
+    return {pid: i + 1 for i, (_, pid) in enumerate(con_clave)}
+
+
+def escribir_numeros_cumpleañera(tanda_id, movidos, actuales):
+    """
+    Escribe los números que cambiaron en transacciones de REORDENAR_LOTE.
+    Cada fila se condiciona a seguir existiendo con el número que se leyó,
+    así una edición concurrente cancela la transacción en lugar de dejar
+    números duplicados.
+
+    Returns:
+        dict: participanteId → número de las filas ya escritas
+    """
+    timestamp = datetime.utcnow().isoformat()
+    escritos = {}
+
+    pendientes = list(movidos.items())
+    for i in range(0, len(pendientes), REORDENAR_LOTE):
+        lote = pendientes[i:i + REORDENAR_LOTE]
+        transaccion = []
+
+        for participante_id, numero in lote:
+            anterior = actuales.get(participante_id)
+            valores = {':num': numero, ':timestamp': timestamp}
+            if anterior is None:
+                condicion = 'attribute_exists(participanteId) AND attribute_not_exists(numeroAsignado)'
+            else:
+                condicion = 'attribute_exists(participanteId) AND numeroAsignado = :anterior'
+                valores[':anterior'] = anterior
+
+            transaccion.append({
+                'Update': {
+                    'TableName': participantes_table.name,
+                    'Key': {'id': tanda_id, 'participanteId': participante_id},
+                    'UpdateExpression': 'SET numeroAsignado = :num, updatedAt = :timestamp',
+                    'ConditionExpression': condicion,
+                    'ExpressionAttributeValues': valores
+                }
+            })
+
+        participantes_table.meta.client.transact_write_items(TransactItems=transaccion)
+        escritos.update(lote)
+
+    return escritos
+
+
+def recalcular_numeros_cumpleañera(tanda_id, todos_participantes):
+    """
+    Recalcula los números de una tanda cumpleañera y escribe sólo los que
+    cambiaron. Se ejecuta cada vez que se agrega, modifica o elimina un
+    participante.
+
+    Si otra petición cambió la tanda entre la lectura y la escritura, se
+    vuelve a leer la partición y se recalcula (hasta REORDENAR_REINTENTOS).
+
+    Args:
+        tanda_id: ID de la tanda
+        todos_participantes: Lista con TODOS los participantes (incluyendo el recién agregado)
+
+    Returns:
+        int: Participantes cuyo número cambió
+    """
+    if not todos_participantes:
+        return 0
+
+    escritos = {}
+
+    for intento in range(1, REORDENAR_REINTENTOS + 1):
+        actuales = {
+            p['participanteId']: int(p['numeroAsignado']) if p.get('numeroAsignado') is not None else None
+            for p in todos_participantes
+        }
+        nuevos = ordenar_cumpleañera(todos_participantes)
+        movidos = {pid: numero for pid, numero in nuevos.items() if actuales.get(pid) != numero}
+
+        if not movidos:
+            break
+
+        try:
+            escritos.update(escribir_numeros_cumpleañera(tanda_id, movidos, actuales))
+            print(f"✅ {len(movidos)} de {len(nuevos)} participantes cambiaron de número")
+            break
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'TransactionCanceledException':
+                print(f"❌ Error actualizando números de tanda {tanda_id}: {e}")
+                break
+            if intento == REORDENAR_REINTENTOS:
+                print(f"❌ No se pudieron reordenar los números de tanda {tanda_id} tras {intento} intentos")
+                break
+
+            print(f"⚠️ La tanda {tanda_id} cambió durante el reordenamiento, reintentando ({intento})...")
+            todos_participantes = query_all(
+                participantes_table,
+                KeyConditionExpression=Key('id').eq(tanda_id),
+                ConsistentRead=True
+            )
+
+    actualizar_numeros_vista(tanda_id, escritos)
+    return len(escritos)
+
+# ========================================
+# HANDLER: LISTAR PARTICIPANTES
+# ========================================
+def listar(event, context):
+    try:
+        tanda_id = event['pathParameters']['tandaId']
+        
+        # Obtener participantes
+        result = participantes_table.query(
+            KeyConditionExpression='id = :tandaId',
+            ExpressionAttributeValues={':tandaId': tanda_id}
+        )
+        
+        participantes = result.get('Items', [])
+        
+        # Ordenar por número asignado
+        participantes.sort(key=lambda x: x['numeroAsignado'])
+        
+        return response(200, {
+            'success': True,
+            'data': {
+                'participantes': participantes,
+                'total': len(participantes)
+            }
+        })
+        
+    except Exception as e:
+        print(f"Error en listar participantes: {str(e)}")
+        return response(500, {
+            'success': False,
+            'error': {'code': 'INTERNAL_SERVER_ERROR', 'message': 'Error al listar'}
+        })
+
+# ========================================
+# HANDLER: ACTUALIZAR PARTICIPANTE
+# ========================================
+def actualizar(event, context):
+    try:
+        user_id = extract_user_id(event)
+        if not user_id:
+            return response(401, {
+                'success': False,
+                'error': {'code': 'UNAUTHORIZED', 'message': 'Token inválido'}
+            })
+        
+        tanda_id = event['pathParameters']['tandaId']
+        participante_id = event['pathParameters']['participanteId']
+        body = json.loads(event['body'])
+        
+        # Verificar permisos
+        tiene_permisos, _ = verificar_permisos_tanda(tanda_id, user_id)
+        if not tiene_permisos:
+            return response(403, {
+                'success': False,
+                'error': {'code': 'FORBIDDEN', 'message': 'Sin permisos'}
+            })
+        
+        # 🆕 OBTENER INFORMACIÓN DE LA TANDA
+        tanda = tandas_table.get_item(Key={'id': tanda_id}).get('Item')
+        if not tanda:
+            return response(404, {
+                'success': False,
+                'error': {'code': 'NOT_FOUND', 'message': 'Tanda no encontrada'}
+            })
+        
+        es_cumpleañera = tanda.get('frecuencia') == 'cumpleaños'
+        
+        # Verificar que el participante existe
+        participante_result = participantes_table.get_item(
+            Key={'id': tanda_id, 'participanteId': participante_id}
+        )
+        
+        if not participante_result.get('Item'):
+            return response(404, {
+                'success': False,
+                'error': {'code': 'NOT_FOUND', 'message': 'Participante no encontrado'}
+            })
+        
+        participante_actual = participante_result['Item']
+        
+        # 🆕 VALIDACIÓN PARA TANDAS CUMPLEAÑERAS
+        if es_cumpleañera:
+            # En tandas cumpleañeras NO se puede cambiar manualmente el número
+            # EXCEPTO si viene del recálculo automático por cambio de fecha
+            if 'numeroAsignado' in body and 'fechaCumpleaños' not in body:
+                return response(400, {
+                    'success': False,
+                    'error': {
+                        'code': 'NUMERO_NO_EDITABLE',
+                        'message': 'En tandas cumpleañeras el número se asigna automáticamente por fecha de cumpleaños'
+                    }
+                })
+        
+        # 🆕 DETECTAR SI CAMBIÓ LA FECHA DE CUMPLEAÑOS EN TANDA CUMPLEAÑERA
+        fecha_cumpleaños_cambio = False
+        numero_nuevo_calculado = None
+        numero_anterior = participante_actual.get('numeroAsignado')
+        
+        if es_cumpleañera and 'fechaCumpleaños' in body:
+            fecha_actual = participante_actual.get('fechaCumpleaños')
+            fecha_nueva = body['fechaCumpleaños']
+            
+            if fecha_actual != fecha_nueva:
+                fecha_cumpleaños_cambio = True
+                
+                # 🆕 CALCULAR EL NUEVO NÚMERO BASADO EN LA FECHA DE CUMPLEAÑOS
+                # (mes/día + fecha de registro, igual que el recálculo)
+                numero_nuevo_calculado = posicion_cumpleaños(
+                    tanda_id,
+                    clave_cumpleaños(
+                        fecha_nueva,
+                        participante_actual.get('fechaRegistro', participante_actual.get('createdAt'))
+                    ),
+                    clave_anterior=clave_de(participante_actual)
+                )
+        
+        # 🆕 Construir expresión de actualización con ExpressionAttributeNames
+        update_expression = "SET updatedAt = :now"
+        expression_values = {':now': datetime.utcnow().isoformat()}
+        expression_names = {}  # Para atributos con caracteres especiales
+        
         if 'nombre' in body:
             update_expression += ", nombre = :nombre"
             expression_values[':nombre'] = body['nombre']
@@ -529,36 +906,92 @@ def actualizar(event, context):
             update_expression += ", #fechaCumple = :fechaCumple"
             expression_names['#fechaCumple'] = 'fechaCumpleaños'
             expression_values[':fechaCumple'] = body['fechaCumpleaños']
+            
+            if body['fechaCumpleaños']:
+                update_expression += ", birthdayKey = :birthdayKey"
+                expression_values[':birthdayKey'] = clave_cumpleaños(
+                    body['fechaCumpleaños'],
+                    participante_actual.get('fechaRegistro', participante_actual.get('createdAt'))
+                )
+            else:
+                update_expression += " REMOVE birthdayKey"
         
         # 🆕 Actualizar participante con ExpressionAttributeNames si es necesario
         update_params = {
             'Key': {'id': tanda_id, 'participanteId': participante_id},
             'UpdateExpression': update_expression,
-            'ExpressionAttributeValues': expression_values
+            'ExpressionAttributeValues': expression_values,
+            'ReturnValues': 'ALL_NEW'
         }
         
         # Solo agregar ExpressionAttributeNames si hay atributos con caracteres especiales
         if expression_names:
             update_params['ExpressionAttributeNames'] = expression_names
         
-        participantes_table.update_item(**update_params)
+        # Tanda normal con cambio de número: el slot se mueve en la misma
+        # transacción que la actualización del participante
+        numero_manual = int(body['numeroAsignado']) if not es_cumpleañera and 'numeroAsignado' in body else None
+        
+        if numero_manual is not None and numero_manual != numero_anterior:
+            transaccion = [
+                {
+                    'Update': {
+                        'TableName': participantes_table.name,
+                        'Key': update_params['Key'],
+                        'UpdateExpression': update_expression,
+                        'ConditionExpression': 'attribute_exists(participanteId)',
+                        'ExpressionAttributeValues': expression_values,
+                        **({'ExpressionAttributeNames': expression_names} if expression_names else {})
+                    }
+                },
+                reservar_slot_tx(tanda_id, numero_manual, participante_id)
+            ]
+            if numero_anterior is not None:
+                transaccion.append(liberar_slot_tx(tanda_id, numero_anterior, participante_id))
+            
+            try:
+                ejecutar_transaccion(transaccion)
+            except ClientError as e:
+                if slots_ocupados(e, transaccion):
+                    return response(400, {
+                        'success': False,
+                        'error': {
+                            'code': 'NUMERO_DUPLICADO',
+                            'message': f"El número {numero_manual} ya está asignado"
+                        }
+                    })
+                raise
+            
+            # TransactWriteItems no devuelve el item actualizado
+            actualizado = {'Attributes': participantes_table.get_item(
+                Key=update_params['Key'],
+                ConsistentRead=True
+            )['Item']}
+        else:
+            actualizado = participantes_table.update_item(**update_params)
+        registrar_participante_vista(tanda_id, actualizado['Attributes'])
         
-        # 🆕 SI CAMBIÓ EL NÚMERO, RECALCULAR TODOS LOS NÚMEROS DE LOS DEMÁS PARTICIPANTES
+        # 🆕 SI CAMBIÓ LA FECHA, RECALCULAR LOS NÚMEROS DE TODOS LOS PARTICIPANTES
+        # Aunque el número calculado sea el mismo: posicion_cumpleaños lee un
+        # GSI (eventualmente consistente) y puede no ver escrituras recientes;
+        # el recálculo parte de la tabla base con lectura consistente.
         numeros_recalculados = False
-        if fecha_cumpleaños_cambio and numero_nuevo_calculado != numero_anterior:
-            print(f"📅 Número cambió de {numero_anterior} a {numero_nuevo_calculado}, recalculando todos los números...")
+        reordenados = 0
+        if fecha_cumpleaños_cambio:
+            print(f"📅 Fecha de cumpleaños cambió (número {numero_anterior} → {numero_nuevo_calculado}), recalculando todos los números...")
             numeros_recalculados = True
             
             # Obtener todos los participantes actualizados (incluye el que acabamos de actualizar)
-            participantes_result = participantes_table.query(
-                KeyConditionExpression='id = :tandaId',
-                ExpressionAttributeValues={':tandaId': tanda_id}
+            todos_participantes = query_all(
+                participantes_table,
+                KeyConditionExpression=Key('id').eq(tanda_id),
+                ConsistentRead=True
             )
-            
-            todos_participantes = participantes_result.get('Items', [])
-            recalcular_numeros_cumpleañera(tanda_id, todos_participantes)
-        elif fecha_cumpleaños_cambio and numero_nuevo_calculado == numero_anterior:
-            print(f"📅 Fecha de cumpleaños cambió pero el número se mantiene en {numero_anterior}")
+            numero_nuevo_calculado = ordenar_cumpleañera(todos_participantes).get(participante_id, numero_nuevo_calculado)
+            reordenados = recalcular_numeros_cumpleañera(tanda_id, todos_participantes)
+        
+        # Regenerar páginas públicas de registro de la tanda
+        publicar_snapshots_tanda(tanda_id)
         
         return response(200, {
             'success': True,
@@ -567,7 +1000,8 @@ def actualizar(event, context):
                 'updatedAt': expression_values[':now'],
                 'numeroAnterior': numero_anterior,
                 'numeroNuevo': numero_nuevo_calculado if fecha_cumpleaños_cambio else numero_anterior,
-                'numerosRecalculados': numeros_recalculados
+                'numerosRecalculados': numeros_recalculados,
+                'participantesReordenados': reordenados
             }
         })
         
@@ -624,39 +1058,74 @@ def eliminar(event, context):
                 'error': {'code': 'NOT_FOUND', 'message': 'Participante no encontrado'}
             })
         
-        # 🆕 ELIMINAR TODOS LOS PAGOS ASOCIADOS AL PARTICIPANTE
-        pagos_eliminados = eliminar_pagos_participante(tanda_id, participante_id)
-        print(f"🗑️ Eliminados {pagos_eliminados} pagos del participante {participante_id}")
+        numero_asignado = participante_result['Item'].get('numeroAsignado')
         
-        # Eliminar participante
-        participantes_table.delete_item(
-            Key={'id': tanda_id, 'participanteId': participante_id}
-        )
+        # 🆕 ELIMINAR PAGOS, NOTIFICACIONES Y EVENTOS DE SCORE DEL PARTICIPANTE
+        conteos, errores = eliminar_dependencias_participante(tanda_id, participante_id)
+        if errores:
+            # El participante se conserva para poder reintentar sin dejar huérfanos
+            return response(500, {
+                'success': False,
+                'error': {
+                    'code': 'INTERNAL_SERVER_ERROR',
+                    'message': 'No se pudieron eliminar todos los datos del participante'
+                },
+                'data': {
+                    'participanteId': participante_id,
+                    'eliminados': conteos,
+                    'errores': errores
+                }
+            })
+        
+        # Eliminar participante (y liberar su número en tandas normales)
+        if es_cumpleañera or numero_asignado is None:
+            participantes_table.delete_item(
+                Key={'id': tanda_id, 'participanteId': participante_id}
+            )
+        else:
+            ejecutar_transaccion([
+                {
+                    'Delete': {
+                        'TableName': participantes_table.name,
+                        'Key': {'id': tanda_id, 'participanteId': participante_id}
+                    }
+                },
+                liberar_slot_tx(tanda_id, numero_asignado, participante_id)
+            ])
+        eliminar_participante_vista(tanda_id, participante_id)
+        if conteos.get('pagos'):
+            recalcular_agregados(tanda_id)
         print(f"✅ Participante {participante_id} eliminado")
         
         # 🆕 SI ES TANDA CUMPLEAÑERA, RECALCULAR NÚMEROS DE LOS RESTANTES
+        reordenados = 0
         if es_cumpleañera:
             print(f"📅 Tanda cumpleañera detectada, recalculando números...")
             
             # Obtener participantes restantes
-            participantes_result = participantes_table.query(
-                KeyConditionExpression='id = :tandaId',
-                ExpressionAttributeValues={':tandaId': tanda_id}
+            participantes_restantes = query_all(
+                participantes_table,
+                KeyConditionExpression=Key('id').eq(tanda_id),
+                ConsistentRead=True
             )
             
-            participantes_restantes = participantes_result.get('Items', [])
-            
             if participantes_restantes:
-                recalcular_numeros_cumpleañera(tanda_id, participantes_restantes)
+                reordenados = recalcular_numeros_cumpleañera(tanda_id, participantes_restantes)
                 print(f"✅ Números recalculados para {len(participantes_restantes)} participantes restantes")
         
+        # Regenerar páginas públicas de registro de la tanda
+        publicar_snapshots_tanda(tanda_id)
+        
         return response(200, {
             'success': True,
             'data': {
                 'message': 'Participante eliminado exitosamente',
                 'participanteId': participante_id,
-                'pagosEliminados': pagos_eliminados,
-                'numerosRecalculados': es_cumpleañera  # 🆕 Indica si se recalcularon números
+                'pagosEliminados': conteos['pagos'],
+                'notificacionesEliminadas': conteos['notificaciones'],
+                'eventosScoreEliminados': conteos['eventosScore'],
+                'numerosRecalculados': es_cumpleañera,  # 🆕 Indica si se recalcularon números
+                'participantesReordenados': reordenados
             }
         })
         
@@ -670,60 +1139,255 @@ def eliminar(event, context):
         })
 
 
-# 🆕 FUNCIÓN AUXILIAR: Eliminar todos los pagos de un participante
+# ========================================
+# LIMPIEZA DE LOS DATOS DE UN PARTICIPANTE
+# Cada eliminador toca sólo las filas del participante: llave (o prefijo de
+# llave) y proyección de llaves vía delete_by_query, borrado en lotes.
+# ========================================
 def eliminar_pagos_participante(tanda_id, participante_id):
-    """
-    Elimina todos los pagos asociados a un participante.
-    Los pagos tienen pagoId con formato: <participanteId>_<num_pago>
-    
-    Args:
-        tanda_id: ID de la tanda
-        participante_id: ID del participante
-    
+    """pagoId = <participanteId>_<ronda>: sólo el rango con ese prefijo"""
+    return delete_by_query(
+        pagos_table,
+        ['id', 'pagoId'],
+        KeyConditionExpression=Key('id').eq(tanda_id) & Key('pagoId').begins_with(f"{participante_id}_")
+    )
+
+
+def eliminar_notificaciones_participante(tanda_id, participante_id):
+    """notificaciones sólo tiene llave `id` (tanda): se filtra por participante"""
+    return delete_by_query(
+        notificaciones_table,
+        ['id'],
+        KeyConditionExpression=Key('id').eq(tanda_id),
+        FilterExpression=Attr('participanteId').eq(participante_id)
+    )
+
+
+def eliminar_eventos_score_participante(tanda_id, participante_id):
+    """Los eventos de score de un participante usan actorId = participanteId"""
+    return delete_by_query(
+        score_events_table,
+        ['actorId', 'eventId'],
+        KeyConditionExpression=Key('actorId').eq(participante_id),
+        FilterExpression=Attr('tandaId').eq(tanda_id)
+    )
+
+
+ELIMINADORES_PARTICIPANTE = {
+    'pagos': eliminar_pagos_participante,
+    'notificaciones': eliminar_notificaciones_participante,
+    'eventosScore': eliminar_eventos_score_participante,
+}
+
+
+def eliminar_dependencias_participante(tanda_id, participante_id):
+    """
     Returns:
-        int: Cantidad de pagos eliminados
+        tuple: (conteos por tabla, errores por tabla)
     """
-    try:
-        # Consultar todos los pagos de la tanda
-        pagos_result = pagos_table.query(
-            KeyConditionExpression='id = :tandaId',
-            ExpressionAttributeValues={':tandaId': tanda_id}
+    conteos = {}
+    errores = {}
+    for nombre, eliminador in ELIMINADORES_PARTICIPANTE.items():
+        try:
+            conteos[nombre] = eliminador(tanda_id, participante_id)
+            print(f"  🗑️ {conteos[nombre]} {nombre} del participante {participante_id}")
+        except Exception as e:
+            print(f"  ❌ Error eliminando {nombre} del participante {participante_id}: {e}")
+            errores[nombre] = str(e)
+    return conteos, errores
+
+
+# =======================================
+# Registro de participante publico
+# =======================================
+def respuesta_publica(status_code, body):
+    """Respuesta de las rutas públicas de registro (sin Authorization en CORS)"""
+    return {
+        'statusCode': status_code,
+        'headers': {
+            'Access-Control-Allow-Origin': '*',
+            'Content-Type': 'application/json'
+        },
+        'body': json.dumps(body, default=decimal_default)
+    }
+
+
+def leer_datos_registro(body):
+    """Campos del body de POST /registro/{token}; nombre y teléfono son obligatorios"""
+    datos = {
+        'nombre': body.get('nombre', '').strip(),
+        'telefono': body.get('telefono', '').strip(),
+        'email': body.get('email', '').strip(),
+        'numeros': body.get('numeros', []),
+        'fechaCumpleaños': body.get('fechaCumpleaños', '').strip()  # 🆕
+    }
+    if not datos['nombre'] or not datos['telefono']:
+        raise CustomError('Nombre y teléfono son obligatorios', 'MISSING_FIELDS', 400)
+    return datos
+
+
+def validar_link_registro(link):
+    if not link:
+        raise CustomError('Link de registro no encontrado', 'NOT_FOUND', 404)
+    if not link.get('activo', True):
+        raise CustomError('Link de registro desactivado', 'LINK_INACTIVO', 403)
+    if datetime.utcnow().timestamp() > link.get('expiracion', 0):
+        raise CustomError('Link de registro expirado', 'LINK_EXPIRADO', 403)
+
+
+def aplicar_registro(link, tanda, datos, participantes_existentes=None):
+    """
+    Valida y escribe un registro público (uno o varios números).
+
+    Args:
+        link: Item de links_registro ya validado
+        tanda: Item de la tanda
+        datos: Salida de leer_datos_registro
+        participantes_existentes: Participantes de la tanda ya leídos
+            (cumpleañeras). Si se pasa, se usa en lugar de consultar la
+            partición y se le agregan los nuevos; si es None se consulta.
+
+    Returns:
+        list: Items de participantes escritos
+
+    Raises:
+        CustomError: Registro inválido o número ocupado
+    """
+    tanda_id = link['tandaId']
+    total_rondas = int(tanda.get('totalRondas', 0))
+    numeros = datos['numeros']
+    fecha_cumpleaños = datos['fechaCumpleaños']
+    
+    # 🆕 DETECTAR SI ES TANDA CUMPLEAÑERA
+    es_cumpleañera = tanda.get('frecuencia') == 'cumpleaños'
+    
+    # 🆕 VALIDACIONES SEGÚN TIPO DE TANDA
+    if es_cumpleañera:
+        # Para tanda cumpleañera: fecha de cumpleaños es obligatoria
+        if not fecha_cumpleaños:
+            raise CustomError('La fecha de cumpleaños es obligatoria para tandas cumpleañeras', 'MISSING_BIRTHDAY', 400)
+        
+        # Validar formato de fecha
+        try:
+            datetime.fromisoformat(fecha_cumpleaños)
+        except ValueError:
+            raise CustomError('Formato de fecha inválido. Use YYYY-MM-DD', 'INVALID_BIRTHDAY', 400)
+    else:
+        # Para tanda normal: números son obligatorios
+        if not numeros or not isinstance(numeros, list):
+            raise CustomError('Debe seleccionar al menos un número', 'MISSING_FIELDS', 400)
+        
+        # Validar cantidad de números (50% máximo)
+        max_numeros = total_rondas // 2
+        if len(numeros) > max_numeros:
+            raise CustomError(f'Solo puedes seleccionar hasta {max_numeros} números (50% del total)', 'DEMASIADOS_NUMEROS', 400)
+    
+    timestamp = datetime.utcnow().isoformat()
+    
+    # 🆕 CALCULAR NÚMERO ASIGNADO PARA TANDA CUMPLEAÑERA
+    if es_cumpleañera:
+        if participantes_existentes is None:
+            # Obtener participantes existentes
+            participantes_existentes = query_all(
+                participantes_table,
+                KeyConditionExpression=Key('id').eq(tanda_id),
+                ConsistentRead=True
+            )
+        
+        numero_asignado = calcular_numero_automatico_cumpleañera(
+            clave_cumpleaños(fecha_cumpleaños, timestamp),
+            participantes_existentes
         )
+        numeros = [numero_asignado]  # Solo un número para cumpleañeras
+    else:
+        # Para tanda normal: validar rango; la disponibilidad la decide
+        # la reserva de slots al escribir
+        for numero in numeros:
+            if numero < 1 or numero > total_rondas:
+                raise CustomError(f'Número {numero} fuera de rango (1-{total_rondas})', 'NUMERO_FUERA_DE_RANGO', 400)
+
+        if len(set(numeros)) != len(numeros):
+            raise CustomError('No puedes seleccionar el mismo número más de una vez', 'NUMERO_REPETIDO', 400)
+
+    # Crear participantes en tabla participantes (uno por cada número)
+    por_registrar = []
+    
+    for numero in numeros:
+        participante = {
+            'participanteId': f'part_{uuid.uuid4().hex[:12]}',
+            'id': tanda_id,
+            'tandaId': tanda_id,
+            'userId': link['userId'],
+            'nombre': datos['nombre'],
+            'telefono': datos['telefono'],
+            'numeroAsignado': Decimal(str(numero)),
+            'createdAt': timestamp,
+            'updatedAt': timestamp,
+            'fechaRegistro': timestamp,  # 🆕 Para desempate en cumpleañeras
+            'registradoPorLink': True
+        }
         
-        pagos = pagos_result.get('Items', [])
-        pagos_eliminados = 0
+        if datos['email']:
+            participante['email'] = datos['email']
         
-        # Filtrar y eliminar pagos que pertenecen al participante
-        for pago in pagos:
-            pago_id = pago.get('pagoId', '')
-            
-            # Verificar si el pagoId comienza con el participanteId
-            # Formato esperado: <participanteId>_<num_pago>
-            if pago_id.startswith(f"{participante_id}_"):
-                try:
-                    pagos_table.delete_item(
-                        Key={
-                            'id': tanda_id,
-                            'pagoId': pago_id
-                        }
-                    )
-                    pagos_eliminados += 1
-                    print(f"  🗑️ Pago eliminado: {pago_id}")
-                except Exception as e:
-                    print(f"  ❌ Error eliminando pago {pago_id}: {e}")
+        # 🆕 Agregar fecha de cumpleaños si existe
+        if fecha_cumpleaños:
+            participante['fechaCumpleaños'] = fecha_cumpleaños
+            participante['birthdayKey'] = clave_cumpleaños(fecha_cumpleaños, timestamp)
         
-        return pagos_eliminados
+        por_registrar.append(participante)
+    
+    # Insertar participantes. En tandas normales, todos los números en
+    # una sola transacción con su slot: o se registran todos o ninguno
+    if es_cumpleañera:
+        for participante in por_registrar:
+            participantes_table.put_item(Item=participante)
+    else:
+        transaccion = []
+        for participante in por_registrar:
+            transaccion.append({'Put': {'TableName': participantes_table.name, 'Item': participante}})
+            transaccion.append(reservar_slot_tx(tanda_id, participante['numeroAsignado'], participante['participanteId']))
         
-    except Exception as e:
-        print(f"❌ Error en eliminar_pagos_participante: {e}")
-        import traceback
-        traceback.print_exc()
-        return 0
+        try:
+            ejecutar_transaccion(transaccion)
+        except ClientError as e:
+            ocupados = slots_ocupados(e, transaccion)
+            if ocupados:
+                raise CustomError(f'El número {ocupados[0]} ya está ocupado', 'NUMERO_DUPLICADO', 400)
+            raise
+    
+    for participante in por_registrar:
+        registrar_participante_vista(tanda_id, participante, nuevo=True)
+    
+    if participantes_existentes is not None:
+        participantes_existentes.extend(por_registrar)
+    
+    return por_registrar
+
+
+def resumen_registro(tanda, por_registrar, reordenados):
+    """Payload `data` de un registro público exitoso"""
+    es_cumpleañera = tanda.get('frecuencia') == 'cumpleaños'
+    nuevos_participantes = [
+        {
+            'participanteId': p['participanteId'],
+            'nombre': p['nombre'],
+            'telefono': p['telefono'],
+            'numeroAsignado': int(p['numeroAsignado']),
+            'fechaCumpleaños': p.get('fechaCumpleaños')
+        }
+        for p in por_registrar
+    ]
+    return {
+        'participantes': nuevos_participantes,
+        'tandaId': tanda['id'],
+        'mensaje': f'{len(nuevos_participantes)} participante(s) registrado(s) exitosamente',
+        'esCumpleañera': es_cumpleañera,  # 🆕 Info útil para el frontend
+        'numeroAsignado': nuevos_participantes[0]['numeroAsignado'] if es_cumpleañera else None,
+        'participantesReordenados': reordenados
+    }
 
 
-# =======================================
-# Registro de participante publico
-# =======================================
 def registro_publico_participante(event, context):
     """
     Registra participante(s) en la tanda
@@ -743,6 +1407,9 @@ def registro_publico_participante(event, context):
         "email": "juan@example.com",  # opcional
         "fechaCumpleaños": "1990-03-15"  # REQUERIDO para cumpleañeras
     }
+    
+    Con REGISTRO_SURGE_ENABLED el registro se encola (ver encolar_registro)
+    y se responde 202 con el solicitudId para consultar el resultado.
     """
 
     try:
@@ -751,335 +1418,321 @@ def registro_publico_participante(event, context):
         
         # Parse body
         body = json.loads(event['body'])
-        nombre = body.get('nombre', '').strip()
-        telefono = body.get('telefono', '').strip()
-        email = body.get('email', '').strip()
-        numeros = body.get('numeros', [])
-        fecha_cumpleaños = body.get('fechaCumpleaños', '').strip()  # 🆕
-        
-        # Validaciones básicas
-        if not nombre or not telefono:
-            return {
-                'statusCode': 400,
-                'headers': {
-                    'Access-Control-Allow-Origin': '*',
-                    'Content-Type': 'application/json'
-                },
-                'body': json.dumps({
-                    'success': False,
-                    'error': {
-                        'message': 'Nombre y teléfono son obligatorios'
-                    }
-                })
-            }
+        datos = leer_datos_registro(body)
         
         # Buscar el link en la tabla
         links_table = dynamodb.Table(LINKS_TABLE)
-        response = links_table.get_item(
-            Key={'token': token}
-        )
-        
-        if 'Item' not in response:
-            return {
-                'statusCode': 404,
-                'headers': {
-                    'Access-Control-Allow-Origin': '*',
-                    'Content-Type': 'application/json'
-                },
-                'body': json.dumps({
-                    'success': False,
-                    'error': {
-                        'message': 'Link de registro no encontrado'
-                    }
-                })
-            }
+        link = links_table.get_item(Key={'token': token}).get('Item')
+        validar_link_registro(link)
         
-        link = response['Item']
-        
-        # Verificar si está activo
-        if not link.get('activo', True):
-            return {
-                'statusCode': 403,
-                'headers': {
-                    'Access-Control-Allow-Origin': '*',
-                    'Content-Type': 'application/json'
-                },
-                'body': json.dumps({
-                    'success': False,
-                    'error': {
-                        'message': 'Link de registro desactivado'
-                    }
-                })
-            }
-        
-        # Verificar si expiró
-        expiracion = link.get('expiracion', 0)
-        if datetime.utcnow().timestamp() > expiracion:
-            return {
-                'statusCode': 403,
-                'headers': {
-                    'Access-Control-Allow-Origin': '*',
-                    'Content-Type': 'application/json'
-                },
-                'body': json.dumps({
-                    'success': False,
-                    'error': {
-                        'message': 'Link de registro expirado'
-                    }
-                })
-            }
+        if REGISTRO_SURGE_ENABLED:
+            return encolar_registro(token, link, body)
         
         # Obtener datos de la tanda        
-        response = tandas_table.get_item(
-            Key={
-                'id': link['tandaId']
-            }
-        )
-        
-        if 'Item' not in response:
-            return {
-                'statusCode': 404,
-                'headers': {
-                    'Access-Control-Allow-Origin': '*',
-                    'Content-Type': 'application/json'
-                },
-                'body': json.dumps({
-                    'success': False,
-                    'error': {
-                        'message': 'Tanda no encontrada'
-                    }
-                })
-            }
-        
-        tanda = response['Item']
-        total_rondas = int(tanda.get('totalRondas', 0))
+        tanda = tandas_table.get_item(Key={'id': link['tandaId']}).get('Item')
+        if not tanda:
+            raise CustomError('Tanda no encontrada', 'NOT_FOUND', 404)
         
-        # 🆕 DETECTAR SI ES TANDA CUMPLEAÑERA
         es_cumpleañera = tanda.get('frecuencia') == 'cumpleaños'
+        por_registrar = aplicar_registro(link, tanda, datos)
         
-        # 🆕 VALIDACIONES SEGÚN TIPO DE TANDA
+        # 🆕 SI ES TANDA CUMPLEAÑERA, RECALCULAR NÚMEROS DE TODOS
+        reordenados = 0
         if es_cumpleañera:
-            # Para tanda cumpleañera: fecha de cumpleaños es obligatoria
-            if not fecha_cumpleaños:
-                return {
-                    'statusCode': 400,
-                    'headers': {
-                        'Access-Control-Allow-Origin': '*',
-                        'Content-Type': 'application/json'
-                    },
-                    'body': json.dumps({
-                        'success': False,
-                        'error': {
-                            'message': 'La fecha de cumpleaños es obligatoria para tandas cumpleañeras'
-                        }
-                    })
-                }
+            # Obtener todos los participantes actualizados (incluyendo los
+            # nuevos): una lectura eventual puede no ver el recién escrito
+            todos_participantes = query_all(
+                participantes_table,
+                KeyConditionExpression=Key('id').eq(link['tandaId']),
+                ConsistentRead=True
+            )
+            reordenados = recalcular_numeros_cumpleañera(link['tandaId'], todos_participantes)
             
-            # Validar formato de fecha
-            try:
-                datetime.fromisoformat(fecha_cumpleaños)
-            except ValueError:
-                return {
-                    'statusCode': 400,
-                    'headers': {
-                        'Access-Control-Allow-Origin': '*',
-                        'Content-Type': 'application/json'
-                    },
-                    'body': json.dumps({
-                        'success': False,
-                        'error': {
-                            'message': 'Formato de fecha inválido. Use YYYY-MM-DD'
-                        }
-                    })
-                }
-        else:
-            # Para tanda normal: números son obligatorios
-            if not numeros or not isinstance(numeros, list):
-                return {
-                    'statusCode': 400,
-                    'headers': {
-                        'Access-Control-Allow-Origin': '*',
-                        'Content-Type': 'application/json'
-                    },
-                    'body': json.dumps({
-                        'success': False,
-                        'error': {
-                            'message': 'Debe seleccionar al menos un número'
-                        }
-                    })
-                }
+            # Obtener el número actualizado del participante recién creado
+            # (puede haber cambiado después del recálculo)
+            participante_actualizado = participantes_table.get_item(
+                Key={
+                    'id': link['tandaId'],
+                    'participanteId': por_registrar[0]['participanteId']
+                },
+                ConsistentRead=True
+            ).get('Item')
             
-            # Validar cantidad de números (50% máximo)
-            max_numeros = total_rondas // 2
-            if len(numeros) > max_numeros:
-                return {
-                    'statusCode': 400,
-                    'headers': {
-                        'Access-Control-Allow-Origin': '*',
-                        'Content-Type': 'application/json'
-                    },
-                    'body': json.dumps({
-                        'success': False,
-                        'error': {
-                            'message': f'Solo puedes seleccionar hasta {max_numeros} números (50% del total)'
-                        }
-                    })
-                }
-        
-        # Obtener participantes existentes
-        response = participantes_table.query(            
-            KeyConditionExpression='id = :tandaId',
-            ExpressionAttributeValues={
-                ':tandaId': link['tandaId']
-            }
-        )
-        
-        participantes_existentes = response.get('Items', [])
+            if participante_actualizado:
+                por_registrar[0]['numeroAsignado'] = participante_actualizado.get('numeroAsignado', por_registrar[0]['numeroAsignado'])
         
-        # 🆕 CALCULAR NÚMERO ASIGNADO PARA TANDA CUMPLEAÑERA
-        if es_cumpleañera:
-            numero_asignado = calcular_numero_automatico_cumpleañera(
-                fecha_cumpleaños,
-                participantes_existentes
-            )
-            numeros = [numero_asignado]  # Solo un número para cumpleañeras
-        else:
-            # Para tanda normal: validar que los números estén disponibles
-            numeros_ocupados = [p.get('numeroAsignado') for p in participantes_existentes]
-            
-            for numero in numeros:
-                if numero in numeros_ocupados:
-                    return {
-                        'statusCode': 400,
-                        'headers': {
-                            'Access-Control-Allow-Origin': '*',
-                            'Content-Type': 'application/json'
-                        },
-                        'body': json.dumps({
-                            'success': False,
-                            'error': {
-                                'message': f'El número {numero} ya está ocupado'
-                            }
-                        })
-                    }
-                
-                if numero < 1 or numero > total_rondas:
-                    return {
-                        'statusCode': 400,
-                        'headers': {
-                            'Access-Control-Allow-Origin': '*',
-                            'Content-Type': 'application/json'
-                        },
-                        'body': json.dumps({
-                            'success': False,
-                            'error': {
-                                'message': f'Número {numero} fuera de rango (1-{total_rondas})'
-                            }
-                        })
-                    }
+        # Regenerar páginas públicas de registro (incluye la de este link)
+        publicar_snapshots_tanda(link['tandaId'])
         
-        # Crear participantes en tabla participantes (uno por cada número)
-        nuevos_participantes = []
-        timestamp = datetime.utcnow().isoformat()
+        return respuesta_publica(200, {
+            'success': True,
+            'data': resumen_registro(tanda, por_registrar, reordenados)
+        })
         
-        for numero in numeros:
-            participante_id = f'part_{uuid.uuid4().hex[:12]}'
-            
-            participante = {
-                'participanteId': participante_id,
-                'id': link['tandaId'],
-                'tandaId': link['tandaId'],
-                'userId': link['userId'],
-                'nombre': nombre,
-                'telefono': telefono,
-                'numeroAsignado': Decimal(str(numero)),
-                'createdAt': timestamp,
-                'updatedAt': timestamp,
-                'fechaRegistro': timestamp,  # 🆕 Para desempate en cumpleañeras
-                'registradoPorLink': True
+    except CustomError as e:
+        return respuesta_publica(e.status_code, {
+            'success': False,
+            'error': {
+                'message': e.message
             }
+        })
+    except Exception as e:
+        print(f"Error registrando participante: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return respuesta_publica(500, {
+            'success': False,
+            'error': {
+                'message': 'Error interno del servidor',
+                'details': str(e)
+            }
+        })
+
+
+# ========================================
+# REGISTRO PÚBLICO EN MODO SURGE
+# Cuando un link se comparte en un grupo grande llegan decenas de registros
+# al mismo tiempo. Con REGISTRO_SURGE_ENABLED el POST sólo valida el link,
+# guarda la solicitud y la encola en una cola FIFO con
+# MessageGroupId = tandaId. Esta misma Lambda consume la cola: por tanda lee
+# la tanda y sus participantes una vez, aplica los registros en orden
+# contra esa lista en memoria (mismas reglas que el registro directo) y
+# recalcula/publica una sola vez por lote. El cliente consulta el resultado
+# en GET /registro/{token}/solicitudes/{solicitudId}.
+# ========================================
+REGISTRO_SURGE_ENABLED = os.environ.get('REGISTRO_SURGE_ENABLED', 'false').lower() == 'true'
+REGISTRO_SURGE_QUEUE_URL = os.environ.get('REGISTRO_SURGE_QUEUE_URL', '')
+SOLICITUDES_TABLE = os.environ.get('SOLICITUDES_TABLE', 'registro_solicitudes')
+
+# Las solicitudes se borran solas (TTL) un día después
+SOLICITUD_TTL_SEGUNDOS = 24 * 3600
+
+sqs = boto3.client('sqs')
+solicitudes_table = dynamodb.Table(SOLICITUDES_TABLE)
+
+
+def encolar_registro(token, link, body):
+    """Guarda la solicitud como pendiente y la encola; responde 202"""
+    solicitud_id = uuid.uuid4().hex
+    ahora = datetime.utcnow()
+    
+    solicitudes_table.put_item(Item={
+        'solicitudId': solicitud_id,
+        'token': token,
+        'tandaId': link['tandaId'],
+        'estado': 'pendiente',
+        'createdAt': ahora.isoformat(),
+        'ttl': int(ahora.timestamp()) + SOLICITUD_TTL_SEGUNDOS
+    })
+    
+    sqs.send_message(
+        QueueUrl=REGISTRO_SURGE_QUEUE_URL,
+        MessageBody=json.dumps({'solicitudId': solicitud_id, 'token': token, 'body': body}),
+        MessageGroupId=link['tandaId'],
+        MessageDeduplicationId=solicitud_id
+    )
+    print(f"📨 Registro encolado {solicitud_id} para tanda {link['tandaId']}")
+    
+    return respuesta_publica(202, {
+        'success': True,
+        'data': {
+            'solicitudId': solicitud_id,
+            'estado': 'pendiente'
+        }
+    })
+
+
+def completar_solicitud(solicitud_id, status_code, body, solo_pendiente=False):
+    """
+    Guarda el resultado de la solicitud. Con solo_pendiente la escritura se
+    condiciona a que siga pendiente (la resuelve sólo una vez).
+    """
+    params = {
+        'Key': {'solicitudId': solicitud_id},
+        'UpdateExpression': 'SET estado = :estado, statusCode = :status, respuesta = :respuesta, updatedAt = :now',
+        'ExpressionAttributeValues': {
+            ':estado': 'completada' if status_code == 200 else 'rechazada',
+            ':status': status_code,
+            ':respuesta': json.dumps(body, default=decimal_default),
+            ':now': datetime.utcnow().isoformat()
+        }
+    }
+    if solo_pendiente:
+        params['ConditionExpression'] = 'estado = :pendiente'
+        params['ExpressionAttributeValues'][':pendiente'] = 'pendiente'
+    solicitudes_table.update_item(**params)
+
+
+def procesar_registros_tanda(tanda_id, mensajes):
+    """
+    Aplica en orden los registros encolados de una tanda.
+
+    Cada solicitud se marca resuelta en cuanto se escribe su registro, así
+    un reintento de SQS nunca vuelve a aplicarla. Si un registro falla con
+    un error inesperado, ése y los siguientes quedan pendientes para que
+    SQS los reintente en el mismo orden.
+
+    Returns:
+        list: solicitudId de los mensajes que quedaron sin resolver
+    """
+    tanda = tandas_table.get_item(Key={'id': tanda_id}).get('Item')
+    es_cumpleañera = bool(tanda) and tanda.get('frecuencia') == 'cumpleaños'
+    links_table = dynamodb.Table(LINKS_TABLE)
+    links = {}
+    participantes = None
+    aceptadas = []
+    no_resueltas = []
+    
+    for i, mensaje in enumerate(mensajes):
+        solicitud_id = mensaje['solicitudId']
+        try:
+            solicitud = solicitudes_table.get_item(Key={'solicitudId': solicitud_id}).get('Item')
+            if not solicitud or solicitud.get('estado') != 'pendiente':
+                # Reintento de SQS de una solicitud que ya se resolvió
+                continue
             
-            if email:
-                participante['email'] = email
+            if not tanda:
+                raise CustomError('Tanda no encontrada', 'NOT_FOUND', 404)
             
-            # 🆕 Agregar fecha de cumpleaños si existe
-            if fecha_cumpleaños:
-                participante['fechaCumpleaños'] = fecha_cumpleaños
+            token = mensaje['token']
+            if token not in links:
+                links[token] = links_table.get_item(Key={'token': token}).get('Item')
+            validar_link_registro(links[token])
             
-            # Insertar participante en la tabla
-            participantes_table.put_item(Item=participante)
+            if es_cumpleañera and participantes is None:
+                participantes = query_all(
+                    participantes_table,
+                    KeyConditionExpression=Key('id').eq(tanda_id),
+                    ConsistentRead=True
+                )
             
-            nuevos_participantes.append({
-                'participanteId': participante_id,
-                'nombre': nombre,
-                'telefono': telefono,
-                'numeroAsignado': int(numero),
-                'fechaCumpleaños': fecha_cumpleaños if fecha_cumpleaños else None
+            por_registrar = aplicar_registro(links[token], tanda, leer_datos_registro(mensaje['body']), participantes)
+            
+        except CustomError as e:
+            print(f"⚠️ Registro {solicitud_id} rechazado: {e.message}")
+            completar_solicitud(solicitud_id, e.status_code, {
+                'success': False,
+                'error': {
+                    'message': e.message
+                }
             })
+            continue
+        except Exception as e:
+            print(f"❌ Error aplicando registro {solicitud_id}: {str(e)}")
+            no_resueltas = [m['solicitudId'] for m in mensajes[i:]]
+            break
         
-        # 🆕 SI ES TANDA CUMPLEAÑERA, RECALCULAR NÚMEROS DE TODOS
+        aceptadas.append((solicitud_id, por_registrar))
+        try:
+            completar_solicitud(solicitud_id, 200, {
+                'success': True,
+                'data': resumen_registro(tanda, por_registrar, 0)
+            }, solo_pendiente=True)
+        except Exception as e:
+            # El registro ya está escrito: reintentarlo lo duplicaría
+            print(f"❌ No se pudo marcar resuelta la solicitud {solicitud_id}: {str(e)}")
+    
+    if not aceptadas:
+        return no_resueltas
+    
+    # Un solo recálculo y una sola publicación por lote. Los registros ya
+    # están escritos y resueltos: un error aquí no se reintenta por SQS
+    try:
         if es_cumpleañera:
-            # Obtener todos los participantes actualizados (incluyendo los nuevos)
-            response = participantes_table.query(            
-                KeyConditionExpression='id = :tandaId',
-                ExpressionAttributeValues={
-                    ':tandaId': link['tandaId']
-                }
+            reordenados = recalcular_numeros_cumpleañera(tanda_id, participantes)
+            numeros = ordenar_cumpleañera(participantes)
+            for solicitud_id, por_registrar in aceptadas:
+                for p in por_registrar:
+                    p['numeroAsignado'] = numeros.get(p['participanteId'], p['numeroAsignado'])
+                # Respuesta con el número definitivo tras reordenar
+                completar_solicitud(solicitud_id, 200, {
+                    'success': True,
+                    'data': resumen_registro(tanda, por_registrar, reordenados)
+                })
+        
+        publicar_snapshots_tanda(tanda_id)
+    except Exception as e:
+        print(f"❌ Error cerrando el lote de registros de tanda {tanda_id}: {str(e)}")
+    
+    print(f"✅ {len(aceptadas)} de {len(mensajes)} registros encolados aplicados en tanda {tanda_id}")
+    return no_resueltas
+
+
+def procesar_cola_registro(event):
+    """
+    Consumidor de la cola FIFO. Los mensajes de un mismo MessageGroupId
+    (tanda) llegan en orden; sólo se reportan los que quedaron sin resolver
+    para que SQS los reintente en el mismo orden (los ya resueltos se saltan).
+    """
+    por_tanda = {}
+    for record in event['Records']:
+        tanda_id = record['attributes']['MessageGroupId']
+        por_tanda.setdefault(tanda_id, []).append(record)
+    
+    fallidos = []
+    for tanda_id, records in por_tanda.items():
+        try:
+            mensajes = [json.loads(r['body']) for r in records]
+            no_resueltas = set(procesar_registros_tanda(tanda_id, mensajes))
+            fallidos.extend(
+                {'itemIdentifier': r['messageId']}
+                for r, mensaje in zip(records, mensajes)
+                if mensaje['solicitudId'] in no_resueltas
             )
-            
-            todos_participantes = response.get('Items', [])
-            recalcular_numeros_cumpleañera(link['tandaId'], todos_participantes)
-            
-            # Obtener el número actualizado del participante recién creado
-            # (puede haber cambiado después del recálculo)
-            participante_actualizado = participantes_table.get_item(
-                Key={
-                    'id': link['tandaId'],
-                    'participanteId': participante_id
+        except Exception as e:
+            # Falla antes de aplicar registros (p. ej. al leer la tanda)
+            print(f"❌ Error procesando registros de tanda {tanda_id}: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            fallidos.extend({'itemIdentifier': r['messageId']} for r in records)
+    
+    return {'batchItemFailures': fallidos}
+
+
+def obtener_solicitud_registro(event, context):
+    """GET /registro/{token}/solicitudes/{solicitudId}"""
+    try:
+        token = event['pathParameters']['token']
+        solicitud_id = event['pathParameters']['solicitudId']
+        
+        solicitud = solicitudes_table.get_item(Key={'solicitudId': solicitud_id}).get('Item')
+        if not solicitud or solicitud.get('token') != token:
+            return respuesta_publica(404, {
+                'success': False,
+                'error': {
+                    'message': 'Solicitud de registro no encontrada'
                 }
-            ).get('Item')
-            
-            if participante_actualizado:
-                numero_final = int(participante_actualizado.get('numeroAsignado', numero_asignado))
-                nuevos_participantes[0]['numeroAsignado'] = numero_final
+            })
         
-        return {
-            'statusCode': 200,
-            'headers': {
-                'Access-Control-Allow-Origin': '*',
-                'Content-Type': 'application/json'
-            },
-            'body': json.dumps({
+        if solicitud['estado'] == 'pendiente':
+            return respuesta_publica(202, {
                 'success': True,
                 'data': {
-                    'participantes': nuevos_participantes,
-                    'tandaId': link['tandaId'],
-                    'mensaje': f'{len(numeros)} participante(s) registrado(s) exitosamente',
-                    'esCumpleañera': es_cumpleañera,  # 🆕 Info útil para el frontend
-                    'numeroAsignado': nuevos_participantes[0]['numeroAsignado'] if es_cumpleañera else None
+                    'solicitudId': solicitud_id,
+                    'estado': 'pendiente'
                 }
-            }, default=decimal_default)
-        }
+            })
         
-    except Exception as e:
-        print(f"Error registrando participante: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        # Mismo status y body que habría dado el registro directo
         return {
-            'statusCode': 500,
+            'statusCode': int(solicitud['statusCode']),
             'headers': {
                 'Access-Control-Allow-Origin': '*',
                 'Content-Type': 'application/json'
             },
-            'body': json.dumps({
-                'success': False,
-                'error': {
-                    'message': 'Error interno del servidor',
-                    'details': str(e)
-                }
-            })
+            'body': solicitud['respuesta']
         }
+        
+    except Exception as e:
+        print(f"Error obteniendo solicitud de registro: {str(e)}")
+        return respuesta_publica(500, {
+            'success': False,
+            'error': {
+                'message': 'Error interno del servidor'
+            }
+        })
 
+@unidad_de_trabajo
 def lambda_handler(event, context):
     print(f"event: {event}")
     method = event.get("httpMethod")
@@ -1087,12 +1740,19 @@ def lambda_handler(event, context):
     routeKey = event.get('routeKey')
     print(f'routeKey: {routeKey}')
     
+    # Consumidor de la cola FIFO de registro (modo surge)
+    if event.get('Records'):
+        return procesar_cola_registro(event)
+    
     try:
         status_code = 200
         if routeKey == "POST /tandas/{tandaId}/participantes":
             print(routeKey)
             return agregar(event,context)
         
+        elif routeKey == 'POST /tandas/{tandaId}/participantes:batch':
+            return importar(event, context)
+        
         elif routeKey == 'GET /tandas/{tandaId}/participantes':
             print(routeKey)
             return listar(event,context)
@@ -1108,6 +1768,9 @@ def lambda_handler(event, context):
         elif routeKey == 'POST /registro/{token}':
             print('Registro publico de participante')
             return registro_publico_participante(event,context)
+        
+        elif routeKey == 'GET /registro/{token}/solicitudes/{solicitudId}':
+            return obtener_solicitud_registro(event, context)
             
         else:  
             status_code = 400
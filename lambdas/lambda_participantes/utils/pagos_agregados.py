@@ -0,0 +1,392 @@
+# ========================================
+# utils/pagos_agregados.py
+# Totales de pagos por tanda, mantenidos en cada escritura
+#
+# Un solo item por tanda en la tabla pagos_agregados:
+#   tandaId               → llave
+#   totalMonto            → suma de `monto` de los pagos con pagado=true
+#   pagosPagados          → cuántos pagos tienen pagado=true
+#   montoParticipantes    → {participanteId: monto pagado}
+#   pagadosParticipantes  → {participanteId: pagos pagados}
+#   montoRondas           → {ronda: monto pagado}
+#   pagadosRondas         → {ronda: pagos pagados}
+#   montoDias             → {YYYY-MM-DD de fechaPago: monto pagado}
+#
+# Cada escritura de un pago suma el delta entre el pago anterior y el
+# nuevo, así que cualquier total (de la tanda, de un participante, de
+# una ronda o de un rango de días) es un GetItem sin importar cuántos
+# pagos tenga la tanda. Un delta contra un pago anterior equivocado se
+# suma igual (dos ediciones que leyeron el mismo pago lo contarían dos
+# veces), así que el anterior debe ser la imagen que devolvió la propia
+# escritura (ReturnValues='ALL_OLD'), no una lectura previa.
+#
+# Igual que la vista (tanda_vista.py): si el item no existe se
+# reconstruye desde pagos; ante cualquier otro error se invalida (se
+# borra) y la siguiente lectura lo reconstruye. La reconciliación
+# (reconciliar_agregados) recalcula todo desde pagos y reporta cualquier
+# diferencia con lo guardado.
+# ========================================
+
+import os
+import boto3
+from datetime import datetime, date
+from decimal import Decimal
+from boto3.dynamodb.conditions import Key
+from botocore.exceptions import ClientError
+
+from utils.dynamo_utils import query_all, agrupar_clausulas
+
+dynamodb = boto3.resource('dynamodb')
+agregados_table = dynamodb.Table(os.environ.get('PAGOS_AGREGADOS_TABLE', 'pagos_agregados'))
+_tandas_table = dynamodb.Table(os.environ.get('TANDAS_TABLE', 'tandas'))
+_pagos_table = dynamodb.Table(os.environ.get('PAGOS_TABLE', 'pagos'))
+
+MAPAS = ['montoParticipantes', 'pagadosParticipantes', 'montoRondas', 'pagadosRondas', 'montoDias']
+
+
+def aporte_pago(pago):
+    """(monto, pagos) con los que un pago cuenta en los totales"""
+    if not pago or not pago.get('pagado', False):
+        return Decimal(0), 0
+    return Decimal(str(pago.get('monto') or 0)), 1
+
+
+def dia_pago(pago):
+    """'YYYY-MM-DD' de fechaPago, o None si el pago no cuenta o no tiene fecha válida"""
+    if not pago or not pago.get('pagado', False):
+        return None
+    dia = str(pago.get('fechaPago') or '')[:10]
+    try:
+        date.fromisoformat(dia)
+    except ValueError:
+        return None
+    return dia
+
+
+def construir_agregados(tanda_id, pagos):
+    """Construye el item completo a partir de los pagos de la tanda"""
+    item = {
+        'tandaId': tanda_id,
+        'totalMonto': Decimal(0),
+        'pagosPagados': 0,
+        **{mapa: {} for mapa in MAPAS}
+    }
+    for pago in pagos:
+        monto, pagados = aporte_pago(pago)
+        if not pagados:
+            continue
+        participante_id = pago['participanteId']
+        ronda = str(int(pago['ronda']))
+
+        item['totalMonto'] += monto
+        item['pagosPagados'] += pagados
+        item['montoParticipantes'][participante_id] = item['montoParticipantes'].get(participante_id, 0) + monto
+        item['pagadosParticipantes'][participante_id] = item['pagadosParticipantes'].get(participante_id, 0) + pagados
+        item['montoRondas'][ronda] = item['montoRondas'].get(ronda, 0) + monto
+        item['pagadosRondas'][ronda] = item['pagadosRondas'].get(ronda, 0) + pagados
+
+        dia = dia_pago(pago)
+        if dia:
+            item['montoDias'][dia] = item['montoDias'].get(dia, 0) + monto
+    return item
+
+
+def monto_pagado(agregados, participante_id=None, ronda=None):
+    """totalMonto de la tanda, de un participante o de una ronda"""
+    if participante_id:
+        return agregados.get('montoParticipantes', {}).get(participante_id, Decimal(0))
+    if ronda is not None:
+        return agregados.get('montoRondas', {}).get(str(int(ronda)), Decimal(0))
+    return agregados.get('totalMonto', Decimal(0))
+
+
+# ========================================
+# Lectura / reconstrucción
+# ========================================
+def obtener_agregados(tanda_id):
+    """Lee los totales; si no existen los reconstruye desde pagos"""
+    result = agregados_table.get_item(Key={'tandaId': tanda_id})
+    item = result.get('Item')
+    # Un item sin alguno de los mapas es de antes de que existiera
+    if item and all(mapa in item for mapa in MAPAS):
+        return item
+    return reconstruir_agregados(tanda_id)
+
+
+def reconstruir_agregados(tanda_id):
+    """Recalcula los totales leyendo todos los pagos de la tanda"""
+    pagos = _leer_pagos(tanda_id)
+    item = {**construir_agregados(tanda_id, pagos), 'actualizadoEn': datetime.utcnow().isoformat()}
+    agregados_table.put_item(Item=item)
+    print(f"🔄 Totales de pagos de tanda {tanda_id} reconstruidos: {item['pagosPagados']} pagados de {len(pagos)}")
+    return item
+
+
+def _leer_pagos(tanda_id):
+    return query_all(
+        _pagos_table,
+        KeyConditionExpression=Key('id').eq(tanda_id),
+        ProjectionExpression='participanteId, ronda, pagado, monto, fechaPago'
+    )
+
+
+def eliminar_agregados(tanda_id):
+    agregados_table.delete_item(Key={'tandaId': tanda_id})
+
+
+def recalcular_agregados(tanda_id):
+    """Reconstrucción que nunca rompe la escritura principal"""
+    try:
+        reconstruir_agregados(tanda_id)
+        return True
+    except Exception as e:
+        print(f"❌ Error reconstruyendo totales de pagos de tanda {tanda_id}: {e}")
+        _invalidar(tanda_id)
+        return False
+
+
+def _invalidar(tanda_id):
+    try:
+        eliminar_agregados(tanda_id)
+    except Exception as e:
+        print(f"❌ No se pudieron invalidar los totales de pagos de tanda {tanda_id}: {e}")
+
+
+# ========================================
+# Escrituras incrementales
+# ========================================
+def registrar_pago_agregados(tanda_id, pago, anterior=None):
+    """
+    Aplica el delta (monto y conteo de pagados) entre el pago anterior y
+    el nuevo sobre los totales de la tanda, del participante, de la ronda
+    y del día de pago. `anterior` debe ser la imagen que devolvió la
+    propia escritura del pago (ReturnValues='ALL_OLD'); None si el pago
+    es nuevo.
+    """
+    deltas = _deltas_vacios()
+    _sumar_delta(deltas, pago, anterior)
+    _aplicar_deltas(tanda_id, deltas)
+
+
+def registrar_pagos_agregados(tanda_id, pagos, anteriores):
+    """
+    Aplica un lote de pagos escrito con BatchWriteItem como un solo delta
+    combinado. `anteriores` ({pagoId: pago}, con pagado, monto y
+    fechaPago) es la lectura que hizo quien escribe justo antes del lote,
+    porque BatchWriteItem no devuelve los items anteriores.
+    """
+    deltas = _deltas_vacios()
+    for pago in pagos:
+        _sumar_delta(deltas, pago, anteriores.get(pago['pagoId']))
+    _aplicar_deltas(tanda_id, deltas)
+
+
+def _deltas_vacios():
+    return {'totalMonto': Decimal(0), 'pagosPagados': 0, **{mapa: {} for mapa in MAPAS}}
+
+
+def _sumar_delta(deltas, pago, anterior):
+    """Acumula en `deltas` lo que cambia entre el pago anterior y el nuevo"""
+    monto_nuevo, pagados_nuevo = aporte_pago(pago)
+    monto_anterior, pagados_anterior = aporte_pago(anterior)
+    delta_monto = monto_nuevo - monto_anterior
+    delta_pagados = pagados_nuevo - pagados_anterior
+    participante_id = pago['participanteId']
+    ronda = str(int(pago['ronda']))
+
+    deltas['totalMonto'] += delta_monto
+    deltas['pagosPagados'] += delta_pagados
+    for mapa, llave, valor in (
+        ('montoParticipantes', participante_id, delta_monto),
+        ('pagadosParticipantes', participante_id, delta_pagados),
+        ('montoRondas', ronda, delta_monto),
+        ('pagadosRondas', ronda, delta_pagados),
+        # Si cambió fechaPago el monto se mueve de un día a otro
+        ('montoDias', dia_pago(anterior), -monto_anterior),
+        ('montoDias', dia_pago(pago), monto_nuevo),
+    ):
+        if llave:
+            deltas[mapa][llave] = deltas[mapa].get(llave, 0) + valor
+
+
+def _aplicar_deltas(tanda_id, deltas):
+    """
+    Suma los deltas al item de la tanda. Si las cláusulas no caben en una
+    expresión se reparten en varios updates; ante un error se reconstruye
+    o se invalida el item y no se aplican los demás.
+    """
+    clausulas = []
+    for mapa in MAPAS:
+        for llave, valor in deltas[mapa].items():
+            if not valor:
+                continue
+            n = len(clausulas)
+            clausulas.append((
+                f'{mapa}.#k{n} = if_not_exists({mapa}.#k{n}, :cero) + :v{n}',
+                {f'#k{n}': llave},
+                {':cero': 0, f':v{n}': valor}
+            ))
+    if not clausulas and not deltas['totalMonto'] and not deltas['pagosPagados']:
+        return
+
+    grupos = agrupar_clausulas(clausulas) or [([], {}, {})]
+    for i, (set_exprs, names, values) in enumerate(grupos):
+        update_expression = 'SET ' + ', '.join(set_exprs + ['actualizadoEn = :now'])
+        values = {**values, ':now': datetime.utcnow().isoformat()}
+        if i == 0:
+            update_expression += ' ADD totalMonto :dm, pagosPagados :dp'
+            values.update({':dm': deltas['totalMonto'], ':dp': deltas['pagosPagados']})
+
+        params = {
+            'Key': {'tandaId': tanda_id},
+            'UpdateExpression': update_expression,
+            'ConditionExpression': 'attribute_exists(tandaId)',
+            'ExpressionAttributeValues': values
+        }
+        if names:
+            params['ExpressionAttributeNames'] = names
+
+        try:
+            agregados_table.update_item(**params)
+        except ClientError as e:
+            codigo = e.response['Error']['Code']
+            if codigo in ('ConditionalCheckFailedException', 'ValidationException'):
+                # Sin item (tanda anterior a los totales, o invalidado) o sin
+                # alguno de los mapas: se reconstruye desde pagos, que ya
+                # incluye esta escritura
+                print(f"⚠️ Totales de pagos de tanda {tanda_id} desincronizados ({codigo}), reconstruyendo")
+                recalcular_agregados(tanda_id)
+            else:
+                print(f"❌ Error actualizando totales de pagos de tanda {tanda_id}: {e}")
+                _invalidar(tanda_id)
+            return
+        except Exception as e:
+            print(f"❌ Error actualizando totales de pagos de tanda {tanda_id}: {e}")
+            _invalidar(tanda_id)
+            return
+
+
+# ========================================
+# Reconciliación
+# ========================================
+def _normalizar(item):
+    """Totales comparables: Decimal en todo y sin llaves en cero"""
+    normalizado = {
+        'totalMonto': Decimal(str(item.get('totalMonto', 0))),
+        'pagosPagados': Decimal(str(item.get('pagosPagados', 0))),
+    }
+    for mapa in MAPAS:
+        normalizado[mapa] = {
+            llave: Decimal(str(valor))
+            for llave, valor in (item.get(mapa) or {}).items()
+            if valor
+        }
+    return normalizado
+
+
+def diferencias_agregados(guardado, calculado):
+    """
+    Compara los totales guardados contra los recalculados desde pagos.
+
+    Returns:
+        dict: {campo: {'guardado': x, 'calculado': y}} para totalMonto y
+        pagosPagados, y {mapa: {llave: {...}}} para cada mapa con diferencias
+    """
+    guardado = _normalizar(guardado)
+    calculado = _normalizar(calculado)
+    drift = {}
+
+    for campo in ('totalMonto', 'pagosPagados'):
+        if guardado[campo] != calculado[campo]:
+            drift[campo] = {'guardado': guardado[campo], 'calculado': calculado[campo]}
+
+    for mapa in MAPAS:
+        distintas = {}
+        for llave in sorted(set(guardado[mapa]) | set(calculado[mapa])):
+            antes = guardado[mapa].get(llave, Decimal(0))
+            despues = calculado[mapa].get(llave, Decimal(0))
+            if antes != despues:
+                distintas[llave] = {'guardado': antes, 'calculado': despues}
+        if distintas:
+            drift[mapa] = distintas
+
+    return drift
+
+
+def reconciliar_tanda(tanda_id, corregir=True):
+    """
+    Recalcula los totales de una tanda desde pagos y los compara con los
+    guardados. Con corregir=True reemplaza el item si hay diferencias,
+    siempre que nadie lo haya actualizado mientras tanto.
+
+    Returns:
+        dict: tandaId, estado ('ok' | 'drift' | 'sin_item') y drift
+    """
+    guardado = agregados_table.get_item(Key={'tandaId': tanda_id}).get('Item')
+    if not guardado:
+        # Se construye en la primera lectura; no es drift
+        return {'tandaId': tanda_id, 'estado': 'sin_item', 'drift': {}}
+
+    calculado = construir_agregados(tanda_id, _leer_pagos(tanda_id))
+    drift = diferencias_agregados(guardado, calculado)
+    resultado = {'tandaId': tanda_id, 'estado': 'drift' if drift else 'ok', 'drift': drift}
+    if not drift or not corregir:
+        return resultado
+
+    try:
+        agregados_table.put_item(
+            Item={**calculado, 'actualizadoEn': datetime.utcnow().isoformat()},
+            ConditionExpression='actualizadoEn = :leido',
+            ExpressionAttributeValues={':leido': guardado.get('actualizadoEn')}
+        )
+        resultado['corregido'] = True
+    except ClientError as e:
+        if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+            raise
+        # Un pago se escribió durante la reconciliación: el drift pudo
+        # ser sólo esa escritura, se revisa en la siguiente corrida
+        resultado['corregido'] = False
+    return resultado
+
+
+def reconciliar_agregados(tanda_ids=None, corregir=True):
+    """
+    Reconciliación de los totales de todas las tandas (o de las indicadas).
+
+    Returns:
+        dict: revisadas, conDrift, corregidas, errores y el detalle de
+        cada tanda con drift
+    """
+    if tanda_ids is None:
+        tanda_ids = [t['id'] for t in _scan_tandas()]
+
+    reporte = {'revisadas': 0, 'conDrift': 0, 'corregidas': 0, 'errores': 0, 'drift': []}
+    for tanda_id in tanda_ids:
+        try:
+            resultado = reconciliar_tanda(tanda_id, corregir=corregir)
+        except Exception as e:
+            print(f"❌ Error reconciliando totales de pagos de tanda {tanda_id}: {e}")
+            reporte['errores'] += 1
+            continue
+
+        reporte['revisadas'] += 1
+        if resultado['estado'] == 'drift':
+            reporte['conDrift'] += 1
+            if resultado.get('corregido'):
+                reporte['corregidas'] += 1
+            reporte['drift'].append(resultado)
+            print(f"⚠️ Drift en totales de pagos de tanda {tanda_id}: {resultado['drift']}")
+
+    print(f"🔄 Reconciliación de totales de pagos: {reporte['revisadas']} revisadas, "
+          f"{reporte['conDrift']} con drift, {reporte['corregidas']} corregidas, {reporte['errores']} errores")
+    return reporte
+
+
+def _scan_tandas():
+    kwargs = {'ProjectionExpression': 'id'}
+    while True:
+        response = _tandas_table.scan(**kwargs)
+        yield from response.get('Items', [])
+        if 'LastEvaluatedKey' not in response:
+            return
+        kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
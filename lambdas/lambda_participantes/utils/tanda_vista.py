@@ -0,0 +1,709 @@
+# ========================================
+# utils/tanda_vista.py
+# Modelo de lectura desnormalizado de una tanda ("tanda vista")
+#
+# Un solo item por tanda en la tabla tandas_vista:
+#   tandaId              → llave
+#   version              → se incrementa en cada escritura
+#   tanda                → metadata de la tanda
+#   totalParticipantes   → contador
+#   participantes        → {participanteId: datos compactos}
+#   pagados / exentos    → {participanteId: {bloque: bitmap}}; cada bloque
+#                          cubre RONDAS_POR_BLOQUE rondas (bloque
+#                          (ronda - 1) // 64, bit (ronda - 1) % 64), así
+#                          ningún Number pasa de 2^64 (DynamoDB admite 38
+#                          dígitos) sin importar cuántas rondas tenga la tanda
+#   pagos                → {participanteId: {ronda: detalle}} sólo con
+#                          los campos que el bitmap no cubre. Las rondas
+#                          menores a 1 no tienen bit: su pagado/exento va
+#                          en el detalle ('p' / 'e')
+#
+# Además de la vista, cada escritura incrementa `version` en el item de la
+# tanda; ese contador es el que usan los ETag de los GET (ver etag.py).
+# Las escrituras de pagos incrementan también `versionPagos`, así un
+# lector sabe si desde cierta versión sólo cambiaron pagos.
+# El item de la tanda también lleva `totalParticipantes`, para que el
+# listado resumido no tenga que leer participantes ni vistas.
+#
+# Las escrituras incrementales nunca deben romper la escritura principal:
+# si la vista no existe o su estructura no coincide se reconstruye desde
+# las tablas fuente; ante cualquier otro error se invalida (se borra) y
+# la siguiente lectura la reconstruye. La reconstrucción sólo se escribe
+# si la vista sigue en la versión que tenía antes de leer las tablas
+# fuente; si otra escritura se adelantó, se vuelve a leer.
+#
+# Los bitmaps se mantienen con deltas (sumas), así que un delta calculado
+# contra un pago anterior equivocado no falla: acarrea a otra ronda. Por
+# eso quien escribe un pago debe pasar la imagen anterior que devolvió su
+# propia escritura (ReturnValues='ALL_OLD'), y la reconciliación
+# (reconciliar_vistas) compara cada vista contra las tablas fuente. Los
+# lotes (BatchWriteItem, sin ALL_OLD) leen los pagos anteriores con
+# BatchGetItem justo antes de escribir; lo que otra escritura cambie en
+# ese intervalo lo corrige la reconciliación.
+# ========================================
+
+import os
+import boto3
+from datetime import datetime
+from decimal import Decimal
+from boto3.dynamodb.conditions import Key
+from botocore.exceptions import ClientError
+
+from utils.dynamo_utils import query_all, agrupar_clausulas
+from utils.unidad_trabajo import invalidar_tabla
+
+dynamodb = boto3.resource('dynamodb')
+vista_table = dynamodb.Table(os.environ.get('TANDAS_VISTA_TABLE', 'tandas_vista'))
+_tandas_table = dynamodb.Table(os.environ.get('TANDAS_TABLE', 'tandas'))
+_participantes_table = dynamodb.Table(os.environ.get('PARTICIPANTES_TABLE', 'participantes'))
+_pagos_table = dynamodb.Table(os.environ.get('PAGOS_TABLE', 'pagos'))
+
+CAMPOS_PARTICIPANTE = [
+    'nombre', 'telefono', 'email', 'numeroAsignado', 'fechaCumpleaños',
+    'fechaRegistro', 'comentarios', 'createdAt', 'updatedAt'
+]
+
+# Campos de detalle de pago → llave corta dentro de la vista
+CAMPOS_PAGO = {
+    'fechaPago': 'f',
+    'monto': 'm',
+    'metodoPago': 'mp',
+    'notas': 'n',
+}
+
+RONDAS_POR_BLOQUE = 64
+RECONSTRUIR_INTENTOS = 3
+
+
+# ========================================
+# Construcción
+# ========================================
+def bit_ronda(ronda):
+    """Máscara del bit correspondiente a la ronda (1-indexada)"""
+    return 1 << (int(ronda) - 1)
+
+
+def ronda_con_bit(ronda):
+    """Las rondas menores a 1 no caben en el bitmap"""
+    return int(ronda) >= 1
+
+
+def bloque_ronda(ronda):
+    """(bloque, máscara dentro del bloque) de la ronda (1-indexada)"""
+    bloque, posicion = divmod(int(ronda) - 1, RONDAS_POR_BLOQUE)
+    return str(bloque), 1 << posicion
+
+
+def bitmap_participante(valor):
+    """
+    Entero con todos los bits del participante. Acepta el formato por
+    bloques y el Number único de las vistas anteriores.
+    """
+    if isinstance(valor, dict):
+        return sum(int(bits) << (int(bloque) * RONDAS_POR_BLOQUE) for bloque, bits in valor.items())
+    return int(valor or 0)
+
+
+def participante_compacto(participante):
+    return {
+        campo: participante[campo]
+        for campo in CAMPOS_PARTICIPANTE
+        if participante.get(campo) not in (None, '')
+    }
+
+
+def pago_compacto(pago):
+    return {
+        corto: pago[campo]
+        for campo, corto in CAMPOS_PAGO.items()
+        if pago.get(campo) not in (None, '')
+    }
+
+
+def construir_vista(tanda, participantes, pagos):
+    """Construye el item completo de la vista a partir de las tablas fuente"""
+    vista = {
+        'tandaId': tanda['id'],
+        'tanda': tanda,
+        'totalParticipantes': len(participantes),
+        'participantes': {},
+        'pagados': {},
+        'exentos': {},
+        'pagos': {},
+    }
+
+    for participante in participantes:
+        participante_id = participante['participanteId']
+        vista['participantes'][participante_id] = participante_compacto(participante)
+        vista['pagados'][participante_id] = {}
+        vista['exentos'][participante_id] = {}
+        vista['pagos'][participante_id] = {}
+
+    for pago in pagos:
+        participante_id = pago.get('participanteId')
+        if participante_id not in vista['participantes']:
+            # Pago huérfano: no se expone en la vista
+            continue
+
+        ronda = str(int(pago['ronda']))
+        detalle = pago_compacto(pago)
+        if ronda_con_bit(ronda):
+            bloque, bit = bloque_ronda(ronda)
+            for campo, bitmaps in (('pagado', vista['pagados']), ('exentoPago', vista['exentos'])):
+                if pago.get(campo, False):
+                    bitmaps[participante_id][bloque] = bitmaps[participante_id].get(bloque, 0) | bit
+        else:
+            detalle.update(_flags_detalle(pago))
+        vista['pagos'][participante_id][ronda] = detalle
+
+    return vista
+
+
+def _flags_detalle(pago):
+    return {'p': bool(pago.get('pagado', False)), 'e': bool(pago.get('exentoPago', False))}
+
+
+def expandir_vista(vista):
+    """
+    Convierte la vista al mismo formato que GET /tandas/{tandaId}
+    devolvía cuando se armaba desde las tres tablas.
+    """
+    tanda = dict(vista['tanda'])
+    participantes = []
+
+    for participante_id in sorted(vista.get('participantes', {})):
+        datos = vista['participantes'][participante_id]
+        pagados = bitmap_participante(vista.get('pagados', {}).get(participante_id))
+        exentos = bitmap_participante(vista.get('exentos', {}).get(participante_id))
+
+        pagos_por_ronda = {}
+        for ronda, detalle in vista.get('pagos', {}).get(participante_id, {}).items():
+            if ronda_con_bit(ronda):
+                bit = bit_ronda(ronda)
+                pagado, exento = bool(pagados & bit), bool(exentos & bit)
+            else:
+                pagado, exento = bool(detalle.get('p')), bool(detalle.get('e'))
+            pagos_por_ronda[ronda] = {
+                'pagado': pagado,
+                'fechaPago': detalle.get('f', ''),
+                'monto': float(detalle.get('m', 0)),
+                'exentoPago': exento,
+                'metodoPago': detalle.get('mp'),
+                'notas': detalle.get('n')
+            }
+
+        participantes.append({
+            'id': vista['tandaId'],
+            'participanteId': participante_id,
+            **datos,
+            'pagos': pagos_por_ronda
+        })
+
+    tanda['participantes'] = participantes
+    tanda['tandaId'] = vista['tandaId']
+    tanda['totalParticipantes'] = vista.get('totalParticipantes', len(participantes))
+    return tanda
+
+
+# ========================================
+# Lectura / reconstrucción
+# ========================================
+def obtener_vista(tanda_id):
+    """Lee la vista; si no existe la reconstruye desde las tablas fuente"""
+    result = vista_table.get_item(Key={'tandaId': tanda_id})
+    if result.get('Item'):
+        return result['Item']
+    return reconstruir_vista(tanda_id)
+
+
+def reconstruir_vista(tanda_id):
+    """
+    Reconstruye la vista completa leyendo tandas, participantes y pagos.
+
+    La escritura es condicional a la versión que tenía la vista antes de
+    leer las tablas fuente: si una escritura incremental se aplicó en
+    medio, la reconstrucción ya no la incluiría y se repite.
+
+    Returns:
+        dict | None: La vista escrita, o None si la tanda no existe
+    """
+    for intento in range(1, RECONSTRUIR_INTENTOS + 1):
+        try:
+            return _reconstruir_vista(tanda_id)
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException' or intento == RECONSTRUIR_INTENTOS:
+                raise
+            print(f"⚠️ Vista de tanda {tanda_id} cambió durante la reconstrucción, reintentando ({intento})")
+
+
+def _reconstruir_vista(tanda_id):
+    actual = vista_table.get_item(
+        Key={'tandaId': tanda_id},
+        ProjectionExpression='version',
+        ConsistentRead=True
+    ).get('Item') or {}
+
+    fuentes = _leer_fuentes(tanda_id)
+    if not fuentes:
+        vista_table.delete_item(Key={'tandaId': tanda_id})
+        return None
+
+    tanda, participantes, pagos = fuentes
+    vista = construir_vista(tanda, participantes, pagos)
+
+    # Corrige (o inicializa, en tandas anteriores al contador) el total
+    # de participantes guardado en el item de la tanda
+    _tandas_table.update_item(
+        Key={'id': tanda_id},
+        UpdateExpression='SET totalParticipantes = :total',
+        ConditionExpression='attribute_exists(id)',
+        ExpressionAttributeValues={':total': vista['totalParticipantes']}
+    )
+    invalidar_tabla(_tandas_table.name)
+
+    escrita = _escribir_vista(tanda_id, vista, actual.get('version'))
+    print(f"🔄 Vista de tanda {tanda_id} reconstruida: {vista['totalParticipantes']} participantes, {len(pagos)} pagos")
+    return escrita
+
+
+def _leer_fuentes(tanda_id):
+    """
+    (tanda, participantes, pagos) con lecturas consistentes: la versión de
+    la vista se leyó antes, así que las tablas fuente deben incluir todo lo
+    que ya se aplicó a esa versión. None si la tanda no existe.
+    """
+    tanda = _tandas_table.get_item(Key={'id': tanda_id}, ConsistentRead=True).get('Item')
+    if not tanda:
+        return None
+    participantes = query_all(_participantes_table, KeyConditionExpression=Key('id').eq(tanda_id), ConsistentRead=True)
+    pagos = query_all(_pagos_table, KeyConditionExpression=Key('id').eq(tanda_id), ConsistentRead=True)
+    return tanda, participantes, pagos
+
+
+def _escribir_vista(tanda_id, vista, version_leida):
+    """Reemplaza la vista si sigue en version_leida (None: si no existe)"""
+    values = {
+        ':tanda': vista['tanda'],
+        ':total': vista['totalParticipantes'],
+        ':participantes': vista['participantes'],
+        ':pagados': vista['pagados'],
+        ':exentos': vista['exentos'],
+        ':pagos': vista['pagos'],
+        ':now': datetime.utcnow().isoformat(),
+        ':uno': 1
+    }
+    if version_leida is not None:
+        condicion = 'version = :leida'
+        values[':leida'] = version_leida
+    else:
+        condicion = 'attribute_not_exists(version)'
+
+    result = vista_table.update_item(
+        Key={'tandaId': tanda_id},
+        UpdateExpression=(
+            'SET tanda = :tanda, totalParticipantes = :total, participantes = :participantes, '
+            'pagados = :pagados, exentos = :exentos, pagos = :pagos, actualizadoEn = :now '
+            'ADD version :uno'
+        ),
+        ConditionExpression=condicion,
+        ExpressionAttributeValues=values,
+        ReturnValues='ALL_NEW'
+    )
+    return result['Attributes']
+
+
+def eliminar_vista(tanda_id):
+    vista_table.delete_item(Key={'tandaId': tanda_id})
+
+
+# ========================================
+# Escrituras incrementales
+# ========================================
+def _actualizar(tanda_id, set_exprs, values, names=None, remove_exprs=None, add_exprs=None,
+                delta_participantes=0, pagos=False):
+    """
+    Aplica una actualización incremental sobre la vista existente y
+    después incrementa la versión de la tanda.
+    """
+    if _aplicar(tanda_id, set_exprs, values, names, remove_exprs, add_exprs) == 'reconstruida':
+        # La reconstrucción ya dejó el total exacto en la tanda
+        delta_participantes = 0
+
+    # Después de la vista: quien lea la versión nueva ya ve los datos nuevos
+    incrementar_version_tanda(tanda_id, delta_participantes, pagos)
+
+
+def _aplicar(tanda_id, set_exprs, values, names=None, remove_exprs=None, add_exprs=None):
+    """
+    Un update sobre la vista existente. Siempre incrementa la versión de
+    la vista.
+
+    Returns:
+        str: 'aplicada', 'reconstruida' (la vista no existía o no tenía la
+        ruta esperada y se reconstruyó desde las tablas fuente) o
+        'invalidada'
+    """
+    expresion = 'SET ' + ', '.join(set_exprs + ['actualizadoEn = :now'])
+    if remove_exprs:
+        expresion += ' REMOVE ' + ', '.join(remove_exprs)
+    expresion += ' ADD ' + ', '.join((add_exprs or []) + ['version :uno'])
+
+    params = {
+        'Key': {'tandaId': tanda_id},
+        'UpdateExpression': expresion,
+        'ConditionExpression': 'attribute_exists(tandaId)',
+        'ExpressionAttributeValues': {**values, ':now': datetime.utcnow().isoformat(), ':uno': 1},
+    }
+    if names:
+        params['ExpressionAttributeNames'] = names
+
+    try:
+        vista_table.update_item(**params)
+        return 'aplicada'
+    except ClientError as e:
+        codigo = e.response['Error']['Code']
+        if codigo in ('ConditionalCheckFailedException', 'ValidationException'):
+            # Vista inexistente o sin la ruta esperada (participante nuevo en
+            # una vista vieja, etc.): se reconstruye desde las tablas fuente.
+            print(f"⚠️ Vista de tanda {tanda_id} desincronizada ({codigo}), reconstruyendo")
+            return 'reconstruida' if _reconstruir_o_invalidar(tanda_id) else 'invalidada'
+        print(f"❌ Error actualizando vista de tanda {tanda_id}: {e}")
+    except Exception as e:
+        print(f"❌ Error actualizando vista de tanda {tanda_id}: {e}")
+
+    _invalidar(tanda_id)
+    return 'invalidada'
+
+
+def incrementar_version_tanda(tanda_id, delta_participantes=0, pagos=False):
+    """
+    Invalida los ETag emitidos para la tanda y ajusta su contador de
+    participantes. Con pagos=True la escritura fue sólo de pagos.
+    """
+    expresion = 'ADD version :uno'
+    values = {':uno': 1}
+    if pagos:
+        expresion += ', versionPagos :uno'
+    if delta_participantes:
+        expresion += ', totalParticipantes :delta'
+        values[':delta'] = delta_participantes
+
+    try:
+        _tandas_table.update_item(
+            Key={'id': tanda_id},
+            UpdateExpression=expresion,
+            ConditionExpression='attribute_exists(id)',
+            ExpressionAttributeValues=values
+        )
+    except ClientError as e:
+        if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+            print(f"❌ Error incrementando versión de tanda {tanda_id}: {e}")
+    except Exception as e:
+        print(f"❌ Error incrementando versión de tanda {tanda_id}: {e}")
+
+    # El item de la tanda puede estar memorizado en la TablaCacheada del handler
+    invalidar_tabla(_tandas_table.name)
+
+
+def _reconstruir_o_invalidar(tanda_id):
+    try:
+        reconstruir_vista(tanda_id)
+        return True
+    except Exception as e:
+        print(f"❌ Error reconstruyendo vista de tanda {tanda_id}: {e}")
+        _invalidar(tanda_id)
+        return False
+
+
+def _invalidar(tanda_id):
+    try:
+        eliminar_vista(tanda_id)
+    except Exception as e:
+        print(f"❌ No se pudo invalidar la vista de tanda {tanda_id}: {e}")
+
+
+def crear_vista(tanda):
+    """Crea la vista vacía de una tanda recién creada"""
+    try:
+        vista = construir_vista(tanda, [], [])
+        vista['version'] = 1
+        vista['actualizadoEn'] = datetime.utcnow().isoformat()
+        vista_table.put_item(Item=vista)
+    except Exception as e:
+        print(f"❌ Error creando vista de tanda {tanda['id']}: {e}")
+
+
+def actualizar_tanda_vista(tanda):
+    """Reemplaza la metadata de la tanda en la vista"""
+    _actualizar(tanda['id'], ['tanda = :tanda'], {':tanda': tanda})
+
+
+def registrar_participante_vista(tanda_id, participante, nuevo=False):
+    """Inserta o reemplaza los datos compactos de un participante"""
+    names = {'#pid': participante['participanteId']}
+    values = {':datos': participante_compacto(participante)}
+    set_exprs = ['participantes.#pid = :datos']
+    add_exprs = []
+
+    if nuevo:
+        values.update({':vacio': {}})
+        set_exprs += [
+            'pagados.#pid = if_not_exists(pagados.#pid, :vacio)',
+            'exentos.#pid = if_not_exists(exentos.#pid, :vacio)',
+            'pagos.#pid = if_not_exists(pagos.#pid, :vacio)',
+        ]
+        add_exprs.append('totalParticipantes :uno')
+
+    _actualizar(tanda_id, set_exprs, values, names, add_exprs=add_exprs,
+                delta_participantes=1 if nuevo else 0)
+
+
+def registrar_participantes_vista(tanda_id):
+    """
+    Alta masiva: una reconstrucción en lugar de un update por participante
+    (un SET por participante no cabe en una sola expresión). La
+    reconstrucción deja el total exacto en la tanda.
+    """
+    _reconstruir_o_invalidar(tanda_id)
+    incrementar_version_tanda(tanda_id)
+
+
+def actualizar_numeros_vista(tanda_id, numeros):
+    """Actualiza numeroAsignado de varios participantes en una sola escritura"""
+    if not numeros:
+        return
+
+    set_exprs, values, names = [], {}, {}
+    for i, (participante_id, numero) in enumerate(numeros.items()):
+        names[f'#p{i}'] = participante_id
+        values[f':n{i}'] = numero
+        set_exprs.append(f'participantes.#p{i}.numeroAsignado = :n{i}')
+
+    _actualizar(tanda_id, set_exprs, values, names)
+
+
+def eliminar_participante_vista(tanda_id, participante_id):
+    """Quita al participante y todos sus pagos de la vista"""
+    _actualizar(
+        tanda_id,
+        ['totalParticipantes = totalParticipantes - :uno'],
+        {},
+        {'#pid': participante_id},
+        remove_exprs=['participantes.#pid', 'pagados.#pid', 'exentos.#pid', 'pagos.#pid'],
+        delta_participantes=-1
+    )
+
+
+def registrar_pago_vista(tanda_id, pago, anterior=None):
+    """
+    Aplica un pago nuevo o modificado.
+
+    Los bitmaps se actualizan con el delta entre el pago anterior y el
+    nuevo, así no hace falta leer la vista antes de escribir. `anterior`
+    debe ser la imagen que devolvió la propia escritura del pago
+    (ReturnValues='ALL_OLD'), no una lectura previa. Una ronda menor a 1
+    no tiene bit; sus banderas van en el detalle.
+    """
+    anterior = anterior or {}
+    names = {'#pid': pago['participanteId'], '#ronda': str(int(pago['ronda']))}
+    detalle = pago_compacto(pago)
+
+    if not ronda_con_bit(pago['ronda']):
+        detalle.update(_flags_detalle(pago))
+        _actualizar(tanda_id, ['pagos.#pid.#ronda = :detalle'], {':detalle': detalle}, names, pagos=True)
+        return
+
+    bloque, bit = bloque_ronda(pago['ronda'])
+    delta_pagado = (int(bool(pago.get('pagado', False))) - int(bool(anterior.get('pagado', False)))) * bit
+    delta_exento = (int(bool(pago.get('exentoPago', False))) - int(bool(anterior.get('exentoPago', False)))) * bit
+
+    _actualizar(
+        tanda_id,
+        [
+            'pagos.#pid.#ronda = :detalle',
+            'pagados.#pid.#bloque = if_not_exists(pagados.#pid.#bloque, :cero) + :dp',
+            'exentos.#pid.#bloque = if_not_exists(exentos.#pid.#bloque, :cero) + :de',
+        ],
+        {
+            ':detalle': detalle,
+            ':cero': 0,
+            ':dp': Decimal(delta_pagado),
+            ':de': Decimal(delta_exento),
+        },
+        {**names, '#bloque': bloque},
+        pagos=True
+    )
+
+
+def registrar_pagos_vista(tanda_id, pagos, anteriores):
+    """
+    Aplica un lote de pagos escrito con BatchWriteItem.
+
+    BatchWriteItem no devuelve los items anteriores: `anteriores`
+    ({pagoId: pago}, con pagado y exentoPago) es la lectura que hizo
+    quien escribe justo antes del lote. Cada (participante, bloque)
+    recibe un solo delta con todas sus rondas del lote, igual que en
+    registrar_pago_vista. Si las cláusulas no caben en una expresión se
+    reparten en varios updates; si uno falla, la reconstrucción ya
+    incluye el lote completo y no se aplican los demás.
+    """
+    indices = {}  # participanteId → i de #p{i}
+    deltas = {}   # (participanteId, bloque) → [delta pagados, delta exentos]
+    clausulas = []
+
+    for k, pago in enumerate(pagos):
+        participante_id = pago['participanteId']
+        i = indices.setdefault(participante_id, len(indices))
+        ronda = str(int(pago['ronda']))
+        detalle = pago_compacto(pago)
+
+        if ronda_con_bit(ronda):
+            anterior = anteriores.get(pago['pagoId']) or {}
+            bloque, bit = bloque_ronda(ronda)
+            delta = deltas.setdefault((participante_id, bloque), [0, 0])
+            for j, campo in enumerate(('pagado', 'exentoPago')):
+                delta[j] += (int(bool(pago.get(campo, False))) - int(bool(anterior.get(campo, False)))) * bit
+        else:
+            detalle.update(_flags_detalle(pago))
+
+        clausulas.append((
+            f'pagos.#p{i}.#r{k} = :d{k}',
+            {f'#p{i}': participante_id, f'#r{k}': ronda},
+            {f':d{k}': detalle}
+        ))
+
+    for n, ((participante_id, bloque), delta) in enumerate(deltas.items()):
+        i = indices[participante_id]
+        for mapa, sufijo, valor in (('pagados', 'p', delta[0]), ('exentos', 'e', delta[1])):
+            if valor:
+                clausulas.append((
+                    f'{mapa}.#p{i}.#b{n} = if_not_exists({mapa}.#p{i}.#b{n}, :cero) + :d{sufijo}{n}',
+                    {f'#p{i}': participante_id, f'#b{n}': bloque},
+                    {':cero': 0, f':d{sufijo}{n}': Decimal(valor)}
+                ))
+
+    for set_exprs, names, values in agrupar_clausulas(clausulas):
+        if _aplicar(tanda_id, set_exprs, values, names) != 'aplicada':
+            break
+
+    incrementar_version_tanda(tanda_id, pagos=True)
+
+
+# ========================================
+# Reconciliación
+# ========================================
+def rondas_bitmap(bits):
+    """Rondas (1-indexadas) con el bit encendido"""
+    return [posicion + 1 for posicion in range(bits.bit_length()) if bits >> posicion & 1]
+
+
+def _normalizar(campo, valores):
+    """Contenido comparable de un campo de la vista, sin participantes vacíos"""
+    if campo in ('pagados', 'exentos'):
+        valores = {pid: rondas_bitmap(bitmap_participante(bits)) for pid, bits in valores.items()}
+    return {pid: valor for pid, valor in valores.items() if valor}
+
+
+def diferencias_vista(guardada, calculada):
+    """
+    Compara la vista guardada contra la construida desde las tablas fuente.
+
+    Returns:
+        dict: {'totalParticipantes': {'guardado': x, 'calculado': y}} y, para
+        participantes, pagados, exentos y pagos, {participanteId: {...}}
+        de cada participante con diferencias (los bitmaps como lista de rondas)
+    """
+    drift = {}
+    total_guardado = int(guardada.get('totalParticipantes', 0))
+    if total_guardado != calculada['totalParticipantes']:
+        drift['totalParticipantes'] = {'guardado': total_guardado, 'calculado': calculada['totalParticipantes']}
+
+    for campo in ('participantes', 'pagados', 'exentos', 'pagos'):
+        antes = _normalizar(campo, guardada.get(campo) or {})
+        despues = _normalizar(campo, calculada[campo])
+        distintos = {
+            pid: {'guardado': antes.get(pid), 'calculado': despues.get(pid)}
+            for pid in sorted(set(antes) | set(despues))
+            if antes.get(pid) != despues.get(pid)
+        }
+        if distintos:
+            drift[campo] = distintos
+
+    return drift
+
+
+def reconciliar_vista(tanda_id, corregir=True):
+    """
+    Reconstruye la vista de una tanda en memoria y la compara con la
+    guardada. Con corregir=True la reemplaza si hay diferencias, siempre
+    que ninguna escritura la haya cambiado mientras tanto.
+
+    Returns:
+        dict: tandaId, estado ('ok' | 'drift' | 'sin_item') y drift
+    """
+    guardada = vista_table.get_item(Key={'tandaId': tanda_id}, ConsistentRead=True).get('Item')
+    fuentes = _leer_fuentes(tanda_id) if guardada else None
+    if not fuentes:
+        # Sin vista se construye en la primera lectura; sin tanda la borra
+        # la siguiente reconstrucción. Ninguno es drift
+        return {'tandaId': tanda_id, 'estado': 'sin_item', 'drift': {}}
+
+    calculada = construir_vista(*fuentes)
+    drift = diferencias_vista(guardada, calculada)
+    resultado = {'tandaId': tanda_id, 'estado': 'drift' if drift else 'ok', 'drift': drift}
+    if not drift or not corregir:
+        return resultado
+
+    try:
+        _escribir_vista(tanda_id, calculada, guardada.get('version'))
+        resultado['corregido'] = True
+    except ClientError as e:
+        if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+            raise
+        # Una escritura se aplicó durante la reconciliación: el drift pudo
+        # ser sólo esa escritura, se revisa en la siguiente corrida
+        resultado['corregido'] = False
+    return resultado
+
+
+def reconciliar_vistas(tanda_ids=None, corregir=True):
+    """
+    Reconciliación de las vistas de todas las tandas (o de las indicadas).
+
+    Returns:
+        dict: revisadas, conDrift, corregidas, errores y el detalle de
+        cada tanda con drift
+    """
+    if tanda_ids is None:
+        tanda_ids = [t['id'] for t in _scan_tandas()]
+
+    reporte = {'revisadas': 0, 'conDrift': 0, 'corregidas': 0, 'errores': 0, 'drift': []}
+    for tanda_id in tanda_ids:
+        try:
+            resultado = reconciliar_vista(tanda_id, corregir=corregir)
+        except Exception as e:
+            print(f"❌ Error reconciliando vista de tanda {tanda_id}: {e}")
+            reporte['errores'] += 1
+            continue
+
+        reporte['revisadas'] += 1
+        if resultado['estado'] == 'drift':
+            reporte['conDrift'] += 1
+            if resultado.get('corregido'):
+                reporte['corregidas'] += 1
+            reporte['drift'].append(resultado)
+            print(f"⚠️ Drift en vista de tanda {tanda_id}: {resultado['drift']}")
+
+    print(f"🔄 Reconciliación de vistas: {reporte['revisadas']} revisadas, "
+          f"{reporte['conDrift']} con drift, {reporte['corregidas']} corregidas, {reporte['errores']} errores")
+    return reporte
+
+
+def _scan_tandas():
+    kwargs = {'ProjectionExpression': 'id'}
+    while True:
+        response = _tandas_table.scan(**kwargs)
+        yield from response.get('Items', [])
+        if 'LastEvaluatedKey' not in response:
+            return
+        kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
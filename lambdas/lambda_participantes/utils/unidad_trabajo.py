@@ -0,0 +1,112 @@
+# ========================================
+# utils/unidad_trabajo.py
+# Cache de lecturas por invocación ("unit of work")
+#
+# TablaCacheada envuelve un dynamodb.Table: get_item y query se memorizan
+# por sus parámetros durante la invocación, y cualquier escritura sobre la
+# tabla descarta lo memorizado de esa tabla. @unidad_de_trabajo en el
+# lambda_handler vacía los caches al inicio de cada invocación (las tablas
+# viven a nivel módulo y sobreviven entre invocaciones calientes) y al
+# final registra hits/misses.
+#
+# Sólo ve lo que pasa por la tabla envuelta: un módulo que escribe con su
+# propio objeto Table (p. ej. utils.tanda_vista sobre tandas) debe llamar
+# invalidar_tabla(nombre) después de escribir.
+# ========================================
+
+import copy
+import threading
+from functools import wraps
+from boto3.dynamodb.conditions import ConditionBase, AttributeBase
+
+_tablas = []
+
+METODOS_ESCRITURA = ('put_item', 'update_item', 'delete_item', 'batch_writer')
+
+
+def _congelar(valor):
+    """Convierte parámetros de boto3 (incluyendo Key()/Attr()) en una llave hashable"""
+    if isinstance(valor, ConditionBase):
+        expresion = valor.get_expression()
+        return ('cond', expresion['operator'], tuple(_congelar(v) for v in expresion['values']))
+    if isinstance(valor, AttributeBase):
+        return ('attr', type(valor).__name__, valor.name)
+    if isinstance(valor, dict):
+        return tuple(sorted((k, _congelar(v)) for k, v in valor.items()))
+    if isinstance(valor, (list, tuple)):
+        return tuple(_congelar(v) for v in valor)
+    if isinstance(valor, set):
+        return ('set', tuple(sorted(repr(v) for v in valor)))
+    return valor
+
+
+class TablaCacheada:
+    def __init__(self, table):
+        self._table = table
+        self._cache = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        _tablas.append(self)
+
+    def _leer(self, operacion, kwargs):
+        llave = (operacion, _congelar(kwargs))
+        with self._lock:
+            if llave in self._cache:
+                self.hits += 1
+                return copy.deepcopy(self._cache[llave])
+            self.misses += 1
+
+        resultado = getattr(self._table, operacion)(**kwargs)
+
+        with self._lock:
+            self._cache[llave] = resultado
+        return copy.deepcopy(resultado)
+
+    def get_item(self, **kwargs):
+        return self._leer('get_item', kwargs)
+
+    def query(self, **kwargs):
+        return self._leer('query', kwargs)
+
+    def invalidar(self):
+        with self._lock:
+            self._cache.clear()
+
+    def reiniciar(self):
+        with self._lock:
+            self._cache.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __getattr__(self, nombre):
+        atributo = getattr(self._table, nombre)
+        # Escrituras directas, o a través del cliente (meta.client.batch_write_item...)
+        if nombre in METODOS_ESCRITURA or nombre == 'meta':
+            self.invalidar()
+        return atributo
+
+
+def invalidar_tabla(nombre):
+    """Descarta lo memorizado de la tabla `nombre` tras una escritura hecha con otro objeto Table"""
+    for tabla in _tablas:
+        if tabla._table.name == nombre:
+            tabla.invalidar()
+
+
+def unidad_de_trabajo(handler):
+    """Decorador para lambda_handler: cache limpio por invocación y métricas al final"""
+    @wraps(handler)
+    def envoltura(event, context):
+        for tabla in _tablas:
+            tabla.reiniciar()
+        try:
+            return handler(event, context)
+        finally:
+            resumen = ', '.join(
+                f"{t._table.name}={t.hits}/{t.hits + t.misses}"
+                for t in _tablas if t.hits or t.misses
+            )
+            if resumen:
+                print(f"🗃️ Cache de lecturas (hits/lecturas): {resumen}")
+    return envoltura
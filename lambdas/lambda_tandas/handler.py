@@ -6,10 +6,10 @@
 import json
 import boto3
 import os
-import jwt
 from datetime import datetime, timedelta, timezone, date
 from decimal import Decimal
-from boto3.dynamodb.conditions import Key
+from boto3.dynamodb.conditions import Key, Attr
+from botocore.config import Config
 import uuid
 import calendar
 
@@ -18,15 +18,32 @@ import calendar
 from exception.custom_http_exception import CustomError
 from exception.custom_http_exception import CustomClientError
 
-dynamodb = boto3.resource('dynamodb')
-tandas_table = dynamodb.Table(os.environ['TANDAS_TABLE'])
-usuarios_table = dynamodb.Table(os.environ['USUARIOS_TABLE'])
-participantes_table = dynamodb.Table(os.environ['PARTICIPANTES_TABLE'])
-pagos_table = dynamodb.Table(os.environ['PAGOS_TABLE'])
-notificaciones_table = dynamodb.Table('notificaciones')
-LINKS_TABLE = 'links_registro'
+from utils.dynamo_utils import query_all, delete_by_query, codificar_cursor, decodificar_cursor
+from utils.fan_out import fan_out, MAX_POOL_CONNECTIONS, FAN_OUT_TIMEOUT
+from utils.tanda_vista import obtener_vista, expandir_vista, crear_vista, actualizar_tanda_vista, eliminar_vista
+from utils.pagos_agregados import eliminar_agregados
+from utils.calendario_rondas import calendario_para_guardar
+from utils.etag import etag_tanda, no_modificado, etag_headers, respuesta_no_modificada
+from utils.registro_snapshot import (
+    datos_publicos, publicar_snapshot_link, publicar_snapshots_tanda,
+    eliminar_snapshots_tanda, purgar_snapshots_expirados
+)
+from utils.identity import extract_user_id
+from utils.unidad_trabajo import TablaCacheada, unidad_de_trabajo
 
-JWT_SECRET = os.environ['JWT_SECRET']
+dynamodb = boto3.resource('dynamodb', config=Config(
+    max_pool_connections=MAX_POOL_CONNECTIONS,
+    read_timeout=FAN_OUT_TIMEOUT,
+    retries={'max_attempts': 3, 'mode': 'standard'}
+))
+tandas_table = TablaCacheada(dynamodb.Table(os.environ['TANDAS_TABLE']))
+usuarios_table = TablaCacheada(dynamodb.Table(os.environ['USUARIOS_TABLE']))
+participantes_table = TablaCacheada(dynamodb.Table(os.environ['PARTICIPANTES_TABLE']))
+pagos_table = TablaCacheada(dynamodb.Table(os.environ['PAGOS_TABLE']))
+notificaciones_table = TablaCacheada(dynamodb.Table('notificaciones'))
+slots_table = TablaCacheada(dynamodb.Table(os.environ['SLOTS_TABLE']))
+LINKS_TABLE = 'links_registro'
+LINKS_EXPIRACION_INDEX = 'tandaId-expiracion-index'
 
 # Utilidades
 def cors_headers():
@@ -42,10 +59,10 @@ def decimal_default(obj):
         return float(obj)
     raise TypeError
 
-def response(status_code, body):
+def response(status_code, body, headers=None):
     return {
         'statusCode': status_code,
-        'headers': cors_headers(),
+        'headers': {**cors_headers(), **(headers or {})},
         'body': json.dumps(body, cls=DecimalEncoder)
     }
 
@@ -75,19 +92,6 @@ def calcular_fecha_inicio(fecha_str: str) -> str:
 
     return fecha_inicio.isoformat()
 
-def extract_user_id(event):
-    """Extrae el userId del token JWT"""
-    try:
-        auth_header = event['headers'].get('Authorization') or event['headers'].get('authorization')
-        if not auth_header:
-            return None
-        
-        token = auth_header.replace('Bearer ', '')
-        payload = jwt.decode(token, JWT_SECRET, algorithms=['HS256'])
-        return payload['id']
-    except:
-        return None
-
 def generate_short_id():
     """Genera un ID corto único"""
     import random
@@ -98,31 +102,16 @@ def eliminar_participantes(tanda_id):
     """Elimina todos los participantes de una tanda"""
     try:
         print(f"🔄 Eliminando participantes de tanda: {tanda_id}")
-        
-        # Buscar todos los participantes
-        resultado = participantes_table.query(
+
+        count = delete_by_query(
+            participantes_table,
+            ['id', 'participanteId'],
             KeyConditionExpression=Key('id').eq(tanda_id)
         )
-        
-        participantes = resultado.get('Items', [])
-        count = len(participantes)
-        
-        if count == 0:
-            print(f"✓ No hay participantes que eliminar")
-            return 0
-        
-        # Eliminar cada participante
-        for participante in participantes:
-            participantes_table.delete_item(
-                Key={
-                    'id': tanda_id,
-                    'participanteId': participante['participanteId']
-                }
-            )
-        
+
         print(f"✓ {count} participantes eliminados")
         return count
-        
+
     except Exception as e:
         print(f"❌ Error eliminando participantes: {str(e)}")
         raise
@@ -132,31 +121,16 @@ def eliminar_pagos(tanda_id):
     """Elimina todos los pagos de una tanda"""
     try:
         print(f"🔄 Eliminando pagos de tanda: {tanda_id}")
-        
-        # Buscar todos los pagos
-        resultado = pagos_table.query(
+
+        count = delete_by_query(
+            pagos_table,
+            ['id', 'pagoId'],
             KeyConditionExpression=Key('id').eq(tanda_id)
         )
-        
-        pagos = resultado.get('Items', [])
-        count = len(pagos)
-        
-        if count == 0:
-            print(f"✓ No hay pagos que eliminar")
-            return 0
-        
-        # Eliminar cada pago
-        for pago in pagos:
-            pagos_table.delete_item(
-                Key={
-                    'id': tanda_id,
-                    'pagoId': pago['pagoId']
-                }
-            )
-        
+
         print(f"✓ {count} pagos eliminados")
         return count
-        
+
     except Exception as e:
         print(f"❌ Error eliminando pagos: {str(e)}")
         raise
@@ -166,35 +140,55 @@ def eliminar_notificaciones(tanda_id):
     """Elimina todas las notificaciones de una tanda"""
     try:
         print(f"🔄 Eliminando notificaciones de tanda: {tanda_id}")
-        
-        # Buscar todas las notificaciones
-        resultado = notificaciones_table.query(
+
+        count = delete_by_query(
+            notificaciones_table,
+            ['id'],
             KeyConditionExpression=Key('id').eq(tanda_id)
         )
-        
-        notificaciones = resultado.get('Items', [])
-        count = len(notificaciones)
-        
-        if count == 0:
-            print(f"✓ No hay notificaciones que eliminar")
-            return 0
-        
-        # Eliminar cada notificación
-        for notificacion in notificaciones:
-            notificaciones_table.delete_item(
-                Key={
-                    'id': tanda_id
-                }
-            )
-        
+
         print(f"✓ {count} notificaciones eliminadas")
         return count
-        
+
     except Exception as e:
         print(f"❌ Error eliminando notificaciones: {str(e)}")
         raise
 
 
+def eliminar_slots(tanda_id):
+    """Libera todos los números reservados de una tanda"""
+    try:
+        print(f"🔄 Eliminando slots de tanda: {tanda_id}")
+
+        count = delete_by_query(
+            slots_table,
+            ['tandaId', 'numero'],
+            KeyConditionExpression=Key('tandaId').eq(tanda_id)
+        )
+
+        print(f"✓ {count} slots eliminados")
+        return count
+
+    except Exception as e:
+        print(f"❌ Error eliminando slots: {str(e)}")
+        raise
+
+
+# Tablas hijas que se purgan en paralelo al eliminar una tanda
+ELIMINADORES_DEPENDENCIAS = {
+    'participantes': eliminar_participantes,
+    'pagos': eliminar_pagos,
+    'notificaciones': eliminar_notificaciones,
+    'slots': eliminar_slots,
+}
+
+# Plazo total para purgar las dependencias. Una purga que siga corriendo
+# al vencer se espera (fan_out con esperar_pendientes) para no reportar
+# como fallida una tabla que sí se terminó de purgar; el margen hasta el
+# timeout de 30 s de la Lambda es para esa espera.
+ELIMINAR_DEPENDENCIAS_TIMEOUT = 20
+
+
 def actualizar_usuario_admin(user_id, tanda_id):
     """Elimina la referencia de la tanda del array de tandas del usuario"""
     try:
@@ -305,6 +299,7 @@ def crear(event, context):
             'montoPorRonda': Decimal(str(body['montoPorRonda'])),
             'totalRondas': int(body['totalRondas']),
             'rondaActual': 1,
+            'totalParticipantes': 0,
             'fechaInicio': fechaInico,
             'adminId': user_id,
             'configuracion': body.get('configuracion', {
@@ -319,10 +314,13 @@ def crear(event, context):
             'metodoPago': body['metodoPago'],
             'diasLimitePago': int(body['diasLimitePago']) if body.get('diasLimitePago') else 5,
         }
+        # Fechas de todas las rondas, para que los lectores no las recalculen
+        tanda.update(calendario_para_guardar(tanda))
         print(f'tanda a crear: {tanda}')
         
         # Guardar en DynamoDB
         tandas_table.put_item(Item=tanda)
+        crear_vista(tanda)
         
         # Actualizar lista de tandas del usuario
         usuarios_table.update_item(
@@ -361,12 +359,14 @@ def crear(event, context):
 def obtener(event, context):
     try:
         tanda_id = event['pathParameters']['tandaId']
-        
-        # Obtener tanda
-        result = tandas_table.get_item(Key={'id': tanda_id})
-        print(f'result: {result}')
-        
-        if not result.get('Item'):
+
+        # Lectura barata de la versión para el GET condicional
+        meta = tandas_table.get_item(
+            Key={'id': tanda_id},
+            ProjectionExpression='id, version'
+        ).get('Item')
+
+        if not meta:
             return response(404, {
                 'success': False,
                 'error': {
@@ -374,55 +374,31 @@ def obtener(event, context):
                     'message': 'Tanda no encontrada'
                 }
             })
-        
-        tanda = result['Item']
-        
-        # Obtener participantes
-        participantes_result = participantes_table.query(
-            KeyConditionExpression='id = :tandaId',
-            ExpressionAttributeValues={':tandaId': tanda_id}
-        )
-        
-        participantes = participantes_result.get('Items', [])
-        
-        # 3. Para cada participante, obtener sus pagos
-        for participante in participantes:
-            participante_id = participante['participanteId']
-            
-            # Consultar pagos del participante
-            pagos_response = pagos_table.query(
-                            KeyConditionExpression=
-                                Key('id').eq(tanda_id) &
-                                Key('pagoId').begins_with(participante_id)
-                        )
-            
-            # Estructurar pagos por ronda
-            pagos_por_ronda = {}
-            for pago in pagos_response.get('Items', []):
-                ronda = str(pago['ronda'])  # Convertir a string
-                pagos_por_ronda[ronda] = {
-                    'pagado': pago.get('pagado', False),
-                    'fechaPago': pago.get('fechaPago', ''),
-                    'monto': float(pago.get('monto', 0)),
-                    'exentoPago': pago.get('exentoPago',False),
-                    'metodoPago': pago.get('metodoPago'),
-                    'notas': pago.get('notas')
+
+        etag = etag_tanda(meta)
+        if no_modificado(event, etag):
+            return respuesta_no_modificada(cors_headers(), etag)
+
+        # Una sola lectura: la vista materializada de la tanda
+        # (se reconstruye desde las tablas fuente si no existe)
+        vista = obtener_vista(tanda_id)
+
+        if not vista:
+            return response(404, {
+                'success': False,
+                'error': {
+                    'code': 'TANDA_NOT_FOUND',
+                    'message': 'Tanda no encontrada'
                 }
-            
-            # Agregar pagos al participante
-            participante['pagos'] = pagos_por_ronda
-        
-        # 4. Agregar participantes a tanda
-        tanda['participantes'] = participantes
-        tanda['tandaId']=tanda_id
-        
-        return {
-            'statusCode': 200,
-            'body': json.dumps({
-                'success': True,
-                'data': tanda
-            }, cls=DecimalEncoder)
-        }
+            })
+
+        tanda = expandir_vista(vista)
+        tanda['version'] = meta.get('version', 0)
+
+        return response(200, {
+            'success': True,
+            'data': tanda
+        }, etag_headers(etag))
         
     except Exception as e:
         print(f"Error en obtener tanda: {str(e)}")
@@ -489,12 +465,26 @@ def actualizar(event, context):
             update_expression += ", diasLimitePago = :diasLimitePago"
             expression_values[':diasLimitePago'] = int(body['diasLimitePago']) if body['diasLimitePago'] else 5
 
+        # Regenerar el calendario de rondas si cambió alguno de sus parámetros
+        # (o la tanda es anterior al calendario)
+        calendario = calendario_para_guardar({
+            **tanda['Item'],
+            **{campo: expression_values[f':{campo}'] for campo in ('fechaInicio', 'totalRondas', 'diasLimitePago') if campo in body}
+        })
+        if calendario and calendario['calendarioClave'] != tanda['Item'].get('calendarioClave'):
+            update_expression += ", calendarioRondas = :calendarioRondas, calendarioClave = :calendarioClave"
+            expression_values[':calendarioRondas'] = calendario['calendarioRondas']
+            expression_values[':calendarioClave'] = calendario['calendarioClave']
+
         # Actualizar
-        tandas_table.update_item(
+        actualizada = tandas_table.update_item(
             Key={'id': tanda_id},
             UpdateExpression=update_expression,
-            ExpressionAttributeValues=expression_values
+            ExpressionAttributeValues=expression_values,
+            ReturnValues='ALL_NEW'
         )
+        actualizar_tanda_vista(actualizada['Attributes'])
+        publicar_snapshots_tanda(tanda_id)
         
         return response(200, {
             'success': True,
@@ -515,6 +505,14 @@ def actualizar(event, context):
 # ========================================
 # HANDLER: LISTAR TANDAS
 # ========================================
+LISTAR_LIMITE_MAXIMO = 100
+
+# Atributos que se leen del GSI en view=summary
+CAMPOS_RESUMEN = [
+    'id', 'adminId', 'nombre', 'montoPorRonda', 'totalRondas', 'rondaActual',
+    'fechaInicio', 'frecuencia', 'status', 'totalParticipantes'
+]
+
 def listar(event, context):
     try:
         user_id = extract_user_id(event)
@@ -527,70 +525,136 @@ def listar(event, context):
                 }
             })
 
-        # 1️⃣ Obtener tandas del admin
-        result = tandas_table.query(
-            IndexName='adminId-index',
-            KeyConditionExpression='adminId = :adminId',
-            ExpressionAttributeValues={':adminId': user_id}
-        )
+        query_params = event.get('queryStringParameters') or {}
+        vista = query_params.get('view', 'full')
+        if vista not in ('full', 'summary'):
+            return response(400, {
+                'success': False,
+                'error': {
+                    'code': 'INVALID_VIEW',
+                    'message': 'view debe ser full o summary'
+                }
+            })
 
-        tandas_items = result.get('Items', [])
-        tandas_response = []
+        limite = None
+        if query_params.get('limit'):
+            try:
+                limite = int(query_params['limit'])
+            except ValueError:
+                limite = 0
+            if not 1 <= limite <= LISTAR_LIMITE_MAXIMO:
+                return response(400, {
+                    'success': False,
+                    'error': {
+                        'code': 'INVALID_LIMIT',
+                        'message': f'limit debe estar entre 1 y {LISTAR_LIMITE_MAXIMO}'
+                    }
+                })
+
+        query_kwargs = {
+            'IndexName': 'adminId-index',
+            'KeyConditionExpression': Key('adminId').eq(user_id)
+        }
+        if vista == 'summary':
+            query_kwargs['ProjectionExpression'] = ', '.join(f'#c{i}' for i in range(len(CAMPOS_RESUMEN)))
+            query_kwargs['ExpressionAttributeNames'] = {f'#c{i}': campo for i, campo in enumerate(CAMPOS_RESUMEN)}
 
-        # 2️⃣ Para cada tanda, obtener participantes
+        if query_params.get('nextToken'):
+            try:
+                inicio = decodificar_cursor(query_params['nextToken'])
+            except ValueError:
+                inicio = None
+            # El cursor sólo puede continuar el listado del mismo admin
+            if not inicio or inicio.get('adminId') != user_id:
+                return response(400, {
+                    'success': False,
+                    'error': {
+                        'code': 'INVALID_NEXT_TOKEN',
+                        'message': 'nextToken inválido'
+                    }
+                })
+            query_kwargs['ExclusiveStartKey'] = inicio
+
+        # 1️⃣ Obtener tandas del admin: una página del GSI si se pidió
+        # limit, o el GSI completo (comportamiento original) si no
+        next_token = None
+        if limite:
+            resultado = tandas_table.query(Limit=limite, **query_kwargs)
+            tandas_items = resultado.get('Items', [])
+            next_token = codificar_cursor(resultado.get('LastEvaluatedKey'))
+        else:
+            tandas_items = query_all(tandas_table, **query_kwargs)
+
+        tandas_validas = []
         for tanda in tandas_items:
-            tanda_id = tanda.get('id')
-            if not tanda_id:
+            if not tanda.get('id'):
                 print(f"⚠️ Tanda sin 'id', saltando: {tanda}")
                 continue
+            tandas_validas.append(tanda)
 
-            try:
-                participantes_result = participantes_table.query(
-                    KeyConditionExpression='id = :tandaId',
-                    ExpressionAttributeValues={':tandaId': tanda_id}
-                )
+        if vista == 'summary':
+            return listar_resumen(tandas_validas, next_token)
 
-                participantes = []
-                for p in participantes_result.get('Items', []):
-                    num_asignado = p.get('numeroAsignado', 0)
-                    participantes.append({
-                        'participanteId': p.get('participanteId', ''),
-                        'nombre': p.get('nombre', ''),
-                        'telefono': p.get('telefono'),
-                        'email': p.get('email'),
-                        'numeroAsignado': num_asignado,
-                        'fechaCumpleaños': p.get('fechaCumpleaños', ''),
-                        'fechaRegistro': p.get('fechaRegistro', '')
-                    })
-
-                tandas_response.append({
-                    'tandaId': tanda_id,
-                    'nombre': tanda.get('nombre', ''),
-                    'montoPorRonda': tanda.get('montoPorRonda', 0),
-                    'totalRondas': tanda.get('totalRondas', 0),
-                    'rondaActual': tanda.get('rondaActual', 1),
-                    'fechaInicio': tanda.get('fechaInicio', ''),
-                    'frecuencia': tanda.get('frecuencia'),
-                    'diasRecordatorio': tanda.get('diasRecordatorio'),
-                    'metodoPago': tanda.get('metodoPago'),
-                    'diasLimitePago': int(tanda.get('diasLimitePago', 5)),
-                    'status': tanda.get('status', 'activa'),
-                    'participantes': sorted(
-                        participantes,
-                        key=lambda x: x['numeroAsignado']
-                    )
-                })
-            except Exception as tanda_err:
-                import traceback
-                print(f"❌ Error procesando tanda {tanda_id}: {str(tanda_err)}")
-                print(traceback.format_exc())
+        # 2️⃣ Obtener participantes de todas las tandas en paralelo
+        participantes_por_tanda, errores = fan_out(
+            lambda tanda_id: query_all(
+                participantes_table,
+                KeyConditionExpression=Key('id').eq(tanda_id)
+            ),
+            [tanda['id'] for tanda in tandas_validas]
+        )
+
+        tandas_response = []
+        for tanda in tandas_validas:
+            tanda_id = tanda['id']
+
+            if tanda_id in errores:
                 # Continúa con las demás tandas en lugar de romper todo
+                print(f"❌ Error procesando tanda {tanda_id}: {errores[tanda_id]}")
                 continue
 
+            participantes = []
+            for p in participantes_por_tanda[tanda_id]:
+                num_asignado = p.get('numeroAsignado', 0)
+                participantes.append({
+                    'participanteId': p.get('participanteId', ''),
+                    'nombre': p.get('nombre', ''),
+                    'telefono': p.get('telefono'),
+                    'email': p.get('email'),
+                    'numeroAsignado': num_asignado,
+                    'fechaCumpleaños': p.get('fechaCumpleaños', ''),
+                    'fechaRegistro': p.get('fechaRegistro', '')
+                })
+
+            tandas_response.append({
+                'tandaId': tanda_id,
+                'nombre': tanda.get('nombre', ''),
+                'montoPorRonda': tanda.get('montoPorRonda', 0),
+                'totalRondas': tanda.get('totalRondas', 0),
+                'rondaActual': tanda.get('rondaActual', 1),
+                'fechaInicio': tanda.get('fechaInicio', ''),
+                'frecuencia': tanda.get('frecuencia'),
+                'diasRecordatorio': tanda.get('diasRecordatorio'),
+                'metodoPago': tanda.get('metodoPago'),
+                'diasLimitePago': int(tanda.get('diasLimitePago', 5)),
+                'calendarioRondas': tanda.get('calendarioRondas', []),
+                'status': tanda.get('status', 'activa'),
+                'participantes': sorted(
+                    participantes,
+                    key=lambda x: x['numeroAsignado']
+                )
+            })
+
         return response(200, {
             'success': True,
             'data': {
-                'tandas': tandas_response
+                'tandas': tandas_response,
+                # Tandas cuyo roster no se pudo leer (falla parcial)
+                'tandasConError': [
+                    {'tandaId': tanda_id, 'error': error}
+                    for tanda_id, error in errores.items()
+                ],
+                'nextToken': next_token
             }
         })
 
@@ -608,6 +672,51 @@ def listar(event, context):
 
 
 
+def listar_resumen(tandas, next_token):
+    """
+    Respuesta de GET /tandas?view=summary: sólo lo que necesita la lista
+    de inicio, sin leer participantes (el total viene en el item de la tanda).
+    """
+    # Tandas creadas antes del contador: se cuenta su partición (COUNT)
+    sin_contador = [t['id'] for t in tandas if 'totalParticipantes' not in t]
+    conteos, errores = fan_out(
+        lambda tanda_id: participantes_table.query(
+            KeyConditionExpression=Key('id').eq(tanda_id),
+            Select='COUNT'
+        )['Count'],
+        sin_contador
+    )
+
+    tandas_response = []
+    for tanda in tandas:
+        tanda_id = tanda['id']
+        total = tanda['totalParticipantes'] if 'totalParticipantes' in tanda else conteos.get(tanda_id)
+
+        tandas_response.append({
+            'tandaId': tanda_id,
+            'nombre': tanda.get('nombre', ''),
+            'montoPorRonda': tanda.get('montoPorRonda', 0),
+            'totalRondas': tanda.get('totalRondas', 0),
+            'rondaActual': tanda.get('rondaActual', 1),
+            'fechaInicio': tanda.get('fechaInicio', ''),
+            'frecuencia': tanda.get('frecuencia'),
+            'status': tanda.get('status', 'activa'),
+            'totalParticipantes': total
+        })
+
+    return response(200, {
+        'success': True,
+        'data': {
+            'tandas': tandas_response,
+            'tandasConError': [
+                {'tandaId': tanda_id, 'error': error}
+                for tanda_id, error in errores.items()
+            ],
+            'nextToken': next_token
+        }
+    })
+
+
 # ========================================
 # HANDLER: ELIMINAR TANDA
 # ========================================
@@ -667,55 +776,30 @@ def obtener_link_vigente(event, context):
         # Tabla
         links_table = dynamodb.Table(LINKS_TABLE)
         
-        # Buscar links de esta tanda
-        response = links_table.query(
-            IndexName='tandaId-index',
-            KeyConditionExpression='tandaId = :tandaId',
-            FilterExpression='userId = :userId',
-            ExpressionAttributeValues={
-                ':tandaId': tanda_id,
-                ':userId': user_id
-            }
-        )
-        
-        print(f'link disponibles: {response}')
-        
-        links = response.get('Items', [])
-        
-        if not links:
-            return {
-                'statusCode': 404,
-                'headers': {
-                    'Access-Control-Allow-Origin': '*',
-                    'Content-Type': 'application/json'
-                },
-                'body': json.dumps({
-                    'success': False,
-                    'error': {
-                        'message': 'No hay links activos para esta tanda'
-                    }
-                })
-            }
+        # El índice ordena los links de la tanda por expiración (epoch):
+        # el primero en orden descendente que no ha expirado y pertenece
+        # al usuario es el vigente. El filtro se aplica después del Limit,
+        # por eso se sigue paginando mientras la página venga vacía.
+        ahora = int(datetime.now(timezone.utc).timestamp())
+        query_kwargs = {
+            'IndexName': LINKS_EXPIRACION_INDEX,
+            'KeyConditionExpression': Key('tandaId').eq(tanda_id) & Key('expiracion').gt(ahora),
+            'FilterExpression': Attr('userId').eq(user_id) & (Attr('activo').not_exists() | Attr('activo').eq(True)),
+            'ScanIndexForward': False,
+            'Limit': 1
+        }
         
-        # Verificar si algún link no ha expirado
-        ahora = datetime.now(timezone.utc)
         link_vigente = None
-        
-        for link in links:
-            expiracion_raw = link['expiracion']
-            if isinstance(expiracion_raw, Decimal):
-                # Asumimos epoch (segundos)
-                expiracion = datetime.fromtimestamp(float(expiracion_raw), tz=timezone.utc)
-            elif isinstance(expiracion_raw, str):
-                expiracion = datetime.fromisoformat(
-                    expiracion_raw.replace('Z', '+00:00')
-                )
-            else:
-                continue
-            
-            if expiracion > ahora:
-                link_vigente = link
+        while True:
+            resultado = links_table.query(**query_kwargs)
+            if resultado.get('Items'):
+                link_vigente = resultado['Items'][0]
+                break
+            if 'LastEvaluatedKey' not in resultado:
                 break
+            query_kwargs['ExclusiveStartKey'] = resultado['LastEvaluatedKey']
+        
+        print(f'link vigente: {link_vigente}')
         
         if not link_vigente:
             return {
@@ -835,20 +919,41 @@ def eliminar_tanda_con_dependencias(event,context):
             'usuario': False
         }
         
-        # Paso 1: Eliminar participantes
-        estadisticas['participantes'] = eliminar_participantes(tanda_id)
-        
-        # Paso 2: Eliminar pagos
-        estadisticas['pagos'] = eliminar_pagos(tanda_id)
-        
-        # Paso 3: Eliminar notificaciones
-        estadisticas['notificaciones'] = eliminar_notificaciones(tanda_id)
+        # Pasos 1-3: Purgar participantes, pagos y notificaciones en paralelo
+        conteos, errores = fan_out(
+            lambda tabla: ELIMINADORES_DEPENDENCIAS[tabla](tanda_id),
+            list(ELIMINADORES_DEPENDENCIAS),
+            timeout=ELIMINAR_DEPENDENCIAS_TIMEOUT,
+            esperar_pendientes=True
+        )
+        estadisticas.update(conteos)
+
+        if errores:
+            # La tanda se conserva para poder reintentar sin dejar huérfanos
+            print(f"❌ Error purgando dependencias: {errores}")
+            return response(500, {
+                'success': False,
+                'error': {'message': 'No se pudieron eliminar todas las dependencias de la tanda'},
+                'data': {
+                    'tandaId': tanda_id,
+                    'estadisticas': estadisticas,
+                    'errores': errores
+                }
+            })
         
         # Paso 4: Actualizar usuario_admin
         estadisticas['usuario'] = actualizar_usuario_admin(user_id, tanda_id)
         
         # Paso 5: Eliminar tanda
         estadisticas['tanda'] = eliminar_tanda(tanda_id)
+        eliminar_vista(tanda_id)
+        eliminar_agregados(tanda_id)
+        
+        # Páginas públicas de registro (snapshots en S3)
+        try:
+            eliminar_snapshots_tanda(tanda_id)
+        except Exception as e:
+            print(f"⚠️ Error eliminando snapshots de registro: {str(e)}")
         
         print("\n" + "="*50)
         print("✅ PROCESO COMPLETADO")
@@ -986,36 +1091,13 @@ def obtener_datos_registro(event, context):
         tanda = response['Item']
         
         # Obtener participantes de la tabla participantes
-        response = participantes_table.query(
-            KeyConditionExpression='id = :tandaId',
-            ExpressionAttributeValues={
-                ':tandaId': link['tandaId']
-            }
+        participantes = query_all(
+            participantes_table,
+            KeyConditionExpression=Key('id').eq(link['tandaId'])
         )
         
-        participantes = response.get('Items', [])
-        
-        # Preparar lista simplificada de participantes (solo número asignado)
-        participantes_publicos = [
-            {
-                'numeroAsignado': int(p.get('numeroAsignado', 0)),
-                'nombre': p.get('nombre', '')
-            }
-            for p in participantes
-        ]
-        
-        # Preparar datos para respuesta (sin información sensible)
-        datos_publicos = {
-            'tandaId': tanda['id'],
-            'nombre': tanda.get('nombre', ''),
-            'montoPorRonda': float(tanda.get('montoPorRonda', 0)),
-            'totalRondas': int(tanda.get('totalRondas', 0)),
-            'frecuencia': tanda.get('frecuencia', 'semanal'),
-            'fechaInicio': tanda.get('fechaInicio', ''),
-            'participantes': tanda.get('participantes', []),
-            'participantes': participantes_publicos,
-            'expiracion': link.get('expiracion', '') 
-        }
+        # Mismo payload que el snapshot estático (registro/{token}.json)
+        datos = datos_publicos(tanda, participantes, link)
         
         return {
             'statusCode': 200,
@@ -1025,7 +1107,7 @@ def obtener_datos_registro(event, context):
             },
             'body': json.dumps({
                 'success': True,
-                'data': datos_publicos
+                'data': datos
             }, default=decimal_default)
         }
         
@@ -1126,21 +1208,23 @@ def generar_link_registro(event, context):
         expiracion_timestamp = int(expiracion.timestamp())
         
         # Guardar en tabla de links de registro
+        link = {
+            'token': token,
+            'tandaId': tanda_id,
+            'userId': user_id,
+            'duracionHoras': duracion_horas,
+            'expiracion': expiracion_timestamp,
+            'createdAt': datetime.utcnow().isoformat(),
+            'activo': True,
+            # TTL para auto-eliminación (expira 24h después de expiración)
+            'ttl': expiracion_timestamp + (24 * 3600),
+            'tipo': 'cumpleañera' if es_cumpleañera else 'normal'  # 🆕 Tipo de link
+        }
         links_table = dynamodb.Table(LINKS_TABLE)
-        links_table.put_item(
-            Item={
-                'token': token,
-                'tandaId': tanda_id,
-                'userId': user_id,
-                'duracionHoras': duracion_horas,
-                'expiracion': expiracion_timestamp,
-                'createdAt': datetime.utcnow().isoformat(),
-                'activo': True,
-                # TTL para auto-eliminación (expira 24h después de expiración)
-                'ttl': expiracion_timestamp + (24 * 3600),
-                'tipo': 'cumpleañera' if es_cumpleañera else 'normal'  # 🆕 Tipo de link
-            }
-        )
+        links_table.put_item(Item=link)
+        
+        # Página pública estática (registro/{token}.json en el bucket del sitio)
+        publicar_snapshot_link(link)
         
         return {
             'statusCode': 200,
@@ -1176,8 +1260,14 @@ def generar_link_registro(event, context):
         }
 
 
+@unidad_de_trabajo
 def lambda_handler(event, context):
     print(f"event: {event}")    
+    
+    # Purga programada (EventBridge) de snapshots de registro vencidos
+    if event.get('source') == 'aws.events':
+        return purgar_snapshots_expirados()
+    
     routeKey = event.get('routeKey')
     print(f'routeKey: {routeKey}')
     
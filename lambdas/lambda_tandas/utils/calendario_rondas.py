@@ -0,0 +1,158 @@
+# ========================================
+# utils/calendario_rondas.py
+# Calendario de rondas de una tanda (mismas reglas que tandaCalculos.js)
+#
+# calendario_rondas() genera todas las rondas en una sola pasada: cada
+# fecha sale de la anterior, en lugar de recorrer desde la ronda 1 para
+# cada una (en quincenal eso era O(R²) al pedir todas las rondas). El
+# resultado se memoiza por (fechaInicio, frecuencia, totalRondas,
+# diasLimitePago).
+#
+# lambda_tandas guarda el calendario en la tanda al crearla/actualizarla:
+#   calendarioRondas → [{'inicio': 'YYYY-MM-DD', 'limite': 'YYYY-MM-DD'}, ...]
+#   calendarioClave  → parámetros con los que se generó
+# y los lectores toman las fechas de ahí. Si falta o la clave no coincide
+# (tanda anterior al calendario) se calcula con la memoización.
+# ========================================
+
+import calendar
+from datetime import date, timedelta
+from functools import lru_cache
+
+# Días de gracia si la tanda no define diasLimitePago (mismo default que lambda_tandas)
+DIAS_LIMITE_PAGO = 5
+
+# En tandas cumpleañeras la fecha de cada ronda depende del participante
+FRECUENCIAS_CALENDARIO = ('semanal', 'quincenal', 'mensual')
+
+
+def _ultimo_dia(anio, mes):
+    return date(anio, mes, calendar.monthrange(anio, mes)[1])
+
+
+def _mes(fecha_inicial, indice):
+    """Mismo día del mes `indice - 1` meses después (ajustado al último día)"""
+    total_meses = (fecha_inicial.month - 1) + (indice - 1)
+    anio = fecha_inicial.year + total_meses // 12
+    mes = total_meses % 12 + 1
+    return date(anio, mes, min(fecha_inicial.day, calendar.monthrange(anio, mes)[1]))
+
+
+def _siguiente_quincena(fecha):
+    """Del 15 al último día del mes; del último día al 15 del mes siguiente"""
+    if fecha.day == 15:
+        return _ultimo_dia(fecha.year, fecha.month)
+    anio, mes = (fecha.year + 1, 1) if fecha.month == 12 else (fecha.year, fecha.month + 1)
+    return date(anio, mes, 15)
+
+
+@lru_cache(maxsize=512)
+def calendario_rondas(fecha_inicio, frecuencia, total_rondas, dias_limite=DIAS_LIMITE_PAGO):
+    """
+    Fechas de todas las rondas en O(total_rondas).
+
+    Args:
+        fecha_inicio: 'YYYY-MM-DD' de la tanda
+        frecuencia: 'semanal', 'quincenal' o 'mensual' (otra repite fechaInicio)
+        total_rondas: Número de rondas a generar
+        dias_limite: Días de gracia después del inicio de cada ronda
+
+    Returns:
+        tuple: (inicio, limite) como date por ronda; la posición 0 es la ronda 1
+    """
+    inicial = date.fromisoformat(str(fecha_inicio).split('T')[0])
+    gracia = timedelta(days=dias_limite)
+
+    inicios = []
+    if frecuencia == 'semanal':
+        inicios = [inicial + timedelta(weeks=i) for i in range(total_rondas)]
+    elif frecuencia == 'mensual':
+        inicios = [_mes(inicial, i) for i in range(1, total_rondas + 1)]
+    elif frecuencia == 'quincenal':
+        # La primera ronda cae en la quincena de fechaInicio
+        fecha = date(inicial.year, inicial.month, 15) if inicial.day <= 15 else _ultimo_dia(inicial.year, inicial.month)
+        for _ in range(total_rondas):
+            inicios.append(fecha)
+            fecha = _siguiente_quincena(fecha)
+    else:
+        inicios = [inicial] * total_rondas
+
+    return tuple((inicio, inicio + gracia) for inicio in inicios)
+
+
+# ========================================
+# Calendario de una tanda
+# ========================================
+def parametros_calendario(tanda):
+    """(fechaInicio, frecuencia, totalRondas, diasLimitePago) o None si la tanda no tiene fechaInicio"""
+    fecha_inicio = str(tanda.get('fechaInicio') or '').split('T')[0]
+    if not fecha_inicio:
+        return None
+    return (
+        fecha_inicio,
+        tanda.get('frecuencia', ''),
+        int(tanda.get('totalRondas', 0)),
+        int(tanda.get('diasLimitePago') or DIAS_LIMITE_PAGO),
+    )
+
+
+def clave_calendario(parametros):
+    return '|'.join(str(p) for p in parametros)
+
+
+def calendario_para_guardar(tanda):
+    """
+    Atributos calendarioRondas y calendarioClave para escribir en la tanda,
+    o {} si la tanda no tiene calendario fijo (cumpleañera o sin fechaInicio).
+    """
+    parametros = parametros_calendario(tanda)
+    if not parametros or parametros[1] not in FRECUENCIAS_CALENDARIO:
+        return {}
+    return {
+        'calendarioRondas': [
+            {'inicio': inicio.isoformat(), 'limite': limite.isoformat()}
+            for inicio, limite in calendario_rondas(*parametros)
+        ],
+        'calendarioClave': clave_calendario(parametros),
+    }
+
+
+def _guardado(tanda, parametros):
+    """Calendario guardado en la tanda si corresponde a sus parámetros actuales"""
+    guardado = tanda.get('calendarioRondas')
+    if guardado and tanda.get('calendarioClave') == clave_calendario(parametros):
+        return guardado
+    return None
+
+
+def calendario_tanda(tanda):
+    """Lista de (inicio, limite) de todas las rondas de la tanda ([] sin fechaInicio)"""
+    parametros = parametros_calendario(tanda)
+    if not parametros:
+        return []
+    guardado = _guardado(tanda, parametros)
+    if guardado is not None:
+        return [(date.fromisoformat(r['inicio']), date.fromisoformat(r['limite'])) for r in guardado]
+    return list(calendario_rondas(*parametros))
+
+
+def fechas_ronda(tanda, ronda):
+    """(inicio, limite) de una ronda, o None si la tanda no tiene fechaInicio válida"""
+    parametros = parametros_calendario(tanda)
+    if not parametros or int(ronda) < 1:
+        return None
+    ronda = int(ronda)
+
+    guardado = _guardado(tanda, parametros)
+    if guardado is not None and ronda <= len(guardado):
+        r = guardado[ronda - 1]
+        return date.fromisoformat(r['inicio']), date.fromisoformat(r['limite'])
+
+    try:
+        rondas = calendario_rondas(*parametros)
+        if ronda > len(rondas):
+            # Ronda fuera de totalRondas: se calcula hasta ella
+            rondas = calendario_rondas(parametros[0], parametros[1], ronda, parametros[3])
+    except ValueError:
+        return None
+    return rondas[ronda - 1]
@@ -0,0 +1,252 @@
+# ========================================
+# utils/dynamo_utils.py
+# Helpers de acceso a DynamoDB compartidos por los handlers
+# ========================================
+
+import json
+import time
+import random
+import base64
+from decimal import Decimal
+
+
+def query_all(table, **kwargs):
+    """
+    Ejecuta un query siguiendo LastEvaluatedKey hasta leer la partición completa.
+
+    Args:
+        table: Tabla boto3 (dynamodb.Table)
+        **kwargs: Parámetros normales de table.query()
+
+    Returns:
+        list: Todos los items de la consulta
+    """
+    resp = table.query(**kwargs)
+    items = resp.get('Items', [])
+
+    while 'LastEvaluatedKey' in resp:
+        resp = table.query(ExclusiveStartKey=resp['LastEvaluatedKey'], **kwargs)
+        items.extend(resp.get('Items', []))
+
+    return items
+
+
+
+# ========================================
+# Paginación por cursor
+# ========================================
+def codificar_cursor(last_evaluated_key):
+    """
+    Convierte un LastEvaluatedKey en un nextToken opaco para el cliente.
+    Devuelve None cuando ya no hay más páginas.
+    """
+    if not last_evaluated_key:
+        return None
+    crudo = json.dumps(
+        last_evaluated_key,
+        separators=(',', ':'),
+        default=lambda o: int(o) if isinstance(o, Decimal) and o % 1 == 0 else float(o)
+    )
+    return base64.urlsafe_b64encode(crudo.encode()).decode().rstrip('=')
+
+
+def decodificar_cursor(token):
+    """
+    Inverso de codificar_cursor. Lanza ValueError si el token no es válido.
+    """
+    try:
+        relleno = '=' * (-len(token) % 4)
+        llave = json.loads(
+            base64.urlsafe_b64decode(token + relleno),
+            parse_float=Decimal,
+            parse_int=Decimal
+        )
+    except Exception:
+        raise ValueError('nextToken inválido')
+    if not isinstance(llave, dict) or not llave:
+        raise ValueError('nextToken inválido')
+    return llave
+
+
+BATCH_WRITE_LIMIT = 25
+BATCH_WRITE_MAX_INTENTOS = 8
+
+
+def _batch_write(table, requests):
+    """
+    Envía WriteRequests en bloques de 25 con BatchWriteItem.
+
+    Los UnprocessedItems se reintentan con backoff exponencial (con jitter)
+    hasta BATCH_WRITE_MAX_INTENTOS; si aún quedan pendientes se lanza error
+    para no reportar como escrito algo que no llegó a la tabla.
+    """
+    client = table.meta.client
+
+    for inicio in range(0, len(requests), BATCH_WRITE_LIMIT):
+        pendientes = {table.name: requests[inicio:inicio + BATCH_WRITE_LIMIT]}
+
+        intento = 0
+        while pendientes:
+            resp = client.batch_write_item(RequestItems=pendientes)
+            pendientes = resp.get('UnprocessedItems') or {}
+            if not pendientes:
+                break
+
+            intento += 1
+            if intento >= BATCH_WRITE_MAX_INTENTOS:
+                raise RuntimeError(
+                    f"{len(pendientes.get(table.name, []))} items sin procesar en {table.name} "
+                    f"tras {intento} intentos"
+                )
+            time.sleep(min(2.0, 0.05 * (2 ** intento)) * random.uniform(0.5, 1.0))
+
+    return len(requests)
+
+
+def batch_delete(table, keys):
+    """
+    Elimina keys en bloques de 25 con BatchWriteItem (ver _batch_write).
+
+    Args:
+        table: Tabla boto3 (dynamodb.Table)
+        keys: Lista de dicts con la llave primaria de cada item
+
+    Returns:
+        int: Cantidad de items eliminados
+    """
+    return _batch_write(table, [{'DeleteRequest': {'Key': key}} for key in keys])
+
+
+def batch_put(table, items):
+    """
+    Escribe items en bloques de 25 con BatchWriteItem (ver _batch_write).
+    Sin condiciones: sólo para items nuevos cuya llave no puede chocar.
+
+    Args:
+        table: Tabla boto3 (dynamodb.Table)
+        items: Lista de items completos
+
+    Returns:
+        int: Cantidad de items escritos
+    """
+    return _batch_write(table, [{'PutRequest': {'Item': item}} for item in items])
+
+
+BATCH_GET_LIMIT = 100
+
+
+def batch_get(table, keys, projection=None, consistent=False):
+    """
+    Lee keys en bloques de 100 con BatchGetItem.
+
+    Los UnprocessedKeys se reintentan igual que en _batch_write. Las keys
+    que no existen simplemente no vuelven; el orden no se conserva.
+
+    Args:
+        table: Tabla boto3 (dynamodb.Table)
+        keys: Lista de dicts con la llave primaria de cada item (sin repetidos)
+        projection: Atributos a devolver (ej. ['pagoId', 'pagado']); None: todos
+        consistent: ConsistentRead
+
+    Returns:
+        list: Items encontrados
+    """
+    client = table.meta.client
+    solicitud = {'ConsistentRead': consistent}
+    if projection:
+        solicitud['ProjectionExpression'] = ', '.join(f'#a{i}' for i in range(len(projection)))
+        solicitud['ExpressionAttributeNames'] = {f'#a{i}': attr for i, attr in enumerate(projection)}
+
+    items = []
+    for inicio in range(0, len(keys), BATCH_GET_LIMIT):
+        pendientes = {table.name: {**solicitud, 'Keys': keys[inicio:inicio + BATCH_GET_LIMIT]}}
+
+        intento = 0
+        while pendientes:
+            resp = client.batch_get_item(RequestItems=pendientes)
+            items.extend(resp.get('Responses', {}).get(table.name, []))
+            pendientes = resp.get('UnprocessedKeys') or {}
+            if not pendientes:
+                break
+
+            intento += 1
+            if intento >= BATCH_WRITE_MAX_INTENTOS:
+                raise RuntimeError(
+                    f"{len(pendientes[table.name]['Keys'])} llaves sin leer en {table.name} "
+                    f"tras {intento} intentos"
+                )
+            time.sleep(min(2.0, 0.05 * (2 ** intento)) * random.uniform(0.5, 1.0))
+
+    return items
+
+
+# DynamoDB admite expresiones de hasta 4 KB; el margen es para las
+# cláusulas fijas que agrega quien arma el update (actualizadoEn, version)
+EXPRESION_MAX = 3500
+
+
+def agrupar_clausulas(clausulas, limite=EXPRESION_MAX):
+    """
+    Reparte cláusulas de un UpdateExpression en grupos que caben en una
+    sola expresión.
+
+    Args:
+        clausulas: Lista de (expresión, names, values) de cada cláusula;
+            names/values sólo con los placeholders que usa esa cláusula
+        limite: Largo máximo de las expresiones unidas de un grupo
+
+    Returns:
+        list: (expresiones, names, values) por grupo, en orden. Cada grupo
+        lleva sólo los names/values que usan sus cláusulas (DynamoDB
+        rechaza los que sobran)
+    """
+    grupos = []
+    largo = limite
+    for expresion, names, values in clausulas:
+        if largo + len(expresion) + 2 > limite:
+            grupos.append(([], {}, {}))
+            largo = 0
+        expresiones, nombres_grupo, valores_grupo = grupos[-1]
+        expresiones.append(expresion)
+        nombres_grupo.update(names)
+        valores_grupo.update(values)
+        largo += len(expresion) + 2
+    return grupos
+
+
+def delete_by_query(table, key_attrs, **kwargs):
+    """
+    Elimina todos los items que devuelve un query, página por página.
+
+    Sólo proyecta los atributos de la llave, así cada página trae el
+    máximo de items por unidad de lectura y la memoria no crece con la
+    partición.
+
+    Args:
+        table: Tabla boto3 (dynamodb.Table)
+        key_attrs: Atributos de la llave primaria (ej. ['id', 'pagoId'])
+        **kwargs: Parámetros de table.query() (KeyConditionExpression, etc.)
+
+    Returns:
+        int: Cantidad de items eliminados
+    """
+    nombres = dict(kwargs.pop('ExpressionAttributeNames', {}))
+    proyeccion = []
+    for i, attr in enumerate(key_attrs):
+        nombres[f'#k{i}'] = attr
+        proyeccion.append(f'#k{i}')
+
+    kwargs['ProjectionExpression'] = ', '.join(proyeccion)
+    kwargs['ExpressionAttributeNames'] = nombres
+
+    eliminados = 0
+    resp = table.query(**kwargs)
+    while True:
+        keys = [{attr: item[attr] for attr in key_attrs} for item in resp.get('Items', [])]
+        eliminados += batch_delete(table, keys)
+
+        if 'LastEvaluatedKey' not in resp:
+            break
+        resp = table.query(ExclusiveStartKey=resp['LastEvaluatedKey'], **kwargs)
+
+    return eliminados
@@ -0,0 +1,221 @@
+# ========================================
+# utils/registro_snapshot.py
+# Snapshot estático de la página pública de registro
+#
+# Lo que devolvía GET /registro/{token} se publica como JSON en el bucket
+# del sitio (registro/{token}.json), así cada persona que abre el link de
+# WhatsApp lo lee directo de S3 sin pasar por Lambda ni DynamoDB.
+#
+# - Se publica al generar el link y se vuelve a publicar para todos los
+#   links vigentes de la tanda cada vez que cambian sus participantes o
+#   sus datos.
+# - Se borra al eliminar la tanda y, para links expirados o desactivados,
+#   en la purga programada (purgar_snapshots_expirados).
+# - El POST de registro sigue validando expiración y números contra
+#   DynamoDB: el snapshot sólo sirve para mostrar la página.
+# ========================================
+
+import os
+import json
+import boto3
+from datetime import datetime, timezone
+from decimal import Decimal
+from boto3.dynamodb.conditions import Key
+
+from utils.dynamo_utils import query_all
+from utils.tanda_vista import obtener_vista
+
+SITE_BUCKET = os.environ.get('SITE_BUCKET', 'app-tandasmx')
+PREFIJO = 'registro/'
+
+# El navegador siempre revalida (S3 responde 304 con su propio ETag)
+CACHE_CONTROL = 'no-cache'
+
+LINKS_EXPIRACION_INDEX = 'tandaId-expiracion-index'
+
+s3 = boto3.client('s3')
+dynamodb = boto3.resource('dynamodb')
+links_table = dynamodb.Table(os.environ.get('LINKS_TABLE', 'links_registro'))
+
+
+class _DecimalEncoder(json.JSONEncoder):
+    def default(self, obj):
+        if isinstance(obj, Decimal):
+            return int(obj) if obj % 1 == 0 else float(obj)
+        return super().default(obj)
+
+
+def llave_snapshot(token):
+    return f'{PREFIJO}{token}.json'
+
+
+def link_vigente(link, ahora=None):
+    """Mismas reglas que aplica GET /registro/{token}"""
+    ahora = ahora if ahora is not None else datetime.now(timezone.utc).timestamp()
+    return bool(link.get('activo', True)) and ahora <= link.get('expiracion', 0)
+
+
+def datos_publicos(tanda, participantes, link):
+    """
+    Payload público de registro (sin información sensible).
+
+    Args:
+        tanda: Item de la tanda
+        participantes: Iterable con al menos numeroAsignado y nombre
+        link: Item de links_registro
+    """
+    return {
+        'tandaId': tanda['id'],
+        'nombre': tanda.get('nombre', ''),
+        'montoPorRonda': float(tanda.get('montoPorRonda', 0)),
+        'totalRondas': int(tanda.get('totalRondas', 0)),
+        'frecuencia': tanda.get('frecuencia', 'semanal'),
+        'fechaInicio': tanda.get('fechaInicio', ''),
+        'diasLimitePago': int(tanda.get('diasLimitePago', 5)),
+        'calendarioRondas': tanda.get('calendarioRondas', []),
+        'participantes': [
+            {
+                'numeroAsignado': int(p.get('numeroAsignado', 0)),
+                'nombre': p.get('nombre', '')
+            }
+            for p in participantes
+        ],
+        'expiracion': link.get('expiracion', '')
+    }
+
+
+def publicar_snapshot(link, vista):
+    """Escribe (o reemplaza) el snapshot de un link a partir de la vista de la tanda"""
+    participantes = [datos for _, datos in sorted(vista.get('participantes', {}).items())]
+    datos = datos_publicos(vista['tanda'], participantes, link)
+    cuerpo = {
+        'success': True,
+        'data': datos,
+        'version': vista.get('version', 0),
+        'generadoEn': datetime.utcnow().isoformat()
+    }
+    s3.put_object(
+        Bucket=SITE_BUCKET,
+        Key=llave_snapshot(link['token']),
+        Body=json.dumps(cuerpo, cls=_DecimalEncoder).encode('utf-8'),
+        ContentType='application/json',
+        CacheControl=CACHE_CONTROL
+    )
+
+
+def publicar_snapshot_link(link):
+    """Publica el snapshot de un link recién creado. Nunca lanza."""
+    try:
+        vista = obtener_vista(link['tandaId'])
+        if vista:
+            publicar_snapshot(link, vista)
+    except Exception as e:
+        print(f"❌ Error publicando snapshot de registro {link['token']}: {e}")
+
+
+def publicar_snapshots_tanda(tanda_id):
+    """
+    Regenera el snapshot de cada link vigente de la tanda.
+    Nunca lanza: un error aquí no debe romper la escritura que lo provocó.
+
+    Returns:
+        int: Snapshots publicados
+    """
+    try:
+        ahora = int(datetime.now(timezone.utc).timestamp())
+        links = [
+            link for link in query_all(
+                links_table,
+                IndexName=LINKS_EXPIRACION_INDEX,
+                KeyConditionExpression=Key('tandaId').eq(tanda_id) & Key('expiracion').gt(ahora)
+            )
+            if link_vigente(link, ahora)
+        ]
+        if not links:
+            return 0
+
+        vista = obtener_vista(tanda_id)
+        if not vista:
+            eliminar_snapshots([link['token'] for link in links])
+            return 0
+
+        for link in links:
+            publicar_snapshot(link, vista)
+
+        print(f"🌐 {len(links)} snapshot(s) de registro publicados para tanda {tanda_id}")
+        return len(links)
+
+    except Exception as e:
+        print(f"❌ Error publicando snapshots de registro de tanda {tanda_id}: {e}")
+        return 0
+
+
+def eliminar_snapshots(tokens):
+    """Borra los snapshots de los tokens dados (DeleteObjects de 1000 en 1000)"""
+    tokens = list(tokens)
+    for i in range(0, len(tokens), 1000):
+        s3.delete_objects(
+            Bucket=SITE_BUCKET,
+            Delete={
+                'Objects': [{'Key': llave_snapshot(t)} for t in tokens[i:i + 1000]],
+                'Quiet': True
+            }
+        )
+
+
+def eliminar_snapshots_tanda(tanda_id):
+    """Borra los snapshots de todos los links de la tanda (vigentes o no)"""
+    links = query_all(
+        links_table,
+        IndexName='tandaId-index',
+        KeyConditionExpression=Key('tandaId').eq(tanda_id),
+        ProjectionExpression='#t',
+        ExpressionAttributeNames={'#t': 'token'}
+    )
+    eliminar_snapshots(link['token'] for link in links)
+    return len(links)
+
+
+def purgar_snapshots_expirados():
+    """
+    Recorre los snapshots publicados y borra los de links expirados,
+    desactivados o que ya no existen (TTL de links_registro).
+
+    Returns:
+        dict: revisados / eliminados
+    """
+    ahora = datetime.now(timezone.utc).timestamp()
+    revisados = 0
+    eliminados = 0
+
+    paginator = s3.get_paginator('list_objects_v2')
+    for pagina in paginator.paginate(Bucket=SITE_BUCKET, Prefix=PREFIJO):
+        tokens = [
+            obj['Key'][len(PREFIJO):-len('.json')]
+            for obj in pagina.get('Contents', [])
+            if obj['Key'].endswith('.json')
+        ]
+        revisados += len(tokens)
+
+        # BatchGetItem admite 100 llaves por llamada
+        links = {}
+        for i in range(0, len(tokens), 100):
+            pendientes = {
+                links_table.name: {
+                    'Keys': [{'token': t} for t in tokens[i:i + 100]],
+                    'ProjectionExpression': '#t, expiracion, activo',
+                    'ExpressionAttributeNames': {'#t': 'token'}
+                }
+            }
+            while pendientes:
+                result = dynamodb.batch_get_item(RequestItems=pendientes)
+                for link in result['Responses'].get(links_table.name, []):
+                    links[link['token']] = link
+                pendientes = result.get('UnprocessedKeys')
+
+        vencidos = [t for t in tokens if t not in links or not link_vigente(links[t], ahora)]
+        eliminar_snapshots(vencidos)
+        eliminados += len(vencidos)
+
+    print(f"🧹 Snapshots de registro revisados: {revisados}, eliminados: {eliminados}")
+    return {'revisados': revisados, 'eliminados': eliminados}
@@ -1,9 +1,11 @@
-import os, json, uuid, boto3, logging, calendar
+import os, json, uuid, boto3, logging
 from decimal import Decimal
-from datetime import date, timedelta, datetime, timezone
+from datetime import date, datetime, timezone
 from boto3.dynamodb.conditions import Key, Attr
 from botocore.exceptions import ClientError
 
+from utils.calendario_rondas import calendario_tanda
+
 logger    = logging.getLogger()
 logger.setLevel(logging.INFO)
 dynamodb  = boto3.resource("dynamodb")
@@ -15,62 +17,20 @@ PAGOS_TABLE         = os.environ["PAGOS_TABLE"]
 SCORE_EVENTS_TABLE  = os.environ["SCORE_EVENTS_TABLE"]
 CALCULATE_SCORE_ARN = os.environ["CALCULATE_SCORE_LAMBDA_ARN"]
 
-DIAS_LIMITE_PAGO = 3
 PAYMENT_TYPES    = {"PAYMENT_EARLY", "PAYMENT_ON_TIME", "PAYMENT_LATE", "PAYMENT_MISSED"}
 POINTS_CONFIG    = {"PAYMENT_EARLY": 2, "PAYMENT_ON_TIME": 1, "PAYMENT_LATE": -1, "PAYMENT_MISSED": -3}
 
 
 # ═══════════════════════════════════════════════════════════════
-# Cálculo de fechas de rondas (equivalente a tandaCalculos.js)
+# Clasificación de pagos (fechas de utils/calendario_rondas.py)
 # ═══════════════════════════════════════════════════════════════
 
-def _calcular_fecha_ronda(fecha_inicial: date, indice: int, frecuencia: str) -> date:
-    if frecuencia == "semanal":
-        return fecha_inicial + timedelta(weeks=indice - 1)
-
-    if frecuencia == "mensual":
-        dia_original = fecha_inicial.day
-        total_months = (fecha_inicial.month - 1) + (indice - 1)
-        new_year     = fecha_inicial.year + total_months // 12
-        new_month    = total_months % 12 + 1
-        max_day      = calendar.monthrange(new_year, new_month)[1]
-        return date(new_year, new_month, min(dia_original, max_day))
-
-    if frecuencia == "quincenal":
-        temp          = fecha_inicial
-        es_fin_de_mes = fecha_inicial.day > 15
-
-        for i in range(1, indice + 1):
-            if es_fin_de_mes:
-                last_day = calendar.monthrange(temp.year, temp.month)[1]
-                temp = date(temp.year, temp.month, last_day)
-            else:
-                temp = date(temp.year, temp.month, 15)
-
-            if i < indice:
-                if es_fin_de_mes:
-                    new_month = temp.month + 1
-                    new_year  = temp.year
-                    if new_month > 12:
-                        new_month = 1
-                        new_year += 1
-                    temp = date(new_year, new_month, 15)
-                else:
-                    last_day = calendar.monthrange(temp.year, temp.month)[1]
-                    temp = date(temp.year, temp.month, last_day)
-                es_fin_de_mes = not es_fin_de_mes
-        return temp
-
-    return fecha_inicial
-
-
-def _clasificar_tipo_pago(fecha_pago_str: str, fecha_ronda: date) -> str:
+def _clasificar_tipo_pago(fecha_pago_str: str, fecha_ronda: date, fecha_limite: date) -> str:
     try:
         fecha_pago = date.fromisoformat(str(fecha_pago_str).split("T")[0])
     except (ValueError, AttributeError):
         return "PAYMENT_ON_TIME"
 
-    fecha_limite = fecha_ronda + timedelta(days=DIAS_LIMITE_PAGO)
     if fecha_pago < fecha_ronda:
         return "PAYMENT_EARLY"
     if fecha_pago <= fecha_limite:
@@ -154,16 +114,14 @@ def _procesar_tanda(tanda: dict, ev_table, forzar_reproceso: bool) -> dict:
         logger.info(f"Tanda {tanda_id} ya sincronizada ({tanda['scoreSyncedAt']}), omitiendo")
         return {"status": "omitida", "razon": "ya_sincronizada", "syncedAt": tanda["scoreSyncedAt"]}
 
-    hoy           = date.today()
-    fecha_inicio  = date.fromisoformat(fecha_inicio_str)
+    hoy = date.today()
 
-    # Calcular solo rondas cuya fecha límite ya pasó
+    # Solo rondas cuya fecha límite ya pasó (calendario guardado en la tanda,
+    # con su diasLimitePago)
     rondas_pasadas = []
-    for i in range(1, total_rondas + 1):
-        fecha_ronda  = _calcular_fecha_ronda(fecha_inicio, i, frecuencia)
-        fecha_limite = fecha_ronda + timedelta(days=DIAS_LIMITE_PAGO)
+    for i, (fecha_ronda, fecha_limite) in enumerate(calendario_tanda(tanda), start=1):
         if fecha_limite < hoy:
-            rondas_pasadas.append((i, fecha_ronda))
+            rondas_pasadas.append((i, fecha_ronda, fecha_limite))
 
     if not rondas_pasadas:
         return {"status": "omitida", "razon": "sin_rondas_pasadas"}
@@ -218,7 +176,7 @@ def _procesar_tanda(tanda: dict, ev_table, forzar_reproceso: bool) -> dict:
                 except (ValueError, TypeError):
                     pass
 
-        for (num_ronda, fecha_ronda) in rondas_pasadas:
+        for (num_ronda, fecha_ronda, fecha_limite) in rondas_pasadas:
             existing_event = rondas_procesadas.get(num_ronda)
 
             if existing_event and not forzar_reproceso:
@@ -238,7 +196,7 @@ def _procesar_tanda(tanda: dict, ev_table, forzar_reproceso: bool) -> dict:
             pago     = pagos_idx.get(pago_key)
 
             if pago and pago.get("pagado"):
-                event_type = _clasificar_tipo_pago(pago.get("fechaPago", ""), fecha_ronda)
+                event_type = _clasificar_tipo_pago(pago.get("fechaPago", ""), fecha_ronda, fecha_limite)
             else:
                 event_type = "PAYMENT_MISSED"
 
@@ -0,0 +1,46 @@
+# ========================================
+# tests/bench_motor_estadisticas.py
+# Tiempo de GET /tandas/{tandaId}/estadisticas sin DynamoDB: cálculo
+# anterior (recorre los pagos una vez por participante) contra
+# motor_estadisticas.calcular_estadisticas (una sola pasada)
+#
+# No lo recoge pytest (no empieza con test_). Uso:
+#   python tests/bench_motor_estadisticas.py [participantes ...]
+# ========================================
+
+import contextlib
+import io
+import sys
+import time
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ / 'lambdas' / 'lambda_estadisticas'))
+
+from utils.motor_estadisticas import calcular_estadisticas  # noqa: E402
+from test_motor_estadisticas import AHORA, estadisticas_anteriores, generar_tanda  # noqa: E402
+
+
+def medir(calculo, datos, repeticiones):
+    # Sin los prints de fechas inválidas, que sólo medirían la terminal
+    with contextlib.redirect_stdout(io.StringIO()):
+        inicio = time.perf_counter()
+        for _ in range(repeticiones):
+            calculo(*datos, AHORA)
+        fin = time.perf_counter()
+    return (fin - inicio) / repeticiones * 1000
+
+
+def main(tamaños):
+    print(f"{'participantes':>13} {'pagos':>7} {'anterior ms':>12} {'motor ms':>10} {'x':>7}")
+    for total_participantes in tamaños:
+        datos = generar_tanda(total_participantes, False, 0, max_rondas=52)
+        repeticiones = max(1, 2000 // total_participantes)
+
+        anterior = medir(estadisticas_anteriores, datos, repeticiones)
+        motor = medir(calcular_estadisticas, datos, repeticiones)
+        print(f"{total_participantes:>13} {len(datos[2]):>7} {anterior:>12.3f} {motor:>10.3f} {anterior / motor:>7.1f}")
+
+
+if __name__ == '__main__':
+    main([int(n) for n in sys.argv[1:]] or [10, 100, 1000])
@@ -0,0 +1,138 @@
+# ========================================
+# tests/bench_tandas_obtener.py
+# Llamadas a DynamoDB y tiempo de GET /tandas/{tandaId} sobre un
+# DynamoFalso con páginas de 100 items y 4 ms por llamada:
+#   - por participante: un query begins_with de pagos por participante,
+#     sin seguir LastEvaluatedKey (como estaba antes)
+#   - por partición: participantes y pagos leídos una vez cada uno con
+#     query_all y agrupados en memoria
+#   - vista: el handler actual (versión de la tanda + tandas_vista)
+#
+# No lo recoge pytest (no empieza con test_). Uso:
+#   python tests/bench_tandas_obtener.py [participantes ...]
+# ========================================
+
+import contextlib
+import importlib
+import io
+import json
+import sys
+import time
+from decimal import Decimal
+
+import conftest  # noqa: F401  (variables de entorno y boto3 de la capa)
+from dynamo_falso import DynamoFalso
+
+sys.path.insert(0, str(conftest.RAIZ / 'lambdas' / 'lambda_tandas'))
+
+from boto3.dynamodb.conditions import Key  # noqa: E402
+
+handler = importlib.import_module('handler')
+tanda_vista = importlib.import_module('utils.tanda_vista')
+from utils.dynamo_utils import query_all  # noqa: E402
+
+TANDA_ID = 'tanda_1'
+PAGOS_POR_PARTICIPANTE = 5
+PAGINA = 100
+LATENCIA = 0.004
+
+
+def preparar(total_participantes):
+    db = DynamoFalso(pagina=PAGINA)
+    handler.tandas_table._table = tanda_vista._tandas_table = db.tabla('tandas', 'id')
+    handler.participantes_table._table = tanda_vista._participantes_table = db.tabla('participantes', 'id', 'participanteId')
+    handler.pagos_table._table = tanda_vista._pagos_table = db.tabla('pagos', 'id', 'pagoId')
+    tanda_vista.vista_table = db.tabla('tandas_vista', 'tandaId')
+
+    db.sembrar('tandas', {
+        'id': TANDA_ID, 'adminId': 'admin_1', 'nombre': 'Tanda', 'frecuencia': 'semanal',
+        'totalRondas': Decimal(total_participantes), 'rondaActual': Decimal(1), 'version': Decimal(1)
+    })
+    for i in range(total_participantes):
+        participante_id = f'part_{i:04d}'
+        db.sembrar('participantes', {
+            'id': TANDA_ID, 'participanteId': participante_id, 'nombre': f'P{i}',
+            'numeroAsignado': Decimal(i + 1)
+        })
+        for ronda in range(1, PAGOS_POR_PARTICIPANTE + 1):
+            db.sembrar('pagos', {
+                'id': TANDA_ID, 'pagoId': f'{participante_id}_{ronda}', 'participanteId': participante_id,
+                'ronda': Decimal(ronda), 'pagado': True, 'monto': Decimal(500)
+            })
+
+    # La vista ya existe: GET /tandas/{tandaId} la construye una vez
+    with contextlib.redirect_stdout(io.StringIO()):
+        tanda_vista.reconstruir_vista(TANDA_ID)
+    return db
+
+
+def obtener_por_participante(db):
+    """Returns: (participantes, pagos) leídos"""
+    tandas, participantes_table, pagos_table = (db.Table(n) for n in ('tandas', 'participantes', 'pagos'))
+    tandas.get_item(Key={'id': TANDA_ID})
+    participantes = participantes_table.query(
+        KeyConditionExpression='id = :tandaId',
+        ExpressionAttributeValues={':tandaId': TANDA_ID}
+    ).get('Items', [])
+    pagos = 0
+    for participante in participantes:
+        pagos += len(pagos_table.query(
+            KeyConditionExpression=Key('id').eq(TANDA_ID) & Key('pagoId').begins_with(participante['participanteId'])
+        ).get('Items', []))
+    return len(participantes), pagos
+
+
+def obtener_por_particion(db):
+    tandas, participantes_table, pagos_table = (db.Table(n) for n in ('tandas', 'participantes', 'pagos'))
+    tandas.get_item(Key={'id': TANDA_ID})
+    participantes = query_all(participantes_table, KeyConditionExpression=Key('id').eq(TANDA_ID))
+    pagos = query_all(pagos_table, KeyConditionExpression=Key('id').eq(TANDA_ID))
+    return len(participantes), len(pagos)
+
+
+def obtener_vista(db):
+    with contextlib.redirect_stdout(io.StringIO()):
+        respuesta = handler.lambda_handler({
+            'routeKey': 'GET /tandas/{tandaId}',
+            'pathParameters': {'tandaId': TANDA_ID},
+            'headers': {},
+        }, None)
+    assert respuesta['statusCode'] == 200
+    tanda = json.loads(respuesta['body'])['data']
+    return len(tanda['participantes']), sum(len(p['pagos']) for p in tanda['participantes'])
+
+
+def medir(obtener, total_participantes):
+    """Returns: (llamadas, ms, filas perdidas)"""
+    db = preparar(total_participantes)
+    db.llamadas.clear()
+    db.latencia = LATENCIA
+
+    inicio = time.perf_counter()
+    participantes, pagos = obtener(db)
+    ms = (time.perf_counter() - inicio) * 1000
+
+    perdidas = (total_participantes - participantes) + (total_participantes * PAGOS_POR_PARTICIPANTE - pagos)
+    return sum(db.llamadas.values()), ms, perdidas
+
+
+def main(tamaños):
+    estrategias = [
+        ('por participante', obtener_por_participante),
+        ('por partición', obtener_por_particion),
+        ('vista', obtener_vista),
+    ]
+    print(f"{'participantes':>13}" + ''.join(f" | {nombre:>32}" for nombre, _ in estrategias))
+    for total_participantes in tamaños:
+        columnas = []
+        for _, obtener in estrategias:
+            llamadas, ms, perdidas = medir(obtener, total_participantes)
+            columna = f"{llamadas} req / {ms:.0f} ms"
+            if perdidas:
+                columna += f" ({perdidas} perdidas)"
+            columnas.append(f" | {columna:>32}")
+        print(f"{total_participantes:>13}" + ''.join(columnas))
+
+
+if __name__ == '__main__':
+    main([int(n) for n in sys.argv[1:]] or [10, 50, 200])
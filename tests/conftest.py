@@ -0,0 +1,68 @@
+# ========================================
+# tests/conftest.py
+#
+# Cada Lambda se empaqueta por separado y todas usan los mismos nombres
+# de módulo (handler, utils.*, exception.*), así que cargar_lambda los
+# descarga de sys.modules e importa el handler desde la carpeta de la
+# Lambda pedida. boto3 y PyJWT vienen de la capa (layers/auth_layer).
+# ========================================
+
+import importlib
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+RAIZ = Path(__file__).resolve().parent.parent
+CAPA = RAIZ / 'layers' / 'auth_layer' / 'python'
+
+ENTORNO = {
+    'AWS_DEFAULT_REGION': 'us-east-1',
+    'JWT_SECRET': 'pruebas',
+    'TANDAS_TABLE': 'tandas',
+    'USUARIOS_TABLE': 'usuarios',
+    'PARTICIPANTES_TABLE': 'participantes',
+    'PAGOS_TABLE': 'pagos',
+    'NOTIFICACIONES_TABLE': 'notificaciones',
+    'SCORE_EVENTS_TABLE': 'score_events',
+    'SLOTS_TABLE': 'participantes_slots',
+}
+
+try:
+    import boto3  # noqa: F401
+except ImportError:
+    sys.path.append(str(CAPA))
+
+for variable, valor in ENTORNO.items():
+    os.environ.setdefault(variable, valor)
+
+import escenario_pagos  # noqa: E402  (usa boto3)
+import escenario_participantes  # noqa: E402
+
+
+@pytest.fixture
+def cargar_lambda(monkeypatch):
+    """Importa lambdas/<nombre>/handler.py con sus propios utils"""
+    def cargar(nombre):
+        for modulo in list(sys.modules):
+            if modulo == 'handler' or modulo.split('.')[0] in ('utils', 'exception'):
+                del sys.modules[modulo]
+        monkeypatch.syspath_prepend(str(RAIZ / 'lambdas' / nombre))
+        return importlib.import_module('handler')
+    return cargar
+
+
+@pytest.fixture
+def participantes_falso(cargar_lambda):
+    """(handler, tanda_vista, db) de lambda_participantes sobre un DynamoFalso"""
+    handler = cargar_lambda('lambda_participantes')
+    tanda_vista, db = escenario_participantes.preparar(handler)
+    return handler, tanda_vista, db
+
+
+@pytest.fixture
+def pagos_falso(cargar_lambda):
+    """(handler, db) de lambda_pagos sobre un DynamoFalso"""
+    handler = cargar_lambda('lambda_pagos')
+    return handler, escenario_pagos.preparar(handler)
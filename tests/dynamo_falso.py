@@ -0,0 +1,328 @@
+# ========================================
+# tests/dynamo_falso.py
+# Tablas DynamoDB en memoria que cuentan cada llamada
+#
+# Cubre sólo lo que usan los handlers en las pruebas:
+#   - llaves y filtros por igualdad, begins_with y comparaciones
+#     (Key()/Attr() o 'id = :tandaId')
+#   - SET (rutas anidadas, if_not_exists, + y -), REMOVE y ADD de primer
+#     nivel; ReturnValues ALL_NEW / ALL_OLD
+#   - en update_item, condiciones simples: attribute_exists(a),
+#     attribute_not_exists(a) y a = :v, unidas con AND u OR
+#   - transact_write_items, batch_write_item y batch_get_item (con
+#     ProjectionExpression) a través de meta.client
+#   - páginas de query (DynamoFalso(pagina=100)) con LastEvaluatedKey /
+#     ExclusiveStartKey, en orden de llave
+# Las demás condiciones no se evalúan. Dos TablaFalsa con el mismo nombre
+# comparten datos, como dos dynamodb.Table de la misma tabla.
+# Con latencia > 0 cada llamada espera esos segundos (benchmarks).
+# ========================================
+
+import copy
+import re
+import time
+from collections import Counter
+from types import SimpleNamespace
+
+from boto3.dynamodb.conditions import ConditionBase
+from botocore.exceptions import ClientError
+
+
+class DynamoFalso:
+    def __init__(self, pagina=None, latencia=0):
+        self.datos = {}            # tabla → {llave: item}
+        self.esquemas = {}         # tabla → (hash, range)
+        self.llamadas = Counter()  # (tabla, operación) → llamadas
+        self.cliente = ClienteFalso(self)
+        self.pagina = pagina       # items por página de query (None: sin límite)
+        self.latencia = latencia   # segundos por llamada
+
+    def contar(self, tabla, operacion):
+        self.llamadas[(tabla, operacion)] += 1
+        if self.latencia:
+            time.sleep(self.latencia)
+
+    def tabla(self, nombre, hash_key, range_key=None):
+        self.esquemas[nombre] = (hash_key, range_key)
+        self.datos.setdefault(nombre, {})
+        return TablaFalsa(self, nombre)
+
+    def Table(self, nombre):
+        """Como boto3.resource('dynamodb').Table, para una tabla ya declarada"""
+        return TablaFalsa(self, nombre)
+
+    def llave(self, nombre, item):
+        hash_key, range_key = self.esquemas[nombre]
+        return item[hash_key], item.get(range_key) if range_key else None
+
+    def llave_item(self, nombre, item):
+        """Atributos de la llave primaria del item (como LastEvaluatedKey)"""
+        return {atributo: item[atributo] for atributo in self.esquemas[nombre] if atributo}
+
+    def sembrar(self, nombre, *items):
+        for item in items:
+            self.datos[nombre][self.llave(nombre, item)] = copy.deepcopy(item)
+
+    def item(self, nombre, **llave):
+        return self.datos[nombre].get(self.llave(nombre, llave))
+
+
+class ClienteFalso:
+    def __init__(self, db):
+        self.db = db
+
+    def transact_write_items(self, TransactItems):
+        self.db.contar('cliente', 'transact_write_items')
+        for accion in TransactItems:
+            (tipo, params), = accion.items()
+            tabla = self.db.datos[params['TableName']]
+            if tipo == 'Put':
+                tabla[self.db.llave(params['TableName'], params['Item'])] = copy.deepcopy(params['Item'])
+            elif tipo == 'Delete':
+                tabla.pop(self.db.llave(params['TableName'], params['Key']), None)
+            elif tipo == 'Update':
+                item = tabla.setdefault(self.db.llave(params['TableName'], params['Key']), dict(params['Key']))
+                _aplicar_update(item, params)
+        return {}
+
+    def batch_write_item(self, RequestItems):
+        self.db.contar('cliente', 'batch_write_item')
+        for nombre, solicitudes in RequestItems.items():
+            for solicitud in solicitudes:
+                if 'PutRequest' in solicitud:
+                    self.db.sembrar(nombre, solicitud['PutRequest']['Item'])
+                else:
+                    self.db.datos[nombre].pop(self.db.llave(nombre, solicitud['DeleteRequest']['Key']), None)
+        return {'UnprocessedItems': {}}
+
+    def batch_get_item(self, RequestItems):
+        self.db.contar('cliente', 'batch_get_item')
+        respuestas = {}
+        for nombre, solicitud in RequestItems.items():
+            nombres = solicitud.get('ExpressionAttributeNames') or {}
+            proyeccion = [
+                nombres.get(atributo.strip(), atributo.strip())
+                for atributo in solicitud.get('ProjectionExpression', '').split(',') if atributo.strip()
+            ]
+            items = [self.db.datos[nombre].get(self.db.llave(nombre, llave)) for llave in solicitud['Keys']]
+            respuestas[nombre] = [
+                copy.deepcopy({a: v for a, v in item.items() if not proyeccion or a in proyeccion})
+                for item in items if item
+            ]
+        return {'Responses': respuestas, 'UnprocessedKeys': {}}
+
+
+class TablaFalsa:
+    def __init__(self, db, nombre):
+        self.db = db
+        self.name = nombre
+        self.meta = SimpleNamespace(client=db.cliente)
+
+    def _contar(self, operacion):
+        self.db.contar(self.name, operacion)
+
+    @property
+    def _items(self):
+        return self.db.datos[self.name]
+
+    def _orden(self, item):
+        return self.db.llave(self.name, item)
+
+    def get_item(self, Key, **kwargs):
+        self._contar('get_item')
+        item = self._items.get(self.db.llave(self.name, Key))
+        return {'Item': copy.deepcopy(item)} if item else {}
+
+    def put_item(self, Item, **kwargs):
+        self._contar('put_item')
+        self.db.sembrar(self.name, Item)
+        return {}
+
+    def delete_item(self, Key, **kwargs):
+        self._contar('delete_item')
+        self._items.pop(self.db.llave(self.name, Key), None)
+        return {}
+
+    def update_item(self, Key, ReturnValues=None, ConditionExpression=None, **kwargs):
+        self._contar('update_item')
+        llave = self.db.llave(self.name, Key)
+        anterior = copy.deepcopy(self._items.get(llave))
+        if ConditionExpression and not _condicion(ConditionExpression, anterior or {}, kwargs):
+            raise ClientError(
+                {'Error': {'Code': 'ConditionalCheckFailedException', 'Message': 'The conditional request failed'}},
+                'UpdateItem'
+            )
+
+        item = self._items.setdefault(llave, copy.deepcopy(Key))
+        _aplicar_update(item, kwargs)
+        if ReturnValues == 'ALL_OLD':
+            return {'Attributes': anterior} if anterior else {}
+        return {'Attributes': copy.deepcopy(item)} if ReturnValues else {}
+
+    def query(self, KeyConditionExpression, ExpressionAttributeValues=None, FilterExpression=None,
+              Select=None, ExclusiveStartKey=None, **kwargs):
+        self._contar('query')
+        valores = ExpressionAttributeValues or {}
+        items = sorted(
+            (item for item in self._items.values() if _cumple(KeyConditionExpression, item, valores)),
+            key=self._orden
+        )
+        if ExclusiveStartKey:
+            inicio = self._orden(ExclusiveStartKey)
+            items = [item for item in items if self._orden(item) > inicio]
+
+        respuesta = {}
+        if self.db.pagina and len(items) > self.db.pagina:
+            # Como DynamoDB: la página se corta antes de aplicar el filtro
+            items = items[:self.db.pagina]
+            respuesta['LastEvaluatedKey'] = self.db.llave_item(self.name, items[-1])
+
+        items = [item for item in items if FilterExpression is None or _cumple(FilterExpression, item, valores)]
+        if Select == 'COUNT':
+            return {**respuesta, 'Count': len(items)}
+        return {**respuesta, 'Items': copy.deepcopy(items), 'Count': len(items)}
+
+    def scan(self, **kwargs):
+        self._contar('scan')
+        return {'Items': copy.deepcopy(list(self._items.values()))}
+
+
+_OPERADORES = {
+    '=': lambda a, b: a == b,
+    '<': lambda a, b: a is not None and a < b,
+    '<=': lambda a, b: a is not None and a <= b,
+    '>': lambda a, b: a is not None and a > b,
+    '>=': lambda a, b: a is not None and a >= b,
+    'begins_with': lambda a, b: str(a or '').startswith(b),
+}
+
+
+def _cumple(condicion, item, valores):
+    if isinstance(condicion, str):
+        # 'id = :tandaId'
+        atributo, operador, valor = condicion.split()
+        return _OPERADORES[operador](item.get(atributo), valores[valor])
+
+    expresion = condicion.get_expression()
+    operandos = expresion['values']
+    if expresion['operator'] == 'AND':
+        return all(_cumple(c, item, valores) for c in operandos)
+    if isinstance(operandos[0], ConditionBase):
+        raise NotImplementedError(expresion['operator'])
+    return _OPERADORES[expresion['operator']](item.get(operandos[0].name), operandos[1])
+
+
+_SECCION = re.compile(r'\b(SET|ADD|REMOVE|DELETE)\b')
+
+
+def _separar(texto):
+    """Separa por comas fuera de paréntesis"""
+    partes, nivel, actual = [], 0, ''
+    for caracter in texto:
+        nivel += {'(': 1, ')': -1}.get(caracter, 0)
+        if caracter == ',' and not nivel:
+            partes.append(actual.strip())
+            actual = ''
+        else:
+            actual += caracter
+    return partes + [actual.strip()] if actual.strip() else partes
+
+
+def _ruta(expresion, nombres):
+    return [nombres.get(parte, parte) for parte in expresion.strip().split('.')]
+
+
+def _leer(item, ruta):
+    for parte in ruta:
+        if not isinstance(item, dict) or parte not in item:
+            return None
+        item = item[parte]
+    return item
+
+
+def _padre(item, ruta):
+    """Mapa que contiene el último elemento de la ruta; ValidationException si no existe"""
+    for parte in ruta[:-1]:
+        if not isinstance(item.get(parte), dict):
+            raise ClientError(
+                {'Error': {'Code': 'ValidationException',
+                           'Message': 'The document path provided in the update expression is invalid for update'}},
+                'UpdateItem'
+            )
+        item = item[parte]
+    return item
+
+
+def _operando(expresion, item, nombres, valores):
+    expresion = expresion.strip()
+    if expresion.startswith(':'):
+        return valores[expresion]
+    if expresion.startswith('if_not_exists('):
+        ruta, defecto = _separar(expresion[len('if_not_exists('):-1])
+        actual = _leer(item, _ruta(ruta, nombres))
+        return valores[defecto] if actual is None else actual
+    actual = _leer(item, _ruta(expresion, nombres))
+    if actual is None:
+        raise ClientError(
+            {'Error': {'Code': 'ValidationException',
+                       'Message': 'The provided expression refers to an attribute that does not exist in the item'}},
+            'UpdateItem'
+        )
+    return actual
+
+
+def _valor(expresion, item, nombres, valores):
+    """operando, operando + operando u operando - operando"""
+    partes = re.split(r'\s([+-])\s', expresion)
+    valor = _operando(partes[0], item, nombres, valores)
+    for operador, operando in zip(partes[1::2], partes[2::2]):
+        otro = _operando(operando, item, nombres, valores)
+        valor = valor + otro if operador == '+' else valor - otro
+    return copy.deepcopy(valor)
+
+
+def _aplicar_update(item, params):
+    """SET (con rutas anidadas), REMOVE y ADD de primer nivel"""
+    nombres = params.get('ExpressionAttributeNames') or {}
+    valores = params.get('ExpressionAttributeValues') or {}
+    partes = _SECCION.split(params['UpdateExpression'])
+
+    # Como DynamoDB, todos los valores se evalúan contra el item anterior
+    original = copy.deepcopy(item)
+    for accion, cuerpo in zip(partes[1::2], partes[2::2]):
+        for clausula in _separar(cuerpo):
+            if accion == 'SET':
+                destino, expresion = clausula.split('=', 1)
+                ruta = _ruta(destino, nombres)
+                _padre(item, ruta)[ruta[-1]] = _valor(expresion, original, nombres, valores)
+            elif accion == 'REMOVE':
+                ruta = _ruta(clausula, nombres)
+                contenedor = _leer(item, ruta[:-1]) if len(ruta) > 1 else item
+                if isinstance(contenedor, dict):
+                    contenedor.pop(ruta[-1], None)
+            elif accion == 'ADD':
+                atributo, valor = clausula.split()
+                atributo = nombres.get(atributo, atributo)
+                item[atributo] = item.get(atributo, 0) + valores[valor]
+
+
+def _condicion(expresion, item, params):
+    """attribute_exists / attribute_not_exists / a = :v con AND u OR; lo demás se da por cumplido"""
+    nombres = params.get('ExpressionAttributeNames') or {}
+    valores = params.get('ExpressionAttributeValues') or {}
+
+    def termino(texto):
+        texto = texto.strip()
+        funcion = re.fullmatch(r'(attribute_exists|attribute_not_exists)\((.+)\)', texto)
+        if funcion:
+            existe = _leer(item, _ruta(funcion.group(2), nombres)) is not None
+            return existe if funcion.group(1) == 'attribute_exists' else not existe
+        igualdad = re.fullmatch(r'([#\w.]+)\s*=\s*(:\w+)', texto)
+        if igualdad:
+            return _leer(item, _ruta(igualdad.group(1), nombres)) == valores[igualdad.group(2)]
+        return True
+
+    return any(
+        all(termino(parte) for parte in re.split(r'\sAND\s', alternativa))
+        for alternativa in re.split(r'\sOR\s', expresion)
+    )
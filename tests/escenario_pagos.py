@@ -0,0 +1,71 @@
+# ========================================
+# tests/escenario_pagos.py
+# lambda_pagos conectada a un DynamoFalso, con una tanda semanal de dos
+# participantes, un pago pendiente de part_1 en la ronda 1 y su vista y
+# totales ya construidos
+# ========================================
+
+import contextlib
+import importlib
+import io
+import json
+from decimal import Decimal
+
+from dynamo_falso import DynamoFalso
+
+TANDA_ID = 'tanda_1'
+ADMIN_ID = 'admin_1'
+MONTO = Decimal(500)
+
+
+def preparar(handler):
+    """Reemplaza las tablas del handler y de sus utils. Returns: db"""
+    tanda_vista = importlib.import_module('utils.tanda_vista')
+    pagos_agregados = importlib.import_module('utils.pagos_agregados')
+
+    db = DynamoFalso()
+    handler.tandas_table._table = db.tabla('tandas', 'id')
+    handler.participantes_table._table = db.tabla('participantes', 'id', 'participanteId')
+    handler.pagos_table._table = db.tabla('pagos', 'id', 'pagoId')
+
+    # Los utils escriben con sus propios objetos Table
+    tanda_vista.vista_table = db.tabla('tandas_vista', 'tandaId')
+    tanda_vista._tandas_table = db.Table('tandas')
+    tanda_vista._participantes_table = db.Table('participantes')
+    tanda_vista._pagos_table = db.Table('pagos')
+    pagos_agregados.agregados_table = db.tabla('pagos_agregados', 'tandaId')
+    pagos_agregados._tandas_table = db.Table('tandas')
+    pagos_agregados._pagos_table = db.Table('pagos')
+
+    db.sembrar('tandas', {
+        'id': TANDA_ID, 'adminId': ADMIN_ID, 'nombre': 'Tanda', 'frecuencia': 'semanal',
+        'totalRondas': Decimal(10), 'rondaActual': Decimal(2), 'montoPorRonda': MONTO,
+        'fechaInicio': '2025-01-06', 'configuracion': {'metodoPago': 'Transferencia'},
+        'version': Decimal(1)
+    })
+    for numero in (1, 2):
+        db.sembrar('participantes', {
+            'id': TANDA_ID, 'participanteId': f'part_{numero}', 'nombre': f'P{numero}',
+            'numeroAsignado': Decimal(numero)
+        })
+    db.sembrar('pagos', {
+        'id': TANDA_ID, 'pagoId': 'part_1_1', 'participanteId': 'part_1', 'ronda': Decimal(1),
+        'pagado': False, 'monto': MONTO, 'exentoPago': False
+    })
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        tanda_vista.reconstruir_vista(TANDA_ID)
+        pagos_agregados.reconstruir_agregados(TANDA_ID)
+    db.llamadas.clear()
+    return db
+
+
+def evento(route_key, body=None, **path):
+    return {
+        'routeKey': route_key,
+        'pathParameters': {'tandaId': TANDA_ID, **path},
+        'body': json.dumps(body) if body is not None else None,
+        'queryStringParameters': None,
+        'requestContext': {'authorizer': {'lambda': {'userId': ADMIN_ID}}},
+        'headers': {},
+    }
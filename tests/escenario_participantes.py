@@ -0,0 +1,64 @@
+# ========================================
+# tests/escenario_participantes.py
+# lambda_participantes conectada a un DynamoFalso, con una tanda normal
+# (números 1-10), un participante con el número 1 y su vista
+# ========================================
+
+import importlib
+import json
+from decimal import Decimal
+
+from dynamo_falso import DynamoFalso
+
+TANDA_ID = 'tanda_1'
+ADMIN_ID = 'admin_1'
+
+
+def preparar(handler):
+    """Reemplaza las tablas del handler y de sus utils. Returns: (tanda_vista, db)"""
+    tanda_vista = importlib.import_module('utils.tanda_vista')
+    registro_snapshot = importlib.import_module('utils.registro_snapshot')
+    pagos_agregados = importlib.import_module('utils.pagos_agregados')
+
+    db = DynamoFalso()
+    handler.tandas_table._table = db.tabla('tandas', 'id')
+    handler.participantes_table._table = db.tabla('participantes', 'id', 'participanteId')
+    handler.pagos_table._table = db.tabla('pagos', 'id', 'pagoId')
+    handler.notificaciones_table._table = db.tabla('notificaciones', 'id')
+    handler.score_events_table = db.tabla('score_events', 'actorId', 'eventId')
+    db.tabla('participantes_slots', 'tandaId', 'numero')
+
+    # Los utils escriben con sus propios objetos Table
+    tanda_vista.vista_table = db.tabla('tandas_vista', 'tandaId')
+    tanda_vista._tandas_table = db.tabla('tandas', 'id')
+    tanda_vista._participantes_table = db.tabla('participantes', 'id', 'participanteId')
+    tanda_vista._pagos_table = db.tabla('pagos', 'id', 'pagoId')
+    registro_snapshot.links_table = db.tabla('links_registro', 'token')
+    pagos_agregados.agregados_table = db.tabla('pagos_agregados', 'tandaId', 'llave')
+    pagos_agregados._pagos_table = db.tabla('pagos', 'id', 'pagoId')
+
+    db.sembrar('tandas', {
+        'id': TANDA_ID, 'adminId': ADMIN_ID, 'nombre': 'Tanda', 'frecuencia': 'semanal',
+        'totalRondas': Decimal(10), 'rondaActual': Decimal(1), 'version': Decimal(1)
+    })
+    db.sembrar('participantes', {
+        'id': TANDA_ID, 'participanteId': 'part_1', 'nombre': 'Ana', 'telefono': '5512345678',
+        'numeroAsignado': Decimal(1)
+    })
+    db.sembrar('participantes_slots', {'tandaId': TANDA_ID, 'numero': Decimal(1), 'participanteId': 'part_1'})
+    db.sembrar('tandas_vista', {
+        'tandaId': TANDA_ID, 'version': Decimal(1), 'totalParticipantes': 1,
+        'participantes': {'part_1': {'nombre': 'Ana', 'telefono': '5512345678', 'numeroAsignado': Decimal(1)}},
+        'pagados': {'part_1': {}}, 'exentos': {'part_1': {}}, 'pagos': {'part_1': {}}
+    })
+    return tanda_vista, db
+
+
+def evento(route_key, body=None, **path):
+    return {
+        'routeKey': route_key,
+        'pathParameters': {'tandaId': TANDA_ID, **path},
+        'body': json.dumps(body) if body is not None else None,
+        'requestContext': {'authorizer': {'lambda': {'userId': ADMIN_ID}}},
+        'headers': {},
+    }
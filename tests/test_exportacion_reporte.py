@@ -0,0 +1,67 @@
+# ========================================
+# Consumidor de la cola de exportaciones (utils/exportacion_reporte.py)
+# cuando falla la generación del archivo
+# ========================================
+
+import importlib
+import json
+import re
+
+import pytest
+
+from dynamo_falso import DynamoFalso
+
+TANDA_ID = 'tanda_1'
+EXPORT_ID = 'csv-v3'
+
+# Palabras reservadas de DynamoDB que podrían usarse como atributo aquí
+RESERVADAS = {'error', 'status', 'size', 'count', 'name', 'data', 'key', 'url', 'state'}
+
+
+@pytest.fixture
+def exportacion(cargar_lambda, monkeypatch):
+    """(exportacion_reporte, db, updates) con la tabla de exportaciones en un DynamoFalso"""
+    cargar_lambda('lambda_estadisticas')
+    modulo = importlib.import_module('utils.exportacion_reporte')
+
+    db = DynamoFalso()
+    tabla = db.tabla('reportes_exportaciones', 'tandaId', 'exportId')
+    db.sembrar('reportes_exportaciones', {'tandaId': TANDA_ID, 'exportId': EXPORT_ID, 'estado': 'pendiente'})
+
+    updates = []
+    update_item = tabla.update_item
+
+    def registrar_update(**kwargs):
+        updates.append(kwargs)
+        return update_item(**kwargs)
+
+    monkeypatch.setattr(tabla, 'update_item', registrar_update)
+    monkeypatch.setattr(modulo, 'exportaciones_table', tabla)
+    return modulo, db, updates
+
+
+def atributos_set(update):
+    """Atributos (o #nombres) a la izquierda de cada '=' del SET"""
+    return re.findall(r'([#\w]+)\s*=', update['UpdateExpression'])
+
+
+def test_falla_al_generar_registra_el_error_con_nombre_de_atributo(exportacion, monkeypatch):
+    modulo, db, updates = exportacion
+
+    def subida_que_falla(*args, **kwargs):
+        raise RuntimeError('AccessDenied')
+
+    monkeypatch.setattr(modulo, 'SubidaMultipart', subida_que_falla)
+
+    resultado = modulo.procesar_cola_exportaciones({'Records': [
+        {'messageId': 'msg_1', 'body': json.dumps({'tandaId': TANDA_ID, 'exportId': EXPORT_ID})}
+    ]})
+
+    # La falla queda en la exportación; no se reintenta por SQS
+    assert resultado == {'batchItemFailures': []}
+    update, = updates
+    assert not RESERVADAS & set(atributos_set(update))
+    assert update['ExpressionAttributeNames'] == {'#error': 'error'}
+    assert db.item('reportes_exportaciones', tandaId=TANDA_ID, exportId=EXPORT_ID) == {
+        'tandaId': TANDA_ID, 'exportId': EXPORT_ID, 'estado': 'fallida', 'error': 'AccessDenied'
+    }
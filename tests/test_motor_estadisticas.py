@@ -0,0 +1,227 @@
+# ========================================
+# motor_estadisticas.calcular_estadisticas contra el cálculo anterior
+# (el que hacía el handler de lambda_estadisticas recorriendo los pagos
+# una vez por participante), sobre tandas generadas
+# ========================================
+
+import importlib
+import random
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+
+AHORA = datetime(2026, 3, 10, 15, 30, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def motor(cargar_lambda):
+    cargar_lambda('lambda_estadisticas')
+    return importlib.import_module('utils.motor_estadisticas')
+
+
+def estadisticas_anteriores(tanda, participantes, pagos, ahora):
+    """Cálculo del handler anterior, con `ahora` en lugar de datetime.now()"""
+    es_cumpleañera = tanda.get('frecuencia') == 'cumpleaños'
+    participantes = list(participantes)
+
+    if es_cumpleañera:
+        def ordenar_cumpleañera(p):
+            if p.get('fechaCumpleaños'):
+                try:
+                    fecha = datetime.fromisoformat(p['fechaCumpleaños'])
+                    fecha_registro = datetime.fromisoformat(p.get('fechaRegistro', p.get('createdAt')))
+                    return (fecha.month, fecha.day, fecha_registro.timestamp())
+                except Exception:
+                    return (13, 32, 0)
+            return (13, 32, 0)
+
+        participantes.sort(key=ordenar_cumpleañera)
+    else:
+        participantes.sort(key=lambda p: p.get('numeroAsignado', 999))
+
+    total_participantes = len(participantes)
+    ronda_actual = int(tanda['rondaActual'])
+    total_rondas = int(tanda['totalRondas'])
+    monto_por_ronda = float(tanda['montoPorRonda'])
+
+    al_corriente = atrasados = adelantados = 0
+    for participante in participantes:
+        pagos_participante = [
+            p for p in pagos
+            if p['participanteId'] == participante['participanteId'] and p.get('pagado', False)
+        ]
+        pagos_realizados = len(pagos_participante)
+        pagos_esperados = ronda_actual - 1
+        if pagos_realizados >= pagos_esperados:
+            al_corriente += 1
+        elif pagos_realizados < pagos_esperados:
+            atrasados += 1
+        if pagos_realizados > pagos_esperados:
+            adelantados += 1
+
+    pagos_realizados = [p for p in pagos if p.get('pagado', False)]
+    total_recaudado = sum(float(p.get('monto', monto_por_ronda)) for p in pagos_realizados)
+    total_esperado = monto_por_ronda * total_participantes * (ronda_actual - 1)
+    porcentaje_recaudacion = (total_recaudado / total_esperado * 100) if total_esperado > 0 else 0
+    progreso_tanda = round((ronda_actual / total_rondas) * 100)
+
+    proximo_numero = None
+    if es_cumpleañera:
+        proximos = []
+        for participante in participantes:
+            if participante.get('fechaCumpleaños'):
+                try:
+                    cumple = datetime.fromisoformat(participante['fechaCumpleaños']).replace(year=ahora.year)
+                    if cumple < ahora:
+                        cumple = cumple.replace(year=ahora.year + 1)
+                    proximos.append((participante, cumple, (cumple - ahora).days))
+                except Exception:
+                    pass
+        if proximos:
+            proximos.sort(key=lambda x: x[2])
+            participante, cumple, dias = proximos[0]
+            proximo_numero = {
+                'participanteId': participante['participanteId'],
+                'nombre': participante['nombre'],
+                'numeroAsignado': participante['numeroAsignado'],
+                'fechaEstimada': cumple.strftime('%Y-%m-%d'),
+                'diasFaltantes': dias,
+                'esCumpleaños': True
+            }
+    elif tanda.get('fechaInicio'):
+        # Sólo 'semanal': en quincenal y mensual la fecha estimada ahora
+        # sale del calendario de la tanda y no de la aproximación anterior
+        for participante in participantes:
+            if participante['numeroAsignado'] == ronda_actual:
+                fecha_estimada = datetime.fromisoformat(tanda['fechaInicio']) + timedelta(weeks=ronda_actual - 1)
+                proximo_numero = {
+                    'participanteId': participante['participanteId'],
+                    'nombre': participante['nombre'],
+                    'numeroAsignado': participante['numeroAsignado'],
+                    'fechaEstimada': fecha_estimada.strftime('%Y-%m-%d'),
+                    'esCumpleaños': False
+                }
+                break
+
+    def parse_fecha_pago(fecha_str):
+        if not fecha_str:
+            return None
+        try:
+            if fecha_str.endswith('Z'):
+                fecha_str = fecha_str.replace('Z', '+00:00')
+            fecha = datetime.fromisoformat(fecha_str)
+            if fecha.tzinfo is None:
+                fecha = fecha.replace(tzinfo=timezone.utc)
+            return fecha
+        except Exception:
+            return None
+
+    hace_un_mes = ahora - timedelta(days=30)
+    pagos_ultimo_mes = sum(
+        float(p.get('monto', 0))
+        for p in pagos_realizados
+        if parse_fecha_pago(p.get('fechaPago')) is not None and parse_fecha_pago(p.get('fechaPago')) > hace_un_mes
+    )
+    pagos_promedio_por_ronda = total_recaudado / max(ronda_actual - 1, 1)
+
+    return {
+        'esCumpleañera': es_cumpleañera,
+        'estadisticas': {
+            'totalParticipantes': total_participantes,
+            'participantesAlCorriente': al_corriente,
+            'participantesAtrasados': atrasados,
+            'rondaActual': ronda_actual,
+            'totalRondas': total_rondas,
+            'progresoTanda': progreso_tanda,
+            'totalRecaudado': round(total_recaudado, 2),
+            'totalEsperado': round(total_esperado, 2),
+            'porcentajeRecaudacion': round(porcentaje_recaudacion, 2),
+            'proximoNumero': proximo_numero,
+            'pagosUltimoMes': round(pagos_ultimo_mes, 2),
+            'pagosPromedioPorRonda': round(pagos_promedio_por_ronda, 2)
+        },
+        'distribucionPagos': {
+            'al_corriente': al_corriente,
+            'atrasados': atrasados,
+            'adelantados': adelantados
+        }
+    }
+
+
+def generar_tanda(total_participantes, cumpleañera, semilla, max_rondas=None):
+    """Tanda con participantes y pagos al azar (montos faltantes, fechas inválidas, pagos huérfanos)"""
+    rnd = random.Random(semilla)
+    total_rondas = max(total_participantes, 2)
+    if max_rondas:
+        total_rondas = min(total_rondas, max_rondas)
+    ronda_actual = rnd.randint(1, total_rondas)
+    tanda = {
+        'id': 'tanda_1', 'nombre': 'Tanda',
+        'frecuencia': 'cumpleaños' if cumpleañera else 'semanal',
+        'totalRondas': Decimal(total_rondas), 'rondaActual': Decimal(ronda_actual),
+        'montoPorRonda': Decimal(rnd.choice(['500', '250.5', '1000'])),
+        'fechaInicio': '2025-01-15',
+    }
+
+    numeros = list(range(1, total_participantes + 1))
+    rnd.shuffle(numeros)
+    participantes, pagos = [], []
+    for i in range(total_participantes):
+        participante = {
+            'id': 'tanda_1', 'participanteId': f'part_{i}', 'nombre': f'P{i}',
+            'numeroAsignado': Decimal(numeros[i]),
+            'createdAt': f'2025-01-{rnd.randint(1, 28):02d}T10:00:00'
+        }
+        if cumpleañera or rnd.random() < 0.3:
+            participante['fechaCumpleaños'] = f'19{rnd.randint(60, 99)}-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}'
+        participantes.append(participante)
+
+        for ronda in range(1, min(total_rondas, ronda_actual + 3) + 1):
+            if rnd.random() < 0.15:
+                continue
+            pago = {
+                'id': 'tanda_1', 'pagoId': f'part_{i}_{ronda}', 'participanteId': f'part_{i}',
+                'ronda': Decimal(ronda), 'pagado': rnd.random() < 0.85
+            }
+            if rnd.random() < 0.9:
+                pago['monto'] = Decimal(rnd.choice(['500', '250.5', '1000', '99.99']))
+            tipo_fecha = rnd.random()
+            if tipo_fecha < 0.8:
+                # La mitad cae dentro de los últimos 30 días
+                fecha = AHORA - timedelta(days=rnd.randint(0, 60), hours=rnd.randint(0, 23), minutes=7)
+                pago['fechaPago'] = fecha.isoformat().replace('+00:00', rnd.choice(['Z', '+00:00', '']))
+            elif tipo_fecha < 0.9:
+                pago['fechaPago'] = 'no-es-fecha'
+            pagos.append(pago)
+
+    pagos.append({'id': 'tanda_1', 'pagoId': 'zz_1', 'participanteId': 'zz', 'ronda': Decimal(1),
+                  'pagado': True, 'monto': Decimal(7)})
+    return tanda, participantes, pagos
+
+
+@pytest.mark.parametrize('cumpleañera', [False, True], ids=['normal', 'cumpleañera'])
+@pytest.mark.parametrize('total_participantes', [1, 3, 10, 40, 100])
+def test_igual_al_calculo_anterior(motor, cumpleañera, total_participantes):
+    for semilla in range(10):
+        tanda, participantes, pagos = generar_tanda(total_participantes, cumpleañera, semilla)
+
+        assert motor.calcular_estadisticas(tanda, participantes, pagos, AHORA) == \
+            estadisticas_anteriores(tanda, participantes, pagos, AHORA)
+
+
+def test_pagos_del_ultimo_mes(motor):
+    tanda, participantes, _ = generar_tanda(3, False, 0)
+    pagos = [
+        {'participanteId': 'part_0', 'pagado': True, 'monto': Decimal(100),
+         'fechaPago': (AHORA - timedelta(days=29)).isoformat()},
+        {'participanteId': 'part_1', 'pagado': True, 'monto': Decimal(200),
+         'fechaPago': (AHORA - timedelta(days=31)).strftime('%Y-%m-%dT%H:%M:%SZ')},
+        {'participanteId': 'part_2', 'pagado': False, 'monto': Decimal(400),
+         'fechaPago': AHORA.isoformat()},
+    ]
+
+    resultado = motor.calcular_estadisticas(tanda, participantes, pagos, AHORA)
+
+    assert resultado['estadisticas']['pagosUltimoMes'] == 100
+    assert resultado['estadisticas']['totalRecaudado'] == 300
@@ -0,0 +1,48 @@
+# ========================================
+# Totales de pagos (utils/pagos_agregados.py) al editar pagos
+# ========================================
+
+import copy
+import importlib
+
+from escenario_pagos import MONTO, TANDA_ID, evento
+
+PUT_PAGO = 'PUT /tandas/{tandaId}/pagos/{pagoId}'
+
+
+def agregados(db):
+    return db.item('pagos_agregados', tandaId=TANDA_ID)
+
+
+def test_ediciones_simultaneas_suman_el_pago_una_vez(pagos_falso, monkeypatch):
+    handler, db = pagos_falso
+    # Dos ediciones del mismo pago que leyeron antes de que cualquiera escribiera
+    inicial = copy.deepcopy(db.item('pagos', id=TANDA_ID, pagoId='part_1_1'))
+    monkeypatch.setattr(handler.pagos_table, 'get_item', lambda **kwargs: {'Item': copy.deepcopy(inicial)})
+
+    for _ in range(2):
+        respuesta = handler.lambda_handler(
+            evento(PUT_PAGO, {'pagado': True, 'fechaPago': '2025-01-06'}, pagoId='part_1_1'), None
+        )
+        assert respuesta['statusCode'] == 200
+
+    item = agregados(db)
+    assert (item['pagosPagados'], item['totalMonto']) == (1, MONTO)
+    assert item['montoParticipantes'] == {'part_1': MONTO}
+    assert item['montoDias'] == {'2025-01-06': MONTO}
+    pagos_agregados = importlib.import_module('utils.pagos_agregados')
+    assert pagos_agregados.reconciliar_tanda(TANDA_ID, corregir=False)['estado'] == 'ok'
+
+
+def test_desmarcar_resta_el_monto_y_el_dia_anteriores(pagos_falso):
+    handler, db = pagos_falso
+
+    for cambio in ({'pagado': True, 'fechaPago': '2025-01-06'}, {'fechaPago': '2025-01-08'}, {'pagado': False}):
+        respuesta = handler.lambda_handler(evento(PUT_PAGO, cambio, pagoId='part_1_1'), None)
+        assert respuesta['statusCode'] == 200
+
+    item = agregados(db)
+    assert (item['pagosPagados'], item['totalMonto']) == (0, 0)
+    assert not any(item['montoDias'].values())
+    pagos_agregados = importlib.import_module('utils.pagos_agregados')
+    assert pagos_agregados.reconciliar_tanda(TANDA_ID, corregir=False)['estado'] == 'ok'
@@ -0,0 +1,87 @@
+# ========================================
+# POST /tandas/{tandaId}/pagos:batch: lecturas y deltas de la vista
+# (utils/tanda_vista.py) y de los totales (utils/pagos_agregados.py)
+# ========================================
+
+import importlib
+from decimal import Decimal
+
+from escenario_pagos import MONTO, TANDA_ID, evento
+
+POST_LOTE = 'POST /tandas/{tandaId}/pagos:batch'
+
+
+def registrar_lote(handler, filas):
+    respuesta = handler.lambda_handler(evento(POST_LOTE, {'pagos': filas}), None)
+    assert respuesta['statusCode'] == 201, respuesta['body']
+    return respuesta
+
+
+def reconciliados():
+    """(estado de la vista, estado de los totales) contra las tablas fuente"""
+    tanda_vista = importlib.import_module('utils.tanda_vista')
+    pagos_agregados = importlib.import_module('utils.pagos_agregados')
+    return (
+        tanda_vista.reconciliar_vista(TANDA_ID, corregir=False)['estado'],
+        pagos_agregados.reconciliar_tanda(TANDA_ID, corregir=False)['estado'],
+    )
+
+
+def test_lote_lee_solo_sus_pagos_y_aplica_deltas(pagos_falso):
+    handler, db = pagos_falso
+
+    registrar_lote(handler, [
+        {'participanteId': 'part_1', 'ronda': 1, 'pagado': True},
+        {'participanteId': 'part_1', 'ronda': 2, 'pagado': True},
+        {'participanteId': 'part_2', 'ronda': 1, 'pagado': False, 'exentoPago': True},
+    ])
+
+    # Ni la partición de pagos ni una reconstrucción: un BatchGetItem y un update por tabla
+    assert db.llamadas[('pagos', 'query')] == 0
+    assert db.llamadas[('cliente', 'batch_get_item')] == 1
+    assert db.llamadas[('tandas_vista', 'update_item')] == 1
+    assert db.llamadas[('pagos_agregados', 'update_item')] == 1
+
+    vista = db.item('tandas_vista', tandaId=TANDA_ID)
+    assert vista['pagados'] == {'part_1': {'0': 0b11}, 'part_2': {}}
+    assert vista['exentos'] == {'part_1': {}, 'part_2': {'0': 0b1}}
+    agregados = db.item('pagos_agregados', tandaId=TANDA_ID)
+    assert (agregados['pagosPagados'], agregados['totalMonto']) == (2, 2 * MONTO)
+    assert reconciliados() == ('ok', 'ok')
+
+    # Desmarcar: el delta sale del pago anterior leído en el lote
+    registrar_lote(handler, [{'participanteId': 'part_1', 'ronda': 1, 'pagado': False}])
+
+    vista = db.item('tandas_vista', tandaId=TANDA_ID)
+    assert vista['pagados']['part_1'] == {'0': 0b10}
+    agregados = db.item('pagos_agregados', tandaId=TANDA_ID)
+    assert (agregados['pagosPagados'], agregados['totalMonto']) == (1, MONTO)
+    assert reconciliados() == ('ok', 'ok')
+
+
+def test_lote_grande_reparte_los_deltas_en_expresiones_validas(pagos_falso, monkeypatch):
+    handler, db = pagos_falso
+    db.item('tandas', id=TANDA_ID)['totalRondas'] = Decimal(200)
+
+    expresiones = []
+    for tabla in (importlib.import_module('utils.tanda_vista').vista_table,
+                  importlib.import_module('utils.pagos_agregados').agregados_table):
+        def registrar_update(update_item=tabla.update_item, **kwargs):
+            expresiones.append(kwargs['UpdateExpression'])
+            return update_item(**kwargs)
+
+        monkeypatch.setattr(tabla, 'update_item', registrar_update)
+
+    registrar_lote(handler, [
+        {'participanteId': 'part_1', 'ronda': ronda, 'pagado': True}
+        for ronda in range(1, 201)
+    ])
+
+    assert db.llamadas[('pagos', 'query')] == 0
+    assert len(expresiones) > 2
+    assert max(len(expresion) for expresion in expresiones) <= 4096
+    vista = db.item('tandas_vista', tandaId=TANDA_ID)
+    assert vista['pagados']['part_1'] == {'0': 2**64 - 1, '1': 2**64 - 1, '2': 2**64 - 1, '3': 2**8 - 1}
+    agregados = db.item('pagos_agregados', tandaId=TANDA_ID)
+    assert (agregados['pagosPagados'], agregados['totalMonto']) == (200, 200 * MONTO)
+    assert reconciliados() == ('ok', 'ok')
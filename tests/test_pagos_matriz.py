@@ -0,0 +1,95 @@
+# ========================================
+# Matriz de pagos: formato compacto contra el detallado
+# ========================================
+
+from decimal import Decimal
+
+import pytest
+
+TOTAL_RONDAS = 6
+RONDA_ACTUAL = 4
+
+
+@pytest.fixture
+def pagos_handler(cargar_lambda):
+    return cargar_lambda('lambda_pagos')
+
+
+def datos():
+    participantes = [
+        {'participanteId': f'part_{i}', 'nombre': f'P{i}', 'numeroAsignado': Decimal(i)}
+        for i in (1, 2)
+    ]
+    pagos = [
+        {'participanteId': 'part_1', 'ronda': Decimal(ronda), 'pagado': True, 'monto': Decimal(500)}
+        for ronda in (1, 2, 3)
+    ] + [
+        # Rondas fuera de 1..totalRondas (registros anteriores sin validación)
+        {'participanteId': 'part_2', 'ronda': Decimal(ronda), 'pagado': True, 'exentoPago': True}
+        for ronda in (0, -1, TOTAL_RONDAS + 1, 200)
+    ] + [
+        {'participanteId': 'part_2', 'ronda': Decimal(1), 'pagado': True, 'monto': Decimal(500)},
+    ]
+    return participantes, pagos
+
+
+def test_compacta_ignora_rondas_fuera_de_rango_como_la_detallada(pagos_handler):
+    participantes, pagos = datos()
+
+    compacta = pagos_handler.matriz_compacta(participantes, pagos, RONDA_ACTUAL, TOTAL_RONDAS, 1, TOTAL_RONDAS)
+    detallada = pagos_handler.matriz_detallada(participantes, pagos, RONDA_ACTUAL, TOTAL_RONDAS, 1, TOTAL_RONDAS)['matriz']
+
+    for fila_compacta, fila_detallada in zip(compacta['participantes'], detallada):
+        assert fila_compacta['estadoGeneral'] == fila_detallada['estadoGeneral']
+        assert fila_compacta['pagosAdelantados'] == fila_detallada['pagosAdelantados']
+        pagadas = {int(ronda) for ronda, pago in fila_detallada['pagos'].items() if pago['pagado']}
+        assert fila_compacta['pagados'] == sum(1 << (ronda - 1) for ronda in pagadas)
+        assert all(1 <= detalle[0] <= TOTAL_RONDAS for detalle in fila_compacta['detalles'])
+
+    assert compacta['participantes'][1]['pagados'] == 0b1
+    assert compacta['participantes'][1]['exentos'] == 0
+
+
+def expandir_compacta(compacta):
+    """Igual que expandirMatrizCompacta (app/src/utils/matrizPagos.js):
+    Returns: {(participanteId, ronda): {campo: valor}} de las celdas con detalle"""
+    campos = compacta['campos'][1:]
+    celdas = {}
+    for fila in compacta['participantes']:
+        detalles = {detalle[0]: detalle for detalle in fila['detalles']}
+        for ronda in range(compacta['desde'], compacta['hasta'] + 1):
+            bit = 1 << (ronda - compacta['desde'])
+            if not (fila['pagados'] | fila['exentos']) & bit and ronda not in detalles:
+                continue
+            detalle = detalles.get(ronda, [])
+            celda = {}
+            for j, campo in enumerate(campos, start=1):
+                valor = detalle[j] if j < len(detalle) else None
+                # `??`: sólo null/ausente toma el predeterminado
+                celda[campo] = valor if valor is not None else compacta['predeterminados'].get(campo)
+            celdas[(fila['participanteId'], ronda)] = celda
+    return celdas
+
+
+def test_compacta_distingue_sin_valor_del_predeterminado(pagos_handler):
+    participantes = [{'participanteId': 'part_1', 'nombre': 'P1', 'numeroAsignado': Decimal(1)}]
+    pagos = [
+        {'participanteId': 'part_1', 'ronda': Decimal(ronda), 'pagado': True,
+         'monto': Decimal(500), 'metodoPago': 'Efectivo'}
+        for ronda in (1, 2, 3)
+    ] + [
+        {'participanteId': 'part_1', 'ronda': Decimal(4), 'pagado': True, 'monto': Decimal(500), 'metodoPago': ''},
+        {'participanteId': 'part_1', 'ronda': Decimal(5), 'pagado': True, 'metodoPago': 'Efectivo'},
+    ]
+
+    compacta = pagos_handler.matriz_compacta(participantes, pagos, RONDA_ACTUAL, TOTAL_RONDAS, 1, TOTAL_RONDAS)
+    detallada = pagos_handler.matriz_detallada(participantes, pagos, RONDA_ACTUAL, TOTAL_RONDAS, 1, TOTAL_RONDAS)['matriz']
+
+    assert compacta['predeterminados'] == {'monto': Decimal(500), 'metodoPago': 'Efectivo'}
+    celdas = expandir_compacta(compacta)
+    assert sorted(ronda for _, ronda in celdas) == [1, 2, 3, 4, 5]
+    for (_, ronda), celda in celdas.items():
+        pago = detallada[0]['pagos'][str(ronda)]
+        for campo in ('monto', 'metodoPago'):
+            # El cliente trata igual '' y null ("sin valor")
+            assert (celda[campo] or None) == (pago.get(campo) or None), (ronda, campo)
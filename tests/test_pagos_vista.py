@@ -0,0 +1,73 @@
+# ========================================
+# Bitmaps de la vista (utils/tanda_vista.py) al editar pagos, y su
+# reconciliación contra las tablas fuente
+# ========================================
+
+import copy
+import importlib
+
+from escenario_pagos import TANDA_ID, evento
+
+PUT_PAGO = 'PUT /tandas/{tandaId}/pagos/{pagoId}'
+
+
+def vista(db):
+    return db.item('tandas_vista', tandaId=TANDA_ID)
+
+
+def test_ediciones_simultaneas_aplican_el_bit_una_vez(pagos_falso, monkeypatch):
+    handler, db = pagos_falso
+    # Dos ediciones del mismo pago que leyeron antes de que cualquiera escribiera
+    inicial = copy.deepcopy(db.item('pagos', id=TANDA_ID, pagoId='part_1_1'))
+    monkeypatch.setattr(handler.pagos_table, 'get_item', lambda **kwargs: {'Item': copy.deepcopy(inicial)})
+
+    for _ in range(2):
+        respuesta = handler.lambda_handler(evento(PUT_PAGO, {'pagado': True}, pagoId='part_1_1'), None)
+        assert respuesta['statusCode'] == 200
+
+    # Con el delta sumado dos veces el bit acarrea a la ronda 2: {'0': 2}
+    assert vista(db)['pagados']['part_1'] == {'0': 1}
+    assert importlib.import_module('utils.tanda_vista').reconciliar_vista(TANDA_ID)['estado'] == 'ok'
+
+
+def test_editar_pago_inexistente_no_lo_crea(pagos_falso):
+    handler, db = pagos_falso
+
+    respuesta = handler.lambda_handler(evento(PUT_PAGO, {'pagado': True}, pagoId='part_2_1'), None)
+
+    assert respuesta['statusCode'] == 404
+    assert db.item('pagos', id=TANDA_ID, pagoId='part_2_1') is None
+    assert ('tandas_vista', 'update_item') not in db.llamadas
+
+
+def test_reconciliacion_corrige_bitmaps_desviados(pagos_falso):
+    _, db = pagos_falso
+    tanda_vista = importlib.import_module('utils.tanda_vista')
+    vista(db)['pagados']['part_1'] = {'0': 2}
+
+    reporte = tanda_vista.reconciliar_vistas([TANDA_ID])
+
+    assert (reporte['conDrift'], reporte['corregidas']) == (1, 1)
+    assert reporte['drift'][0]['drift'] == {'pagados': {'part_1': {'guardado': [2], 'calculado': None}}}
+    assert vista(db)['pagados']['part_1'] == {}
+    assert tanda_vista.reconciliar_vistas([TANDA_ID])['conDrift'] == 0
+
+
+def test_reconciliacion_no_pisa_una_escritura_concurrente(pagos_falso, monkeypatch):
+    _, db = pagos_falso
+    tanda_vista = importlib.import_module('utils.tanda_vista')
+    vista(db)['pagados']['part_1'] = {'0': 2}
+    leer_fuentes = tanda_vista._leer_fuentes
+
+    def fuentes_y_escritura(tanda_id):
+        fuentes = leer_fuentes(tanda_id)
+        tanda_vista.actualizar_tanda_vista(fuentes[0])
+        return fuentes
+
+    monkeypatch.setattr(tanda_vista, '_leer_fuentes', fuentes_y_escritura)
+
+    resultado = tanda_vista.reconciliar_vista(TANDA_ID)
+
+    assert resultado['estado'] == 'drift'
+    assert resultado['corregido'] is False
+    assert vista(db)['pagados']['part_1'] == {'0': 2}
@@ -0,0 +1,96 @@
+# ========================================
+# Números de una tanda cumpleañera al cambiar la fecha de cumpleaños
+# ========================================
+
+import json
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from escenario_participantes import ADMIN_ID, TANDA_ID, evento
+
+REGISTRO = '2025-01-01T00:00:00'
+
+
+def sembrar_cumpleañera(db):
+    db.sembrar('tandas', {
+        'id': TANDA_ID, 'adminId': ADMIN_ID, 'nombre': 'Tanda', 'frecuencia': 'cumpleaños',
+        'totalRondas': Decimal(2), 'rondaActual': Decimal(1), 'version': Decimal(1)
+    })
+    for participante_id, fecha, numero in (('part_1', '1990-03-01', 1), ('part_2', '1990-06-01', 2)):
+        db.sembrar('participantes', {
+            'id': TANDA_ID, 'participanteId': participante_id, 'nombre': participante_id,
+            'telefono': '5512345678', 'numeroAsignado': Decimal(numero),
+            'fechaCumpleaños': fecha, 'fechaRegistro': REGISTRO,
+            'birthdayKey': f"{fecha[5:7]}{fecha[8:10]}#{REGISTRO}"
+        })
+
+
+def numeros(db):
+    return {
+        participante_id: int(db.item('participantes', id=TANDA_ID, participanteId=participante_id)['numeroAsignado'])
+        for participante_id in ('part_1', 'part_2')
+    }
+
+
+def test_cambio_de_fecha_reordena_aunque_el_indice_este_desactualizado(participantes_falso, monkeypatch):
+    handler, _, db = participantes_falso
+    sembrar_cumpleañera(db)
+    # id-birthdayKey-index es eventualmente consistente: aquí todavía no
+    # refleja el orden nuevo y devuelve el número que ya tenía
+    monkeypatch.setattr(handler, 'posicion_cumpleaños', lambda *args, **kwargs: 1)
+
+    respuesta = handler.lambda_handler(evento(
+        'PUT /tandas/{tandaId}/participantes/{participanteId}',
+        {'fechaCumpleaños': '1990-09-01'},
+        participanteId='part_1'
+    ), None)
+
+    assert respuesta['statusCode'] == 200
+    assert numeros(db) == {'part_1': 2, 'part_2': 1}
+    assert '"numeroNuevo": 2' in respuesta['body']
+
+
+def test_eliminar_reordena_a_los_restantes(participantes_falso):
+    handler, _, db = participantes_falso
+    sembrar_cumpleañera(db)
+
+    respuesta = handler.lambda_handler(evento(
+        'DELETE /tandas/{tandaId}/participantes/{participanteId}',
+        participanteId='part_1'
+    ), None)
+
+    assert respuesta['statusCode'] == 200
+    assert int(db.item('participantes', id=TANDA_ID, participanteId='part_2')['numeroAsignado']) == 1
+
+
+def test_registro_publico_reordena_con_el_recien_registrado(participantes_falso, monkeypatch):
+    handler, _, db = participantes_falso
+    sembrar_cumpleañera(db)
+    monkeypatch.setattr(handler, 'dynamodb', db)
+    monkeypatch.setattr(handler, 'publicar_snapshots_tanda', lambda tanda_id: 0)
+    expiracion = Decimal(int((datetime.utcnow() + timedelta(days=1)).timestamp()))
+    db.sembrar('links_registro', {'token': 'token_1', 'tandaId': TANDA_ID, 'userId': ADMIN_ID, 'expiracion': expiracion})
+
+    # Un query sin ConsistentRead todavía no ve lo escrito en esta petición
+    tabla = handler.participantes_table._table
+    query = tabla.query
+    anteriores = set(db.datos['participantes'])
+
+    def query_eventual(**kwargs):
+        respuesta = query(**kwargs)
+        if not kwargs.get('ConsistentRead') and 'Items' in respuesta:
+            respuesta['Items'] = [p for p in respuesta['Items'] if db.llave('participantes', p) in anteriores]
+        return respuesta
+
+    monkeypatch.setattr(tabla, 'query', query_eventual)
+
+    respuesta = handler.lambda_handler({
+        'routeKey': 'POST /registro/{token}',
+        'pathParameters': {'token': 'token_1'},
+        'body': json.dumps({'nombre': 'Caro', 'telefono': '5599999999', 'fechaCumpleaños': '1990-04-01'}),
+    }, None)
+
+    assert respuesta['statusCode'] == 200
+    nuevo, = [p for p in db.datos['participantes'].values() if p.get('registradoPorLink')]
+    assert int(nuevo['numeroAsignado']) == 2
+    assert numeros(db) == {'part_1': 1, 'part_2': 3}
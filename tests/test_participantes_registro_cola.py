@@ -0,0 +1,70 @@
+# ========================================
+# Consumidor de la cola FIFO de registro público (procesar_cola_registro)
+# ========================================
+
+import json
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+from escenario_participantes import TANDA_ID
+
+
+def record(message_id, solicitud_id, numero):
+    return {
+        'messageId': message_id,
+        'attributes': {'MessageGroupId': TANDA_ID},
+        'body': json.dumps({
+            'solicitudId': solicitud_id,
+            'token': 'token_1',
+            'body': {'nombre': f'Registro {numero}', 'telefono': '5511111111', 'numeros': [numero]}
+        })
+    }
+
+
+@pytest.fixture
+def cola(participantes_falso, monkeypatch):
+    handler, _, db = participantes_falso
+    handler.solicitudes_table = db.tabla('registro_solicitudes', 'solicitudId')
+    monkeypatch.setattr(handler, 'dynamodb', db)
+    monkeypatch.setattr(handler, 'publicar_snapshots_tanda', lambda tanda_id: 0)
+
+    expiracion = Decimal(int((datetime.utcnow() + timedelta(days=1)).timestamp()))
+    db.sembrar('links_registro', {'token': 'token_1', 'tandaId': TANDA_ID, 'userId': 'admin_1', 'expiracion': expiracion})
+    for solicitud_id in ('sol_1', 'sol_2'):
+        db.sembrar('registro_solicitudes', {'solicitudId': solicitud_id, 'tandaId': TANDA_ID, 'estado': 'pendiente'})
+    return handler, db
+
+
+def participantes_de_registro(db):
+    return [p for p in db.datos['participantes'].values() if p.get('registradoPorLink')]
+
+
+def test_error_inesperado_solo_reintenta_lo_no_resuelto(cola, monkeypatch):
+    handler, db = cola
+    aplicar_registro = handler.aplicar_registro
+    fallas = {'pendientes': 1}
+
+    def aplicar_con_falla(link, tanda, datos, participantes=None):
+        if datos['numeros'] == [3] and fallas['pendientes']:
+            fallas['pendientes'] -= 1
+            raise RuntimeError('ProvisionedThroughputExceeded')
+        return aplicar_registro(link, tanda, datos, participantes)
+
+    monkeypatch.setattr(handler, 'aplicar_registro', aplicar_con_falla)
+    records = [record('msg_1', 'sol_1', 2), record('msg_2', 'sol_2', 3)]
+
+    resultado = handler.lambda_handler({'Records': records}, None)
+
+    assert resultado == {'batchItemFailures': [{'itemIdentifier': 'msg_2'}]}
+    assert db.item('registro_solicitudes', solicitudId='sol_1')['estado'] == 'completada'
+    assert db.item('registro_solicitudes', solicitudId='sol_2')['estado'] == 'pendiente'
+    assert len(participantes_de_registro(db)) == 1
+
+    # SQS vuelve a entregar el lote: sol_1 ya está resuelta y no se duplica
+    resultado = handler.lambda_handler({'Records': records}, None)
+
+    assert resultado == {'batchItemFailures': []}
+    assert db.item('registro_solicitudes', solicitudId='sol_2')['estado'] == 'completada'
+    assert sorted(int(p['numeroAsignado']) for p in participantes_de_registro(db)) == [2, 3]
@@ -0,0 +1,99 @@
+# ========================================
+# Llamadas a DynamoDB de agregar / actualizar / eliminar participante con
+# el cache por invocación (utils/unidad_trabajo.py)
+# ========================================
+
+from collections import Counter
+
+from escenario_participantes import TANDA_ID, evento
+
+
+def test_agregar_lee_la_tanda_una_vez(participantes_falso):
+    handler, _, db = participantes_falso
+
+    respuesta = handler.lambda_handler(evento(
+        'POST /tandas/{tandaId}/participantes',
+        {'nombre': 'Beto', 'telefono': '5587654321', 'numeroAsignado': 2}
+    ), None)
+
+    assert respuesta['statusCode'] == 201
+    assert db.llamadas == Counter({
+        ('tandas', 'get_item'): 1,                   # permisos + datos de la tanda
+        ('cliente', 'transact_write_items'): 1,      # participante + slot
+        ('tandas_vista', 'update_item'): 1,
+        ('tandas', 'update_item'): 1,                # version + totalParticipantes
+        ('links_registro', 'query'): 1,
+    })
+
+
+def test_actualizar_lee_la_tanda_una_vez(participantes_falso):
+    handler, _, db = participantes_falso
+
+    respuesta = handler.lambda_handler(evento(
+        'PUT /tandas/{tandaId}/participantes/{participanteId}',
+        {'nombre': 'Ana María'},
+        participanteId='part_1'
+    ), None)
+
+    assert respuesta['statusCode'] == 200
+    assert db.llamadas == Counter({
+        ('tandas', 'get_item'): 1,
+        ('participantes', 'get_item'): 1,
+        ('participantes', 'update_item'): 1,
+        ('tandas_vista', 'update_item'): 1,
+        ('tandas', 'update_item'): 1,
+        ('links_registro', 'query'): 1,
+    })
+    assert db.item('participantes', id=TANDA_ID, participanteId='part_1')['nombre'] == 'Ana María'
+
+
+def test_eliminar_lee_la_tanda_una_vez(participantes_falso):
+    handler, _, db = participantes_falso
+
+    respuesta = handler.lambda_handler(evento(
+        'DELETE /tandas/{tandaId}/participantes/{participanteId}',
+        participanteId='part_1'
+    ), None)
+
+    assert respuesta['statusCode'] == 200
+    assert db.llamadas == Counter({
+        ('tandas', 'get_item'): 1,
+        ('participantes', 'get_item'): 1,
+        ('pagos', 'query'): 1,
+        ('notificaciones', 'query'): 1,
+        ('score_events', 'query'): 1,
+        ('cliente', 'transact_write_items'): 1,      # participante + slot
+        ('tandas_vista', 'update_item'): 1,
+        ('tandas', 'update_item'): 1,
+        ('links_registro', 'query'): 1,
+    })
+    assert db.item('participantes', id=TANDA_ID, participanteId='part_1') is None
+
+
+def test_cache_se_reinicia_en_cada_invocacion(participantes_falso):
+    handler, _, db = participantes_falso
+    evento_actualizar = evento(
+        'PUT /tandas/{tandaId}/participantes/{participanteId}',
+        {'nombre': 'Ana María'},
+        participanteId='part_1'
+    )
+
+    handler.lambda_handler(evento_actualizar, None)
+    handler.lambda_handler(evento_actualizar, None)
+
+    assert db.llamadas[('tandas', 'get_item')] == 2
+
+
+def test_escritura_de_tanda_vista_invalida_la_tanda_cacheada(participantes_falso):
+    """tanda_vista escribe la tanda con otro objeto Table que el cache no ve"""
+    handler, tanda_vista, db = participantes_falso
+
+    handler.tandas_table.get_item(Key={'id': TANDA_ID})
+    handler.tandas_table.get_item(Key={'id': TANDA_ID})
+    assert db.llamadas[('tandas', 'get_item')] == 1
+
+    tanda_vista.incrementar_version_tanda(TANDA_ID)
+    tanda = handler.tandas_table.get_item(Key={'id': TANDA_ID})['Item']
+
+    assert db.llamadas[('tandas', 'get_item')] == 2
+    assert tanda['version'] == 2